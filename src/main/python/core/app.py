@@ -1,8 +1,23 @@
 """
-INPUT:  HTTP 請求（GET /health、POST /valuate）
-OUTPUT: JSON 回應
+INPUT:  HTTP 請求（GET /health、GET /ready、GET /metrics、POST /valuate、POST /valuate/batch、POST /valuate/stress、
+        POST /valuate/xgboost/explain/stream 等）
+OUTPUT: JSON 回應（解釋串流為 text/event-stream）；執行器滿載時 429 + Retry-After
 POS:    FastAPI 進入點（port 8001）
 
+執行模型：
+    路由本身只做請求解析，CPU 計算送 cpu_executor（VALUATION_EXECUTOR=thread/process），
+    阻塞 I/O 送 io_executor（thread），皆有在途上限（見 core/executor.py），
+    event loop 不會被單一慢請求卡住。Ollama 解釋改以 async 連線池直接 await（見 services/ollamaClient.py），
+    /valuate/xgboost/explain/stream 以 SSE 逐 token 轉送。
+    /valuate/xgboost 的單列 XGBoost 推論經 xgboost_batcher 合併並行請求後一次推論
+    （XGBOOST_BATCH_MAX_SIZE / XGBOOST_BATCH_WAIT_MS，見 core/micro_batcher.py）。
+    物件估價結果另經 valuation_cache 快取（見 core/result_cache.py），同一物件只改貸款金額時僅重算 LTV。
+    model="surface" 時改以離線建置的價格曲面查表（見 inference/price_surface.py），不經模型推論與微批次。
+
+啟動預熱：
+    lifespan 於背景預載 XGBoost 模型並以合成請求走過每條路由的計算路徑（見 core/warmup.py），
+    完成前 GET /ready 回 503；GET /health 僅為存活探針，不觸發任何載入。
+
 啟動方式：
     cd <project_root>
     uvicorn src.main.python.core.app:app --port 8001 --reload
@@ -13,18 +28,47 @@ POS:    FastAPI 進入點（port 8001）
 
 import sys
 import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Literal, Optional
 
 _project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../.."))
 if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+
+from src.main.python.core.executor import (
+    OffloadExecutor,
+    ExecutorSaturated,
+    ExecutorUnavailable,
+    BACKEND_THREAD,
+    install_backpressure_handlers,
+)
+from src.main.python.core.micro_batcher import MicroBatcher
+from src.main.python.core.serialization import json_bytes as _json_bytes
+from src.main.python.core.warmup import Readiness, run_warmup
+from src.main.python.models.valuation_schema import (
+    ValuationRequest,
+    ValuationResult,
+    StressGridRequest,
+    StressGridResponse,
+)
+from src.main.python.services.valuationService import valuate, valuate_batch
+from src.main.python.services import xgboostValuationService as xgb_service
+from src.main.python.services.ollamaClient import OllamaError
+from src.main.python.inference.monte_carlo import multiplier_cache_info, RISK_LEVELS, SERVICE_ENGINE
+from src.main.python.inference.stress_grid import run_stress_grid
 
-from pydantic import BaseModel, Field
 
-from src.main.python.models.valuation_schema import ValuationRequest, ValuationResult
-from src.main.python.services.valuationService import valuate
+class XGBoostShapFactor(BaseModel):
+    """XGBoost 估價回應的影響因子（/valuate/xgboost 的 shap_factors 項目）"""
+    label:        str   = Field(..., description="因子名稱（如：屋齡）")
+    contribution: float = Field(..., description="貢獻比例（貢獻 / Σ|貢獻|）")
+    direction:    str   = Field(..., description="拉高 / 拉低")
 
 
 class XGBoostExplainRequest(BaseModel):
@@ -39,6 +83,10 @@ class XGBoostExplainRequest(BaseModel):
     ltv_ratio:      float = Field(..., ge=0, description="LTV 比率")
     risk_level:     str   = Field(..., description="風險評級")
     loan_amount:    float = Field(..., gt=0, description="申請貸款金額（元）")
+    shap_factors:   list[XGBoostShapFactor] = Field(default_factory=list, description="影響因子（模板解釋使用）")
+    mode:           Optional[Literal["hedged", "llm", "template"]] = Field(
+        default=None, description="hedged=LLM 逾延遲預算改回模板、llm=等待 LLM、template=僅模板（預設依 EXPLAIN_MODE）",
+    )
 
 
 class XGBoostValuationRequest(BaseModel):
@@ -52,12 +100,91 @@ class XGBoostValuationRequest(BaseModel):
     has_parking:   bool  = Field(..., description="是否含車位")
     rooms:         int   = Field(default=3, ge=0, le=10, description="房間數")
     loan_amount:   float = Field(..., gt=0, description="申請貸款金額（元）")
+    term_years:    Optional[int] = Field(default=None, ge=1, le=40, description="貸款年限（年）")
+    model:         Optional[Literal["xgboost", "surface"]] = Field(
+        default=None, description="估價模式：xgboost=即時推論、surface=預先計算價格曲面查表（預設依 XGBOOST_MODEL）",
+    )
+
+# POST /valuate/batch 單次請求筆數上限
+MAX_BATCH_SIZE = 5000
+
+# 預熱用合成請求（涵蓋四層模型、LTV 觸價、期限結構延伸至到期）
+WARMUP_REQUEST = ValuationRequest(
+    area_ping     = 30.0,
+    property_age  = 10,
+    building_type = "大樓",
+    floor         = 8,
+    has_parking   = True,
+    layout        = "3房2廳",
+    region        = "台北市",
+    loan_amount   = 8_000_000.0,
+    term_years    = 20,
+)
+WARMUP_XGBOOST_REQUEST = XGBoostValuationRequest(
+    district      = "大安區",
+    building_type = "大樓",
+    area_ping     = 30.0,
+    property_age  = 10,
+    floor         = 8,
+    total_floors  = 15,
+    has_parking   = True,
+    loan_amount   = 8_000_000.0,
+    term_years    = 20,
+)
+WARMUP_STRESS_REQUEST = StressGridRequest(spot_values=[10_000_000.0], mus=[-0.05, 0.0], sigmas=[0.08, 0.16])
+
+
+def _preload_models() -> None:
+    """載入 XGBoost 鑑價模型與類別編碼表；預設為曲面模式且曲面可用、或無模型檔（Demo 模式）時不載入模型"""
+    if xgb_service.resolve_model() == xgb_service.MODEL_SURFACE:
+        return
+    if xgb_service.MODEL_PATH.exists():
+        xgb_service._load()
+
+
+# CPU 計算（鑑價 / 批次 / 壓力網格 / XGBoost）與阻塞 I/O（Ollama）分開限流；
+# process pool 的每個工作者啟動時各自預載模型
+cpu_executor = OffloadExecutor.from_env("valuation-cpu", "VALUATION", initializer=_preload_models)
+io_executor  = OffloadExecutor.from_env("valuation-io", "VALUATION_IO", BACKEND_THREAD, max_workers=8, max_queue=32)
+_EXECUTORS   = (cpu_executor, io_executor)
+
+# 並行的 XGBoost 單列推論合併為批次（批次本身在 cpu_executor 執行）
+xgboost_batcher = MicroBatcher.from_env("xgboost", "XGBOOST", xgb_service.predict_live, cpu_executor)
+
+readiness = Readiness("ML 鑑價 SubAgent")
+
+
+def _warmup_phases() -> list:
+    """預熱階段：經由 cpu_executor 走與正式請求相同的路徑"""
+    return [
+        ("preload_models",  lambda: cpu_executor.run(_preload_models)),
+        ("warmup_valuate",  lambda: cpu_executor.run(valuate, WARMUP_REQUEST)),
+        ("warmup_batch",    lambda: cpu_executor.run(_valuate_batch_payload, [WARMUP_REQUEST.model_dump()] * 2)),
+        ("warmup_stress",   lambda: cpu_executor.run(_stress_response, WARMUP_STRESS_REQUEST)),
+        ("warmup_xgboost",  lambda: _xgboost_valuation(WARMUP_XGBOOST_REQUEST)),
+    ]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    for executor in _EXECUTORS:
+        executor.reopen()
+    warmup = asyncio.create_task(run_warmup(readiness, _warmup_phases()))
+    yield
+    warmup.cancel()
+    await xgboost_batcher.aclose()
+    await xgb_service.ollama_client.aclose()
+    for executor in _EXECUTORS:
+        executor.shutdown(wait=False)
+
 
 app = FastAPI(
     title       = "ML 鑑價 SubAgent",
     description = "台灣房貸鑑價引擎：Demo LSTM + Demo RF+SDE + 完整 GBM Monte Carlo",
     version     = "1.0.0",
+    lifespan    = lifespan,
 )
+install_backpressure_handlers(app)
 
 # CORS（允許 Node.js 後端呼叫）
 app.add_middleware(
@@ -70,7 +197,7 @@ app.add_middleware(
 
 @app.get("/health")
 async def health_check() -> dict:
-    """服務健康檢查"""
+    """服務存活檢查（liveness：不觸發模型載入，永遠即時回應）"""
     return {
         "status":  "ok",
         "service": "ML 鑑價 SubAgent",
@@ -79,6 +206,33 @@ async def health_check() -> dict:
     }
 
 
+@app.get("/ready")
+async def ready_check():
+    """服務就緒檢查（readiness：預熱完成前 503，完成後 200，附各階段耗時 ms）"""
+    return readiness.response()
+
+
+@app.get("/metrics")
+async def metrics() -> dict:
+    """服務內部指標（快取命中率、執行器佇列深度 / 等待時間、XGBoost 未知類別統計等，供監控 / 自動擴展使用）"""
+    return {
+        "monte_carlo_cache": multiplier_cache_info(),
+        "xgboost_categories": xgb_service.category_stats(),
+        "xgboost_backend":    xgb_service.backend_info(),
+        "xgboost_valuation_cache": xgb_service.valuation_cache.stats(),
+        "xgboost_surface":    xgb_service.surface_info(),
+        "executors": {
+            "cpu": cpu_executor.stats(),
+            "io":  io_executor.stats(),
+        },
+        "micro_batchers": {
+            "xgboost": xgboost_batcher.stats(),
+        },
+        "ollama": xgb_service.ollama_client.stats(),
+        "xgboost_explanation_cache": xgb_service.explanation_cache_stats(),
+    }
+
+
 @app.post("/valuate", response_model=ValuationResult)
 async def valuate_property(request: ValuationRequest) -> ValuationResult:
     """
@@ -93,17 +247,112 @@ async def valuate_property(request: ValuationRequest) -> ValuationResult:
         - layout:         格局（str，例：3房2廳）
         - region:         縣市（str，例：台北市）
         - loan_amount:    申請貸款金額（float，元）
+        - term_years:     貸款年限（int，選填；期限結構延伸至到期，亦為 LTV 觸價機率觀察期間）
 
     Returns:
         ValuationResult（JSON）
     """
     try:
-        result = valuate(request)
-        return result
+        return await cpu_executor.run(valuate, request)
+    except (ExecutorSaturated, ExecutorUnavailable):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"鑑價計算失敗：{str(e)}")
 
 
+@app.post("/valuate/batch")
+async def valuate_property_batch(items: list[dict] = Body(...)) -> Response:
+    """
+    批次鑑價 API（四層模型向量化，一次處理整批物件）
+
+    Request Body：ValuationRequest 物件的 JSON 陣列（上限 MAX_BATCH_SIZE 筆）
+
+    Returns:
+        {
+            results: [{index, ok: true, result: ValuationResult} | {index, ok: false, error: str}, ...],
+            succeeded: int,
+            failed: int
+        }
+        單筆驗證失敗不影響其他筆；結果依輸入順序排列。
+    """
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"批次筆數上限為 {MAX_BATCH_SIZE}")
+
+    return Response(
+        content    = await cpu_executor.run(_valuate_batch_payload, items),
+        media_type = "application/json",
+    )
+
+
+def _valuate_batch_payload(items: list[dict]) -> bytes:
+    """批次驗證 + 鑑價 + 序列化（於執行器中執行）"""
+    # 單次走訪完成驗證：合法者進入批次計算，不合法者記錄錯誤
+    valid: list[ValuationRequest] = []
+    valid_index: list[int] = []
+    results: list[dict] = [None] * len(items)
+    for i, item in enumerate(items):
+        try:
+            valid.append(ValuationRequest.model_validate(item))
+            valid_index.append(i)
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors())
+            results[i] = {"index": i, "ok": False, "error": errors}
+
+    try:
+        outputs = valuate_batch(valid)
+        for i, out in zip(valid_index, outputs):
+            results[i] = {"index": i, "ok": True, "result": out}
+    except Exception:
+        # 批次計算失敗時退回逐筆計算，僅標記出錯的物件
+        for i, req in zip(valid_index, valid):
+            try:
+                results[i] = {"index": i, "ok": True, "result": valuate(req).model_dump()}
+            except Exception as e:
+                results[i] = {"index": i, "ok": False, "error": f"鑑價計算失敗：{str(e)}"}
+
+    succeeded = sum(1 for r in results if r["ok"])
+    return _json_bytes({
+        "results":   results,
+        "succeeded": succeeded,
+        "failed":    len(results) - succeeded,
+    })
+
+
+@app.post("/valuate/stress", response_model=StressGridResponse)
+async def valuate_stress(request: StressGridRequest) -> StressGridResponse:
+    """
+    (mu, sigma) 壓力情境網格 API
+
+    一次回傳所有物件 × 所有情境的 P5 / P50 / P95 與風險代碼（單次廣播計算）。
+
+    Request Body：
+        - spot_values: 起始估值清單（元，例：/valuate 回傳的 estimated_value）
+        - mus:         漂移率情境（例：[-0.05, 0.0, 0.045]）
+        - sigmas:      波動率情境（例：[0.08, 0.16]）
+
+    Returns:
+        StressGridResponse（矩陣皆為 [物件][mu][sigma]）
+    """
+    try:
+        return await cpu_executor.run(_stress_response, request)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _stress_response(request: StressGridRequest) -> StressGridResponse:
+    grid = run_stress_grid(request.spot_values, request.mus, request.sigmas, engine=SERVICE_ENGINE)
+    return StressGridResponse(
+        mus         = grid.mus.tolist(),
+        sigmas      = grid.sigmas.tolist(),
+        p5          = grid.p5.tolist(),
+        p50         = grid.p50.tolist(),
+        p95         = grid.p95.tolist(),
+        risk_codes  = grid.risk_codes.tolist(),
+        risk_levels = list(RISK_LEVELS),
+        engine      = SERVICE_ENGINE,
+    )
+
+
 @app.post("/valuate/xgboost")
 async def valuate_xgboost_property(request: XGBoostValuationRequest) -> dict:
     """
@@ -119,50 +368,112 @@ async def valuate_xgboost_property(request: XGBoostValuationRequest) -> dict:
         - has_parking:   是否含車位
         - rooms:         房間數（預設 3）
         - loan_amount:   申請貸款金額（元）
+        - term_years:    貸款年限（年，選填；期限結構延伸至到期，亦為 LTV 觸價機率觀察期間）
 
     Returns:
-        { estimated_value, confidence_interval, ltv_ratio, risk_level,
-          price_per_ping, model }
+        { estimated_value, confidence_interval, term_structure, ltv_ratio,
+          ltv_breach_probability, risk_level, price_per_ping, model }
     """
     try:
-        from src.main.python.services.xgboostValuationService import valuate_xgboost
-        result = valuate_xgboost(
-            district      = request.district,
-            building_type = request.building_type,
-            area_ping     = request.area_ping,
-            property_age  = request.property_age,
-            floor         = request.floor,
-            total_floors  = request.total_floors,
-            has_parking   = request.has_parking,
-            rooms         = request.rooms,
-            loan_amount   = request.loan_amount,
-        )
-        return result
+        return await _xgboost_valuation(request)
+    except (ExecutorSaturated, ExecutorUnavailable):
+        raise
     except FileNotFoundError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"XGBoost 鑑價失敗：{str(e)}")
 
 
+async def _xgboost_valuation(request: XGBoostValuationRequest) -> dict:
+    """
+    物件估價經 valuation_cache 快取（同鍵並行未命中合併為一次計算），LTV 相關欄位依本次貸款金額重算：
+    未命中時特徵於 event loop 編碼、推論與解釋因子經微批次合併；其餘計算（Monte Carlo 等）送 cpu_executor
+    """
+    features = dict(
+        district      = request.district,
+        building_type = request.building_type,
+        area_ping     = request.area_ping,
+        property_age  = request.property_age,
+        floor         = request.floor,
+        total_floors  = request.total_floors,
+        has_parking   = request.has_parking,
+        rooms         = request.rooms,
+    )
+    model = xgb_service.resolve_model(request.model)
+    valuation = await xgb_service.valuation_cache.aget_or_compute(
+        xgb_service.valuation_cache_key(**features, term_years=request.term_years, model=model),
+        lambda: _property_valuation(features, request.term_years, model),
+    )
+    return await cpu_executor.run(xgb_service.apply_loan, valuation, request.loan_amount, request.term_years)
+
+
+async def _property_valuation(features: dict, term_years: Optional[int], model: str) -> xgb_service.PropertyValuation:
+    prediction = None
+    if model == xgb_service.MODEL_XGBOOST and xgb_service.MODEL_PATH.exists():
+        prediction = await xgboost_batcher.submit(xgb_service.build_feature_row(**features))
+    return await cpu_executor.run(
+        xgb_service.property_valuation, **features, term_years=term_years,
+        live_prediction=prediction, model=model,
+    )
+
+
 @app.post("/valuate/xgboost/explain")
 async def explain_xgboost_valuation(request: XGBoostExplainRequest) -> dict:
     """
     Qwen2.5 白話解釋 XGBoost 估價結果
 
-    呼叫本地 Ollama Qwen2.5 模型，產生 2-3 段中文說明。
-    若 Ollama 未啟動，回傳 explanation: ""（不中斷主流程）。
+    呼叫本地 Ollama Qwen2.5 模型，產生 2-3 段中文說明（async 連線池，不佔用執行緒）。
+    相同內容的解釋直接取自解釋快取，並行的相同請求只生成一次。
+    LLM 未於延遲預算（EXPLAIN_LLM_BUDGET_MS）內完成、Ollama 未啟動或逾時時，
+    改回傳依影響因子 / LTV / 風險評級組成的模板說明；source 標示說明來源（llm / template）。
+    """
+    fields = request.model_dump(exclude={"shap_factors", "mode"})
+    return await xgb_service.explain_with_fallback(
+        mode         = request.mode,
+        shap_factors = [f.model_dump() for f in request.shap_factors],
+        **fields,
+    )
+
+
+@app.post("/valuate/xgboost/explain/stream")
+async def stream_xgboost_explanation(request: XGBoostExplainRequest) -> StreamingResponse:
     """
-    from src.main.python.services.xgboostValuationService import explain_valuation_zh
-    explanation = explain_valuation_zh(
-        district        = request.district,
-        building_type   = request.building_type,
-        area_ping       = request.area_ping,
-        property_age    = request.property_age,
-        floor           = request.floor,
-        price_per_ping  = request.price_per_ping,
-        estimated_value = request.estimated_value,
-        ltv_ratio       = request.ltv_ratio,
-        risk_level      = request.risk_level,
-        loan_amount     = request.loan_amount,
+    Qwen2.5 白話解釋（Server-Sent Events 串流）
+
+    Ollama 每產生一個 token 即轉送，前端不必等待完整回覆：
+        event: token  data: {"text": "..."}          逐 token
+        event: error  data: {"error": "..."}         Ollama 未啟動 / 逾時 / 錯誤（其後仍送 done）
+        event: done   data: {"explanation": "...", "source": "llm" | "template"}
+                                                     完整說明；LLM 失敗時為模板說明（取代已送出的片段）
+    解釋快取命中時只送一個包含完整說明的 token 事件；mode="template" 時直接送出模板說明。
+    """
+    return StreamingResponse(
+        _explanation_events(request),
+        media_type = "text/event-stream",
+        headers    = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return {"explanation": explanation}
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + _json_bytes(data) + b"\n\n"
+
+
+async def _explanation_events(request: XGBoostExplainRequest):
+    result = request.model_dump(exclude={"shap_factors", "mode"})
+    template_only = (request.mode or xgb_service.EXPLAIN_MODE) == xgb_service.EXPLAIN_MODE_TEMPLATE
+    if not template_only:
+        tokens = []
+        try:
+            async for token in xgb_service.stream_explanation_zh(**result):
+                tokens.append(token)
+                yield _sse("token", {"text": token})
+            yield _sse("done", {"explanation": "".join(tokens).strip(), "source": xgb_service.EXPLAIN_SOURCE_LLM})
+            return
+        except OllamaError as e:
+            yield _sse("error", {"error": str(e)})
+
+    # 模板模式，或 LLM 失敗時以完整的模板說明取代已送出的片段
+    explanation = xgb_service.template_explanation([f.model_dump() for f in request.shap_factors], **result)
+    if template_only:
+        yield _sse("token", {"text": explanation})
+    yield _sse("done", {"explanation": explanation, "source": xgb_service.EXPLAIN_SOURCE_TEMPLATE})
@@ -0,0 +1,117 @@
+"""
+INPUT:  內容定址鍵（十六進位雜湊字串）與可 JSON 序列化的值
+OUTPUT: 先前寫入的值（未過期）或 None；命中 / 寫入等統計供 /metrics
+POS:    核心層 — 選用的磁碟快取（ResultCache 的第二層，服務重啟後仍保留結果）
+
+設計說明：
+    每個鍵存為一個 JSON 檔（{directory}/{key[:2]}/{key}.json，依前兩碼分目錄避免單一目錄過多檔案），
+    內容為 {"value": ..., "created_at": epoch 秒}。寫入先寫行程專屬暫存檔再 os.replace，
+    多個工作者同時寫入同一鍵也不會讀到半成品；讀取失敗（檔案損毀等）視為未命中。
+    未設定目錄時停用（get 一律回傳 None、put 不寫入）。
+
+環境變數（prefix 例：EXPLAIN）：
+    {PREFIX}_CACHE_DIR          快取目錄（未設定 = 停用）
+    {PREFIX}_CACHE_DISK_TTL_S   有效秒數（預設 30 天）
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_DISK_TTL_S = 30 * 86_400.0
+
+
+class DiskStore:
+    """內容定址 JSON 檔案快取（執行緒安全；directory 為 None 時停用）"""
+
+    def __init__(
+        self,
+        name: str,
+        directory=None,
+        ttl_seconds: float = DEFAULT_DISK_TTL_S,
+    ):
+        self.name        = name
+        self.directory   = Path(directory) if directory else None
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+
+        self._lock    = threading.Lock()
+        self._hits    = 0
+        self._misses  = 0
+        self._expired = 0
+        self._writes  = 0
+        self._errors  = 0
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str) -> "DiskStore":
+        """依 {prefix}_CACHE_DIR / _CACHE_DISK_TTL_S 環境變數建立"""
+        return cls(
+            name        = name,
+            directory   = os.environ.get(f"{prefix}_CACHE_DIR") or None,
+            ttl_seconds = float(os.environ.get(f"{prefix}_CACHE_DISK_TTL_S", DEFAULT_DISK_TTL_S)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    # ─── 存取 ────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[object]:
+        """讀取未過期的值（停用、不存在、過期或損毀 → None）"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self._count("_misses")
+            return None
+        except (OSError, ValueError):
+            self._count("_errors")
+            return None
+        if time.time() - entry.get("created_at", 0) >= self.ttl_seconds:
+            self._count("_expired")
+            return None
+        self._count("_hits")
+        return entry.get("value")
+
+    def put(self, key: str, value) -> None:
+        if not self.enabled or self.ttl_seconds == 0:
+            return
+        path = self._path(key)
+        tmp  = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"value": value, "created_at": time.time()}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            self._count("_errors")
+            tmp.unlink(missing_ok=True)
+            return
+        self._count("_writes")
+
+    # ─── 指標 ────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled":   self.enabled,
+                "directory": str(self.directory) if self.enabled else None,
+                "ttl_s":     self.ttl_seconds,
+                "hits":      self._hits,
+                "misses":    self._misses,
+                "expired":   self._expired,
+                "writes":    self._writes,
+                "errors":    self._errors,
+            }
@@ -0,0 +1,265 @@
+"""
+INPUT:  同步（CPU / 阻塞 I/O）函式與參數
+OUTPUT: await 後的函式回傳值；滿載時拋出 ExecutorSaturated（→ HTTP 429 + Retry-After）
+POS:    核心層 — FastAPI 路由的有界卸載執行器（thread / process pool + 在途上限 + 背壓）
+
+設計說明：
+    async 路由內直接執行 CPU 計算或阻塞 I/O 會卡住整個 event loop，
+    OffloadExecutor 將工作送進 thread / process pool，並以「在途上限」限制排隊長度：
+        capacity = workers + max_queue
+    在途數達上限時立即拒絕（ExecutorSaturated → 429），而非無限排隊累積延遲；
+    執行器已關閉時拋出 ExecutorUnavailable（→ 503）。
+    Retry-After 以近期平均執行時間 × 排隊長度 / workers 估計。
+
+環境變數（prefix 例：VALUATION、FRAUD）：
+    {PREFIX}_EXECUTOR   thread / process（預設 thread）
+    {PREFIX}_WORKERS    工作者數（預設 min(4, CPU 數)）
+    {PREFIX}_MAX_QUEUE  除執行中以外可排隊的工作數（預設 workers × 8）
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+BACKEND_THREAD  = "thread"
+BACKEND_PROCESS = "process"
+EXECUTOR_BACKENDS = (BACKEND_THREAD, BACKEND_PROCESS)
+
+# 等待 / 執行時間樣本保留筆數（計算 P50 / P95）
+TIMING_WINDOW = 1024
+# 平均執行時間的指數平滑係數
+EWMA_ALPHA = 0.2
+
+
+class ExecutorSaturated(Exception):
+    """在途工作已達上限（→ 429）"""
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} 執行器已滿載，請於 {retry_after} 秒後重試")
+        self.retry_after = retry_after
+
+
+class ExecutorUnavailable(Exception):
+    """執行器已關閉（→ 503）"""
+    def __init__(self, name: str, retry_after: int = 5):
+        super().__init__(f"{name} 執行器暫停服務")
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict):
+    """於工作者內執行並記錄起訖時間（wall clock，跨行程可比）；例外原樣帶回由呼叫端重拋"""
+    started = time.time()
+    try:
+        return started, time.time(), True, fn(*args, **kwargs)
+    except BaseException as e:
+        return started, time.time(), False, e
+
+
+class OffloadExecutor:
+    """有界卸載執行器（thread / process pool），pool 於第一次提交時才建立"""
+
+    def __init__(
+        self,
+        name: str,
+        backend: str = BACKEND_THREAD,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        if backend not in EXECUTOR_BACKENDS:
+            raise ValueError(f"未知的執行器類型：{backend}（可用：{', '.join(EXECUTOR_BACKENDS)}）")
+        self.name        = name
+        self.backend     = backend
+        self.max_workers = max(1, int(max_workers or min(4, os.cpu_count() or 1)))
+        self.max_queue   = max(0, int(self.max_workers * 8 if max_queue is None else max_queue))
+        self.capacity    = self.max_workers + self.max_queue
+        self.initializer = initializer   # 每個工作者啟動時執行一次（process pool 用於預載模型）
+
+        self._pool: Optional[Executor] = None
+        self._closed   = False
+        self._lock     = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed    = 0
+        self._rejected  = 0
+        self._waits:    deque = deque(maxlen=TIMING_WINDOW)
+        self._services: deque = deque(maxlen=TIMING_WINDOW)
+        self._service_ewma = 0.0
+
+    @classmethod
+    def from_env(
+        cls,
+        name: str,
+        prefix: str,
+        backend: str = BACKEND_THREAD,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        initializer: Optional[Callable[[], None]] = None,
+    ) -> "OffloadExecutor":
+        """依 {prefix}_EXECUTOR / _WORKERS / _MAX_QUEUE 環境變數建立（未設定者用參數預設值）"""
+        workers = os.environ.get(f"{prefix}_WORKERS")
+        queue   = os.environ.get(f"{prefix}_MAX_QUEUE")
+        return cls(
+            name        = name,
+            backend     = os.environ.get(f"{prefix}_EXECUTOR", backend).strip().lower(),
+            max_workers = int(workers) if workers else max_workers,
+            max_queue   = int(queue) if queue else max_queue,
+            initializer = initializer,
+        )
+
+    # ─── 提交 ────────────────────────────────────────────────────────
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        於 pool 中執行 fn(*args, **kwargs) 並 await 結果
+
+        Raises:
+            ExecutorSaturated:   在途數已達 capacity
+            ExecutorUnavailable: 執行器已關閉
+            其餘例外：fn 本身拋出者原樣重拋
+        """
+        with self._lock:
+            if self._closed:
+                raise ExecutorUnavailable(self.name)
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise ExecutorSaturated(self.name, self._retry_after_locked())
+            self._in_flight += 1
+            self._submitted += 1
+            pool = self._ensure_pool_locked()
+
+        enqueued = time.time()
+        try:
+            future = pool.submit(_timed_call, fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+                self._failed += 1
+            raise
+        # 以 done callback 結算：呼叫端被取消（client 斷線）時在途數仍於工作真正結束後才扣除
+        future.add_done_callback(lambda f: self._on_done(f, enqueued))
+
+        _, _, ok, payload = await asyncio.wrap_future(future)
+        if not ok:
+            raise payload
+        return payload
+
+    def _on_done(self, future, enqueued: float) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+                return
+            started, finished, ok, _ = future.result()
+            if not ok:
+                self._failed += 1
+            service = max(finished - started, 0.0)
+            self._waits.append(max(started - enqueued, 0.0))
+            self._services.append(service)
+            self._service_ewma = (
+                service if len(self._services) == 1
+                else (1 - EWMA_ALPHA) * self._service_ewma + EWMA_ALPHA * service
+            )
+
+    def _ensure_pool_locked(self) -> Executor:
+        if self._pool is None:
+            if self.backend == BACKEND_PROCESS:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=self.initializer)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers        = self.max_workers,
+                    thread_name_prefix = self.name,
+                    initializer        = self.initializer,
+                )
+        return self._pool
+
+    def _retry_after_locked(self) -> int:
+        """預估清空目前排隊所需秒數（至少 1 秒）"""
+        queued = max(self._in_flight - self.max_workers, 0) + 1
+        return max(1, math.ceil(self._service_ewma * queued / self.max_workers))
+
+    # ─── 生命週期 / 指標 ─────────────────────────────────────────────
+
+    def shutdown(self, wait: bool = True) -> None:
+        """關閉 pool；之後的提交拋出 ExecutorUnavailable"""
+        with self._lock:
+            self._closed = True
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def reopen(self) -> None:
+        """重新接受提交（pool 於下次提交時重建）"""
+        with self._lock:
+            self._closed = False
+
+    def stats(self) -> dict:
+        """佇列深度、等待 / 執行時間（秒）與拒絕次數，供 /metrics 與自動擴展使用"""
+        with self._lock:
+            waits    = np.fromiter(self._waits, dtype=np.float64, count=len(self._waits))
+            services = np.fromiter(self._services, dtype=np.float64, count=len(self._services))
+            in_flight = self._in_flight
+            out = {
+                "backend":      self.backend,
+                "workers":      self.max_workers,
+                "capacity":     self.capacity,
+                "in_flight":    in_flight,
+                "queue_depth":  max(in_flight - self.max_workers, 0),
+                "utilization":  round(in_flight / self.capacity, 4),
+                "submitted":    self._submitted,
+                "completed":    self._completed,
+                "failed":       self._failed,
+                "rejected":     self._rejected,
+                "closed":       self._closed,
+            }
+        out["wait_seconds"]    = _timing_summary(waits)
+        out["service_seconds"] = _timing_summary(services)
+        return out
+
+
+def _timing_summary(samples: np.ndarray) -> dict:
+    if samples.size == 0:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0, "samples": 0}
+    p50, p95 = np.percentile(samples, [50, 95])
+    return {
+        "p50":     round(float(p50), 6),
+        "p95":     round(float(p95), 6),
+        "max":     round(float(samples.max()), 6),
+        "samples": int(samples.size),
+    }
+
+
+# ─── FastAPI 例外處理 ─────────────────────────────────────────────
+
+async def saturated_handler(request: Request, exc: ExecutorSaturated) -> JSONResponse:
+    """滿載 → 429 Too Many Requests + Retry-After"""
+    return JSONResponse(
+        status_code = 429,
+        content     = {"detail": str(exc)},
+        headers     = {"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def unavailable_handler(request: Request, exc: ExecutorUnavailable) -> JSONResponse:
+    """執行器關閉 → 503 Service Unavailable + Retry-After"""
+    return JSONResponse(
+        status_code = 503,
+        content     = {"detail": str(exc)},
+        headers     = {"Retry-After": str(exc.retry_after)},
+    )
+
+
+def install_backpressure_handlers(app) -> None:
+    """註冊 ExecutorSaturated / ExecutorUnavailable 的 HTTP 對應"""
+    app.add_exception_handler(ExecutorSaturated,   saturated_handler)
+    app.add_exception_handler(ExecutorUnavailable, unavailable_handler)
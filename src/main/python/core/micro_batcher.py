@@ -0,0 +1,221 @@
+"""
+INPUT:  並行請求各自的一列特徵（np.ndarray，一維）
+OUTPUT: 該列的預測值（由單次批次推論結果分發）
+POS:    核心層 — 非同步微批次排程器（XGBoost 鑑價 / 防詐模型，並行單列請求合併為一次批次推論）
+
+設計說明：
+    樹模型一次推論 64 列與 1 列的成本相近（主要是呼叫與樹走訪的固定開銷），
+    並行請求各自呼叫 predict 會浪費這個特性。MicroBatcher 於 event loop 內收集請求：
+        第一筆進入後最多再等 max_wait_ms，或湊滿 max_batch_size 即送出，
+    批次經 OffloadExecutor 執行（沿用在途上限與 429 背壓），結果依序分發回各請求。
+    批次大小與排隊延遲以 Histogram 記錄，供對照 p99 調整等待窗口。
+
+環境變數（prefix 例：XGBOOST、FRAUD）：
+    {PREFIX}_BATCH_MAX_SIZE  單批上限（預設 64）
+    {PREFIX}_BATCH_WAIT_MS   第一筆進入後最長等待毫秒（預設 2）
+"""
+
+import asyncio
+import bisect
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from src.main.python.core.executor import OffloadExecutor
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS    = 2.0
+
+BATCH_SIZE_BUCKETS     = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_DELAY_MS_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    """固定邊界直方圖（累積計數，與 Prometheus le 語意相同）"""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(float(b) for b in bounds)
+        self._lock   = threading.Lock()
+        self._counts = [0] * (len(self.bounds) + 1)   # 最後一格為 +Inf
+        self._sum    = 0.0
+        self._count  = 0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.bounds, value)] += 1
+            self._sum   += value
+            self._count += 1
+
+    def quantile(self, q: float) -> float:
+        """以所在桶上界估計分位數（落在 +Inf 桶時回傳最後邊界）"""
+        with self._lock:
+            if self._count == 0:
+                return 0.0
+            rank = q * self._count
+            running = 0
+            for bound, count in zip(self.bounds, self._counts):
+                running += count
+                if running >= rank:
+                    return bound
+            return self.bounds[-1]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, running = {}, 0
+            for bound, count in zip(self.bounds, self._counts):
+                running += count
+                cumulative[f"{bound:g}"] = running
+            cumulative["+Inf"] = self._count
+            total, count = self._sum, self._count
+        return {
+            "le":    cumulative,
+            "count": count,
+            "sum":   round(total, 6),
+            "p50":   self.quantile(0.50),
+            "p99":   self.quantile(0.99),
+        }
+
+
+class MicroBatcher:
+    """將並行的單列推論請求合併為批次（predict_fn: (n, d) → (n,)）"""
+
+    def __init__(
+        self,
+        name: str,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        executor: OffloadExecutor,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+    ):
+        self.name           = name
+        self.predict_fn     = predict_fn
+        self.executor       = executor
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms    = max(0.0, float(max_wait_ms))
+
+        self.batch_sizes  = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_delays = Histogram(QUEUE_DELAY_MS_BUCKETS)
+        self._batches = 0
+        self._items   = 0
+        self._failed_batches = 0
+
+        self._loop:  Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task:  Optional[asyncio.Task] = None
+        self._running: set = set()   # 執行中的批次工作（保留強參照）
+
+    @classmethod
+    def from_env(
+        cls,
+        name: str,
+        prefix: str,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        executor: OffloadExecutor,
+    ) -> "MicroBatcher":
+        """依 {prefix}_BATCH_MAX_SIZE / _BATCH_WAIT_MS 環境變數建立"""
+        return cls(
+            name           = name,
+            predict_fn     = predict_fn,
+            executor       = executor,
+            max_batch_size = int(os.environ.get(f"{prefix}_BATCH_MAX_SIZE", DEFAULT_MAX_BATCH_SIZE)),
+            max_wait_ms    = float(os.environ.get(f"{prefix}_BATCH_WAIT_MS", DEFAULT_MAX_WAIT_MS)),
+        )
+
+    # ─── 提交 ────────────────────────────────────────────────────────
+
+    async def submit(self, row: np.ndarray):
+        """送出一列特徵，await 該列的預測值"""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((row, future, time.perf_counter()))
+        return await future
+
+    def _ensure_worker(self) -> None:
+        # 收集工作綁定目前的 event loop；loop 更換（例如重新啟動應用）時重建
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop  = loop
+            self._queue = asyncio.Queue()
+            self._task  = loop.create_task(self._collect())
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # 送出後立即回頭收集下一批，批次之間可並行（受執行器在途上限約束）
+            task = loop.create_task(self._execute(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _execute(self, batch: list) -> None:
+        now = time.perf_counter()
+        for _, _, enqueued in batch:
+            self.queue_delays.observe((now - enqueued) * 1000)
+        self.batch_sizes.observe(len(batch))
+        self._batches += 1
+        self._items   += len(batch)
+
+        try:
+            rows = np.stack([row for row, _, _ in batch])
+            preds = await self.executor.run(self.predict_fn, rows)
+            if len(preds) != len(batch):
+                # 筆數不符時 zip 會提早結束，其餘請求永遠等不到結果 → 整批以例外結束
+                raise ValueError(f"{self.name}: predict_fn 回傳 {len(preds)} 筆結果，批次共 {len(batch)} 列")
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            # 批次失敗（含 ExecutorSaturated）→ 同批所有請求收到相同例外
+            self._failed_batches += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), pred in zip(batch, preds):
+            if not future.done():
+                future.set_result(pred)
+
+    async def aclose(self) -> None:
+        """停止收集工作（lifespan 結束時呼叫）"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    # ─── 指標 ────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        """批次數、平均批次大小、批次大小 / 排隊延遲（ms）直方圖"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms":    self.max_wait_ms,
+            "batches":        self._batches,
+            "items":          self._items,
+            "failed_batches": self._failed_batches,
+            "pending":        self._queue.qsize() if self._queue is not None else 0,
+            "mean_batch_size": round(self._items / self._batches, 3) if self._batches else 0.0,
+            "batch_size":     self.batch_sizes.snapshot(),
+            "queue_delay_ms": self.queue_delays.snapshot(),
+        }
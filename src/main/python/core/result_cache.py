@@ -0,0 +1,215 @@
+"""
+INPUT:  快取鍵（可雜湊 tuple）與未命中時的計算函式（同步函式或回傳 awaitable 的函式）
+OUTPUT: 快取值（命中）或計算結果（未命中，存入快取）；命中率等統計供 /metrics
+POS:    核心層 — 有界 TTL + LRU 結果快取，並合併同鍵的並行未命中（single-flight）
+
+設計說明：
+    行員調整貸款金額反覆試算同一物件時，物件估價（編碼、推論、解釋因子、Monte Carlo）結果不變，
+    只有 LTV 相關欄位需要重算。ResultCache 以 OrderedDict 保存 (到期時間, 值)：
+        命中 → 移到尾端（最近使用）；過期 → 視為未命中並移除；超過 maxsize → 淘汰最久未使用。
+    同一鍵的並行未命中只計算一次，其餘請求等待同一結果（例外亦同時傳給所有等待者，不寫入快取）：
+        get_or_compute   執行緒版（執行器內的同步呼叫）
+        aget_or_compute  event loop 版；計算包成獨立 Task，發起請求被取消時其他等待者與快取寫入不受影響
+
+環境變數（prefix 例：XGBOOST、EXPLAIN）：
+    {PREFIX}_CACHE_SIZE   快取筆數上限（預設 4096；0 = 不快取，仍合併並行未命中）
+    {PREFIX}_CACHE_TTL_S  有效秒數（預設 900，可由 from_env 的 ttl_seconds 覆寫預設值）
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Optional
+
+DEFAULT_CACHE_SIZE  = 4096
+DEFAULT_CACHE_TTL_S = 900.0
+
+_MISSING = object()
+
+
+class _Flight:
+    """執行緒版進行中的計算（等待者共用結果）"""
+
+    def __init__(self):
+        self.done  = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class ResultCache:
+    """有界 TTL / LRU 快取 + single-flight（執行緒安全）"""
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_CACHE_TTL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name        = name
+        self.maxsize     = max(0, int(maxsize))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._clock      = clock
+
+        self._lock    = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._flights: dict[Hashable, _Flight] = {}
+        self._loop:  Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+
+        self._hits        = 0
+        self._misses      = 0
+        self._coalesced   = 0
+        self._evictions   = 0
+        self._expirations = 0
+        self._errors      = 0
+
+    @classmethod
+    def from_env(
+        cls,
+        name: str,
+        prefix: str,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_CACHE_TTL_S,
+    ) -> "ResultCache":
+        """依 {prefix}_CACHE_SIZE / _CACHE_TTL_S 環境變數建立（maxsize / ttl_seconds 為未設定時的預設值）"""
+        return cls(
+            name        = name,
+            maxsize     = int(os.environ.get(f"{prefix}_CACHE_SIZE", maxsize)),
+            ttl_seconds = float(os.environ.get(f"{prefix}_CACHE_TTL_S", ttl_seconds)),
+        )
+
+    # ─── 基本存取 ────────────────────────────────────────────────────
+
+    def _lookup_locked(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            self._expirations += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default=None):
+        """僅查詢（計入命中 / 未命中）"""
+        with self._lock:
+            value = self._lookup_locked(key)
+            if value is _MISSING:
+                self._misses += 1
+                return default
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value) -> None:
+        if self.maxsize == 0 or self.ttl_seconds == 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """清空快取並歸零統計（進行中的計算不受影響）"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._coalesced = 0
+            self._evictions = self._expirations = self._errors = 0
+
+    # ─── single-flight ───────────────────────────────────────────────
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        """命中回傳快取值；未命中由第一個呼叫者計算，同鍵並行呼叫者等待同一結果"""
+        with self._lock:
+            value = self._lookup_locked(key)
+            if value is not _MISSING:
+                self._hits += 1
+                return value
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._misses += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            self.put(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    async def aget_or_compute(self, key: Hashable, compute: Callable[[], Awaitable]):
+        """event loop 版 get_or_compute（compute 回傳 awaitable）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            value = self._lookup_locked(key)
+            if value is not _MISSING:
+                self._hits += 1
+                return value
+            if self._loop is not loop:
+                # 進行中的 Task 綁定原 event loop；loop 更換（例如重新啟動應用）時重建
+                self._loop  = loop
+                self._tasks = {}
+            task = self._tasks.get(key)
+            if task is None:
+                self._misses += 1
+            else:
+                self._coalesced += 1
+
+        if task is None:
+            task = loop.create_task(compute())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t, key=key: self._settle(key, t))
+        return await asyncio.shield(task)
+
+    def _settle(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            with self._lock:
+                self._errors += 1
+            return
+        self.put(key, task.result())
+
+    # ─── 指標 ────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        """命中 / 未命中 / 合併等待次數、命中率（命中 + 合併 佔全部查詢）、淘汰與過期次數"""
+        with self._lock:
+            lookups = self._hits + self._misses + self._coalesced
+            return {
+                "size":        len(self._entries),
+                "maxsize":     self.maxsize,
+                "ttl_s":       self.ttl_seconds,
+                "hits":        self._hits,
+                "misses":      self._misses,
+                "coalesced":   self._coalesced,
+                "hit_rate":    round((self._hits + self._coalesced) / lookups, 4) if lookups else 0.0,
+                "evictions":   self._evictions,
+                "expirations": self._expirations,
+                "errors":      self._errors,
+                "in_flight":   len(self._flights) + len(self._tasks),
+            }
@@ -0,0 +1,20 @@
+"""
+INPUT:  可 JSON 序列化的回應內容（dict / list，值為 Python 原生型別）
+OUTPUT: UTF-8 JSON bytes（直接作為 fastapi Response 的 content）
+POS:    核心層 — 批次 API 回應序列化（/valuate/batch、/score/batch）
+
+說明：
+    大型批次回應若交給 FastAPI 預設序列化，需逐筆經 jsonable_encoder 走訪，
+    這裡直接產生 bytes；orjson 約快 5-10 倍，未安裝時退回標準 json。
+"""
+
+try:
+    import orjson
+
+    def json_bytes(content) -> bytes:
+        return orjson.dumps(content)
+except ImportError:
+    import json
+
+    def json_bytes(content) -> bytes:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
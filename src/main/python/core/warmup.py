@@ -0,0 +1,89 @@
+"""
+INPUT:  依序的啟動階段（名稱 + 回傳 awaitable 的函式：模型預載、各路由的合成請求）
+OUTPUT: Readiness 狀態（ready / 各階段耗時 ms / 錯誤訊息），供 GET /ready 回應
+POS:    核心層 — 服務啟動預熱與就緒探針（/health 僅表示行程存活，/ready 表示可承接流量）
+
+設計說明：
+    模型載入（pandas / xgboost / joblib import、編碼表建構）與首次推論
+    原本延遲到第一個請求才發生，部署後的前幾個請求會出現數秒延遲尖峰。
+    lifespan 啟動時以背景工作依序執行各階段（經由與正式請求相同的執行器與程式路徑），
+    全部成功後 /ready 才回 200；任一階段失敗則維持 503 並附上錯誤。
+    每個階段耗時寫入 log（logger：src.main.python.core.warmup）。
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Optional
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+WarmupPhase = tuple[str, Callable[[], Awaitable]]
+
+
+class Readiness:
+    """服務就緒狀態（預熱未完成或失敗時 ready=False）"""
+
+    def __init__(self, service: str):
+        self.service = service
+        self.reset()
+
+    def reset(self) -> None:
+        self.ready: bool = False
+        self.error: Optional[str] = None
+        self.phases_ms: dict[str, float] = {}
+        self._started = time.perf_counter()
+        self.warmup_ms: Optional[float] = None
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.phases_ms[phase] = round(seconds * 1000, 1)
+
+    def mark_ready(self) -> None:
+        self.warmup_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        self.ready = True
+
+    def mark_failed(self, error: str) -> None:
+        self.warmup_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        self.error = error
+
+    def snapshot(self) -> dict:
+        return {
+            "ready":     self.ready,
+            "service":   self.service,
+            "phases_ms": dict(self.phases_ms),
+            "warmup_ms": self.warmup_ms,
+            "error":     self.error,
+        }
+
+    def response(self) -> JSONResponse:
+        """GET /ready 回應：就緒 200，否則 503"""
+        return JSONResponse(status_code=200 if self.ready else 503, content=self.snapshot())
+
+
+@contextmanager
+def timed_phase(readiness: Readiness, phase: str):
+    """記錄單一階段耗時並寫入 log（例外時仍記錄耗時）"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        readiness.record(phase, elapsed)
+        logger.info("[%s] 啟動階段 %s：%.1f ms", readiness.service, phase, elapsed * 1000)
+
+
+async def run_warmup(readiness: Readiness, phases: list[WarmupPhase]) -> None:
+    """依序執行各階段；全部成功 → ready，任一失敗 → 記錄錯誤並停止"""
+    readiness.reset()
+    for name, step in phases:
+        try:
+            with timed_phase(readiness, name):
+                await step()
+        except Exception as e:
+            readiness.mark_failed(f"{name}: {e}")
+            logger.exception("[%s] 啟動階段 %s 失敗", readiness.service, name)
+            return
+    readiness.mark_ready()
+    logger.info("[%s] 預熱完成：%.1f ms", readiness.service, readiness.warmup_ms)
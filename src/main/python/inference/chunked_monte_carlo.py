@@ -0,0 +1,135 @@
+"""
+INPUT:  spot_value（當前估值，元）、mu / sigma（年化參數）、n_paths（路徑數，可達百萬級）、
+        horizon_years（模擬年期，預設 30 年）、steps_per_year（預設 12，月步）
+OUTPUT: ChunkedMonteCarloResult（P5 / P50 / P95、草圖誤差界、risk_level）
+POS:    推論層 — 壓力測試用分塊 GBM 蒙地卡羅（記憶體上限固定，與路徑數無關）
+
+算法說明：
+    run_monte_carlo 一次建立 (n_paths, n_steps) float64 矩陣，
+    100 萬路徑 × 360 月步即需 2.9 GB。本引擎改為：
+        1. 路徑分塊（chunk_paths 條一塊），每塊再依步數分段（step_block 步一段）
+        2. 以預先配置的 float32 緩衝區產生標準常態亂數，逐段累加期末 ΣZ
+        3. 期末價格 S_T = spot_value × exp((mu - 0.5×sigma²)×T + sigma×sqrt(dt)×ΣZ)
+        4. 每塊期末價格送入 t-digest 串流草圖，最後查詢 P5 / P50 / P95 與誤差界
+    峰值記憶體 ≈ chunk_paths × step_block × 4 bytes + 草圖緩衝，與 n_paths 無關。
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.main.python.inference.monte_carlo import (
+    ConfidenceInterval,
+    DEFAULT_MU,
+    DEFAULT_SIGMA,
+    classify_risk,
+)
+from src.main.python.utils.quantile_sketch import TDigest, DEFAULT_COMPRESSION
+
+DEFAULT_CHUNK_PATHS = 16_384   # 每塊路徑數
+DEFAULT_STEP_BLOCK  = 64       # 每段步數（控制亂數緩衝區大小）
+
+
+@dataclass
+class ChunkedMonteCarloResult:
+    """分塊蒙地卡羅結果（含 t-digest 誤差界）"""
+    confidence_interval: ConfidenceInterval
+    risk_level: str
+    error_bounds: dict[str, tuple[float, float]]   # {"p5": (lo, hi), ...}（元）
+    rank_errors: dict[str, float]                  # {"p5": ε, ...}（分位數 rank 誤差）
+    n_paths: int
+    n_steps: int
+    n_chunks: int
+    horizon_years: float
+
+
+def run_monte_carlo_chunked(
+    spot_value: float,
+    mu: float = DEFAULT_MU,
+    sigma: float = DEFAULT_SIGMA,
+    n_paths: int = 1_000_000,
+    horizon_years: float = 30.0,
+    steps_per_year: int = 12,
+    chunk_paths: int = DEFAULT_CHUNK_PATHS,
+    step_block: int = DEFAULT_STEP_BLOCK,
+    seed: int = 42,
+    compression: float = DEFAULT_COMPRESSION,
+) -> ChunkedMonteCarloResult:
+    """
+    分塊 GBM 蒙地卡羅（float32 區塊 + t-digest 串流分位數）
+
+    Args:
+        spot_value:     起始估值（元）
+        mu:             年化漂移率
+        sigma:          年化波動率
+        n_paths:        總路徑數（預設 100 萬）
+        horizon_years:  模擬年期（預設 30 年，對應房貸年限）
+        steps_per_year: 每年步數（預設 12，月步）
+        chunk_paths:    每塊路徑數
+        step_block:     每段步數
+        seed:           隨機種子
+        compression:    t-digest 壓縮參數（越大越準、centroid 越多）
+
+    Returns:
+        ChunkedMonteCarloResult
+    """
+    if n_paths <= 0 or chunk_paths <= 0 or step_block <= 0:
+        raise ValueError("n_paths / chunk_paths / step_block 須為正整數")
+
+    n_steps = max(int(round(horizon_years * steps_per_year)), 1)
+    dt      = horizon_years / n_steps
+    drift   = (mu - 0.5 * sigma ** 2) * horizon_years
+    scale   = np.float32(sigma * np.sqrt(dt))
+
+    rng    = np.random.default_rng(seed)
+    sketch = TDigest(compression=compression)
+
+    # 預先配置的 float32 緩衝區（整個模擬過程重複使用）
+    block   = min(step_block, n_steps)
+    z_buf   = np.empty(chunk_paths * block, dtype=np.float32)
+    acc_buf = np.empty(chunk_paths, dtype=np.float32)
+
+    n_chunks  = 0
+    remaining = n_paths
+    while remaining > 0:
+        rows = min(chunk_paths, remaining)
+        acc  = acc_buf[:rows]
+        acc.fill(0.0)
+
+        steps_left = n_steps
+        while steps_left > 0:
+            cols = min(block, steps_left)
+            z = z_buf[:rows * cols].reshape(rows, cols)
+            rng.standard_normal(out=z, dtype=np.float32)
+            acc += z.sum(axis=1, dtype=np.float32)
+            steps_left -= cols
+
+        # 期末價格（float64 計算 exp，避免高 sigma 長年期溢位）
+        final_values = spot_value * np.exp(drift + (acc * scale).astype(np.float64))
+        sketch.update(final_values)
+
+        remaining -= rows
+        n_chunks  += 1
+
+    quantiles = {"p5": 0.05, "p50": 0.50, "p95": 0.95}
+    estimates = {k: sketch.quantile(q) for k, q in quantiles.items()}
+
+    ci = ConfidenceInterval(
+        p5  = round(estimates["p5"],  0),
+        p50 = round(estimates["p50"], 0),
+        p95 = round(estimates["p95"], 0),
+    )
+
+    return ChunkedMonteCarloResult(
+        confidence_interval = ci,
+        risk_level   = classify_risk(estimates["p5"], estimates["p50"], estimates["p95"]),
+        error_bounds = {
+            k: tuple(round(v, 0) for v in sketch.quantile_bounds(q))
+            for k, q in quantiles.items()
+        },
+        rank_errors  = {k: sketch.rank_error(q) for k, q in quantiles.items()},
+        n_paths      = n_paths,
+        n_steps      = n_steps,
+        n_chunks     = n_chunks,
+        horizon_years = horizon_years,
+    )
@@ -1,7 +1,7 @@
 """
 INPUT:  region（縣市）、base_value（基準估值，元）
 OUTPUT: adjusted_value（LSTM 市場指數調整後估值，元）、lstm_index（市場指數）
-POS:    推論層 — Demo LSTM（線性成長率 + 季節波動）
+POS:    推論層 — Demo LSTM（線性成長率 + 季節波動；run_demo_lstm_batch 為批次版本）
 
 Demo 模式說明：
     使用線性成長率 + sin 季節波動近似 LSTM 時序預測輸出。
@@ -20,6 +20,8 @@ Demo 模式說明：
 import math
 from typing import Tuple
 
+import numpy as np
+
 # ────────────────────────────────────────────────
 # 各縣市年化成長率（Demo 校正參數）
 # 資料來源：近年住宅價格指數年增率估算
@@ -80,6 +82,35 @@ def run_demo_lstm(region: str, base_value: float) -> Tuple[float, float]:
     #   return base_value * (1 + index_adj), lstm_index
     # [REPLACE_LSTM_END]
     """
+    lstm_index, index_adj = _lstm_index(region)
+    adjusted_value = base_value * (1.0 + index_adj)
+
+    return round(adjusted_value, 0), round(lstm_index, 2)
+
+
+def run_demo_lstm_batch(regions, base_values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批次 Demo LSTM（市場指數只取決於縣市：每個唯一縣市計算一次後廣播）
+
+    Returns:
+        Tuple[adjusted_values（元，ndarray）, lstm_indices（ndarray）]，與逐筆 run_demo_lstm 一致
+    """
+    regions     = np.asarray(regions, dtype=object)
+    base_values = np.asarray(base_values, dtype=np.float64)
+    if regions.size == 0:
+        return np.empty(0), np.empty(0)
+
+    uniques, inverse = np.unique(regions, return_inverse=True)
+    per_region = np.array([_lstm_index(r) for r in uniques], dtype=np.float64)
+    lstm_index = per_region[inverse.ravel(), 0]
+    index_adj  = per_region[inverse.ravel(), 1]
+
+    adjusted_values = base_values * (1.0 + index_adj)
+    return np.round(adjusted_values, 0), np.round(lstm_index, 2)
+
+
+def _lstm_index(region: str) -> Tuple[float, float]:
+    """縣市 → (lstm_index, index_adj)"""
     annual_growth = REGION_ANNUAL_GROWTH.get(region, 0.035)
 
     # 線性成長趨勢
@@ -94,6 +125,4 @@ def run_demo_lstm(region: str, base_value: float) -> Tuple[float, float]:
 
     # 調整幅度（以 180 作為正規化分母，使台北市約略持平）
     index_adj = (lstm_index / 180.0 - 1.0) * SCALE_FACTOR
-    adjusted_value = base_value * (1.0 + index_adj)
-
-    return round(adjusted_value, 0), round(lstm_index, 2)
+    return lstm_index, index_adj
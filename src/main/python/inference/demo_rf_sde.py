@@ -2,12 +2,13 @@
 INPUT:  region（縣市）、building_type（建物類型）、property_age（屋齡）、
         lstm_adjusted_value（LSTM 調整後估值，元）
 OUTPUT: rf_adjusted_value（RF+SDE 情緒分數調整後估值，元）、sentiment_score（-1~1）
-POS:    推論層 — Demo RF+SDE（斜率公式計算市場情緒分數）
+POS:    推論層 — Demo RF+SDE（斜率公式計算市場情緒分數；run_demo_rf_sde_batch 為批次版本）
 
 Demo 模式說明：
     依縣市年化成長率計算近 3 個月斜率（slope），
     加上建物類型需求修正與屋齡修正，合成情緒分數。
     偏多（>0.15）→ 調升 3%；中性（-0.15~0.15）→ 不動；偏空（<-0.15）→ 調降 5%。
+    屋齡門檻 / 係數與情緒門檻 / 調整幅度為模組常數，逐筆與批次版本共用。
 
 真實替換步驟：
     1. pip install scikit-learn（取消 requirements.txt 中的注解）
@@ -22,6 +23,9 @@ Demo 模式說明：
 
 import math
 from typing import Tuple
+
+import numpy as np
+
 from src.main.python.inference.demo_lstm import REGION_ANNUAL_GROWTH
 
 # ────────────────────────────────────────────────
@@ -35,16 +39,36 @@ BUILDING_DEMAND_FACTOR: dict[str, float] = {
     "別墅": -0.02,
 }
 
-# 屋齡情緒修正（新屋買氣較佳）
+# ────────────────────────────────────────────────
+# 屋齡情緒修正（新屋買氣較佳）：屋齡 ≤ 各門檻 → 對應係數，超過最後門檻 → 最後一個係數
+# ────────────────────────────────────────────────
+AGE_SENTIMENT_BREAKS:  tuple[int, ...]   = (5, 15, 30)
+AGE_SENTIMENT_FACTORS: tuple[float, ...] = (0.08, 0.03, -0.05, -0.12)
+
+# ────────────────────────────────────────────────
+# 情緒分數 → 估值調整：偏多（> BULLISH）調升、偏空（< BEARISH）調降、其餘不動
+# ────────────────────────────────────────────────
+SENTIMENT_BULLISH  = 0.15
+SENTIMENT_BEARISH  = -0.15
+BULLISH_ADJUSTMENT = 1.03
+BEARISH_ADJUSTMENT = 0.95
+NEUTRAL_ADJUSTMENT = 1.00
+
+
 def age_sentiment_factor(property_age: int) -> float:
-    if property_age <= 5:
-        return 0.08
-    elif property_age <= 15:
-        return 0.03
-    elif property_age <= 30:
-        return -0.05
-    else:
-        return -0.12
+    for bound, factor in zip(AGE_SENTIMENT_BREAKS, AGE_SENTIMENT_FACTORS):
+        if property_age <= bound:
+            return factor
+    return AGE_SENTIMENT_FACTORS[-1]
+
+
+def sentiment_adjustment(sentiment_score: float) -> float:
+    """情緒分數 → 估值調整倍數"""
+    if sentiment_score > SENTIMENT_BULLISH:
+        return BULLISH_ADJUSTMENT
+    if sentiment_score < SENTIMENT_BEARISH:
+        return BEARISH_ADJUSTMENT
+    return NEUTRAL_ADJUSTMENT
 
 
 def run_demo_rf_sde(
@@ -79,16 +103,7 @@ def run_demo_rf_sde(
     #   sentiment_score = float(rf_model.predict([features])[0])
     # [REPLACE_RF_SDE_END]
     """
-    annual_growth = REGION_ANNUAL_GROWTH.get(region, 0.035)
-    monthly_rate  = annual_growth / 12.0
-
-    months_elapsed = YEARS_ELAPSED_MONTHS = 11 * 12  # 132 個月
-
-    # 模擬近 3 個月指數斜率
-    from src.main.python.inference.demo_lstm import BASE_INDEX
-    curr_index   = BASE_INDEX * math.pow(1.0 + monthly_rate, months_elapsed)
-    prev_3m_idx  = BASE_INDEX * math.pow(1.0 + monthly_rate, months_elapsed - 3)
-    slope_3m     = (curr_index - prev_3m_idx) / prev_3m_idx  # 約等於 monthly_rate × 3
+    slope_3m = _slope_3m(region)
 
     # 建物與屋齡修正
     demand_factor = BUILDING_DEMAND_FACTOR.get(building_type, 0.0)
@@ -107,18 +122,66 @@ def run_demo_rf_sde(
     raw_sentiment   = slope_3m + demand_factor + age_factor + svi_adj
     sentiment_score = max(-1.0, min(1.0, raw_sentiment))
 
-    # 情緒分數 → 估值調整
-    if sentiment_score > 0.15:
-        adjustment = 1.03    # 偏多：調升 3%
-    elif sentiment_score < -0.15:
-        adjustment = 0.95    # 偏空：調降 5%
-    else:
-        adjustment = 1.00    # 中性：不動
-
-    rf_adjusted_value = lstm_adjusted_value * adjustment
+    # 情緒分數 → 估值調整（偏多調升 3% / 中性不動 / 偏空調降 5%）
+    rf_adjusted_value = lstm_adjusted_value * sentiment_adjustment(sentiment_score)
 
     return round(rf_adjusted_value, 0), round(sentiment_score, 4)
 
 
+def run_demo_rf_sde_batch(
+    regions,
+    building_types,
+    property_ages,
+    lstm_adjusted_values,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批次 Demo RF+SDE（縣市斜率 / 建物需求去重查表，屋齡係數與調整幅度以 np.select 向量化）
+
+    Returns:
+        Tuple[rf_adjusted_values（元，ndarray）, sentiment_scores（ndarray）]，與逐筆 run_demo_rf_sde 一致
+    """
+    regions        = np.asarray(regions, dtype=object)
+    building_types = np.asarray(building_types, dtype=object)
+    ages           = np.asarray(property_ages, dtype=np.int64)
+    lstm_values    = np.asarray(lstm_adjusted_values, dtype=np.float64)
+    if regions.size == 0:
+        return np.empty(0), np.empty(0)
+
+    uniq_r, inv_r = np.unique(regions, return_inverse=True)
+    uniq_b, inv_b = np.unique(building_types, return_inverse=True)
+    slope_3m      = np.array([_slope_3m(r) for r in uniq_r])[inv_r.ravel()]
+    demand_factor = np.array([BUILDING_DEMAND_FACTOR.get(b, 0.0) for b in uniq_b])[inv_b.ravel()]
+    age_factor    = np.select(
+        [ages <= bound for bound in AGE_SENTIMENT_BREAKS], AGE_SENTIMENT_FACTORS[:-1],
+        default=AGE_SENTIMENT_FACTORS[-1],
+    )
+    svi_adj       = 0.0   # 同 run_demo_rf_sde：Google Trends Stub
+
+    raw_sentiment   = slope_3m + demand_factor + age_factor + svi_adj
+    sentiment_score = np.clip(raw_sentiment, -1.0, 1.0)
+
+    adjustment = np.select(
+        [sentiment_score > SENTIMENT_BULLISH, sentiment_score < SENTIMENT_BEARISH],
+        [BULLISH_ADJUSTMENT, BEARISH_ADJUSTMENT], default=NEUTRAL_ADJUSTMENT,
+    )
+    rf_adjusted_values = lstm_values * adjustment
+
+    return np.round(rf_adjusted_values, 0), np.round(sentiment_score, 4)
+
+
+def _slope_3m(region: str) -> float:
+    """縣市 → 近 3 個月指數斜率"""
+    annual_growth = REGION_ANNUAL_GROWTH.get(region, 0.035)
+    monthly_rate  = annual_growth / 12.0
+
+    months_elapsed = 11 * 12  # 132 個月
+
+    # 模擬近 3 個月指數斜率
+    from src.main.python.inference.demo_lstm import BASE_INDEX
+    curr_index   = BASE_INDEX * math.pow(1.0 + monthly_rate, months_elapsed)
+    prev_3m_idx  = BASE_INDEX * math.pow(1.0 + monthly_rate, months_elapsed - 3)
+    return (curr_index - prev_3m_idx) / prev_3m_idx  # 約等於 monthly_rate × 3
+
+
 # 暴露 YEARS_ELAPSED_MONTHS 常數供其他模組使用
 YEARS_ELAPSED = 11
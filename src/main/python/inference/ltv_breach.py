@@ -0,0 +1,166 @@
+"""
+INPUT:  spot_values（當前估值陣列，元）、loan_amounts（貸款金額陣列，元）、mu / sigma（年化參數）、
+        horizon_years（貸款年限）、thresholds（LTV 門檻，預設 80% / 90%）
+OUTPUT: breach probability 矩陣 shape=(物件數, 門檻數)：貸款期間內任一時點 LTV 超過門檻的機率
+POS:    推論層 — LTV 觸價機率（粗步長 GBM + Brownian bridge 穿越修正，跨物件向量化）
+
+算法說明：
+    LTV(t) = loan / S(t) > θ  ⇔  S(t) < loan / θ
+    以對數空間 X(t) = ln(S(t) / S_0) = (mu - 0.5×sigma²)×t + sigma×W(t)，
+    障礙 b = ln(loan / (θ × S_0))（貸款餘額以申請金額固定計，未計攤還，屬保守估計）。
+
+    粗步長（預設季步）只觀察離散時點會低估觸價，故每一步以 Brownian bridge
+    條件穿越機率修正（兩端點皆在障礙之上時）：
+        p_k = exp(-2 × (x_k - b) × (x_{k+1} - b) / (sigma² × Δt))
+    路徑存活機率 = Π(1 - p_k)（任一端點 ≤ b 則為 0），觸價機率 = 1 - mean(存活機率)。
+    以條件期望取代抽樣判定，變異數更低，季步即可逼近連續監控結果。
+
+向量化：
+    所有物件 × 門檻共用同一組標準布朗路徑 W（共同隨機數），
+    依 (物件, 門檻) 分塊廣播計算，記憶體上限由 max_block_elements 控制。
+
+解析引擎（engine="analytic"）：
+    固定障礙下帶漂移布朗運動的首次通過機率有封閉解（反射原理），ν = mu - 0.5×sigma²：
+        P(min X ≤ b) = Φ((b - νT) / (sigma√T)) + exp(2νb / sigma²) × Φ((b + νT) / (sigma√T))
+    模擬引擎保留作為驗證基準，並可延伸至時變障礙（如攤還餘額）。
+"""
+
+import numpy as np
+
+from src.main.python.inference.monte_carlo import (
+    DEFAULT_MU,
+    DEFAULT_SIGMA,
+    ENGINE_ANALYTIC,
+)
+
+DEFAULT_LTV_THRESHOLDS       = (0.80, 0.90)
+DEFAULT_BREACH_HORIZON_YEARS = 30      # 未提供貸款年限時的預設觀察期間（年）
+DEFAULT_STEPS_PER_YEAR       = 4       # 季步
+DEFAULT_MAX_BLOCK_ELEMENTS   = 4_000_000
+
+
+def run_ltv_breach(
+    spot_values,
+    loan_amounts,
+    mus=DEFAULT_MU,
+    sigmas=DEFAULT_SIGMA,
+    horizon_years: float = DEFAULT_BREACH_HORIZON_YEARS,
+    thresholds: tuple[float, ...] = DEFAULT_LTV_THRESHOLDS,
+    steps_per_year: int = DEFAULT_STEPS_PER_YEAR,
+    n_paths: int = 1000,
+    seed: int = 42,
+    bridge_correction: bool = True,
+    max_block_elements: int = DEFAULT_MAX_BLOCK_ELEMENTS,
+    engine: str = "simulated",
+) -> np.ndarray:
+    """
+    貸款期間 LTV 觸價機率（向量化跨物件）
+
+    Args:
+        spot_values:        當前估值（純量或陣列，元）
+        loan_amounts:       貸款金額（純量或陣列，元）
+        mus:                年化漂移率（純量或陣列）
+        sigmas:             年化波動率（純量或陣列）
+        horizon_years:      觀察期間（年，通常為貸款年限）
+        thresholds:         LTV 門檻
+        steps_per_year:     每年觀察步數（4 = 季步、12 = 月步）
+        n_paths:            模擬路徑數
+        seed:               隨機種子
+        bridge_correction:  是否套用 Brownian bridge 穿越修正（False = 僅離散觀察）
+        max_block_elements: 每塊 (案例 × 路徑 × 步) 元素上限
+        engine:             "analytic" = 首次通過封閉解；其他值 = 粗步長模擬 + bridge 修正
+
+    Returns:
+        np.ndarray shape=(物件數, 門檻數)，值域 [0, 1]
+    """
+    spot, loan, mu, sigma = (
+        np.ravel(a) for a in np.broadcast_arrays(
+            np.asarray(spot_values,  dtype=np.float64),
+            np.asarray(loan_amounts, dtype=np.float64),
+            np.asarray(mus,          dtype=np.float64),
+            np.asarray(sigmas,       dtype=np.float64),
+        )
+    )
+    thr = np.asarray(thresholds, dtype=np.float64)
+    n_props, n_thr = spot.size, thr.size
+
+    if engine == ENGINE_ANALYTIC:
+        return _analytic_breach(spot, loan, mu, sigma, thr, horizon_years)
+
+    n_steps = max(int(round(horizon_years * steps_per_year)), 1)
+    dt      = horizon_years / n_steps
+    times   = np.arange(n_steps + 1) * dt
+
+    # 共同隨機數：標準布朗路徑 W(t_k)，shape=(n_paths, n_steps + 1)
+    rng = np.random.default_rng(seed)
+    W = np.zeros((n_paths, n_steps + 1))
+    np.cumsum(np.sqrt(dt) * rng.standard_normal(size=(n_paths, n_steps)), axis=1, out=W[:, 1:])
+
+    # 攤平為 (物件 × 門檻) 個案例
+    case_drift   = np.repeat(mu - 0.5 * sigma ** 2, n_thr)
+    case_sigma   = np.repeat(sigma, n_thr)
+    with np.errstate(divide="ignore"):
+        case_barrier = np.log(np.repeat(loan, n_thr) / (np.tile(thr, n_props) * np.repeat(spot, n_thr)))
+
+    n_cases = case_barrier.size
+    probs   = np.empty(n_cases)
+    block   = max(max_block_elements // (n_paths * (n_steps + 1)), 1)
+
+    for start in range(0, n_cases, block):
+        sl = slice(start, start + block)
+        drift = case_drift[sl, None, None]
+        vol   = case_sigma[sl, None, None]
+        b     = case_barrier[sl, None, None]
+
+        # 障礙距離 d = X(t) - b，shape=(案例, 路徑, 步 + 1)
+        d = drift * times + vol * W - b
+        breached = (d <= 0.0).any(axis=2)
+
+        if bridge_correction:
+            d_left, d_right = d[..., :-1], d[..., 1:]
+            with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+                exponent = -2.0 * d_left * d_right / (vol ** 2 * dt)
+                cross    = np.where((d_left > 0) & (d_right > 0), np.exp(exponent), 1.0)
+                log_surv = np.log1p(-cross).sum(axis=2)
+            survival = np.where(breached, 0.0, np.exp(log_surv))
+        else:
+            survival = np.where(breached, 0.0, 1.0)
+
+        probs[sl] = 1.0 - survival.mean(axis=1)
+
+    return np.clip(probs.reshape(n_props, n_thr), 0.0, 1.0)
+
+
+def _analytic_breach(
+    spot: np.ndarray,
+    loan: np.ndarray,
+    mu: np.ndarray,
+    sigma: np.ndarray,
+    thr: np.ndarray,
+    horizon_years: float,
+) -> np.ndarray:
+    """首次通過封閉解，回傳 shape=(物件數, 門檻數)"""
+    from scipy.special import ndtr
+
+    nu    = (mu - 0.5 * sigma ** 2)[:, None]
+    vol   = sigma[:, None]
+    sqrtT = np.sqrt(horizon_years)
+    with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+        b = np.log(loan[:, None] / (thr[None, :] * spot[:, None]))
+        probs = (
+            ndtr((b - nu * horizon_years) / (vol * sqrtT))
+            + np.exp(2.0 * nu * b / vol ** 2) * ndtr((b + nu * horizon_years) / (vol * sqrtT))
+        )
+    probs = np.where(b >= 0.0, 1.0, np.nan_to_num(probs, nan=0.0))
+    return np.clip(probs, 0.0, 1.0)
+
+
+def breach_probability_dict(
+    probabilities,
+    thresholds: tuple[float, ...] = DEFAULT_LTV_THRESHOLDS,
+) -> dict[str, float]:
+    """單一物件觸價機率 → {"80%": p, "90%": p}（API 回應格式）"""
+    return {
+        f"{round(t * 100)}%": round(float(p), 4)
+        for t, p in zip(thresholds, np.ravel(probabilities))
+    }
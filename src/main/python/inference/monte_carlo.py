@@ -9,14 +9,39 @@ POS:    推論層 — 完整 GBM 蒙地卡羅實作（零 Demo 替換需求，
         S[t+1] = S[t] × exp((mu - 0.5×sigma²)×dt + sigma×sqrt(dt)×Z)
         Z ~ N(0,1)，固定 seed=42 確保可重現
 
+    解析引擎（engine="analytic"）：
+        GBM 期末對數報酬精確服從常態分配：
+            ln(S_T / S_0) ~ N((mu - 0.5×sigma²)×T, sigma²×T)，T = n_steps × dt = 1 年
+        故 Pq = S_0 × exp((mu - 0.5×sigma²)×T + sigma×sqrt(T)×z_q)，z_q 為標準常態分位數，
+        不需產生路徑矩陣；抽樣引擎（engine="sampled"）保留作為驗證基準。
+
+    抽樣引擎快取：
+        固定 seed 下期末價格 = spot_value × exp(cum_log_return)，百分位數與 spot_value 成正比，
+        只取決於 (mu, sigma, n_paths, n_steps, seed)。正規化乘數（spot_value=1）以 LRU 快取，
+        同參數的後續請求只需一次乘法；四捨五入至元後與逐次模擬結果一致。
+
+    期限結構（run_term_structure）：
+        一次模擬輸出多個檢查點（預設 1 / 3 / 5 / 10 年 + 貸款到期）的 P5 / P50 / P95。
+        各檢查點間的對數報酬增量精確服從 N((mu - 0.5×sigma²)×Δt, sigma²×Δt)，
+        每條路徑只在檢查點抽樣並累加，矩陣為 (n_paths, 檢查點數)，不建立逐步路徑。
+
+    批次介面（run_monte_carlo_batch）：
+        以 (mu, sigma, seed) 去重後逐組取得乘數（與單筆共用同一來源），
+        再以 NumPy 廣播乘上 spot_values，結果與逐筆呼叫 run_monte_carlo 完全一致。
+
     風險等級判斷（spread_ratio = (P95-P5)/P50）：
         < 0.15  → 低風險
         < 0.30  → 中風險
         >= 0.30 → 高風險
 """
 
-import numpy as np
+import math
+import os
 from dataclasses import dataclass
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
 
 # GBM 預設參數（依台灣住宅市場估算）
 DEFAULT_MU    = 0.045   # 年化漂移率 4.5%（長期房價年增率）
@@ -25,13 +50,67 @@ DEFAULT_SIGMA = 0.080   # 年化波動率 8.0%（住宅市場波動）
 RISK_THRESHOLD_LOW  = 0.15
 RISK_THRESHOLD_HIGH = 0.30
 
+# 批次介面風險代碼 → 風險等級（risk_code 為此 tuple 的 index）
+RISK_LEVELS = ("低風險", "中風險", "高風險")
+
+# 模擬引擎
+ENGINE_SAMPLED  = "sampled"    # 路徑抽樣（n_paths × n_steps 標準常態矩陣）
+ENGINE_ANALYTIC = "analytic"   # 對數常態封閉解（微秒級）
+ENGINE_ANTITHETIC = "antithetic"  # 對偶變量抽樣（見 variance_reduction.py）
+ENGINE_SOBOL      = "sobol"       # 加擾 Sobol 準蒙地卡羅（見 variance_reduction.py）
+MC_ENGINES = (ENGINE_SAMPLED, ENGINE_ANALYTIC, ENGINE_ANTITHETIC, ENGINE_SOBOL)
+
+
+def _service_engine_from_env() -> str:
+    """讀取 VALUATION_MC_ENGINE；值不在 MC_ENGINES 時於 import（服務啟動）即失敗，而非每個估價請求才報錯"""
+    engine = os.environ.get("VALUATION_MC_ENGINE", ENGINE_ANALYTIC)
+    if engine not in MC_ENGINES:
+        raise ValueError(f"環境變數 VALUATION_MC_ENGINE={engine!r} 無效（可用：{', '.join(MC_ENGINES)}）")
+    return engine
+
+
+# 鑑價服務預設引擎（可由環境變數 VALUATION_MC_ENGINE 切換回 sampled）
+SERVICE_ENGINE = _service_engine_from_env()
+
+# 期限結構預設檢查點（年）
+DEFAULT_TERM_CHECKPOINTS = (1, 3, 5, 10)
+
+# 抽樣引擎正規化百分位數乘數快取上限（組數）
+MULTIPLIER_CACHE_SIZE = 256
+
+# 標準常態分位數 z_q（P5 / P50 / P95）
+_Z_P5  = NormalDist().inv_cdf(0.05)
+_Z_P50 = 0.0
+_Z_P95 = NormalDist().inv_cdf(0.95)
+_PERCENTILE_KEYS = ("p5", "p50", "p95")
+
 
 @dataclass
 class ConfidenceInterval:
-    """GBM 模擬信心區間"""
+    """GBM 模擬信心區間（standard_errors：antithetic / sobol 引擎的組間標準誤（元），其餘引擎為 None）"""
     p5:  float
     p50: float
     p95: float
+    standard_errors: dict[str, float] | None = None
+
+
+@dataclass
+class TermStructurePoint:
+    """期限結構單一檢查點（years 年後的信心區間）"""
+    years:      float
+    p5:         float
+    p50:        float
+    p95:        float
+    risk_level: str
+
+
+@dataclass
+class BatchConfidenceInterval:
+    """批次 GBM 信心區間（各欄為與輸入同 shape 的 ndarray；standard_errors 同 ConfidenceInterval）"""
+    p5:  np.ndarray
+    p50: np.ndarray
+    p95: np.ndarray
+    standard_errors: dict[str, np.ndarray] | None = None
 
 
 def run_monte_carlo(
@@ -41,6 +120,7 @@ def run_monte_carlo(
     n_paths: int = 1000,
     n_steps: int = 252,
     seed: int = 42,
+    engine: str = ENGINE_SAMPLED,
 ) -> tuple[ConfidenceInterval, str]:
     """
     幾何布朗運動蒙地卡羅模擬
@@ -59,10 +139,318 @@ def run_monte_carlo(
         n_paths:    模擬路徑數（預設 1000）
         n_steps:    模擬步數（預設 252，對應一個交易年）
         seed:       隨機種子（固定 42，確保可重現）
+        engine:     "sampled"（路徑抽樣，預設）、"analytic"（封閉解，忽略 n_paths / seed）、
+                    "antithetic" / "sobol"（變異數縮減期末抽樣，忽略 n_steps）
+
+    Returns:
+        Tuple[ConfidenceInterval（P5/P50/P95；antithetic / sobol 附各百分位數標準誤），risk_level（低/中/高風險）]
+    """
+    m5, m50, m95 = percentile_multipliers(engine, mu, sigma, n_paths, n_steps, seed)
+    p5, p50, p95 = spot_value * m5, spot_value * m50, spot_value * m95
+
+    rel = _relative_standard_errors(engine, mu, sigma, n_paths, seed)
+    ci = ConfidenceInterval(
+        p5  = round(p5,  0),
+        p50 = round(p50, 0),
+        p95 = round(p95, 0),
+        standard_errors = None if rel is None else {
+            key: round(value * r, 2) for key, value, r in zip(_PERCENTILE_KEYS, (p5, p50, p95), rel)
+        },
+    )
+
+    return ci, classify_risk(p5, p50, p95)
+
+
+def classify_risk(p5: float, p50: float, p95: float) -> str:
+    """依 spread_ratio = (P95-P5)/P50 判斷風險等級"""
+    spread_ratio = (p95 - p5) / p50 if p50 > 0 else 0.0
+    if spread_ratio < RISK_THRESHOLD_LOW:
+        return "低風險"
+    elif spread_ratio < RISK_THRESHOLD_HIGH:
+        return "中風險"
+    else:
+        return "高風險"
+
+
+def run_term_structure(
+    spot_value: float,
+    mu: float = DEFAULT_MU,
+    sigma: float = DEFAULT_SIGMA,
+    checkpoints: tuple[float, ...] = DEFAULT_TERM_CHECKPOINTS,
+    maturity_years: float | None = None,
+    n_paths: int = 1000,
+    seed: int = 42,
+    engine: str = ENGINE_SAMPLED,
+) -> list[TermStructurePoint]:
+    """
+    多期限信心區間（單次模擬，僅於檢查點取累積對數報酬）
+
+    Args:
+        spot_value:     起始估值（元）
+        mu:             年化漂移率
+        sigma:          年化波動率
+        checkpoints:    檢查點（年），超過 maturity_years 者略去
+        maturity_years: 貸款到期年限（加入為最後一個檢查點），None = 不加入
+        n_paths:        模擬路徑數
+        seed:           隨機種子
+        engine:         "analytic" = 各檢查點封閉解；其餘引擎皆以檢查點抽樣（單次模擬）
+
+    Returns:
+        list[TermStructurePoint]（依年期遞增）
+    """
+    horizons    = _term_horizons(checkpoints, maturity_years)
+    multipliers = _term_structure_multipliers(engine, mu, sigma, horizons, n_paths, seed)
+
+    points = []
+    for years, (m5, m50, m95) in zip(horizons, multipliers):
+        p5, p50, p95 = spot_value * m5, spot_value * m50, spot_value * m95
+        points.append(TermStructurePoint(
+            years      = years,
+            p5         = round(p5,  0),
+            p50        = round(p50, 0),
+            p95        = round(p95, 0),
+            risk_level = classify_risk(p5, p50, p95),
+        ))
+    return points
+
+
+def run_term_structure_batch(
+    spot_values,
+    mu: float = DEFAULT_MU,
+    sigma: float = DEFAULT_SIGMA,
+    checkpoints: tuple[float, ...] = DEFAULT_TERM_CHECKPOINTS,
+    maturity_years: float | None = None,
+    n_paths: int = 1000,
+    seed: int = 42,
+    engine: str = ENGINE_SAMPLED,
+) -> tuple[tuple[float, ...], BatchConfidenceInterval, np.ndarray]:
+    """
+    批次期限結構（同一組檢查點與參數，多筆估值一次完成）
+
+    Returns:
+        Tuple[horizons（年），
+              BatchConfidenceInterval（各欄 shape=(估值數, 檢查點數)，已四捨五入至元），
+              risk_codes（int8，shape 同上）]；每列與 run_term_structure 逐筆結果一致
+    """
+    horizons    = _term_horizons(checkpoints, maturity_years)
+    multipliers = np.array(
+        _term_structure_multipliers(engine, mu, sigma, horizons, n_paths, seed), dtype=np.float64,
+    )                                                            # shape=(檢查點數, 3)
+    spot = np.asarray(spot_values, dtype=np.float64)[:, np.newaxis]
+    p5, p50, p95 = spot * multipliers[:, 0], spot * multipliers[:, 1], spot * multipliers[:, 2]
+
+    ci = BatchConfidenceInterval(
+        p5  = np.round(p5,  0),
+        p50 = np.round(p50, 0),
+        p95 = np.round(p95, 0),
+    )
+    return horizons, ci, classify_risk_codes(p5, p50, p95)
+
+
+def _term_structure_multipliers(
+    engine: str,
+    mu: float,
+    sigma: float,
+    horizons: tuple[float, ...],
+    n_paths: int,
+    seed: int,
+) -> tuple[tuple[float, float, float], ...]:
+    """依引擎取得各檢查點 spot_value=1 的 P5 / P50 / P95（單筆與批次共用）"""
+    if engine == ENGINE_ANALYTIC:
+        return tuple(_analytic_multipliers(mu, sigma, h) for h in horizons)
+    if engine in MC_ENGINES:
+        return _term_multipliers(float(mu), float(sigma), horizons, int(n_paths), int(seed))
+    raise ValueError(f"未知的模擬引擎：{engine}（可用：{', '.join(MC_ENGINES)}）")
+
+
+def _term_horizons(checkpoints: tuple[float, ...], maturity_years: float | None) -> tuple[float, ...]:
+    """檢查點去重排序；有到期年限時截斷並補上到期點"""
+    horizons = {float(c) for c in checkpoints if c > 0}
+    if maturity_years is not None:
+        horizons = {h for h in horizons if h <= maturity_years} | {float(maturity_years)}
+    if not horizons:
+        raise ValueError("期限結構至少需要一個正的檢查點")
+    return tuple(sorted(horizons))
+
+
+@lru_cache(maxsize=MULTIPLIER_CACHE_SIZE)
+def _term_multipliers(
+    mu: float,
+    sigma: float,
+    horizons: tuple[float, ...],
+    n_paths: int,
+    seed: int,
+) -> tuple[tuple[float, float, float], ...]:
+    """各檢查點 spot_value=1 的 P5 / P50 / P95（shape=(n_paths, 檢查點數) 單次模擬）"""
+    rng = np.random.default_rng(seed)
+
+    dts = np.diff(np.concatenate([[0.0], horizons]))            # 檢查點間隔（年）
+    Z   = rng.standard_normal(size=(n_paths, len(horizons)))
+
+    increments = (mu - 0.5 * sigma ** 2) * dts + sigma * np.sqrt(dts) * Z
+    cum_log_return = np.cumsum(increments, axis=1)              # shape=(n_paths, 檢查點數)
+    percentiles = np.percentile(np.exp(cum_log_return), [5, 50, 95], axis=0)   # shape=(3, 檢查點數)
+
+    return tuple(tuple(float(v) for v in col) for col in percentiles.T)
+
+
+def run_monte_carlo_batch(
+    spot_values,
+    mus=DEFAULT_MU,
+    sigmas=DEFAULT_SIGMA,
+    n_paths: int = 1000,
+    n_steps: int = 252,
+    seed=42,
+    engine: str = ENGINE_SAMPLED,
+) -> tuple[BatchConfidenceInterval, np.ndarray]:
+    """
+    批次 GBM 蒙地卡羅模擬（多筆估值 × 多組參數，一次完成）
+
+    spot_values / mus / sigmas / seed 皆可為純量或 array-like，依 NumPy 規則廣播。
+    每筆結果與 run_monte_carlo(spot, mu, sigma, n_paths, n_steps, seed, engine) 完全一致：
+    相同 (mu, sigma, seed) 只計算一次百分位數乘數，其餘為向量化乘法與風險分級。
+
+    Args:
+        spot_values: 起始估值陣列（元）
+        mus:         年化漂移率（純量或陣列）
+        sigmas:      年化波動率（純量或陣列）
+        n_paths:     模擬路徑數（sampled 引擎）
+        n_steps:     模擬步數（sampled 引擎）
+        seed:        隨機種子（純量 = 全部共用，與單筆呼叫相同；陣列 = 逐筆指定）
+        engine:      "sampled" 或 "analytic"
+
+    Returns:
+        Tuple[BatchConfidenceInterval（P5/P50/P95 陣列，已四捨五入至元），
+              risk_codes（int8 陣列，對應 RISK_LEVELS index）]
+    """
+    spot = np.asarray(spot_values, dtype=np.float64)
+    mu, sigma, seeds = np.broadcast_arrays(
+        np.asarray(mus,    dtype=np.float64),
+        np.asarray(sigmas, dtype=np.float64),
+        np.asarray(seed,   dtype=np.int64),
+    )
+
+    # (mu, sigma, seed) 去重 → 每組只取一次乘數
+    params = np.stack([mu.ravel(), sigma.ravel(), seeds.ravel().astype(np.float64)], axis=1)
+    unique_params, inverse = np.unique(params, axis=0, return_inverse=True)
+    unique_multipliers = np.array([
+        percentile_multipliers(engine, float(m), float(s), n_paths, n_steps, int(sd))
+        for m, s, sd in unique_params
+    ], dtype=np.float64).reshape(-1, 3)
+    multipliers = unique_multipliers[inverse.ravel()].reshape(mu.shape + (3,))
+    spot, multipliers = np.broadcast_arrays(spot[..., np.newaxis], multipliers)
+
+    spot = spot[..., 0]
+    p5  = spot * multipliers[..., 0]
+    p50 = spot * multipliers[..., 1]
+    p95 = spot * multipliers[..., 2]
+
+    standard_errors = None
+    if engine in (ENGINE_ANTITHETIC, ENGINE_SOBOL):
+        unique_rel = np.array([
+            _relative_standard_errors(engine, float(m), float(s), n_paths, int(sd))
+            for m, s, sd in unique_params
+        ], dtype=np.float64).reshape(-1, 3)
+        rel = np.broadcast_to(unique_rel[inverse.ravel()].reshape(mu.shape + (3,)), multipliers.shape)
+        standard_errors = {
+            key: np.round(value * rel[..., i], 2)
+            for i, (key, value) in enumerate(zip(_PERCENTILE_KEYS, (p5, p50, p95)))
+        }
+
+    ci = BatchConfidenceInterval(
+        p5  = np.round(p5,  0),
+        p50 = np.round(p50, 0),
+        p95 = np.round(p95, 0),
+        standard_errors = standard_errors,
+    )
+
+    return ci, classify_risk_codes(p5, p50, p95)
+
+
+def classify_risk_codes(p5: np.ndarray, p50: np.ndarray, p95: np.ndarray) -> np.ndarray:
+    """classify_risk 的向量化版本，回傳 RISK_LEVELS index（int8）"""
+    p50 = np.asarray(p50, dtype=np.float64)
+    spread_ratio = np.divide(
+        np.asarray(p95, dtype=np.float64) - np.asarray(p5, dtype=np.float64),
+        p50,
+        out=np.zeros_like(p50),
+        where=p50 > 0,
+    )
+    codes = np.full(spread_ratio.shape, 2, dtype=np.int8)
+    codes[spread_ratio < RISK_THRESHOLD_HIGH] = 1
+    codes[spread_ratio < RISK_THRESHOLD_LOW]  = 0
+    return codes
+
+
+def risk_labels(risk_codes: np.ndarray) -> list[str]:
+    """風險代碼陣列 → 風險等級字串 list"""
+    return [RISK_LEVELS[int(c)] for c in np.ravel(risk_codes)]
+
+
+def percentile_multipliers(
+    engine: str,
+    mu: float,
+    sigma: float,
+    n_paths: int,
+    n_steps: int,
+    seed: int,
+) -> tuple[float, float, float]:
+    """依引擎取得 spot_value=1 時的 P5 / P50 / P95 乘數（單筆、批次與壓力網格共用；抽樣類引擎有快取）"""
+    if engine == ENGINE_ANALYTIC:
+        return _analytic_multipliers(mu, sigma)
+    if engine == ENGINE_SAMPLED:
+        return _sampled_multipliers(
+            float(mu), float(sigma), int(n_paths), int(n_steps), int(seed),
+        )
+    if engine in (ENGINE_ANTITHETIC, ENGINE_SOBOL):
+        return _variance_reduced_estimate(
+            engine, float(mu), float(sigma), int(n_paths), int(seed),
+        )[0]
+    raise ValueError(f"未知的模擬引擎：{engine}（可用：{', '.join(MC_ENGINES)}）")
+
+
+def analytic_percentile_multipliers(mus, sigmas, horizon: float = 1.0) -> np.ndarray:
+    """
+    對數常態封閉解的向量化版本（壓力網格等整批情境用）
+
+    Args:
+        mus / sigmas: 年化漂移率 / 波動率（純量或 array-like，依 NumPy 規則廣播）
+        horizon:      年期（年）
 
     Returns:
-        Tuple[ConfidenceInterval（P5/P50/P95），risk_level（低/中/高風險）]
+        np.ndarray shape=廣播後 shape + (3,)，最後一軸為 P5 / P50 / P95 ÷ spot_value
     """
+    mu    = np.asarray(mus,    dtype=np.float64)
+    sigma = np.asarray(sigmas, dtype=np.float64)
+    drift = (mu - 0.5 * sigma ** 2) * horizon
+    scale = sigma * math.sqrt(horizon)
+    return np.exp(drift[..., None] + scale[..., None] * np.array([_Z_P5, _Z_P50, _Z_P95]))
+
+
+def _analytic_multipliers(
+    mu: float,
+    sigma: float,
+    horizon: float = 1.0,
+) -> tuple[float, float, float]:
+    """對數常態封閉解：Pq / S_0 = exp((mu - 0.5×sigma²)×T + sigma×sqrt(T)×z_q)"""
+    drift = (mu - 0.5 * sigma ** 2) * horizon
+    scale = sigma * math.sqrt(horizon)
+    return (
+        math.exp(drift + scale * _Z_P5),
+        math.exp(drift + scale * _Z_P50),
+        math.exp(drift + scale * _Z_P95),
+    )
+
+
+@lru_cache(maxsize=MULTIPLIER_CACHE_SIZE)
+def _sampled_multipliers(
+    mu: float,
+    sigma: float,
+    n_paths: int,
+    n_steps: int,
+    seed: int,
+) -> tuple[float, float, float]:
+    """產生 (n_paths, n_steps) 標準常態矩陣，回傳 spot_value=1 時的期末 P5 / P50 / P95"""
     rng = np.random.default_rng(seed)
 
     dt = 1.0 / n_steps  # 每步時間間隔（以年為單位）
@@ -74,29 +462,63 @@ def run_monte_carlo(
     drift     = (mu - 0.5 * sigma ** 2) * dt
     diffusion = sigma * np.sqrt(dt) * Z          # shape=(n_paths, n_steps)
 
-    # 累積對數收益率 → 期末價格
-    log_returns   = drift + diffusion             # shape=(n_paths, n_steps)
+    # 累積對數收益率 → 期末價格乘數
+    log_returns    = drift + diffusion            # shape=(n_paths, n_steps)
     cum_log_return = np.sum(log_returns, axis=1)  # shape=(n_paths,)
-    final_values   = spot_value * np.exp(cum_log_return)
+    final_multipliers = np.exp(cum_log_return)
 
     # 百分位數
-    p5  = float(np.percentile(final_values, 5))
-    p50 = float(np.percentile(final_values, 50))
-    p95 = float(np.percentile(final_values, 95))
+    m5  = float(np.percentile(final_multipliers, 5))
+    m50 = float(np.percentile(final_multipliers, 50))
+    m95 = float(np.percentile(final_multipliers, 95))
 
-    ci = ConfidenceInterval(
-        p5  = round(p5,  0),
-        p50 = round(p50, 0),
-        p95 = round(p95, 0),
-    )
+    return m5, m50, m95
+
+
+@lru_cache(maxsize=MULTIPLIER_CACHE_SIZE)
+def _variance_reduced_estimate(
+    sampler: str,
+    mu: float,
+    sigma: float,
+    n_paths: int,
+    seed: int,
+) -> tuple[tuple[float, float, float], tuple[float, float, float]]:
+    """對偶變量 / Sobol 抽樣的 spot_value=1 期末 P5 / P50 / P95 與各自的相對標準誤"""
+    from src.main.python.inference.variance_reduction import run_variance_reduced
+    result = run_variance_reduced(1.0, mu=mu, sigma=sigma, sampler=sampler, n_paths=n_paths, seed=seed)
+    return result.multipliers, tuple(result.relative_errors[key] for key in _PERCENTILE_KEYS)
+
+
+def _relative_standard_errors(
+    engine: str,
+    mu: float,
+    sigma: float,
+    n_paths: int,
+    seed: int,
+) -> tuple[float, float, float] | None:
+    """antithetic / sobol 引擎的 P5 / P50 / P95 相對標準誤（與乘數共用快取）；其餘引擎無組間標準誤 → None"""
+    if engine not in (ENGINE_ANTITHETIC, ENGINE_SOBOL):
+        return None
+    return _variance_reduced_estimate(engine, float(mu), float(sigma), int(n_paths), int(seed))[1]
+
+
+def multiplier_cache_info() -> dict:
+    """抽樣類引擎乘數快取統計（hits / misses / size / maxsize）"""
+    infos = [
+        _sampled_multipliers.cache_info(),
+        _variance_reduced_estimate.cache_info(),
+        _term_multipliers.cache_info(),
+    ]
+    return {
+        "hits":    sum(i.hits for i in infos),
+        "misses":  sum(i.misses for i in infos),
+        "size":    sum(i.currsize for i in infos),
+        "maxsize": sum(i.maxsize for i in infos),
+    }
 
-    # 風險等級判斷
-    spread_ratio = (p95 - p5) / p50 if p50 > 0 else 0.0
-    if spread_ratio < RISK_THRESHOLD_LOW:
-        risk_level = "低風險"
-    elif spread_ratio < RISK_THRESHOLD_HIGH:
-        risk_level = "中風險"
-    else:
-        risk_level = "高風險"
 
-    return ci, risk_level
+def clear_multiplier_cache() -> None:
+    """清空抽樣類引擎乘數快取並歸零統計"""
+    _sampled_multipliers.cache_clear()
+    _variance_reduced_estimate.cache_clear()
+    _term_multipliers.cache_clear()
@@ -0,0 +1,415 @@
+"""
+INPUT:  PortfolioBook（每筆貸款的縣市、行政區、擔保品估值、貸款金額）、
+        縣市相關係數矩陣（預設依地理分區建構）、mu / sigma、horizon_years、n_paths、n_workers
+OUTPUT: PortfolioResult（投組損失 VaR / Expected Shortfall、預期損失、各行政區集中度）
+POS:    推論層 — 跨縣市相關 GBM 投組壓力模擬（行程池分片 + 共享記憶體結果緩衝）
+
+算法說明：
+    1. 縣市衝擊：X_r = (mu_r - 0.5×sigma_r²)×T + sigma_r×sqrt(T)×(L z)_r，
+       L 為相關係數矩陣的 Cholesky 因子（以矩陣內容為鍵快取，只分解一次）
+    2. 行政區衝擊：X_d = X_{r(d)} + idio_sigma×sqrt(T)×ε_d（行政區特有波動，彼此獨立）
+    3. 擔保品處分價值 = 估值 × exp(X_d) × (1 - liquidation_haircut)，
+       單筆損失 = max(貸款 - 處分價值, 0)（貸款餘額以申請金額固定計）
+
+    同一行政區內所有貸款共用乘數 m，損失 > 0 ⇔ 貸款 / 估值 > m，
+    故事先依 (行政區, 貸款 / 估值) 排序並累加，每條路徑每個行政區只需一次 searchsorted：
+        損失_d = ΣL_{k > m} - m × ΣV_{k > m}
+    計算量與貸款筆數無關（僅排序 O(n log n) 一次），10 萬筆以上貸款亦可於數秒內完成。
+
+平行化：
+    路徑切成固定大小分片（shard_paths），各分片以 SeedSequence.spawn 取得獨立亂數流，
+    結果與 n_workers 無關；分片由 ProcessPoolExecutor 執行，
+    各行程將 (路徑, 行政區) 損失直接寫入 multiprocessing.shared_memory 緩衝區，免序列化回傳。
+    n_workers = 1 時於本行程直接計算。
+"""
+
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from src.main.python.inference.monte_carlo import DEFAULT_MU, DEFAULT_SIGMA
+from src.main.python.utils.region_price_table import (
+    REGION_BASE_PRICE,
+    DISTRICT_TO_REGION,
+    calculate_base_value,
+)
+
+# ────────────────────────────────────────────────
+# 縣市地理分區（預設相關係數矩陣用）
+# ────────────────────────────────────────────────
+REGION_GROUP: dict[str, str] = {
+    "台北市": "北部", "新北市": "北部", "基隆市": "北部", "桃園市": "北部",
+    "新竹市": "北部", "新竹縣": "北部", "宜蘭縣": "北部",
+    "台中市": "中部", "苗栗縣": "中部", "彰化縣": "中部", "南投縣": "中部", "雲林縣": "中部",
+    "台南市": "南部", "高雄市": "南部", "嘉義市": "南部", "嘉義縣": "南部", "屏東縣": "南部",
+    "花蓮縣": "東部", "台東縣": "東部",
+    "澎湖縣": "離島", "金門縣": "離島", "連江縣": "離島",
+}
+
+REGIONS = tuple(REGION_BASE_PRICE)
+
+DEFAULT_BASE_CORRELATION  = 0.50   # 全國共同景氣因子
+DEFAULT_GROUP_CORRELATION = 0.75   # 同分區縣市
+DEFAULT_IDIO_SIGMA        = 0.03   # 行政區特有年化波動
+DEFAULT_LIQUIDATION_HAIRCUT = 0.10 # 擔保品處分折價
+DEFAULT_PORTFOLIO_HORIZON = 1.0    # 年
+DEFAULT_PORTFOLIO_PATHS   = 20_000
+DEFAULT_SHARD_PATHS       = 4_096
+DEFAULT_VAR_LEVELS        = (0.95, 0.99)
+DEFAULT_PORTFOLIO_REGION  = "台北市"   # 申請案未填縣市時的預設
+
+
+@dataclass
+class PortfolioBook:
+    """投組貸款明細（欄位皆為等長陣列）"""
+    regions: np.ndarray             # 縣市名稱（須在 REGIONS 內）
+    districts: np.ndarray           # 行政區名稱（集中度分組；未知時同縣市）
+    collateral_values: np.ndarray   # 擔保品估值（元，> 0）
+    loan_amounts: np.ndarray        # 貸款金額（元）
+
+    def __len__(self) -> int:
+        return int(self.loan_amounts.size)
+
+
+@dataclass
+class DistrictConcentration:
+    """單一行政區的曝險與尾端損失貢獻"""
+    district: str
+    region: str
+    n_loans: int
+    exposure: float           # 貸款總額（元）
+    exposure_share: float     # 占投組貸款比例
+    expected_loss: float      # 平均損失（元）
+    es_contribution: float    # 最高信賴水準 ES 情境下的平均損失（元）
+    es_share: float           # 占投組 ES 比例
+
+
+@dataclass
+class PortfolioResult:
+    """投組模擬結果"""
+    var: dict[str, float]                 # {"95%": 損失（元）, "99%": ...}
+    expected_shortfall: dict[str, float]  # {"95%": 損失（元）, "99%": ...}
+    expected_loss: float
+    total_exposure: float
+    concentration: list[DistrictConcentration]   # 依 es_contribution 由大到小
+    n_loans: int
+    n_paths: int
+    n_workers: int
+    horizon_years: float
+
+
+# ─────────────────────────────────────────────────────────────────
+# 相關係數矩陣
+# ─────────────────────────────────────────────────────────────────
+def default_region_correlation(
+    base_correlation: float = DEFAULT_BASE_CORRELATION,
+    group_correlation: float = DEFAULT_GROUP_CORRELATION,
+) -> np.ndarray:
+    """預設縣市相關係數矩陣（順序同 REGIONS）：同分區 group_correlation，其餘 base_correlation"""
+    groups = np.array([REGION_GROUP[r] for r in REGIONS])
+    corr = np.where(groups[:, None] == groups[None, :], group_correlation, base_correlation)
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+def region_cholesky(correlation: np.ndarray) -> np.ndarray:
+    """相關係數矩陣 → 下三角 Cholesky 因子（同一矩陣只分解一次）"""
+    corr = np.ascontiguousarray(correlation, dtype=np.float64)
+    if corr.ndim != 2 or corr.shape[0] != corr.shape[1]:
+        raise ValueError("相關係數矩陣須為方陣")
+    factor = _cholesky_cached(corr.tobytes(), corr.shape[0])
+    return factor.copy()
+
+
+@lru_cache(maxsize=16)
+def _cholesky_cached(corr_bytes: bytes, n: int) -> np.ndarray:
+    corr = np.frombuffer(corr_bytes, dtype=np.float64).reshape(n, n)
+    if not np.allclose(corr, corr.T):
+        raise ValueError("相關係數矩陣須對稱")
+    try:
+        return np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError as e:
+        raise ValueError(f"相關係數矩陣非正定：{e}") from e
+
+
+# ─────────────────────────────────────────────────────────────────
+# 申請案 → 投組
+# ─────────────────────────────────────────────────────────────────
+def load_portfolio_cases(
+    path: str | Path,
+    default_region: str = DEFAULT_PORTFOLIO_REGION,
+) -> PortfolioBook:
+    """
+    讀取 data/applications.json 格式的案件清單，取房貸案組成投組
+
+    縣市取 propertyInfo.region → DISTRICT_TO_REGION[propertyInfo.district] → default_region；
+    擔保品估值以 calculate_base_value 計算（未填欄位以中位數假設補齊）。
+    """
+    with open(path, encoding="utf-8") as f:
+        records = json.load(f)
+    return portfolio_from_applications(records, default_region=default_region)
+
+
+def portfolio_from_applications(
+    records: list[dict],
+    default_region: str = DEFAULT_PORTFOLIO_REGION,
+) -> PortfolioBook:
+    """申請案 dict 清單 → PortfolioBook（非房貸或缺擔保品資料者略過）"""
+    regions, districts, values, loans = [], [], [], []
+    for rec in records:
+        prop = rec.get("propertyInfo") or {}
+        if rec.get("loanType") != "mortgage" or not prop.get("areaPing"):
+            continue
+        district = prop.get("district") or ""
+        region   = prop.get("region") or DISTRICT_TO_REGION.get(district) or default_region
+        value, _ = calculate_base_value(
+            region        = region,
+            building_type = prop.get("buildingType") or "大樓",
+            property_age  = int(prop.get("propertyAge") or 0),
+            floor         = int(prop.get("floor") or 5),
+            layout        = prop.get("layout") or "",
+            has_parking   = bool(prop.get("hasParking")),
+            area_ping     = float(prop["areaPing"]),
+        )
+        regions.append(region)
+        districts.append(district or region)
+        values.append(value)
+        loans.append(float((rec.get("basicInfo") or {}).get("amount") or 0.0))
+
+    return PortfolioBook(
+        regions           = np.array(regions, dtype=object),
+        districts         = np.array(districts, dtype=object),
+        collateral_values = np.array(values, dtype=np.float64),
+        loan_amounts      = np.array(loans, dtype=np.float64),
+    )
+
+
+# ─────────────────────────────────────────────────────────────────
+# 模擬
+# ─────────────────────────────────────────────────────────────────
+def run_portfolio_simulation(
+    book: PortfolioBook,
+    correlation: np.ndarray | None = None,
+    mus: dict[str, float] | float = DEFAULT_MU,
+    sigmas: dict[str, float] | float = DEFAULT_SIGMA,
+    idio_sigma: float = DEFAULT_IDIO_SIGMA,
+    liquidation_haircut: float = DEFAULT_LIQUIDATION_HAIRCUT,
+    horizon_years: float = DEFAULT_PORTFOLIO_HORIZON,
+    n_paths: int = DEFAULT_PORTFOLIO_PATHS,
+    var_levels: tuple[float, ...] = DEFAULT_VAR_LEVELS,
+    n_workers: int | None = None,
+    shard_paths: int = DEFAULT_SHARD_PATHS,
+    seed: int = 42,
+) -> PortfolioResult:
+    """
+    跨縣市相關投組損失模擬
+
+    Args:
+        book:                投組貸款明細
+        correlation:         縣市相關係數矩陣（順序同 REGIONS），None = default_region_correlation()
+        mus / sigmas:        年化漂移率 / 波動率（純量 = 全縣市相同；dict = 依縣市指定，缺者用預設）
+        idio_sigma:          行政區特有年化波動
+        liquidation_haircut: 擔保品處分折價
+        horizon_years:       損失觀察期間（年）
+        n_paths:             模擬路徑數
+        var_levels:          VaR / ES 信賴水準
+        n_workers:           行程數（None = CPU 核心數，1 = 本行程計算）
+        shard_paths:         每分片路徑數（亦為亂數流切分單位）
+        seed:                隨機種子
+
+    Returns:
+        PortfolioResult
+    """
+    n_loans = len(book)
+    if n_loans == 0:
+        raise ValueError("投組無貸款資料")
+    if n_paths <= 0 or shard_paths <= 0:
+        raise ValueError("n_paths / shard_paths 須為正整數")
+    unknown = set(book.regions.tolist()) - set(REGIONS)
+    if unknown:
+        raise ValueError(f"未知的縣市：{', '.join(sorted(unknown))}")
+    if np.any(book.collateral_values <= 0):
+        raise ValueError("擔保品估值須大於 0")
+
+    corr   = default_region_correlation() if correlation is None else correlation
+    factor = region_cholesky(corr)
+    if factor.shape[0] != len(REGIONS):
+        raise ValueError(f"相關係數矩陣維度須為 {len(REGIONS)}")
+
+    mu_r    = _region_params(mus, DEFAULT_MU)
+    sigma_r = _region_params(sigmas, DEFAULT_SIGMA)
+    tables  = _district_tables(book)
+
+    params = dict(
+        factor        = factor,
+        drift         = (mu_r - 0.5 * sigma_r ** 2) * horizon_years,
+        vol           = sigma_r * math.sqrt(horizon_years),
+        idio_vol      = idio_sigma * math.sqrt(horizon_years),
+        keep          = 1.0 - liquidation_haircut,
+        district_region = tables["district_region"],
+        keys          = tables["keys"],
+        cum_loan      = tables["cum_loan"],
+        cum_value     = tables["cum_value"],
+        ends          = tables["ends"],
+    )
+
+    n_districts = tables["names"].size
+    shards      = [(s, min(shard_paths, n_paths - s)) for s in range(0, n_paths, shard_paths)]
+    seeds       = np.random.SeedSequence(seed).spawn(len(shards))
+    workers     = max(1, min(n_workers or os.cpu_count() or 1, len(shards)))
+
+    shm = shared_memory.SharedMemory(create=True, size=n_paths * n_districts * 8)
+    try:
+        losses = np.ndarray((n_paths, n_districts), dtype=np.float64, buffer=shm.buf)
+        if workers == 1:
+            for (start, rows), ss in zip(shards, seeds):
+                losses[start:start + rows] = _shard_losses(params, rows, ss)
+        else:
+            with ProcessPoolExecutor(
+                max_workers = workers,
+                initializer = _init_worker,
+                initargs    = (params, shm.name, n_paths, n_districts),
+            ) as pool:
+                list(pool.map(_run_shard, [(start, rows, ss) for (start, rows), ss in zip(shards, seeds)]))
+        district_losses = losses.copy()
+        del losses
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return _summarize(book, tables, district_losses, var_levels, n_paths, workers, horizon_years)
+
+
+def _region_params(values: dict[str, float] | float, default: float) -> np.ndarray:
+    if isinstance(values, dict):
+        return np.array([values.get(r, default) for r in REGIONS], dtype=np.float64)
+    return np.full(len(REGIONS), float(values))
+
+
+def _district_tables(book: PortfolioBook) -> dict:
+    """依 (行政區, 貸款 / 估值) 排序，建立 searchsorted 查詢鍵與累加和"""
+    region_idx = {r: i for i, r in enumerate(REGIONS)}
+    # 行政區以 (縣市, 行政區) 為單位，避免不同縣市同名行政區合併
+    labels = np.array([f"{r}|{d}" for r, d in zip(book.regions, book.districts)], dtype=object)
+    names, codes = np.unique(labels, return_inverse=True)
+
+    ratio = book.loan_amounts / book.collateral_values
+    order = np.lexsort((ratio, codes))
+    codes_sorted = codes[order]
+
+    # 鍵 = 行政區代碼 + k / (1 + k) ∈ [d, d + 1)，單一陣列即可跨行政區 searchsorted
+    r_sorted = ratio[order]
+    keys = codes_sorted + r_sorted / (1.0 + r_sorted)
+
+    return dict(
+        names           = names,
+        codes           = codes,
+        district_region = np.array([region_idx[n.split("|", 1)[0]] for n in names], dtype=np.int64),
+        keys            = keys,
+        cum_loan        = np.concatenate([[0.0], np.cumsum(book.loan_amounts[order])]),
+        cum_value       = np.concatenate([[0.0], np.cumsum(book.collateral_values[order])]),
+        ends            = np.searchsorted(codes_sorted, np.arange(names.size), side="right"),
+    )
+
+
+def _shard_losses(params: dict, rows: int, seed_seq: np.random.SeedSequence) -> np.ndarray:
+    """單一分片：回傳 shape=(rows, 行政區數) 的損失矩陣"""
+    rng = np.random.default_rng(seed_seq)
+    n_regions   = params["factor"].shape[0]
+    district_rg = params["district_region"]
+
+    z_region = rng.standard_normal(size=(rows, n_regions)) @ params["factor"].T
+    x_region = params["drift"] + params["vol"] * z_region
+    x_dist   = x_region[:, district_rg] + params["idio_vol"] * rng.standard_normal(size=(rows, district_rg.size))
+    m        = params["keep"] * np.exp(x_dist)
+
+    # 各行政區中 貸款 / 估值 > m 的貸款才有損失
+    codes = np.arange(district_rg.size)
+    start = np.searchsorted(params["keys"], codes + m / (1.0 + m), side="right")
+    ends  = params["ends"]
+    tail_loan  = params["cum_loan"][ends]  - params["cum_loan"][start]
+    tail_value = params["cum_value"][ends] - params["cum_value"][start]
+    return np.maximum(tail_loan - m * tail_value, 0.0)
+
+
+# 行程池 worker 狀態（initializer 設定一次，避免每個分片重複傳送投組資料）
+_WORKER_STATE: dict = {}
+
+
+def _init_worker(params: dict, shm_name: str, n_paths: int, n_districts: int) -> None:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _WORKER_STATE["params"] = params
+    _WORKER_STATE["shm"]    = shm
+    _WORKER_STATE["losses"] = np.ndarray((n_paths, n_districts), dtype=np.float64, buffer=shm.buf)
+
+
+def _run_shard(task: tuple[int, int, np.random.SeedSequence]) -> int:
+    start, rows, seed_seq = task
+    _WORKER_STATE["losses"][start:start + rows] = _shard_losses(_WORKER_STATE["params"], rows, seed_seq)
+    return rows
+
+
+def _summarize(
+    book: PortfolioBook,
+    tables: dict,
+    district_losses: np.ndarray,
+    var_levels: tuple[float, ...],
+    n_paths: int,
+    n_workers: int,
+    horizon_years: float,
+) -> PortfolioResult:
+    portfolio = district_losses.sum(axis=1)
+    order     = np.argsort(portfolio)
+
+    def tail(level: float) -> np.ndarray:
+        return order[min(int(math.floor(level * n_paths)), n_paths - 1):]
+
+    var, es = {}, {}
+    for level in var_levels:
+        key = f"{round(level * 100, 2):g}%"
+        idx = tail(level)
+        var[key] = round(float(portfolio[idx[0]]), 0)
+        es[key]  = round(float(portfolio[idx].mean()), 0)
+    tail_idx = tail(max(var_levels))
+
+    names       = tables["names"]
+    codes       = tables["codes"]
+    exposure    = np.bincount(codes, weights=book.loan_amounts, minlength=names.size)
+    counts      = np.bincount(codes, minlength=names.size)
+    total_exp   = float(book.loan_amounts.sum())
+    el          = district_losses.mean(axis=0)
+    es_contrib  = district_losses[tail_idx].mean(axis=0)
+    es_total    = float(es_contrib.sum())
+
+    concentration = [
+        DistrictConcentration(
+            district        = names[i].split("|", 1)[1],
+            region          = names[i].split("|", 1)[0],
+            n_loans         = int(counts[i]),
+            exposure        = round(float(exposure[i]), 0),
+            exposure_share  = round(float(exposure[i]) / total_exp, 6) if total_exp > 0 else 0.0,
+            expected_loss   = round(float(el[i]), 0),
+            es_contribution = round(float(es_contrib[i]), 0),
+            es_share        = round(float(es_contrib[i]) / es_total, 6) if es_total > 0 else 0.0,
+        )
+        for i in np.argsort(-es_contrib, kind="stable")
+    ]
+
+    return PortfolioResult(
+        var                = var,
+        expected_shortfall = es,
+        expected_loss      = round(float(portfolio.mean()), 0),
+        total_exposure     = round(total_exp, 0),
+        concentration      = concentration,
+        n_loans            = len(book),
+        n_paths            = n_paths,
+        n_workers          = n_workers,
+        horizon_years      = horizon_years,
+    )
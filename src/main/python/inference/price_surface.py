@@ -0,0 +1,242 @@
+"""
+INPUT:  推論函式（特徵矩陣 → log(單價)）、類別數、各數值維度格點、估價年度 / 季度
+OUTPUT: 價格曲面 models/price_surface/{surface.npy, surface.json}（float32 memmap + 格點 / 誤差中繼資料）；
+        查表 log(單價)（單筆 / 整批）
+POS:    推論層 — 離線預先計算的 XGBoost 價格曲面（高 QPS 鑑價以查表取代模型推論）
+
+算法說明：
+    valuate_xgboost 的輸入大多為低基數維度，且估價年度 / 季度於請求時固定為當季。
+    建置時對下列維度的稠密格點逐一以模型推論，存為 float32 陣列（np.save，查詢端以 mmap 開啟）：
+        district × building_type × has_parking × floor × total_floors × rooms × property_age × area_ping
+    查詢：
+        類別維度（district / building_type / has_parking）直接以編碼為索引（未知類別 = 編碼 0，與模型相同）；
+        floor / total_floors / rooms 取最近格點；
+        property_age × area_ping 於所在格內雙線性內插（格點範圍外取邊界值）。
+    查詢不需 xgboost / 模型載入，單筆只讀取 4 個格點值，延遲近乎固定。
+
+    曲面僅對建置時的模型版本與估價季度有效（見 surface.json 的 model_version / year / quarter），
+    建置時以實際成交資料與格點範圍內隨機樣本比對即時推論，誤差寫入 surface.json 的 error 欄位。
+"""
+
+import bisect
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+SURFACE_VERSION = 1
+VALUES_FILE = "surface.npy"
+META_FILE   = "surface.json"
+
+# 陣列維度順序（類別維度在前，內插維度在最後兩維）
+CATEGORICAL_AXES = ("district", "building_type", "has_parking")
+SNAP_AXES        = ("floor", "total_floors", "rooms")
+INTERP_AXES      = ("property_age", "area_ping")
+
+# 格點取捨（模型於屋齡 / 樓層每個整數皆有分裂點，無法以小曲面精確重現）：
+# 屋齡與總樓層數對誤差影響最大故較密，樓層影響最小故較疏（約 2,600 萬格、100 MB）
+DEFAULT_KNOTS = {
+    "floor":        (1, 2, 3, 5, 7, 10, 15, 25),
+    "total_floors": (2, 3, 4, 5, 6, 7, 8, 10, 12, 14, 16, 20, 25, 30),
+    "rooms":        (1, 2, 3, 4, 5),
+    "property_age": (0, 2, 4, 6, 8, 10, 12, 14, 17, 20, 24, 28, 33, 40, 50, 60),
+    "area_ping":    (10, 15, 20, 25, 30, 35, 40, 50, 60, 80, 110, 160),
+}
+
+# 特徵列欄位順序（與 xgboostValuationService.FEATURE_COLS 相同）
+_COL = {name: i for i, name in enumerate(
+    ["district", "building_type", "area_ping", "property_age",
+     "floor", "total_floors", "has_parking", "rooms", "year", "quarter"]
+)}
+
+
+def _snap_table(knots: tuple) -> list[int]:
+    """整數值 0..max(knots) → 最近格點索引（同距時取較小格點）"""
+    return [min(range(len(knots)), key=lambda i: (abs(knots[i] - v), i)) for v in range(int(knots[-1]) + 1)]
+
+
+class PriceSurface:
+    """唯讀價格曲面（values 通常為 np.load(mmap_mode="r") 的 memmap）"""
+
+    def __init__(self, values: np.ndarray, meta: dict):
+        self.values = values
+        self.meta   = meta
+        self.knots  = {axis: tuple(meta["knots"][axis]) for axis in SNAP_AXES + INTERP_AXES}
+        self._snap  = {axis: _snap_table(self.knots[axis]) for axis in SNAP_AXES}
+        self._n_categories = tuple(values.shape[:len(CATEGORICAL_AXES)])
+
+    # ─── 載入 / 儲存 ─────────────────────────────────────────────────
+
+    @classmethod
+    def load(cls, directory) -> "PriceSurface":
+        directory = Path(directory)
+        with open(directory / META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != SURFACE_VERSION:
+            raise ValueError(f"不支援的價格曲面版本：{meta.get('version')}")
+        values = np.load(directory / VALUES_FILE, mmap_mode="r")
+        if list(values.shape) != meta["shape"]:
+            raise ValueError(f"價格曲面 shape {values.shape} 與中繼資料 {meta['shape']} 不符")
+        return cls(values, meta)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.values.nbytes)
+
+    # ─── 查詢 ────────────────────────────────────────────────────────
+
+    def _snap_index(self, axis: str, value) -> int:
+        table = self._snap[axis]
+        v = int(value)
+        return table[0 if v < 0 else min(v, len(table) - 1)]
+
+    @staticmethod
+    def _interp_index(knots: tuple, x: float) -> tuple[int, float]:
+        i = min(max(bisect.bisect_right(knots, x) - 1, 0), len(knots) - 2)
+        t = (x - knots[i]) / (knots[i + 1] - knots[i])
+        return i, min(max(t, 0.0), 1.0)
+
+    def log_price(
+        self,
+        district_code: int,
+        building_type_code: int,
+        area_ping: float,
+        property_age: float,
+        floor: int,
+        total_floors: int,
+        has_parking: bool,
+        rooms: int,
+    ) -> float:
+        """單筆查表 + 雙線性內插（不經 numpy 向量運算，延遲固定）"""
+        n_district, n_btype, _ = self._n_categories
+        d = district_code if 0 <= district_code < n_district else 0
+        b = building_type_code if 0 <= building_type_code < n_btype else 0
+        block = self.values[
+            d, b, int(bool(has_parking)),
+            self._snap_index("floor", floor),
+            self._snap_index("total_floors", total_floors),
+            self._snap_index("rooms", rooms),
+        ]
+        i, ti = self._interp_index(self.knots["property_age"], float(property_age))
+        j, tj = self._interp_index(self.knots["area_ping"], float(area_ping))
+        v00, v01 = float(block[i, j]),     float(block[i, j + 1])
+        v10, v11 = float(block[i + 1, j]), float(block[i + 1, j + 1])
+        return ((v00 * (1 - tj) + v01 * tj) * (1 - ti)
+                + (v10 * (1 - tj) + v11 * tj) * ti)
+
+    def log_prices(self, rows: np.ndarray) -> np.ndarray:
+        """整批查表（rows 為模型特徵列，欄位順序同 FEATURE_COLS；year / quarter 欄位忽略）"""
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+        idx = []
+        for axis, n in zip(CATEGORICAL_AXES, self._n_categories):
+            codes = rows[:, _COL[axis]].astype(np.int64)
+            idx.append(np.where((codes >= 0) & (codes < n), codes, 0))
+        for axis in SNAP_AXES:
+            table = np.asarray(self._snap[axis])
+            idx.append(table[np.clip(rows[:, _COL[axis]].astype(np.int64), 0, len(table) - 1)])
+
+        corners = []
+        for axis in INTERP_AXES:
+            knots = np.asarray(self.knots[axis], dtype=np.float64)
+            x = rows[:, _COL[axis]]
+            i = np.clip(np.searchsorted(knots, x, side="right") - 1, 0, len(knots) - 2)
+            t = np.clip((x - knots[i]) / (knots[i + 1] - knots[i]), 0.0, 1.0)
+            corners.append((i, t))
+        (i, ti), (j, tj) = corners
+
+        def at(di, dj):
+            return np.asarray(self.values[tuple(idx) + (i + di, j + dj)], dtype=np.float64)
+
+        return ((at(0, 0) * (1 - tj) + at(0, 1) * tj) * (1 - ti)
+                + (at(1, 0) * (1 - tj) + at(1, 1) * tj) * ti)
+
+
+# ─── 建置 ────────────────────────────────────────────────────────────
+
+def build_price_surface(
+    directory,
+    predict_fn: Callable[[np.ndarray], np.ndarray],
+    n_districts: int,
+    n_building_types: int,
+    year: int,
+    quarter: int,
+    knots: Optional[dict] = None,
+    meta: Optional[dict] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> PriceSurface:
+    """
+    以模型推論填滿稠密格點並寫出曲面（逐 district × building_type 區塊寫入 memmap，不需整份留在記憶體）
+
+    Args:
+        directory:   輸出目錄
+        predict_fn:  特徵矩陣 float32 (n, 10) → log(單價) (n,)
+        year / quarter: 估價年度 / 季度（寫入特徵列與中繼資料）
+        knots:       各數值維度格點（None → DEFAULT_KNOTS）
+        meta:        額外中繼資料（例：model_version、categories）
+        progress:    區塊完成回呼 (已完成數, 總數)
+    """
+    knots = {axis: tuple(sorted((knots or DEFAULT_KNOTS)[axis])) for axis in SNAP_AXES + INTERP_AXES}
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    shape = (n_districts, n_building_types, 2) + tuple(len(knots[a]) for a in SNAP_AXES + INTERP_AXES)
+    tmp_values = directory / f".{VALUES_FILE}.tmp"
+    values = np.lib.format.open_memmap(tmp_values, mode="w+", dtype=np.float32, shape=shape)
+
+    # 單一 (district, building_type) 區塊的其餘維度網格（has_parking × snap × interp）
+    grid = np.meshgrid(
+        np.array([0, 1]),
+        *(np.asarray(knots[a], dtype=np.float32) for a in SNAP_AXES + INTERP_AXES),
+        indexing="ij",
+    )
+    block_rows = np.empty((grid[0].size, len(_COL)), dtype=np.float32)
+    for axis, g in zip(("has_parking",) + SNAP_AXES + INTERP_AXES, grid):
+        block_rows[:, _COL[axis]] = g.ravel()
+    block_rows[:, _COL["year"]]    = year
+    block_rows[:, _COL["quarter"]] = quarter
+
+    total = n_districts * n_building_types
+    for d in range(n_districts):
+        for b in range(n_building_types):
+            block_rows[:, _COL["district"]]      = d
+            block_rows[:, _COL["building_type"]] = b
+            values[d, b] = np.asarray(predict_fn(block_rows), dtype=np.float32).reshape(shape[2:])
+            if progress is not None:
+                progress(d * n_building_types + b + 1, total)
+    values.flush()
+    del values
+    tmp_values.replace(directory / VALUES_FILE)
+
+    write_meta(directory, {
+        **(meta or {}),
+        "version":  SURFACE_VERSION,
+        "year":     int(year),
+        "quarter":  int(quarter),
+        "axes":     list(CATEGORICAL_AXES + SNAP_AXES + INTERP_AXES),
+        "shape":    list(shape),
+        "knots":    {axis: list(k) for axis, k in knots.items()},
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+    })
+    return PriceSurface.load(directory)
+
+
+def write_meta(directory, meta: dict) -> None:
+    with open(Path(directory) / META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def surface_error(surface_log_prices: np.ndarray, live_log_prices: np.ndarray) -> dict:
+    """曲面與即時推論的單價誤差（以 expm1 還原單價後的相對誤差，%）"""
+    surface_price = np.expm1(np.asarray(surface_log_prices, dtype=np.float64))
+    live_price    = np.expm1(np.asarray(live_log_prices, dtype=np.float64))
+    pct = np.abs(surface_price - live_price) / live_price * 100
+    return {
+        "n":        int(pct.size),
+        "mape_pct": round(float(pct.mean()), 3),
+        "p50_pct":  round(float(np.percentile(pct, 50)), 3),
+        "p95_pct":  round(float(np.percentile(pct, 95)), 3),
+        "p99_pct":  round(float(np.percentile(pct, 99)), 3),
+        "max_pct":  round(float(pct.max()), 3),
+    }
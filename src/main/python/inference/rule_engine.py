@@ -0,0 +1,328 @@
+"""
+INPUT:  規則設定檔（JSON；已安裝 PyYAML 時亦可為 .yaml / .yml）、特徵欄位順序、特徵矩陣 rows（shape=(n, d)）
+OUTPUT: 各列各規則的貢獻矩陣（shape=(n, 規則數)）；規則命中次數 / 評估耗時、重新載入統計供 /metrics
+POS:    推論層 — 宣告式規則引擎（防詐 Demo 模式規則加權評分；規則門檻 / 權重改檔即生效，不需重新部署）
+
+設定檔格式：
+    {
+      "version": "2026-10-17",
+      "rules": [
+        {"feature": "document_match", "label": "證件比對不一致", "direction": "低 = 風險",
+         "type": "flag", "when": {"op": "eq", "value": 0}, "weight": 0.35},
+        {"feature": "credit_inquiry_count", "label": "聯徵查詢次數過高", "direction": "高 = 風險",
+         "type": "linear", "per_unit": 0.06, "max": 0.25},
+        {"feature": "monthly_income", "label": "月收入偏低", "direction": "低 = 風險",
+         "type": "tiers", "tiers": [{"when": {"op": "lt", "value": 3.0}, "weight": 0.08},
+                                    {"when": {"op": "lt", "value": 5.0}, "weight": 0.04}]}
+      ]
+    }
+
+    規則類型：
+        flag    條件成立 → weight，否則 0；when 為單一條件或條件陣列（任一成立即可）
+        linear  min(特徵值 × per_unit, max)
+        tiers   依序比對，第一個成立的 tier 的 weight，皆不成立 → 0
+    條件 op：eq / ne / lt / le / gt / ge（value 為數值；布林特徵為 0 / 1）、in（value 為數值陣列）。
+
+設計說明：
+    載入時即驗證並編譯：每條規則轉為一個以整欄特徵值運算的 NumPy 函式（np.where / np.minimum），
+    評分時不再逐條解讀設定；設定錯誤（未知特徵、未知 op、缺少欄位）於載入時以 RuleConfigError 回報。
+    RuleEngine.current() 每 reload_interval_s 秒至多檢查一次檔案 mtime / 大小，變更時重新編譯，
+    成功才以單一參照替換（請求開始時取得的 RuleSet 於整個請求中不變，重新載入不會中斷或混用新舊規則）；
+    新設定無效時沿用舊規則並記錄錯誤（reload_errors / last_error）。
+    規則命中與耗時統計屬於各 RuleSet，重新載入後歸零；process 執行器下各工作者各自統計。
+
+環境變數（prefix 例：FRAUD）：
+    {PREFIX}_RULES_PATH       規則設定檔路徑（未設定 = 服務內建預設檔）
+    {PREFIX}_RULES_RELOAD_S   檢查檔案變更的最短間隔秒數（預設 2；0 = 每次評分都檢查）
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RELOAD_INTERVAL_S = 2.0
+
+RULE_TYPES = ("flag", "linear", "tiers")
+
+_COMPARATORS: dict[str, Callable[[np.ndarray, float], np.ndarray]] = {
+    "eq": np.equal,
+    "ne": np.not_equal,
+    "lt": np.less,
+    "le": np.less_equal,
+    "gt": np.greater,
+    "ge": np.greater_equal,
+}
+
+
+class RuleConfigError(ValueError):
+    """規則設定檔無法讀取或內容無效"""
+
+
+# ─── 編譯 ──────────────────────────────────────────────────────────
+
+def _number(value, where: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise RuleConfigError(f"{where}: 需為數值，收到 {value!r}")
+    return float(value)
+
+
+def _compile_condition(spec, where: str) -> Callable[[np.ndarray], np.ndarray]:
+    """條件（或條件陣列，OR）→ 回傳布林陣列的函式"""
+    if isinstance(spec, list):
+        if not spec:
+            raise RuleConfigError(f"{where}: 條件陣列不可為空")
+        parts = [_compile_condition(s, f"{where}[{i}]") for i, s in enumerate(spec)]
+        if len(parts) == 1:
+            return parts[0]
+
+        def any_of(v: np.ndarray) -> np.ndarray:
+            mask = parts[0](v)
+            for part in parts[1:]:
+                mask = mask | part(v)
+            return mask
+        return any_of
+
+    if not isinstance(spec, dict) or "op" not in spec or "value" not in spec:
+        raise RuleConfigError(f"{where}: 條件需為 {{op, value}}")
+    op = spec["op"]
+    if op == "in":
+        if not isinstance(spec["value"], list) or not spec["value"]:
+            raise RuleConfigError(f"{where}: in 的 value 需為非空數值陣列")
+        # 少量候選值時逐一比較較 np.isin 快（單列評分為主要路徑）
+        return _compile_condition(
+            [{"op": "eq", "value": x} for x in spec["value"]], f"{where}.value",
+        )
+    if op not in _COMPARATORS:
+        raise RuleConfigError(f"{where}: 未知的 op {op!r}（可用：{', '.join([*_COMPARATORS, 'in'])}）")
+    compare   = _COMPARATORS[op]
+    threshold = _number(spec["value"], f"{where}.value")
+    return lambda v: compare(v, threshold)
+
+
+def _compile_rule(spec: dict, where: str) -> Callable[[np.ndarray], np.ndarray]:
+    """單條規則 → 以整欄特徵值回傳貢獻陣列的函式"""
+    kind = spec.get("type")
+    if kind == "flag":
+        when   = _compile_condition(spec.get("when"), f"{where}.when")
+        weight = _number(spec.get("weight"), f"{where}.weight")
+        return lambda v: np.where(when(v), weight, 0.0)
+
+    if kind == "linear":
+        per_unit = _number(spec.get("per_unit"), f"{where}.per_unit")
+        cap      = _number(spec.get("max"), f"{where}.max")
+        return lambda v: np.minimum(v * per_unit, cap)
+
+    if kind == "tiers":
+        tiers = spec.get("tiers")
+        if not isinstance(tiers, list) or not tiers:
+            raise RuleConfigError(f"{where}.tiers: 需為非空陣列")
+        conditions = [_compile_condition(t.get("when"), f"{where}.tiers[{i}].when") for i, t in enumerate(tiers)]
+        weights    = [_number(t.get("weight"), f"{where}.tiers[{i}].weight") for i, t in enumerate(tiers)]
+
+        def first_match(v: np.ndarray) -> np.ndarray:
+            # 由最後一個 tier 往前套 np.where，前面的 tier 優先
+            out = np.zeros(len(v))
+            for cond, weight in zip(reversed(conditions), reversed(weights)):
+                out = np.where(cond(v), weight, out)
+            return out
+        return first_match
+
+    raise RuleConfigError(f"{where}.type: 未知的規則類型 {kind!r}（可用：{', '.join(RULE_TYPES)}）")
+
+
+class RuleSet:
+    """已編譯的規則集合（載入後不變；命中 / 耗時統計以鎖保護）"""
+
+    def __init__(self, config: dict, feature_names: list[str], source: str = "<memory>"):
+        if not isinstance(config, dict) or not isinstance(config.get("rules"), list) or not config["rules"]:
+            raise RuleConfigError(f"{source}: 需有非空的 rules 陣列")
+
+        self.version = str(config.get("version", ""))
+        self.source  = source
+
+        keys, labels, directions, cols, fns = [], [], [], [], []
+        for i, spec in enumerate(config["rules"]):
+            where = f"{source}: rules[{i}]"
+            if not isinstance(spec, dict):
+                raise RuleConfigError(f"{where}: 規則需為物件")
+            feature = spec.get("feature")
+            if feature not in feature_names:
+                raise RuleConfigError(f"{where}.feature: 未知特徵 {feature!r}")
+            if feature in keys:
+                raise RuleConfigError(f"{where}.feature: {feature!r} 重複定義")
+            keys.append(feature)
+            labels.append(str(spec.get("label", feature)))
+            directions.append(str(spec.get("direction", "")))
+            cols.append(feature_names.index(feature))
+            fns.append(_compile_rule(spec, where))
+
+        self.keys       = tuple(keys)
+        self.labels     = tuple(labels)
+        self.directions = tuple(directions)
+        self.cols       = tuple(cols)
+        self._fns       = tuple(fns)
+
+        self.loaded_at = time.time()
+        self._lock     = threading.Lock()
+        self._calls    = 0
+        self._rows     = 0
+        self._hits     = np.zeros(len(keys), dtype=np.int64)
+        self._seconds  = np.zeros(len(keys))
+
+    def evaluate(self, rows: np.ndarray) -> np.ndarray:
+        """整批計算各規則貢獻（shape=(n, 規則數)，欄位順序同 keys）"""
+        contrib = np.empty((len(rows), len(self._fns)))
+        elapsed = np.empty(len(self._fns))
+        for j, (fn, col) in enumerate(zip(self._fns, self.cols)):
+            start = time.perf_counter()
+            contrib[:, j] = fn(rows[:, col])
+            elapsed[j] = time.perf_counter() - start
+        hits = np.count_nonzero(contrib > 0, axis=0)
+        with self._lock:
+            self._calls   += 1
+            self._rows    += len(rows)
+            self._hits    += hits
+            self._seconds += elapsed
+        return contrib
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._rows
+            return {
+                "version":   self.version,
+                "source":    self.source,
+                "loaded_at": self.loaded_at,
+                "calls":     self._calls,
+                "rows":      rows,
+                "rules": {
+                    key: {
+                        "hits":       int(hits),
+                        "hit_rate":   round(int(hits) / rows, 4) if rows else 0.0,
+                        "total_ms":   round(float(seconds) * 1000, 3),
+                        "us_per_row": round(float(seconds) * 1e6 / rows, 4) if rows else 0.0,
+                    }
+                    for key, hits, seconds in zip(self.keys, self._hits, self._seconds)
+                },
+            }
+
+
+# ─── 載入 / 熱重新載入 ────────────────────────────────────────────
+
+def load_rule_config(path) -> dict:
+    """讀取規則設定檔（.yaml / .yml 需 PyYAML，其餘視為 JSON）"""
+    path = Path(path)
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError as e:
+        raise RuleConfigError(f"{path}: 無法讀取（{e}）") from e
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise RuleConfigError(f"{path}: YAML 規則檔需安裝 PyYAML") from e
+        try:
+            return yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise RuleConfigError(f"{path}: YAML 格式錯誤（{e}）") from e
+    try:
+        return json.loads(text)
+    except ValueError as e:
+        raise RuleConfigError(f"{path}: JSON 格式錯誤（{e}）") from e
+
+
+class RuleEngine:
+    """規則設定檔的編譯結果 + 檔案變更時熱重新載入（初次載入失敗即拋出 RuleConfigError）"""
+
+    def __init__(
+        self,
+        path,
+        feature_names: list[str],
+        reload_interval_s: float = DEFAULT_RELOAD_INTERVAL_S,
+    ):
+        self.path              = Path(path)
+        self.feature_names     = list(feature_names)
+        self.reload_interval_s = max(0.0, float(reload_interval_s))
+
+        self._reload_lock   = threading.Lock()
+        self._reloads       = 0
+        self._reload_errors = 0
+        self._last_error: Optional[str] = None
+
+        self._signature = self._stat()
+        self._rules     = self._compile()
+        self._next_check = time.monotonic() + self.reload_interval_s
+
+    @classmethod
+    def from_env(
+        cls,
+        prefix: str,
+        default_path,
+        feature_names: list[str],
+    ) -> "RuleEngine":
+        """依 {prefix}_RULES_PATH / _RULES_RELOAD_S 環境變數建立"""
+        return cls(
+            path              = os.environ.get(f"{prefix}_RULES_PATH") or default_path,
+            feature_names     = feature_names,
+            reload_interval_s = float(os.environ.get(f"{prefix}_RULES_RELOAD_S", DEFAULT_RELOAD_INTERVAL_S)),
+        )
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _compile(self) -> RuleSet:
+        return RuleSet(load_rule_config(self.path), self.feature_names, source=str(self.path))
+
+    def current(self) -> RuleSet:
+        """目前生效的規則集合（到達檢查間隔且檔案已變更時先重新載入）"""
+        if time.monotonic() >= self._next_check and self._reload_lock.acquire(blocking=False):
+            # 其他執行緒正在重新載入時不等待，直接使用目前規則
+            try:
+                self._next_check = time.monotonic() + self.reload_interval_s
+                signature = self._stat()
+                if signature is not None and signature != self._signature:
+                    self._signature = signature
+                    self._reload()
+            finally:
+                self._reload_lock.release()
+        return self._rules
+
+    def reload(self) -> bool:
+        """立即重新載入（成功 → True；失敗沿用舊規則 → False）"""
+        with self._reload_lock:
+            self._signature = self._stat()
+            return self._reload()
+
+    def _reload(self) -> bool:
+        try:
+            rules = self._compile()
+        except RuleConfigError as e:
+            self._reload_errors += 1
+            self._last_error = str(e)
+            logger.warning("規則重新載入失敗，沿用版本 %s：%s", self._rules.version, e)
+            return False
+        self._rules = rules
+        self._reloads += 1
+        self._last_error = None
+        logger.info("規則已重新載入：%s（版本 %s，%d 條）", self.path, rules.version, len(rules.keys))
+        return True
+
+    def stats(self) -> dict:
+        return {
+            **self._rules.stats(),
+            "reload_interval_s": self.reload_interval_s,
+            "reloads":           self._reloads,
+            "reload_errors":     self._reload_errors,
+            "last_error":        self._last_error,
+        }
@@ -0,0 +1,136 @@
+"""
+INPUT:  spot_values（一或多筆估值，元）、mus（漂移率情境清單）、sigmas（波動率情境清單）
+OUTPUT: StressGridResult（P5 / P50 / P95 與風險代碼，shape=(物件數, mu 數, sigma 數)）
+POS:    推論層 — (mu, sigma) 壓力情境網格（單次廣播計算，取代 N×M 次 run_monte_carlo）
+
+算法說明：
+    抽樣引擎的期末對數報酬 = Σ_k [(mu - 0.5×sigma²)×dt + sigma×sqrt(dt)×Z_k]
+                           = (mu - 0.5×sigma²)×T + sigma×sqrt(dt)×S，S = Σ_k Z_k
+    固定 seed 下 S 與 (mu, sigma) 無關（共同隨機數），且 sigma > 0 時期末乘數對 S 單調遞增，
+    故排序後的 S 只需抽樣一次（依 (n_paths, n_steps, seed) 快取），
+    每個情境的百分位數 = np.percentile 同一線性內插位置上的兩個順序統計量：
+        Pq = (1 - w) × exp(a + b×S_(k)) + w × exp(a + b×S_(k+1))，h = (n - 1)×q，k = ⌊h⌋，w = h - k
+    與逐格呼叫 run_monte_carlo(engine="sampled") 只差浮點加總順序（四捨五入至元後一致）。
+
+    analytic 引擎直接以封閉解廣播；antithetic / sobol 引擎逐組取快取乘數（percentile_multipliers）。
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from src.main.python.inference.monte_carlo import (
+    ENGINE_ANALYTIC,
+    ENGINE_SAMPLED,
+    SERVICE_ENGINE,
+    MC_ENGINES,
+    analytic_percentile_multipliers,
+    classify_risk_codes,
+    percentile_multipliers,
+)
+
+_QUANTILES = (0.05, 0.50, 0.95)
+
+# 排序後 ΣZ 快取組數（每組 n_paths 個 float64）
+TERMINAL_SUM_CACHE_SIZE = 8
+
+
+@dataclass
+class StressGridResult:
+    """壓力情境網格結果（p5 / p50 / p95 / risk_codes shape=(物件數, mu 數, sigma 數)）"""
+    mus: np.ndarray
+    sigmas: np.ndarray
+    p5: np.ndarray
+    p50: np.ndarray
+    p95: np.ndarray
+    risk_codes: np.ndarray   # int8，對應 RISK_LEVELS index
+
+
+def run_stress_grid(
+    spot_values,
+    mus,
+    sigmas,
+    n_paths: int = 1000,
+    n_steps: int = 252,
+    seed: int = 42,
+    engine: str = SERVICE_ENGINE,
+) -> StressGridResult:
+    """
+    (mu, sigma) 壓力情境網格：所有物件 × 所有情境一次計算
+
+    Args:
+        spot_values: 起始估值（純量或一維陣列，元）
+        mus:         漂移率情境（一維）
+        sigmas:      波動率情境（一維，皆須 > 0）
+        n_paths:     模擬路徑數（抽樣類引擎）
+        n_steps:     模擬步數（sampled 引擎）
+        seed:        隨機種子
+        engine:      "analytic" / "sampled" / "antithetic" / "sobol"
+
+    Returns:
+        StressGridResult（百分位數已四捨五入至元）
+    """
+    if engine not in MC_ENGINES:
+        raise ValueError(f"未知的模擬引擎：{engine}（可用：{', '.join(MC_ENGINES)}）")
+    spot  = np.atleast_1d(np.asarray(spot_values, dtype=np.float64))
+    mu    = np.atleast_1d(np.asarray(mus,         dtype=np.float64))
+    sigma = np.atleast_1d(np.asarray(sigmas,      dtype=np.float64))
+    if spot.ndim != 1 or mu.ndim != 1 or sigma.ndim != 1:
+        raise ValueError("spot_values / mus / sigmas 須為一維")
+    if np.any(sigma <= 0):
+        raise ValueError("sigma 須大於 0")
+
+    mu_g, sigma_g = np.meshgrid(mu, sigma, indexing="ij")   # shape=(n_mu, n_sigma)
+
+    if engine == ENGINE_ANALYTIC:
+        multipliers = analytic_percentile_multipliers(mu_g, sigma_g)
+    elif engine == ENGINE_SAMPLED:
+        multipliers = _sampled_grid_multipliers(mu_g, sigma_g, n_paths, n_steps, seed)
+    else:
+        multipliers = np.array([
+            percentile_multipliers(engine, float(m), float(s), n_paths, n_steps, seed)
+            for m, s in zip(mu_g.ravel(), sigma_g.ravel())
+        ], dtype=np.float64).reshape(mu_g.shape + (3,))
+
+    values = spot[:, None, None, None] * multipliers[None]   # shape=(n_props, n_mu, n_sigma, 3)
+    p5, p50, p95 = values[..., 0], values[..., 1], values[..., 2]
+
+    return StressGridResult(
+        mus        = mu,
+        sigmas     = sigma,
+        p5         = np.round(p5,  0),
+        p50        = np.round(p50, 0),
+        p95        = np.round(p95, 0),
+        risk_codes = classify_risk_codes(p5, p50, p95),
+    )
+
+
+def _sampled_grid_multipliers(
+    mu_g: np.ndarray,
+    sigma_g: np.ndarray,
+    n_paths: int,
+    n_steps: int,
+    seed: int,
+) -> np.ndarray:
+    """共同隨機數：排序 ΣZ 的順序統計量 → 各情境 P5 / P50 / P95 乘數，shape=mu_g.shape + (3,)"""
+    sorted_sums = _sorted_terminal_sums(int(n_paths), int(n_steps), int(seed))
+    dt = 1.0 / n_steps
+
+    h = (n_paths - 1) * np.asarray(_QUANTILES)
+    lo = np.floor(h).astype(np.int64)
+    hi = np.minimum(lo + 1, n_paths - 1)
+    w  = h - lo
+
+    a = ((mu_g - 0.5 * sigma_g ** 2) * dt * n_steps)[..., None]
+    b = (sigma_g * np.sqrt(dt))[..., None]
+    return (1.0 - w) * np.exp(a + b * sorted_sums[lo]) + w * np.exp(a + b * sorted_sums[hi])
+
+
+@lru_cache(maxsize=TERMINAL_SUM_CACHE_SIZE)
+def _sorted_terminal_sums(n_paths: int, n_steps: int, seed: int) -> np.ndarray:
+    """與 _sampled_multipliers 相同亂數流的每條路徑 ΣZ（已排序、唯讀）"""
+    rng = np.random.default_rng(seed)
+    sums = np.sort(rng.standard_normal(size=(n_paths, n_steps)).sum(axis=1))
+    sums.flags.writeable = False
+    return sums
@@ -0,0 +1,208 @@
+"""
+INPUT:  xgboost.Booster 與模型檔路徑、後端偏好順序（XGBOOST_BACKEND，例："treelite,onnx"）
+OUTPUT: 推論後端（predict: float32 (n, d) → (n,)）與選擇結果（實際後端 / 各後端失敗原因）
+POS:    推論層 — XGBoost 樹模型可抽換推論後端（原生 Booster / ONNX Runtime / Treelite 編譯）
+
+後端說明：
+    native    Booster.inplace_predict（預設，永遠可用，作為最終退路）
+    onnx      onnxmltools 轉換為 ONNX 後以 onnxruntime 推論（TreeEnsembleRegressor 運算子）
+    treelite  treelite 讀取模型、tl2cgen 編譯為共享函式庫後推論（首次編譯約需一分鐘）
+
+    轉換 / 編譯產物快取於模型檔旁（xgboost_valuation.onnx / .so），模型檔較新時自動重建；
+    已有產物時只需執行期套件（onnxruntime / tl2cgen），不需 onnxmltools。
+    依偏好順序嘗試載入，任一後端缺套件、轉換失敗或探針列預測值與 native 不一致，
+    即記錄原因並改試下一個，最後退回 native。
+
+環境變數：
+    XGBOOST_BACKEND          偏好順序（逗號分隔，預設 native）
+    XGBOOST_BACKEND_THREADS  onnx / treelite 每次推論的執行緒數（預設 1，並行由執行器負責）
+"""
+
+import logging
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKEND_NATIVE   = "native"
+BACKEND_ONNX     = "onnx"
+BACKEND_TREELITE = "treelite"
+BACKENDS = (BACKEND_NATIVE, BACKEND_ONNX, BACKEND_TREELITE)
+
+# 探針列預測值與 native 的容許誤差（float32 累加順序不同造成的差異約 1e-5）
+PROBE_TOLERANCE = 1e-4
+
+_LIB_SUFFIX = {"win32": ".dll", "darwin": ".dylib"}.get(sys.platform, ".so")
+
+
+def _is_stale(artifact: Path, model_path: Path) -> bool:
+    return not artifact.exists() or artifact.stat().st_mtime < model_path.stat().st_mtime
+
+
+def _temp_path(path: Path) -> Path:
+    # 先寫入行程專屬暫存檔再 os.replace，process pool 的多個工作者同時建置也不會讀到半成品
+    return path.with_name(f"{path.stem}.{os.getpid()}.tmp{path.suffix}")
+
+
+class NativeBackend:
+    """XGBoost Booster 原地推論"""
+
+    name = BACKEND_NATIVE
+
+    def __init__(self, booster, model_path: Path, threads: int = 1):
+        self.booster = booster
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        return self.booster.inplace_predict(rows, validate_features=False)
+
+
+class OnnxBackend:
+    """ONNX Runtime 推論（CPUExecutionProvider）"""
+
+    name = BACKEND_ONNX
+
+    def __init__(self, booster, model_path: Path, threads: int = 1):
+        import onnxruntime as ort
+        self.artifact = Path(model_path).with_suffix(".onnx")
+        if _is_stale(self.artifact, Path(model_path)):
+            self._export(booster, self.artifact)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(
+            str(self.artifact), options, providers=["CPUExecutionProvider"],
+        )
+        self._input = self._session.get_inputs()[0].name
+
+    @staticmethod
+    def _export(booster, path: Path) -> None:
+        from onnxmltools.convert import convert_xgboost
+        from onnxmltools.convert.common.data_types import FloatTensorType
+        # 轉換器以 f0, f1, ... 對應特徵，移除訓練時的欄位名稱
+        unnamed = booster.copy()
+        unnamed.feature_names = None
+        onx = convert_xgboost(
+            unnamed,
+            initial_types = [("input", FloatTensorType([None, booster.num_features()]))],
+            target_opset  = 15,
+        )
+        tmp = _temp_path(path)
+        tmp.write_bytes(onx.SerializeToString())
+        os.replace(tmp, path)
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        return self._session.run(None, {self._input: rows})[0].ravel()
+
+
+class TreeliteBackend:
+    """Treelite / tl2cgen 編譯的原生預測函式庫"""
+
+    name = BACKEND_TREELITE
+
+    def __init__(self, booster, model_path: Path, threads: int = 1):
+        import tl2cgen
+        self._tl2cgen = tl2cgen
+        self.artifact = Path(model_path).with_suffix(_LIB_SUFFIX)
+        if _is_stale(self.artifact, Path(model_path)):
+            self._compile(Path(model_path), self.artifact)
+        self._predictor = tl2cgen.Predictor(str(self.artifact), nthread=threads)
+        # Predictor 內含共用的工作執行緒池，並行呼叫需序列化
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _compile(model_path: Path, path: Path) -> None:
+        import treelite
+        import tl2cgen
+        model = treelite.frontend.load_xgboost_model(str(model_path))
+        logger.info("編譯 Treelite 預測函式庫：%s", path)
+        tmp = _temp_path(path)
+        tl2cgen.export_lib(
+            model,
+            toolchain = "gcc",
+            libpath   = str(tmp),
+            params    = {"parallel_comp": os.cpu_count() or 1},
+        )
+        os.replace(tmp, path)
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        matrix = self._tl2cgen.DMatrix(rows)
+        with self._lock:
+            return self._predictor.predict(matrix).ravel()
+
+
+_BACKEND_CLASSES = {
+    BACKEND_NATIVE:   NativeBackend,
+    BACKEND_ONNX:     OnnxBackend,
+    BACKEND_TREELITE: TreeliteBackend,
+}
+
+
+@dataclass
+class BackendSelection:
+    """後端選擇結果（/metrics 顯示）"""
+    backend:   object
+    requested: list[str]
+    errors:    dict[str, str] = field(default_factory=dict)
+
+    def info(self) -> dict:
+        return {
+            "backend":   self.backend.name,
+            "requested": list(self.requested),
+            "fallback":  self.backend.name != self.requested[0],
+            "errors":    dict(self.errors),
+        }
+
+
+def parse_backends(spec: str | None) -> list[str]:
+    """'treelite, onnx' → ['treelite', 'onnx']（空白 / 未設定 → ['native']）"""
+    names = [s.strip().lower() for s in (spec or "").split(",") if s.strip()]
+    return names or [BACKEND_NATIVE]
+
+
+def select_backend(
+    booster,
+    model_path,
+    requested: list[str] | None = None,
+    threads: int | None = None,
+) -> BackendSelection:
+    """
+    依偏好順序載入第一個可用的後端，全部失敗時退回 native
+
+    Args:
+        booster:    已載入的 xgboost.Booster（native 後端與探針比對使用）
+        model_path: 模型 JSON 檔（轉換 / 編譯產物存放於同目錄）
+        requested:  偏好順序，None → XGBOOST_BACKEND 環境變數
+        threads:    onnx / treelite 推論執行緒數，None → XGBOOST_BACKEND_THREADS（預設 1）
+    """
+    if requested is None:
+        requested = parse_backends(os.environ.get("XGBOOST_BACKEND"))
+    if threads is None:
+        threads = int(os.environ.get("XGBOOST_BACKEND_THREADS", "1"))
+    model_path = Path(model_path)
+
+    native = NativeBackend(booster, model_path)
+    probe  = np.zeros((1, booster.num_features()), dtype=np.float32)
+    errors: dict[str, str] = {}
+    for name in requested:
+        if name == BACKEND_NATIVE:
+            return BackendSelection(native, requested, errors)
+        cls = _BACKEND_CLASSES.get(name)
+        if cls is None:
+            errors[name] = f"未知的推論後端（可用：{', '.join(BACKENDS)}）"
+            continue
+        try:
+            backend = cls(booster, model_path, threads)
+            diff = float(np.abs(backend.predict(probe) - native.predict(probe)).max())
+            if diff > PROBE_TOLERANCE:
+                raise ValueError(f"探針列預測值與 native 相差 {diff:.2e}")
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+            logger.warning("推論後端 %s 無法使用，改試下一個：%s", name, errors[name])
+            continue
+        return BackendSelection(backend, requested, errors)
+    return BackendSelection(native, requested, errors)
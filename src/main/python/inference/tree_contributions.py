@@ -0,0 +1,57 @@
+"""
+INPUT:  xgboost.Booster、特徵矩陣 rows（shape=(n, d)）
+OUTPUT: 每列每個特徵的貢獻值（shape=(n, d)，不含 bias）、依 |貢獻| 排序的前 k 大特徵
+POS:    推論層 — XGBoost 原生樹貢獻解釋引擎（取代請求路徑上的 shap.TreeExplainer）
+
+算法說明：
+    Booster.predict(pred_contribs=True) 即 XGBoost 內建的 TreeSHAP（精確解），
+    shap.TreeExplainer 對 XGBoost 模型亦是轉呼叫同一實作，兩者數值一致；
+    直接呼叫可省去 import shap 的大量相依套件與記憶體，且整批列一次計算。
+    輸出最後一欄為 bias（期望值），此處移除。
+
+    approximate=True 改用 Saabas 近似（approx_contribs），約快 50 倍，
+    但前三大因子集合與精確解約僅半數一致，預設不啟用（環境變數 TREE_CONTRIBS_APPROX=1 開啟）。
+"""
+
+import os
+
+import numpy as np
+
+DEFAULT_TOP_K = 3
+# 服務層預設的貢獻計算方式（False = 精確 TreeSHAP）
+APPROXIMATE_CONTRIBS = os.environ.get("TREE_CONTRIBS_APPROX", "0") == "1"
+
+
+def tree_contributions(booster, rows, approximate: bool = False) -> np.ndarray:
+    """
+    整批計算樹貢獻值
+
+    Args:
+        booster:     xgboost.Booster
+        rows:        特徵矩陣（shape=(n, d)，欄位順序同訓練）
+        approximate: True → Saabas 近似；False → 精確 TreeSHAP
+
+    Returns:
+        np.ndarray shape=(n, d)，各列加總 + bias = 模型 margin 輸出
+    """
+    import xgboost as xgb
+    matrix = xgb.DMatrix(np.asarray(rows, dtype=np.float32))
+    contribs = booster.predict(
+        matrix,
+        pred_contribs     = True,
+        approx_contribs   = approximate,
+        validate_features = False,
+    )
+    return contribs[:, :-1]
+
+
+def top_k_contributions(contribs: np.ndarray, k: int = DEFAULT_TOP_K) -> tuple[np.ndarray, np.ndarray]:
+    """
+    每列依 |貢獻| 由大到小取前 k 個特徵（同值時保留原欄位順序，與 sorted(..., reverse=True) 相同）
+
+    Returns:
+        (特徵 index shape=(n, k), 貢獻值 shape=(n, k))
+    """
+    contribs = np.atleast_2d(contribs)
+    order = np.argsort(-np.abs(contribs), axis=1, kind="stable")[:, :k]
+    return order, np.take_along_axis(contribs, order, axis=1)
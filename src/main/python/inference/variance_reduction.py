@@ -0,0 +1,203 @@
+"""
+INPUT:  spot_value（當前估值，元）、mu / sigma（年化參數）、sampler（plain / antithetic / sobol）、
+        n_paths（路徑數）或 target_rel_error（目標相對標準誤，例 0.002 = 0.2%）
+OUTPUT: PrecisionResult（P5 / P50 / P95、各百分位數標準誤、實際使用路徑數）
+POS:    推論層 — 變異數縮減 GBM 抽樣（對偶變量 / 加擾 Sobol 準蒙地卡羅）與精度估計
+
+算法說明：
+    GBM 期末對數報酬精確服從 N((mu - 0.5×sigma²)×T, sigma²×T)，
+    期末分配只需一維標準常態 Z，故每條路徑抽一個 Z 即與逐步模擬同分配：
+        S_T = spot_value × exp((mu - 0.5×sigma²)×T + sigma×sqrt(T)×Z)
+
+    抽樣器：
+        plain       — 偽隨機 Z ~ N(0,1)
+        antithetic  — 對偶變量：每個 Z 同時使用 -Z（半數亂數、對稱分配）
+        sobol       — 加擾 Sobol 點 u ∈ (0,1)，Z = Φ⁻¹(u)（準蒙地卡羅，收斂快於 1/sqrt(n)）
+
+    標準誤（三種抽樣器共用）：
+        將 n_paths 切成 n_replicates 組獨立重複（Sobol 各組使用獨立加擾），
+        每組各自計算百分位數（Hazen 內插）；估計值 = 各組平均，
+        標準誤 = 組間標準差 / sqrt(n_replicates)。
+
+    目標精度（target_rel_error）：
+        max(SE / 估計值) 超過目標時，依收斂速率放大路徑數後重新抽樣，直到達標或達 max_paths：
+            plain / antithetic：SE ∝ n^(-1/2) → n_new = n × (rel / target)²
+            sobol：            SE ≈ n^(-1)   → n_new = n × (rel / target)（取 2 的冪次）
+        每輪至少加倍，避免標準誤估計雜訊造成原地踏步；各組大小向下取整使總路徑數不超過 max_paths。
+
+    run_monte_carlo 的 antithetic / sobol 引擎回傳的 ConfidenceInterval 附上 standard_errors（元），
+    即此處的組間標準誤。
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.main.python.inference.monte_carlo import (
+    ConfidenceInterval,
+    DEFAULT_MU,
+    DEFAULT_SIGMA,
+    classify_risk,
+)
+
+SAMPLER_PLAIN      = "plain"
+SAMPLER_ANTITHETIC = "antithetic"
+SAMPLER_SOBOL      = "sobol"
+SAMPLERS = (SAMPLER_PLAIN, SAMPLER_ANTITHETIC, SAMPLER_SOBOL)
+
+DEFAULT_REPLICATES = 16
+DEFAULT_MAX_PATHS  = 1 << 20
+
+_QUANTILES = (0.05, 0.50, 0.95)
+_KEYS      = ("p5", "p50", "p95")
+
+
+@dataclass
+class PrecisionResult:
+    """變異數縮減抽樣結果（含各百分位數標準誤）"""
+    confidence_interval: ConfidenceInterval
+    risk_level: str
+    standard_errors: dict[str, float]   # {"p5": SE（元）, ...}
+    relative_errors: dict[str, float]   # {"p5": SE / 估計值, ...}
+    n_paths: int
+    n_replicates: int
+    sampler: str
+    target_met: bool
+    multipliers: tuple[float, float, float]   # 未四捨五入的 P5 / P50 / P95 ÷ spot_value
+
+
+def run_variance_reduced(
+    spot_value: float,
+    mu: float = DEFAULT_MU,
+    sigma: float = DEFAULT_SIGMA,
+    sampler: str = SAMPLER_SOBOL,
+    n_paths: int = 1024,
+    target_rel_error: float | None = None,
+    n_replicates: int = DEFAULT_REPLICATES,
+    max_paths: int = DEFAULT_MAX_PATHS,
+    horizon: float = 1.0,
+    seed: int = 42,
+) -> PrecisionResult:
+    """
+    變異數縮減 GBM 抽樣，回傳百分位數與標準誤
+
+    Args:
+        spot_value:       起始估值（元）
+        mu:               年化漂移率
+        sigma:            年化波動率
+        sampler:          "plain" / "antithetic" / "sobol"
+        n_paths:          起始路徑數（target_rel_error 未指定時即為最終路徑數）
+        target_rel_error: 目標相對標準誤（所有百分位數皆須達標），None = 不自動調整
+        n_replicates:     獨立重複組數（標準誤估計用，≥ 2）
+        max_paths:        自動調整時的路徑數上限
+        horizon:          模擬年期（年）
+        seed:             隨機種子
+
+    Returns:
+        PrecisionResult
+    """
+    if sampler not in SAMPLERS:
+        raise ValueError(f"未知的抽樣器：{sampler}（可用：{', '.join(SAMPLERS)}）")
+    if n_replicates < 2:
+        raise ValueError("n_replicates 須 ≥ 2 才能估計標準誤")
+
+    per_rep = _replicate_size(sampler, n_paths, n_replicates)
+    while True:
+        estimate, se = _replicated_quantiles(sampler, per_rep, n_replicates, mu, sigma, horizon, seed)
+        rel      = se / estimate
+        max_rel  = float(rel.max())
+
+        if target_rel_error is None or max_rel <= target_rel_error:
+            break
+        rate   = 1.0 if sampler == SAMPLER_SOBOL else 2.0
+        growth = max((max_rel / target_rel_error) ** rate, 2.0)
+        grown  = _replicate_size(
+            sampler, min(int(math.ceil(per_rep * n_replicates * growth)), max_paths), n_replicates, max_paths,
+        )
+        if grown <= per_rep:
+            break   # 已達 max_paths：不超過上限的下一個合法大小無法再增加路徑數
+        per_rep = grown
+    paths = per_rep * n_replicates
+
+    p5, p50, p95 = (spot_value * float(v) for v in estimate)
+    standard_errors = {k: round(spot_value * float(v), 2) for k, v in zip(_KEYS, se)}
+    ci = ConfidenceInterval(
+        p5  = round(p5,  0),
+        p50 = round(p50, 0),
+        p95 = round(p95, 0),
+        standard_errors = standard_errors,
+    )
+
+    return PrecisionResult(
+        confidence_interval = ci,
+        risk_level      = classify_risk(p5, p50, p95),
+        standard_errors = standard_errors,
+        relative_errors = {k: float(v) for k, v in zip(_KEYS, rel)},
+        n_paths         = paths,
+        n_replicates    = n_replicates,
+        sampler         = sampler,
+        target_met      = target_rel_error is None or max_rel <= target_rel_error,
+        multipliers     = tuple(float(v) for v in estimate),
+    )
+
+
+def _replicate_size(sampler: str, n_paths: int, n_replicates: int, max_paths: int | None = None) -> int:
+    """
+    每組重複的樣本數（antithetic 取偶數，Sobol 取 2 的冪次）
+
+    max_paths 指定時，進位後若 n_replicates × per_rep 超過上限，改為向下取
+    不超過上限的最大合法大小（至少 2）。
+    """
+    per_rep = max(int(math.ceil(n_paths / n_replicates)), 2)
+    if sampler == SAMPLER_SOBOL:
+        per_rep = 1 << (per_rep - 1).bit_length()
+    elif sampler == SAMPLER_ANTITHETIC:
+        per_rep = per_rep + (per_rep % 2)
+
+    if max_paths is not None and per_rep * n_replicates > max_paths:
+        cap = max(max_paths // n_replicates, 2)
+        if sampler == SAMPLER_SOBOL:
+            return 1 << (cap.bit_length() - 1)
+        if sampler == SAMPLER_ANTITHETIC:
+            return cap - (cap % 2)
+        return cap
+    return per_rep
+
+
+def _standard_normals(sampler: str, per_rep: int, n_replicates: int, seed: int) -> np.ndarray:
+    """產生 shape=(n_replicates, per_rep) 的標準常態樣本"""
+    rng = np.random.default_rng(seed)
+    if sampler == SAMPLER_PLAIN:
+        return rng.standard_normal(size=(n_replicates, per_rep))
+    if sampler == SAMPLER_ANTITHETIC:
+        half = rng.standard_normal(size=(n_replicates, per_rep // 2))
+        return np.concatenate([half, -half], axis=1)
+
+    from scipy.stats import qmc
+    from scipy.special import ndtri
+    m = per_rep.bit_length() - 1
+    u = np.stack([
+        qmc.Sobol(d=1, scramble=True, seed=rng).random_base2(m).ravel()
+        for _ in range(n_replicates)
+    ])
+    return ndtri(u)
+
+
+def _replicated_quantiles(
+    sampler: str,
+    per_rep: int,
+    n_replicates: int,
+    mu: float,
+    sigma: float,
+    horizon: float,
+    seed: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """回傳 (各百分位數乘數估計值, 標準誤)，spot_value = 1"""
+    Z = _standard_normals(sampler, per_rep, n_replicates, seed)
+    terminal = np.exp((mu - 0.5 * sigma ** 2) * horizon + sigma * math.sqrt(horizon) * Z)
+    # Hazen 內插（第 k 個排序樣本對應 (k - 0.5) / n），與 Sobol 分層點位置一致、偏誤較小
+    per_replicate = np.quantile(terminal, _QUANTILES, axis=1, method="hazen")   # shape=(3, R)
+    estimate = per_replicate.mean(axis=1)
+    se       = per_replicate.std(axis=1, ddof=1) / math.sqrt(n_replicates)
+    return estimate, se
@@ -1,11 +1,12 @@
 """
 INPUT:  HTTP JSON Body
-OUTPUT: ValuationRequest（輸入驗證）、ValuationResult（API 回應）
+OUTPUT: ValuationRequest（輸入驗證）、ValuationResult（API 回應）、
+        StressGridRequest / StressGridResponse（壓力情境網格）
 POS:    資料模型層，定義鑑價引擎的 Pydantic Schema
 """
 
 from pydantic import BaseModel, Field, field_validator
-from typing import Literal
+from typing import Literal, Optional
 
 
 class ValuationRequest(BaseModel):
@@ -19,6 +20,7 @@ class ValuationRequest(BaseModel):
     layout: str = Field(..., min_length=2, description="格局（例：3房2廳）")
     region: str = Field(..., min_length=2, description="縣市名稱（例：台北市）")
     loan_amount: float = Field(..., gt=0, description="申請貸款金額（元）")
+    term_years: Optional[int] = Field(None, ge=1, le=40, description="貸款年限（年），期限結構延伸至到期")
 
     @field_validator("building_type")
     @classmethod
@@ -37,15 +39,31 @@ class ValuationConfidenceInterval(BaseModel):
     p95: float = Field(..., description="P95 樂觀估值（元）")
 
 
+class ValuationTermPoint(BaseModel):
+    """期限結構檢查點（years 年後的信心區間）"""
+
+    years: float = Field(..., description="距今年數")
+    p5: float = Field(..., description="P5 悲觀估值（元）")
+    p50: float = Field(..., description="P50 中位估值（元）")
+    p95: float = Field(..., description="P95 樂觀估值（元）")
+    risk_level: Literal["低風險", "中風險", "高風險"] = Field(..., description="該期限風險等級")
+
+
 class ValuationResult(BaseModel):
     """鑑價結果 Schema（API 回應）"""
 
     # 核心估值
     estimated_value: float = Field(..., description="建議鑑估值（P50，元）")
     confidence_interval: ValuationConfidenceInterval = Field(..., description="蒙地卡羅信心區間")
+    term_structure: list[ValuationTermPoint] = Field(
+        default_factory=list, description="多期限信心區間（1/3/5/10 年 + 貸款到期）",
+    )
 
     # 風險評估
     ltv_ratio: float = Field(..., description="貸款成數（loan_amount / estimated_value）")
+    ltv_breach_probability: dict[str, float] = Field(
+        default_factory=dict, description="貸款期間 LTV 觸價機率（{\"80%\": p, \"90%\": p}）",
+    )
     risk_level: Literal["低風險", "中風險", "高風險"] = Field(..., description="風險等級")
 
     # 模型分數
@@ -60,3 +78,45 @@ class ValuationResult(BaseModel):
     mode: Literal["demo", "production"] = Field(default="demo", description="運算模式")
     region: str = Field(..., description="縣市")
     building_type: str = Field(..., description="建物類型")
+
+
+class StressGridRequest(BaseModel):
+    """壓力情境網格請求 Schema（對應 POST /valuate/stress body）"""
+
+    spot_values: list[float] = Field(..., min_length=1, max_length=1000, description="起始估值清單（元）")
+    mus: list[float] = Field(..., min_length=1, max_length=50, description="漂移率情境（例：-0.05 ~ 0.05）")
+    sigmas: list[float] = Field(..., min_length=1, max_length=50, description="波動率情境（皆須 > 0）")
+
+    @field_validator("spot_values")
+    @classmethod
+    def validate_spot_values(cls, v: list[float]) -> list[float]:
+        if any(x <= 0 for x in v):
+            raise ValueError("spot_values 須大於 0")
+        return v
+
+    @field_validator("sigmas")
+    @classmethod
+    def validate_sigmas(cls, v: list[float]) -> list[float]:
+        if any(x <= 0 or x > 2.0 for x in v):
+            raise ValueError("sigmas 須介於 (0, 2]")
+        return v
+
+    @field_validator("mus")
+    @classmethod
+    def validate_mus(cls, v: list[float]) -> list[float]:
+        if any(abs(x) > 1.0 for x in v):
+            raise ValueError("mus 須介於 [-1, 1]")
+        return v
+
+
+class StressGridResponse(BaseModel):
+    """壓力情境網格回應（矩陣皆為 [物件][mu][sigma]）"""
+
+    mus: list[float] = Field(..., description="漂移率情境（矩陣第 2 維）")
+    sigmas: list[float] = Field(..., description="波動率情境（矩陣第 3 維）")
+    p5: list[list[list[float]]] = Field(..., description="P5 悲觀估值矩陣（元）")
+    p50: list[list[list[float]]] = Field(..., description="P50 中位估值矩陣（元）")
+    p95: list[list[list[float]]] = Field(..., description="P95 樂觀估值矩陣（元）")
+    risk_codes: list[list[list[int]]] = Field(..., description="風險代碼矩陣（risk_levels 的 index）")
+    risk_levels: list[str] = Field(..., description="風險代碼對照（0 = 低風險、1 = 中風險、2 = 高風險）")
+    engine: str = Field(..., description="蒙地卡羅引擎")
@@ -0,0 +1,89 @@
+"""
+INPUT:  --samples（自 cleaned_lvpr.parquet 抽樣列數）、--calls（單列量測次數）、--batch（批次大小）、
+        --backends（逗號分隔，預設全部）
+OUTPUT: 終端機表格：各推論後端單列延遲（P50 / P95，µs）、批次吞吐（列/秒）與相對 native 的最大誤差
+POS:    腳本層 — XGBoost 推論後端基準（native / onnx / treelite，供各部署環境選擇 XGBOOST_BACKEND）
+
+執行方式：
+    cd <project_root>
+    python -m src.main.python.scripts.bench_inference_backends --samples 20000 --batch 64
+
+說明：
+    需 models/xgboost_valuation.json 與類別編碼表；onnx 需 onnxruntime + onnxmltools，
+    treelite 需 treelite + tl2cgen + gcc（首次編譯約一分鐘，產物快取於 models/）。
+    無法載入的後端顯示失敗原因並略過。特徵以服務相同的 CategoryTables 編碼、float32 矩陣送入。
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.main.python.inference.tree_backends import BACKENDS, parse_backends, select_backend
+from src.main.python.services import xgboostValuationService as svc
+
+DATA_PATH = "data/lvpr/cleaned_lvpr.parquet"
+
+
+def _sample_rows(n: int, seed: int = 0) -> np.ndarray:
+    import pandas as pd
+    df = pd.read_parquet(DATA_PATH)
+    df = df.sample(n=min(n, len(df)), random_state=seed)
+    cols = []
+    for col in svc.FEATURE_COLS:
+        if col in svc._categories.classes:
+            cols.append(svc._categories.encode_column(col, df[col].astype(str).to_numpy()))
+        else:
+            cols.append(df[col].to_numpy())
+    return np.ascontiguousarray(np.column_stack(cols), dtype=np.float32)
+
+
+def _single_row_us(backend, rows: np.ndarray, calls: int) -> np.ndarray:
+    out = np.empty(calls)
+    for i in range(calls):
+        row = rows[i % len(rows)][None, :]
+        start = time.perf_counter()
+        backend.predict(row)
+        out[i] = (time.perf_counter() - start) * 1e6
+    return out
+
+
+def _batch_throughput(backend, rows: np.ndarray, batch: int) -> float:
+    batches = [rows[i:i + batch] for i in range(0, len(rows) - batch + 1, batch)]
+    start = time.perf_counter()
+    for b in batches:
+        backend.predict(b)
+    return len(batches) * batch / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XGBoost 推論後端延遲 / 吞吐基準")
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--calls", type=int, default=5_000)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    args = parser.parse_args()
+
+    svc._load()
+    rows = _sample_rows(args.samples)
+    reference = svc._booster.inplace_predict(rows, validate_features=False)
+    print(f"samples={len(rows)}  batch={args.batch}")
+    print(f"{'backend':<10}{'p50 µs':>10}{'p95 µs':>10}{'rows/s':>12}{'max |Δ|':>12}")
+    print("─" * 54)
+
+    for name in parse_backends(args.backends):
+        selection = select_backend(svc._booster, svc.MODEL_PATH, [name])
+        if selection.backend.name != name:
+            print(f"{name:<10}略過（{selection.errors.get(name, '無法載入')}）")
+            continue
+        backend = selection.backend
+        _single_row_us(backend, rows, 200)
+        lat = _single_row_us(backend, rows, args.calls)
+        p50, p95 = np.percentile(lat, [50, 95])
+        throughput = _batch_throughput(backend, rows, args.batch)
+        diff = float(np.abs(backend.predict(rows) - reference).max())
+        print(f"{name:<10}{p50:>10.1f}{p95:>10.1f}{throughput:>12,.0f}{diff:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
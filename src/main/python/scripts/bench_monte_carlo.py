@@ -0,0 +1,70 @@
+"""
+INPUT:  --paths（路徑數清單）、--years（年期）、--steps-per-year、--dense-max-paths
+OUTPUT: 終端機表格：各引擎峰值記憶體（tracemalloc）與吞吐量（路徑步數 / 秒）
+POS:    腳本層 — Monte Carlo 引擎基準測試（dense 原實作 vs 分塊 t-digest 引擎）
+
+執行方式：
+    cd <project_root>
+    python -m src.main.python.scripts.bench_monte_carlo --paths 10000 100000 1000000
+
+說明：
+    dense 引擎即 run_monte_carlo 的 (n_paths, n_steps) float64 矩陣實作（不經乘數快取），
+    峰值記憶體隨路徑數線性成長，超過 --dense-max-paths 時略過以免 OOM。
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from src.main.python.inference.monte_carlo import _sampled_multipliers
+from src.main.python.inference.chunked_monte_carlo import run_monte_carlo_chunked
+
+
+def _measure(fn) -> tuple[float, float]:
+    """回傳 (耗時秒數, 峰值記憶體 MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo 引擎記憶體 / 吞吐量基準測試")
+    parser.add_argument("--paths", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--years", type=float, default=30.0)
+    parser.add_argument("--steps-per-year", type=int, default=12)
+    parser.add_argument("--dense-max-paths", type=int, default=200_000)
+    args = parser.parse_args()
+
+    n_steps = int(round(args.years * args.steps_per_year))
+    print(f"年期 {args.years:g} 年 × {args.steps_per_year} 步/年 = {n_steps} 步")
+    print(f"{'engine':<10}{'paths':>12}{'seconds':>10}{'peak MB':>10}{'Mpath-steps/s':>16}")
+    print("─" * 58)
+
+    for n_paths in args.paths:
+        work = n_paths * n_steps / 1e6
+
+        if n_paths <= args.dense_max_paths:
+            # dense 實作以 1 年 = n_steps 步計算，步數相同即工作量相同
+            elapsed, peak = _measure(
+                lambda: _sampled_multipliers.__wrapped__(0.045, 0.08, n_paths, n_steps, 42)
+            )
+            print(f"{'dense':<10}{n_paths:>12,}{elapsed:>10.2f}{peak:>10.1f}{work / elapsed:>16.1f}")
+        else:
+            est_mb = n_paths * n_steps * 8 * 2 / 1e6
+            print(f"{'dense':<10}{n_paths:>12,}{'skip':>10}{f'~{est_mb:,.0f}':>10}{'-':>16}")
+
+        elapsed, peak = _measure(
+            lambda: run_monte_carlo_chunked(
+                10_000_000, n_paths=n_paths,
+                horizon_years=args.years, steps_per_year=args.steps_per_year,
+            )
+        )
+        print(f"{'chunked':<10}{n_paths:>12,}{elapsed:>10.2f}{peak:>10.1f}{work / elapsed:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+INPUT:  --concurrency（並行請求數）、--rounds（輪數）、--first-token-ms / --token-ms（替身伺服器延遲）
+OUTPUT: 終端機表格：舊版 urllib 阻塞呼叫、連線池非串流、連線池串流三種方式的
+        首 token 延遲與完整回覆延遲（P50 / P95，ms）與新建連線數
+POS:    腳本層 — Ollama 白話解釋呼叫方式基準（以 scripts/ollama_stub.py 替身伺服器取代 Ollama）
+
+執行方式：
+    cd <project_root>
+    python -m src.main.python.scripts.bench_ollama_explain --concurrency 16 --rounds 5
+
+說明：
+    舊版（urllib，每次新連線、stream: False）於 8 執行緒的執行緒池執行，對應原本 io_executor 的工作者數；
+    非串流 / 串流版以 OllamaClient 連線池在單一 event loop 上並行。
+    非串流呼叫的首 token 延遲即完整回覆延遲（前端在最後一個 token 前看不到任何內容）。
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.main.python.scripts.ollama_stub import serve_in_thread
+from src.main.python.services import xgboostValuationService as svc
+from src.main.python.services.ollamaClient import OllamaClient
+
+RESULT = dict(
+    district        = "大安區",
+    building_type   = "大樓",
+    area_ping       = 30.0,
+    property_age    = 10,
+    floor           = 8,
+    price_per_ping  = 950_000.0,
+    estimated_value = 28_500_000.0,
+    ltv_ratio       = 0.28,
+    risk_level      = "低風險",
+    loan_amount     = 8_000_000.0,
+)
+LEGACY_WORKERS = 8
+
+
+def _legacy_call(base_url: str) -> tuple[float, float]:
+    """舊版 explain_valuation_zh 的呼叫方式（每次新連線、阻塞等待完整回覆）"""
+    payload = json.dumps({
+        "model": "stub", "messages": svc.explanation_messages(**RESULT),
+        "stream": False, "options": svc.EXPLAIN_OPTIONS,
+    }).encode()
+    start = time.perf_counter()
+    req = urllib.request.Request(f"{base_url}/api/chat", data=payload, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=45) as resp:
+        json.loads(resp.read())
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def _legacy(base_url: str, n: int) -> list[tuple[float, float]]:
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(LEGACY_WORKERS) as pool:
+        start = time.perf_counter()
+
+        async def one():
+            await loop.run_in_executor(pool, _legacy_call, base_url)
+            elapsed = time.perf_counter() - start   # 含執行緒池排隊時間
+            return elapsed, elapsed
+
+        return await asyncio.gather(*(one() for _ in range(n)))
+
+
+async def _pooled_chat(client: OllamaClient, n: int) -> list[tuple[float, float]]:
+    async def one():
+        start = time.perf_counter()
+        await svc.explain_valuation_zh(client=client, **RESULT)
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    return await asyncio.gather(*(one() for _ in range(n)))
+
+
+async def _pooled_stream(client: OllamaClient, n: int) -> list[tuple[float, float]]:
+    async def one():
+        start = time.perf_counter()
+        first = None
+        async for _ in svc.stream_explanation_zh(client=client, **RESULT):
+            if first is None:
+                first = time.perf_counter() - start
+        return first, time.perf_counter() - start
+
+    return await asyncio.gather(*(one() for _ in range(n)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ollama 白話解釋呼叫方式基準（替身伺服器）")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--first-token-ms", type=float, default=300.0)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with serve_in_thread(first_token_ms=args.first_token_ms, token_ms=args.token_ms) as (base_url, stub_app):
+        client = OllamaClient(base_url=base_url, model="stub")
+        modes = {
+            "urllib":      lambda: _legacy(base_url, args.concurrency),
+            "pool-chat":   lambda: _pooled_chat(client, args.concurrency),
+            "pool-stream": lambda: _pooled_stream(client, args.concurrency),
+        }
+        print(f"concurrency={args.concurrency}  rounds={args.rounds}  "
+              f"first_token={args.first_token_ms:g} ms  token={args.token_ms:g} ms")
+        print(f"{'mode':<13}{'TTFT p50':>10}{'TTFT p95':>10}{'total p50':>11}{'total p95':>11}{'conns':>7}")
+        print("─" * 62)
+
+        async def run_all():
+            for name, run in modes.items():
+                peers_before = set(stub_app.state.peers)
+                samples = []
+                for _ in range(args.rounds):
+                    samples.extend(await run())
+                ttft, total = (np.array(col) * 1000 for col in zip(*samples))
+                conns = len(stub_app.state.peers - peers_before)
+                print(f"{name:<13}{np.percentile(ttft, 50):>10.0f}{np.percentile(ttft, 95):>10.0f}"
+                      f"{np.percentile(total, 50):>11.0f}{np.percentile(total, 95):>11.0f}{conns:>7}")
+            await client.aclose()
+
+        asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+INPUT:  --rows（每次解釋的列數）、--calls（量測次數）、--mode（內部用：單一模式子行程）
+OUTPUT: 終端機表格：shap.TreeExplainer vs 原生樹貢獻（精確 / 近似）每次呼叫延遲（ms）、行程峰值 RSS（MB）
+POS:    腳本層 — XGBoost 鑑價模型解釋因子微基準（請求路徑移除 shap 依據）
+
+執行方式：
+    cd <project_root>
+    python -m src.main.python.scripts.bench_tree_explanations --rows 1 --calls 200
+
+說明：
+    需 models/xgboost_valuation.json；shap 模式需另行安裝 shap（requirements.txt 已改為選用）。
+    每種模式於獨立子行程量測，峰值 RSS（ru_maxrss）才不會互相汙染，
+    結果含 import 與 explainer 建構成本。精確模式另與 shap 值比對最大誤差、近似模式比對前三大因子一致率。
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+MODES = ("shap", "native", "approx")
+
+
+def _rows(n: int) -> np.ndarray:
+    from src.main.python.services import xgboostValuationService as svc
+    rng = np.random.default_rng(0)
+    districts = svc._categories.classes["district"]
+    return np.stack([
+        svc.build_feature_row(
+            districts[rng.integers(len(districts))], "大樓",
+            float(rng.uniform(10, 80)), int(rng.integers(0, 60)),
+            int(rng.integers(1, 30)), 30, bool(rng.integers(2)), int(rng.integers(1, 5)),
+        )
+        for _ in range(n)
+    ])
+
+
+def _run_mode(mode: str, n_rows: int, calls: int) -> dict:
+    """子行程：載入模型 → 建構解釋器 → 量測 calls 次"""
+    from src.main.python.services import xgboostValuationService as svc
+    from src.main.python.inference.tree_contributions import tree_contributions, top_k_contributions
+    svc._load()
+    rows = _rows(n_rows)
+
+    if mode == "shap":
+        import shap
+        explainer = shap.TreeExplainer(svc._model)
+        explain = lambda: explainer.shap_values(rows)   # noqa: E731
+    else:
+        explain = lambda: tree_contributions(svc._booster, rows, approximate=(mode == "approx"))  # noqa: E731
+
+    explain()
+    lat = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        explain()
+        lat[i] = (time.perf_counter() - start) * 1000
+
+    out = {
+        "mode":   mode,
+        "p50":    float(np.percentile(lat, 50)),
+        "p95":    float(np.percentile(lat, 95)),
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    if mode != "shap":
+        exact = tree_contributions(svc._booster, rows)
+        got   = explain()
+        out["max_abs_diff_vs_exact"] = float(np.abs(got - exact).max())
+        top_got, _ = top_k_contributions(got)
+        top_exact, _ = top_k_contributions(exact)
+        out["top3_agreement"] = float(np.mean([set(a) == set(b) for a, b in zip(top_got.tolist(), top_exact.tolist())]))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XGBoost 解釋因子延遲 / 記憶體微基準")
+    parser.add_argument("--rows", type=int, default=1)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(_run_mode(args.mode, args.rows, args.calls)))
+        return
+
+    print(f"rows={args.rows}")
+    print(f"{'mode':<8}{'p50 ms':>10}{'p95 ms':>10}{'RSS MB':>10}{'top3 一致':>10}")
+    print("─" * 50)
+    for mode in MODES:
+        proc = subprocess.run(
+            [sys.executable, "-m", "src.main.python.scripts.bench_tree_explanations",
+             "--mode", mode, "--rows", str(args.rows), "--calls", str(args.calls)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{mode:<8}略過（{proc.stderr.strip().splitlines()[-1] if proc.stderr else '失敗'}）")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        agreement = f"{r['top3_agreement']:.0%}" if "top3_agreement" in r else "—"
+        print(f"{mode:<8}{r['p50']:>10.2f}{r['p95']:>10.2f}{r['rss_mb']:>10.1f}{agreement:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+INPUT:  --calls（每種實作量測次數）、--warmup（暖身次數）
+OUTPUT: 終端機表格：單列推論每次呼叫延遲（P50 / P95 / 平均，µs）與加速倍數
+POS:    腳本層 — XGBoost 單列推論微基準（原 pandas DataFrame + predict vs 預配置列 + inplace_predict）
+
+執行方式：
+    cd <project_root>
+    python -m src.main.python.scripts.bench_xgboost_inference --calls 5000
+
+說明：
+    需 models/xgboost_valuation.json 與 models/xgboost_encoders.pkl（原路徑的 LabelEncoder）。
+    「dataframe」重現原請求路徑：LabelEncoder.transform 編碼 → 單列 pd.DataFrame → XGBRegressor.predict；
+    「inplace」為目前路徑：CategoryTables 查表寫入預配置 float32 列 → Booster.inplace_predict。
+    兩者以相同隨機特徵輪替量測，並確認預測值逐筆相同。
+"""
+
+import argparse
+import time
+
+import joblib
+import numpy as np
+
+from src.main.python.services import xgboostValuationService as svc
+
+_label_encoders: dict = {}
+
+
+def _legacy_encode(col: str, value: str) -> int:
+    le = _label_encoders.get(col)
+    if le is None:
+        return 0
+    try:
+        return int(le.transform([str(value)])[0])
+    except ValueError:
+        return 0
+
+
+def _legacy_predict(features: dict) -> float:
+    import pandas as pd
+    row = pd.DataFrame([{
+        "district":      _legacy_encode("district",      features["district"]),
+        "building_type": _legacy_encode("building_type", features["building_type"]),
+        "area_ping":     features["area_ping"],
+        "property_age":  features["property_age"],
+        "floor":         features["floor"],
+        "total_floors":  features["total_floors"],
+        "has_parking":   int(features["has_parking"]),
+        "rooms":         features["rooms"],
+        "year":          features["year"],
+        "quarter":       features["quarter"],
+    }])[svc.FEATURE_COLS]
+    return float(svc._model.predict(row)[0])
+
+
+def _fast_predict(features: dict) -> float:
+    return svc._predict_log_price(svc._fill_row(svc._feature_row(), **features))
+
+
+def _random_features(n: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    districts = svc._categories.classes["district"]
+    btypes    = svc._categories.classes["building_type"]
+    return [
+        {
+            "district":      districts[rng.integers(len(districts))],
+            "building_type": btypes[rng.integers(len(btypes))],
+            "area_ping":     float(rng.uniform(10, 80)),
+            "property_age":  int(rng.integers(0, 60)),
+            "floor":         int(rng.integers(1, 30)),
+            "total_floors":  int(rng.integers(1, 30)),
+            "has_parking":   bool(rng.integers(2)),
+            "rooms":         int(rng.integers(1, 5)),
+            "year":          2025,
+            "quarter":       int(rng.integers(1, 5)),
+        }
+        for _ in range(n)
+    ]
+
+
+def _latencies_us(fn, inputs: list[dict], calls: int) -> np.ndarray:
+    out = np.empty(calls)
+    for i in range(calls):
+        features = inputs[i % len(inputs)]
+        start = time.perf_counter()
+        fn(features)
+        out[i] = (time.perf_counter() - start) * 1e6
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XGBoost 單列推論延遲微基準")
+    parser.add_argument("--calls", type=int, default=5_000)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+
+    svc._load()
+    _label_encoders.update(joblib.load(svc.ENCODERS_PATH))
+    inputs = _random_features(256)
+    for features in inputs:
+        assert _legacy_predict(features) == _fast_predict(features), "兩種路徑預測值不一致"
+
+    print(f"{'path':<12}{'p50 µs':>10}{'p95 µs':>10}{'mean µs':>10}")
+    print("─" * 42)
+    results = {}
+    for name, fn in (("dataframe", _legacy_predict), ("inplace", _fast_predict)):
+        _latencies_us(fn, inputs, args.warmup)
+        lat = _latencies_us(fn, inputs, args.calls)
+        results[name] = lat
+        p50, p95 = np.percentile(lat, [50, 95])
+        print(f"{name:<12}{p50:>10.1f}{p95:>10.1f}{lat.mean():>10.1f}")
+
+    speedup = np.median(results["dataframe"]) / np.median(results["inplace"])
+    print(f"P50 加速：{speedup:.1f}×")
+
+
+if __name__ == "__main__":
+    main()
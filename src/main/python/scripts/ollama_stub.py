@@ -0,0 +1,138 @@
+"""
+INPUT:  POST /api/chat（與 Ollama 相同的請求格式，stream: true / false）
+OUTPUT: 固定回覆文字（stream: true 時以 NDJSON 逐 token 回傳）；GET /api/tags 模型清單
+POS:    開發工具 — 本地 Ollama 替身伺服器（測試與 SSE 串流解釋壓測用，不需 GPU / 模型）
+
+說明：
+    以 first_token_ms（首 token 前的「prefill」延遲）與 token_ms（每個 token 的生成間隔）模擬 LLM 的延遲特性，
+    回覆內容固定（REPLY 依字元切成 token）。伺服器記錄每個請求的用戶端位址，
+    測試可據此確認客戶端重用 keep-alive 連線（app.state.peers）。
+
+執行方式：
+    cd <project_root>
+    python -m src.main.python.scripts.ollama_stub --port 11434 --first-token-ms 300 --token-ms 20
+
+程式內使用（測試 / 壓測）：
+    with serve_in_thread(first_token_ms=50, token_ms=5) as (base_url, stub_app):
+        client = OllamaClient(base_url=base_url)
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLY = (
+    "此物件位於大安區電梯大樓，屋齡十年，單價接近區域行情中位數，主要受行政區與屋齡影響。"
+    "申請貸款成數在一般範圍內，擔保品價值足以涵蓋放款，整體風險屬低度。"
+)
+
+
+def create_app(
+    reply: str = REPLY,
+    first_token_ms: float = 0.0,
+    token_ms: float = 0.0,
+    fail_status: int | None = None,
+) -> FastAPI:
+    """
+    建立替身 app
+
+    Args:
+        reply:          回覆文字（每個字元為一個 token）
+        first_token_ms: 首 token 前延遲（毫秒）
+        token_ms:       每個 token 之間的延遲（毫秒）
+        fail_status:    設定時 /api/chat 一律回傳此 HTTP 狀態碼
+    """
+    app = FastAPI(title="Ollama stub")
+    app.state.requests = 0
+    app.state.peers    = set()
+
+    def _chunk(model: str, content: str, done: bool) -> bytes:
+        body = {"model": model, "message": {"role": "assistant", "content": content}, "done": done}
+        return (json.dumps(body, ensure_ascii=False) + "\n").encode("utf-8")
+
+    @app.get("/api/tags")
+    async def tags() -> dict:
+        return {"models": [{"name": "stub"}]}
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        app.state.requests += 1
+        app.state.peers.add((request.client.host, request.client.port))
+        if fail_status is not None:
+            return JSONResponse({"error": "stub failure"}, status_code=fail_status)
+        body  = await request.json()
+        model = body.get("model", "stub")
+
+        if not body.get("stream", True):
+            await asyncio.sleep((first_token_ms + token_ms * len(reply)) / 1000)
+            return JSONResponse(
+                {"model": model, "message": {"role": "assistant", "content": reply}, "done": True},
+            )
+
+        async def tokens():
+            await asyncio.sleep(first_token_ms / 1000)
+            for i, ch in enumerate(reply):
+                if i:
+                    await asyncio.sleep(token_ms / 1000)
+                yield _chunk(model, ch, False)
+            yield _chunk(model, "", True)
+
+        return StreamingResponse(tokens(), media_type="application/x-ndjson")
+
+    return app
+
+
+@contextmanager
+def serve_in_thread(**kwargs):
+    """於背景執行緒啟動替身伺服器（隨機埠），yield (base_url, app)；離開時關閉"""
+    import uvicorn
+
+    app  = create_app(**kwargs)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("Ollama 替身伺服器啟動失敗")
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}", app
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        sock.close()
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="本地 Ollama 替身伺服器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--first-token-ms", type=float, default=300.0)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(first_token_ms=args.first_token_ms, token_ms=args.token_ms),
+        host      = args.host,
+        port      = args.port,
+        log_level = "warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,32 @@
 """
-INPUT:  POST /score（BorrowerFeatures）
-OUTPUT: { fraud_score, risk_level, top_risk_factors }
+INPUT:  POST /score（BorrowerFeatures）、POST /score/batch（BorrowerFeatures 陣列）、GET /health、GET /ready、GET /metrics
+OUTPUT: { fraud_score, risk_level, top_risk_factors }；執行器滿載時 429 + Retry-After
 POS:    CREW 3 防詐 PILOT — ML 異常評分服務（port 8002）
 
 啟動方式：
     uvicorn src.main.python.services.fraudScoringService:app --port 8002 --reload
 
 模型載入策略：
-    - 有訓練模型（models/fraud_xgboost.json）→ XGBoost 推論 + SHAP 解釋
+    - 有訓練模型（models/fraud_xgboost.json）→ XGBoost 推論 + 原生樹貢獻（TreeSHAP）解釋
     - 無模型 → Demo 模式（規則加權評分，零依賴）
+
+執行模型：
+    評分（含模型載入）送 score_executor（FRAUD_EXECUTOR=thread/process，有在途上限），
+    不在 event loop 上執行。Live 模式的 predict_proba 與樹貢獻經 fraud_batcher 合併並行請求後一次推論
+    （FRAUD_BATCH_MAX_SIZE / FRAUD_BATCH_WAIT_MS，見 core/micro_batcher.py）。
+    風險因子改用 Booster.predict(pred_contribs=True)（見 inference/tree_contributions.py），
+    請求路徑不再 import shap。
+    POST /score/batch 將整批申請人組成一個特徵矩陣：live 一次 predict_proba + 樹貢獻，
+    demo 規則以 NumPy 欄運算計算；單筆 /score 的 demo 評分也走同一路徑。
+
+Demo 規則：
+    門檻 / 權重定義於 src/main/resources/config/fraud_rules.json（FRAUD_RULES_PATH 可覆寫），
+    載入時編譯為向量化函式，檔案變更後自動重新載入（FRAUD_RULES_RELOAD_S，見 inference/rule_engine.py）；
+    各規則命中率與評估耗時見 GET /metrics 的 rules。
+
+啟動預熱：
+    lifespan 於背景載入模型並以合成申請人跑一次評分（live 含樹貢獻），完成前 GET /ready 回 503；
+    GET /health 僅為存活探針，不再呼叫 _try_load()。
 """
 
 import sys
@@ -18,13 +36,25 @@ _project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.
 if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
+import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
-from fastapi import FastAPI
+from fastapi import Body, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import Response
+from pydantic import BaseModel, Field, ValidationError
+
+from src.main.python.core.executor import OffloadExecutor, install_backpressure_handlers
+from src.main.python.core.micro_batcher import MicroBatcher
+from src.main.python.core.serialization import json_bytes
+from src.main.python.core.warmup import Readiness, run_warmup
+from src.main.python.inference.rule_engine import RuleEngine
+from src.main.python.inference.tree_contributions import (
+    APPROXIMATE_CONTRIBS, tree_contributions, top_k_contributions,
+)
 
 # ─── Pydantic 模型 ─────────────────────────────────────────────────
 
@@ -57,7 +87,6 @@ MODEL_PATH    = Path("models/fraud_xgboost.json")
 ENCODERS_PATH = Path("models/fraud_encoders.pkl")
 
 _model    = None
-_explainer = None
 
 FEATURE_NAMES = [
     "age", "occupation_code", "monthly_income",
@@ -81,7 +110,7 @@ FEATURE_LABELS = {
 
 def _try_load():
     """嘗試載入訓練好的 XGBoost 模型，失敗靜默返回 None。"""
-    global _model, _explainer
+    global _model
     if _model is not None:
         return _model
     if not MODEL_PATH.exists():
@@ -91,11 +120,6 @@ def _try_load():
         m = xgb.XGBClassifier()
         m.load_model(str(MODEL_PATH))
         _model = m
-        try:
-            import shap
-            _explainer = shap.TreeExplainer(_model)
-        except ImportError:
-            _explainer = None
         return _model
     except Exception:
         return None
@@ -103,105 +127,59 @@ def _try_load():
 
 # ─── Demo 模式規則加權評分 ─────────────────────────────────────────
 
-# 各特徵風險貢獻（方向：+ = 增加風險，值 = 最大貢獻幅度）
-_RISK_WEIGHTS: dict[str, dict] = {
-    "document_match": {
-        "direction": "低 = 風險",
-        "contribution": lambda v: 0.35 if not v else 0.0,
-        "label": "證件比對不一致",
-    },
-    "credit_inquiry_count": {
-        "direction": "高 = 風險",
-        "contribution": lambda v: min(v * 0.06, 0.25),
-        "label": "聯徵查詢次數過高",
-    },
-    "occupation_code": {
-        "direction": "0/4 = 風險",
-        "contribution": lambda v: 0.15 if v in (0, 4) else 0.0,
-        "label": "職業穩定性不足",
-    },
-    "lives_in_branch_county": {
-        "direction": "低 = 風險",
-        "contribution": lambda v: 0.10 if not v else 0.0,
-        "label": "非服務縣市居民",
-    },
-    "has_salary_transfer": {
-        "direction": "低 = 風險",
-        "contribution": lambda v: 0.08 if not v else 0.0,
-        "label": "無薪轉往來",
-    },
-    "existing_bank_loans": {
-        "direction": "高 = 風險",
-        "contribution": lambda v: min(v * 0.04, 0.15),
-        "label": "現有借款筆數多",
-    },
-    "has_real_estate": {
-        "direction": "低 = 風險（信貸）",
-        "contribution": lambda v: 0.05 if not v else 0.0,
-        "label": "無不動產擔保",
-    },
-    "monthly_income": {
-        "direction": "低 = 風險",
-        "contribution": lambda v: 0.08 if v < 3.0 else (0.04 if v < 5.0 else 0.0),
-        "label": "月收入偏低",
-    },
-    "age": {
-        "direction": "極高/低 = 風險",
-        "contribution": lambda v: 0.07 if v >= 65 or v < 22 else 0.0,
-        "label": "年齡風險（高齡或過輕）",
-    },
-}
+# 規則（門檻 / 權重 / 標籤）定義於 RULES_PATH，載入時編譯為欄運算函式，檔案變更後自動重新載入
+RULES_PATH = Path(__file__).resolve().parents[2] / "resources" / "config" / "fraud_rules.json"
 
+rule_engine = RuleEngine.from_env("FRAUD", RULES_PATH, FEATURE_NAMES)
 
-def _demo_score(feat: BorrowerFeatures) -> FraudScoreResponse:
-    """Demo 模式：規則加權計算 fraud_score + 前三大風險因子。"""
-    feat_dict = {
-        "age":                  feat.age,
-        "occupation_code":      feat.occupation_code,
-        "monthly_income":       feat.monthly_income,
-        "credit_inquiry_count": feat.credit_inquiry_count,
-        "existing_bank_loans":  feat.existing_bank_loans,
-        "has_real_estate":      feat.has_real_estate,
-        "document_match":       feat.document_match,
-        "lives_in_branch_county": feat.lives_in_branch_county,
-        "has_salary_transfer":  feat.has_salary_transfer,
-    }
-
-    contributions = []
-    for key, cfg in _RISK_WEIGHTS.items():
-        val = feat_dict[key]
-        contrib = cfg["contribution"](val)
-        if contrib > 0:
-            contributions.append({
-                "feature":      key,
-                "label":        cfg["label"],
-                "contribution": round(contrib, 4),
-            })
 
-    raw_score = sum(c["contribution"] for c in contributions)
-    fraud_score = round(min(raw_score, 1.0), 4)
+def _risk_level(fraud_score: float) -> str:
+    if fraud_score <= 0.4:
+        return "low"
+    if fraud_score <= 0.7:
+        return "medium"
+    return "high"
+
+
+def _demo_score_rows(rows: np.ndarray) -> list[dict]:
+    """Demo 模式整批評分：規則貢獻以欄運算一次算出 (n, 規則數)，再取各列前三大因子（回傳 FraudScoreResponse 欄位的 dict）"""
+    rules   = rule_engine.current()   # 整批使用同一版規則（重新載入不影響進行中的評分）
+    contrib = rules.evaluate(rows)
+    np.round(contrib, 4, out=contrib)
+    # 依規則順序逐欄累加（與逐項加總的浮點運算順序相同）
+    raw = np.zeros(len(rows))
+    for j in range(contrib.shape[1]):
+        raw += contrib[:, j]
+    scores = np.round(np.minimum(raw, 1.0), 4)
+    # 穩定排序：貢獻相同時依設定檔中的規則順序
+    order = np.argsort(-contrib, axis=1, kind="stable")[:, :3]
+    return [
+        {
+            "fraud_score": score,
+            "risk_level":  _risk_level(score),
+            "top_risk_factors": [
+                {
+                    "feature":      rules.keys[j],
+                    "label":        rules.labels[j],
+                    "contribution": values[j],
+                }
+                for j in idx if values[j] > 0
+            ],
+            "mode":  "demo",
+            "model": "rule-based-weighted",
+        }
+        for score, idx, values in zip(scores.tolist(), order.tolist(), contrib.tolist())
+    ]
 
-    top3 = sorted(contributions, key=lambda x: x["contribution"], reverse=True)[:3]
 
-    if fraud_score <= 0.4:
-        risk_level = "low"
-    elif fraud_score <= 0.7:
-        risk_level = "medium"
-    else:
-        risk_level = "high"
-
-    return FraudScoreResponse(
-        fraud_score=fraud_score,
-        risk_level=risk_level,
-        top_risk_factors=top3,
-        mode="demo",
-        model="rule-based-weighted",
-    )
+def _demo_score(feat: BorrowerFeatures) -> FraudScoreResponse:
+    """Demo 模式：規則加權計算 fraud_score + 前三大風險因子（單列走與批次相同的路徑）"""
+    return FraudScoreResponse(**_demo_score_rows(_feature_vector(feat)[None, :])[0])
 
 
-def _live_score(feat: BorrowerFeatures, model) -> FraudScoreResponse:
-    """Live 模式：XGBoost 推論 + SHAP（若可用）。"""
-    X = np.array([[
+def _feature_vector(feat: BorrowerFeatures) -> np.ndarray:
+    """依 FEATURE_NAMES 順序轉為一維特徵向量"""
+    return np.array([
         feat.age,
         feat.occupation_code,
         feat.monthly_income,
@@ -211,56 +189,134 @@ def _live_score(feat: BorrowerFeatures, model) -> FraudScoreResponse:
         int(feat.document_match),
         int(feat.lives_in_branch_county),
         int(feat.has_salary_transfer),
-    ]])
+    ], dtype=np.float64)
 
-    proba = model.predict_proba(X)[0]
-    fraud_score = round(float(proba[1]), 4)
 
-    # SHAP 解釋
-    top3 = []
-    if _explainer is not None:
-        try:
-            shap_vals = _explainer.shap_values(X)
-            vals = shap_vals[0] if isinstance(shap_vals, list) else shap_vals[0]
-            factor_pairs = sorted(
-                zip(FEATURE_NAMES, vals.tolist()),
-                key=lambda x: abs(x[1]),
-                reverse=True,
-            )[:3]
-            top3 = [
+def _predict_fraud_live(rows: np.ndarray) -> list[tuple[float, list[dict]]]:
+    """批次詐欺機率 + 前三大風險因子（fraud_batcher 的 predict_fn）"""
+    model = _try_load()
+    if model is None:
+        raise RuntimeError("防詐模型無法載入")
+    proba = model.predict_proba(rows)[:, 1]
+    contribs = tree_contributions(model.get_booster(), rows, approximate=APPROXIMATE_CONTRIBS)
+    order, values = top_k_contributions(contribs)
+    return [
+        (
+            float(p),
+            [
                 {
-                    "feature":      fname,
-                    "label":        FEATURE_LABELS.get(fname, fname),
-                    "contribution": round(abs(fval), 4),
+                    "feature":      FEATURE_NAMES[i],
+                    "label":        FEATURE_LABELS.get(FEATURE_NAMES[i], FEATURE_NAMES[i]),
+                    "contribution": round(abs(float(v)), 4),
                 }
-                for fname, fval in factor_pairs
-            ]
-        except Exception:
-            top3 = []
+                for i, v in zip(idx.tolist(), vals.tolist())
+            ],
+        )
+        for p, idx, vals in zip(proba, order, values)
+    ]
 
-    if fraud_score <= 0.4:
-        risk_level = "low"
-    elif fraud_score <= 0.7:
-        risk_level = "medium"
-    else:
-        risk_level = "high"
-
-    return FraudScoreResponse(
-        fraud_score=fraud_score,
-        risk_level=risk_level,
-        top_risk_factors=top3,
-        mode="live",
-        model="xgboost-fraud-classifier",
-    )
+
+def _live_score(feat: BorrowerFeatures) -> FraudScoreResponse:
+    """Live 模式：XGBoost 推論 + 樹貢獻解釋（單列走與批次相同的路徑）"""
+    proba, top3 = _predict_fraud_live(_feature_vector(feat)[None, :])[0]
+    return _live_response(proba, top3)
+
+
+def _live_response(proba: float, top3: list[dict]) -> FraudScoreResponse:
+    """由已算出的詐欺機率與前三大因子組成回應"""
+    return FraudScoreResponse(**_live_result(proba, top3))
+
+
+def _live_result(proba: float, top3: list[dict]) -> dict:
+    fraud_score = round(proba, 4)
+    return {
+        "fraud_score":      fraud_score,
+        "risk_level":       _risk_level(fraud_score),
+        "top_risk_factors": top3,
+        "mode":             "live",
+        "model":            "xgboost-fraud-classifier",
+    }
+
+
+def _score(features: BorrowerFeatures) -> FraudScoreResponse:
+    """單筆評分（於執行器中執行）：有模型走 live，否則 demo"""
+    model = _try_load()
+    if model is not None:
+        return _live_score(features)
+    return _demo_score(features)
+
+
+def _feature_matrix(features: list[BorrowerFeatures]) -> np.ndarray:
+    """多位申請人 → (n, 9) 特徵矩陣（欄位順序同 FEATURE_NAMES）"""
+    return np.array([
+        (
+            f.age, f.occupation_code, f.monthly_income, f.credit_inquiry_count, f.existing_bank_loans,
+            f.has_real_estate, f.document_match, f.lives_in_branch_county, f.has_salary_transfer,
+        )
+        for f in features
+    ], dtype=np.float64).reshape(len(features), len(FEATURE_NAMES))
+
+
+def _score_rows(rows: np.ndarray) -> list[dict]:
+    """整批評分：有模型時一次 predict_proba + 樹貢獻，否則 Demo 規則欄運算"""
+    if len(rows) == 0:
+        return []
+    if _try_load() is not None:
+        return [_live_result(proba, top3) for proba, top3 in _predict_fraud_live(rows)]
+    return _demo_score_rows(rows)
 
 
 # ─── FastAPI 應用 ───────────────────────────────────────────────────
 
+def _preload_model() -> None:
+    _try_load()
+
+
+# 預熱用合成申請人（觸發多個規則 / 樹貢獻因子）
+WARMUP_FEATURES = BorrowerFeatures(
+    age                    = 35,
+    occupation_code        = 2,
+    monthly_income         = 4.5,
+    credit_inquiry_count   = 3,
+    existing_bank_loans    = 1,
+    has_real_estate        = False,
+    document_match         = True,
+    lives_in_branch_county = True,
+    has_salary_transfer    = False,
+)
+
+# POST /score/batch 單次請求筆數上限
+MAX_BATCH_SIZE = 10_000
+
+# process pool 的每個工作者啟動時各自載入模型
+score_executor = OffloadExecutor.from_env("fraud-score", "FRAUD", initializer=_preload_model)
+
+# 並行的 live 單列推論合併為批次（批次本身在 score_executor 執行）
+fraud_batcher = MicroBatcher.from_env("fraud", "FRAUD", _predict_fraud_live, score_executor)
+
+readiness = Readiness("CREW 3 防詐 PILOT ML 評分服務")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    score_executor.reopen()
+    warmup = asyncio.create_task(run_warmup(readiness, [
+        ("preload_model", lambda: score_executor.run(_preload_model)),
+        ("warmup_score",  lambda: _score_async(WARMUP_FEATURES)),
+    ]))
+    yield
+    warmup.cancel()
+    await fraud_batcher.aclose()
+    score_executor.shutdown(wait=False)
+
+
 app = FastAPI(
     title       = "CREW 3 防詐 PILOT — ML 異常評分服務",
     description = "XGBoost / Isolation Forest 防詐評分 + SHAP 風險因子解釋",
     version     = "1.0.0",
+    lifespan    = lifespan,
 )
+install_backpressure_handlers(app)
 
 app.add_middleware(
     CORSMiddleware,
@@ -272,16 +328,31 @@ app.add_middleware(
 
 @app.get("/health")
 async def health_check() -> dict:
-    """服務健康檢查"""
-    model = _try_load()
+    """服務存活檢查（liveness：不觸發模型載入；mode 反映目前是否已載入模型）"""
     return {
         "status":  "ok",
         "service": "CREW 3 防詐 PILOT ML 評分服務",
-        "mode":    "live" if model else "demo",
+        "mode":    "live" if _model is not None else "demo",
         "port":    8002,
     }
 
 
+@app.get("/ready")
+async def ready_check():
+    """服務就緒檢查（readiness：模型載入與預熱評分完成前 503）"""
+    return readiness.response()
+
+
+@app.get("/metrics")
+async def metrics() -> dict:
+    """評分執行器佇列深度 / 等待時間 / 拒絕次數、微批次大小 / 排隊延遲、Demo 規則命中 / 耗時（供監控 / 自動擴展使用）"""
+    return {
+        "executors":      {"score": score_executor.stats()},
+        "micro_batchers": {"fraud": fraud_batcher.stats()},
+        "rules":          rule_engine.stats(),
+    }
+
+
 @app.post("/score", response_model=FraudScoreResponse)
 async def score_fraud_risk(features: BorrowerFeatures) -> FraudScoreResponse:
     """
@@ -306,7 +377,67 @@ async def score_fraud_risk(features: BorrowerFeatures) -> FraudScoreResponse:
         fraud_score 0.4-0.7 → Level 2（medium）：指派資深行員
         fraud_score > 0.7  → Level 3（high）：Power Automate → Teams 主管警示
     """
-    model = _try_load()
-    if model is not None:
-        return _live_score(features, model)
-    return _demo_score(features)
+    return await _score_async(features)
+
+
+async def _score_async(features: BorrowerFeatures) -> FraudScoreResponse:
+    """Live：機率與樹貢獻經微批次合併推論；無模型檔 → Demo"""
+    if not MODEL_PATH.exists():
+        return await score_executor.run(_score, features)
+    try:
+        proba, top3 = await fraud_batcher.submit(_feature_vector(features))
+    except RuntimeError:
+        # 模型檔存在但載入失敗 → 與 _score 相同退回 Demo 模式
+        return await score_executor.run(_score, features)
+    return _live_response(proba, top3)
+
+
+@app.post("/score/batch")
+async def score_fraud_risk_batch(items: list[dict] = Body(...)) -> Response:
+    """
+    批次防詐評分 API（案件簿夜間重新篩檢等大量評分）
+
+    Request Body：BorrowerFeatures 物件的 JSON 陣列（上限 MAX_BATCH_SIZE 筆）
+
+    整批組成一個特徵矩陣：live 模式一次 predict_proba + 樹貢獻，demo 模式規則以 NumPy 欄運算計算，
+    不經微批次（本身即為批次）。
+
+    Returns:
+        {
+            results: [{index, ok: true, result: FraudScoreResponse} | {index, ok: false, error: str}, ...],
+            succeeded: int,
+            failed: int
+        }
+        單筆驗證失敗不影響其他筆；結果依輸入順序排列。
+    """
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"批次筆數上限為 {MAX_BATCH_SIZE}")
+
+    return Response(
+        content    = await score_executor.run(_score_batch_payload, items),
+        media_type = "application/json",
+    )
+
+
+def _score_batch_payload(items: list[dict]) -> bytes:
+    """批次驗證 + 評分 + 序列化（於執行器中執行）"""
+    valid: list[BorrowerFeatures] = []
+    valid_index: list[int] = []
+    results: list[dict] = [None] * len(items)
+    for i, item in enumerate(items):
+        try:
+            valid.append(BorrowerFeatures.model_validate(item))
+            valid_index.append(i)
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors())
+            results[i] = {"index": i, "ok": False, "error": errors}
+
+    for i, out in zip(valid_index, _score_rows(_feature_matrix(valid))):
+        results[i] = {"index": i, "ok": True, "result": out}
+
+    succeeded = len(valid_index)
+    return json_bytes({
+        "results":   results,
+        "succeeded": succeeded,
+        "failed":    len(results) - succeeded,
+    })
@@ -0,0 +1,237 @@
+"""
+INPUT:  Ollama /api/chat 對話訊息（messages）與生成參數（options）
+OUTPUT: 完整回覆文字（chat）或逐 token 文字片段（stream_chat，async iterator）；失敗時拋出 OllamaError
+POS:    Ollama 非同步連線池客戶端（XGBoost 估價白話解釋、SSE 串流解釋）
+
+設計說明：
+    舊版每次呼叫以 urllib 建立新連線並以 stream: False 阻塞等待完整回覆（最長 45 秒），
+    並佔用 io_executor 一個執行緒。OllamaClient 以 httpx.AsyncClient 保持 keep-alive 連線池，
+    直接在 event loop 上等待；stream_chat 逐行解析 Ollama 的 NDJSON 串流，
+    前端可在第一個 token 產生時即開始顯示（首 token 延遲取代完整回覆延遲）。
+    每次呼叫的逾時分為三層：
+        連線逾時（connect）、相鄰兩個資料塊之間的讀取逾時（read）、整體期限（total，可逐次覆寫）
+    首 token 延遲與完整回覆延遲以 Histogram 記錄（/metrics）。
+
+環境變數：
+    OLLAMA_URL                Ollama 位址（預設 http://127.0.0.1:11434）
+    OLLAMA_MODEL              模型名稱（預設 qwen2.5:14b）
+    OLLAMA_MAX_CONNECTIONS    連線池上限（預設 16）
+    OLLAMA_CONNECT_TIMEOUT_S  連線逾時秒數（預設 2）
+    OLLAMA_READ_TIMEOUT_S     資料塊間讀取逾時秒數（預設 30）
+    OLLAMA_TIMEOUT_S          單次呼叫整體期限秒數（預設 45）
+
+測試 / 壓測以 scripts/ollama_stub.py 的本地替身伺服器取代 Ollama。
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from src.main.python.core.micro_batcher import Histogram
+
+DEFAULT_OLLAMA_URL   = "http://127.0.0.1:11434"
+DEFAULT_OLLAMA_MODEL = "qwen2.5:14b"
+
+DEFAULT_MAX_CONNECTIONS   = 16
+DEFAULT_CONNECT_TIMEOUT_S = 2.0
+DEFAULT_READ_TIMEOUT_S    = 30.0
+DEFAULT_TIMEOUT_S         = 45.0
+
+LATENCY_MS_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 45000)
+
+
+class OllamaError(Exception):
+    """Ollama 呼叫失敗（連線失敗、HTTP 錯誤、回覆格式錯誤）"""
+
+
+class OllamaTimeout(OllamaError):
+    """Ollama 呼叫超過連線 / 讀取逾時或整體期限"""
+
+
+class OllamaClient:
+    """Ollama /api/chat 非同步客戶端（keep-alive 連線池，綁定目前的 event loop）"""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_OLLAMA_URL,
+        model: str = DEFAULT_OLLAMA_MODEL,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        connect_timeout_s: float = DEFAULT_CONNECT_TIMEOUT_S,
+        read_timeout_s: float = DEFAULT_READ_TIMEOUT_S,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+    ):
+        self.base_url          = base_url.rstrip("/")
+        self.model             = model
+        self.max_connections   = max(1, int(max_connections))
+        self.connect_timeout_s = float(connect_timeout_s)
+        self.read_timeout_s    = float(read_timeout_s)
+        self.timeout_s         = float(timeout_s)
+
+        self._loop:   Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self.first_token_ms = Histogram(LATENCY_MS_BUCKETS)
+        self.total_ms       = Histogram(LATENCY_MS_BUCKETS)
+        self._requests  = 0
+        self._streams   = 0
+        self._errors    = 0
+        self._timeouts  = 0
+        self._in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> "OllamaClient":
+        """依 OLLAMA_* 環境變數建立"""
+        return cls(
+            base_url          = os.environ.get("OLLAMA_URL", DEFAULT_OLLAMA_URL),
+            model             = os.environ.get("OLLAMA_MODEL", DEFAULT_OLLAMA_MODEL),
+            max_connections   = int(os.environ.get("OLLAMA_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+            connect_timeout_s = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT_S", DEFAULT_CONNECT_TIMEOUT_S)),
+            read_timeout_s    = float(os.environ.get("OLLAMA_READ_TIMEOUT_S", DEFAULT_READ_TIMEOUT_S)),
+            timeout_s         = float(os.environ.get("OLLAMA_TIMEOUT_S", DEFAULT_TIMEOUT_S)),
+        )
+
+    # ─── 連線池 ──────────────────────────────────────────────────────
+
+    def _http(self) -> httpx.AsyncClient:
+        # 連線綁定建立時的 event loop；loop 更換（例如重新啟動應用）時重建連線池
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop or self._client.is_closed:
+            self._loop   = loop
+            self._client = httpx.AsyncClient(
+                base_url = self.base_url,
+                timeout  = httpx.Timeout(self.read_timeout_s, connect=self.connect_timeout_s),
+                limits   = httpx.Limits(
+                    max_connections           = self.max_connections,
+                    max_keepalive_connections = self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """關閉連線池（lifespan 結束時呼叫）"""
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop   = None
+
+    def _payload(self, messages: list[dict], options: Optional[dict], model: Optional[str], stream: bool) -> dict:
+        payload = {"model": model or self.model, "messages": messages, "stream": stream}
+        if options:
+            payload["options"] = options
+        return payload
+
+    @staticmethod
+    def _parse(line: str) -> dict:
+        try:
+            chunk = json.loads(line)
+        except ValueError as e:
+            raise OllamaError(f"Ollama 回覆格式錯誤：{line[:80]!r}") from e
+        if chunk.get("error"):
+            raise OllamaError(f"Ollama 錯誤：{chunk['error']}")
+        return chunk
+
+    def _fail(self, e: BaseException) -> OllamaError:
+        # httpx / asyncio 例外統一轉為 OllamaError，呼叫端只需處理一種例外
+        if isinstance(e, (httpx.TimeoutException, asyncio.TimeoutError)):
+            self._timeouts += 1
+            return OllamaTimeout(f"Ollama 逾時：{type(e).__name__}")
+        self._errors += 1
+        if isinstance(e, OllamaError):
+            return e
+        if isinstance(e, httpx.HTTPStatusError):
+            return OllamaError(f"Ollama HTTP {e.response.status_code}")
+        return OllamaError(f"Ollama 連線失敗：{type(e).__name__}: {e}")
+
+    # ─── 呼叫 ────────────────────────────────────────────────────────
+
+    async def chat(
+        self,
+        messages: list[dict],
+        options: Optional[dict] = None,
+        model: Optional[str] = None,
+        timeout_s: Optional[float] = None,
+    ) -> str:
+        """非串流呼叫，回傳完整回覆文字（超過整體期限拋出 OllamaTimeout）"""
+        self._requests  += 1
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                self._http().post("/api/chat", json=self._payload(messages, options, model, stream=False)),
+                timeout_s if timeout_s is not None else self.timeout_s,
+            )
+            response.raise_for_status()
+            content = self._parse(response.text).get("message", {}).get("content", "")
+        except Exception as e:
+            raise self._fail(e) from e
+        finally:
+            self._in_flight -= 1
+        self.total_ms.observe((time.perf_counter() - start) * 1000)
+        return content
+
+    async def stream_chat(
+        self,
+        messages: list[dict],
+        options: Optional[dict] = None,
+        model: Optional[str] = None,
+        timeout_s: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """串流呼叫，逐一產出 token 文字片段（整體期限涵蓋整段串流）"""
+        self._streams   += 1
+        self._in_flight += 1
+        loop  = asyncio.get_running_loop()
+        start = time.perf_counter()
+        deadline = loop.time() + (timeout_s if timeout_s is not None else self.timeout_s)
+        first = True
+        try:
+            request = self._http().build_request(
+                "POST", "/api/chat", json=self._payload(messages, options, model, stream=True),
+            )
+            response = await asyncio.wait_for(self._http().send(request, stream=True), deadline - loop.time())
+            try:
+                response.raise_for_status()
+                lines = response.aiter_lines()
+                while True:
+                    try:
+                        line = await asyncio.wait_for(lines.__anext__(), deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    if not line.strip():
+                        continue
+                    chunk = self._parse(line)
+                    token = chunk.get("message", {}).get("content", "")
+                    if token:
+                        if first:
+                            self.first_token_ms.observe((time.perf_counter() - start) * 1000)
+                            first = False
+                        yield token
+                    # done 之後不提前中斷，讀完回應本體才能把連線放回連線池
+            finally:
+                await response.aclose()
+        except Exception as e:
+            raise self._fail(e) from e
+        finally:
+            self._in_flight -= 1
+        self.total_ms.observe((time.perf_counter() - start) * 1000)
+
+    # ─── 指標 ────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        """呼叫 / 串流 / 失敗 / 逾時次數、首 token 與完整回覆延遲（ms）直方圖"""
+        return {
+            "base_url":        self.base_url,
+            "model":           self.model,
+            "max_connections": self.max_connections,
+            "timeout_s":       self.timeout_s,
+            "requests":        self._requests,
+            "streams":         self._streams,
+            "errors":          self._errors,
+            "timeouts":        self._timeouts,
+            "in_flight":       self._in_flight,
+            "first_token_ms":  self.first_token_ms.snapshot(),
+            "total_ms":        self.total_ms.snapshot(),
+        }
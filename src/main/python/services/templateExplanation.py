@@ -0,0 +1,87 @@
+"""
+INPUT:  估價結果（行政區、建物型態、坪數、屋齡、樓層、單價、市值、LTV、風險評級、貸款金額）與前三大影響因子
+OUTPUT: 2-3 段白話中文說明（純字串模板，相同輸入必得相同輸出）
+POS:    規則 / 模板解釋層 — Qwen2.5 白話解釋的即時備援（Ollama 緩慢或未啟動時使用，微秒級）
+
+說明：
+    第一段：物件概況與估計單價 / 市值；
+    第二段：影響因子（shap_factors 的 label / direction / contribution）依貢獻大小串成句子，
+            常見因子有專屬措辭（見 FACTOR_PHRASES），其餘以「{因子}{拉高 / 拉低}估價」表達；
+    第三段：LTV 區間（≤ 60% / ≤ 80% / > 80%，80% 與 apply_loan 的高 LTV 升級門檻相同）與風險評級建議。
+"""
+
+# 常見影響因子措辭（label, direction）→ 說明片語
+FACTOR_PHRASES = {
+    ("行政區", "拉高"):   "所在行政區行情較高",
+    ("行政區", "拉低"):   "所在行政區行情較低",
+    ("屋齡", "拉高"):     "屋齡較新",
+    ("屋齡", "拉低"):     "屋齡折舊",
+    ("坪數", "拉高"):     "坪數條件有利",
+    ("坪數", "拉低"):     "坪數較大使單價攤薄",
+    ("樓層", "拉高"):     "樓層位置較佳",
+    ("樓層", "拉低"):     "樓層位置較不利",
+    ("建物類型", "拉高"): "建物型態較受市場青睞",
+    ("建物類型", "拉低"): "建物型態的市場接受度較低",
+    ("車位", "拉高"):     "附有車位",
+    ("車位", "拉低"):     "未附車位",
+}
+
+LTV_CONSERVATIVE = 0.60
+LTV_HIGH         = 0.80
+
+RISK_ADVICE = {
+    "低風險": "可依一般流程審核。",
+    "中風險": "建議確認借款人還款能力，並留意區域行情變化。",
+    "高風險": "建議降低貸款成數或要求補充擔保後再行核貸。",
+}
+
+
+def _factor_phrase(factor: dict) -> str:
+    label     = factor.get("label", "")
+    direction = factor.get("direction", "")
+    phrase    = FACTOR_PHRASES.get((label, direction), f"{label}{direction}估價")
+    share     = abs(float(factor.get("contribution", 0.0))) * 100
+    return f"{phrase}（{direction}，約占 {share:.0f}%）"
+
+
+def _ltv_phrase(ltv_ratio: float) -> str:
+    if ltv_ratio <= LTV_CONSERVATIVE:
+        return "貸款成數保守，擔保品價值足以涵蓋放款"
+    if ltv_ratio <= LTV_HIGH:
+        return "貸款成數在一般範圍內"
+    return "貸款成數偏高，擔保品價值下跌時的緩衝有限"
+
+
+def template_explanation_zh(
+    district: str,
+    building_type: str,
+    area_ping: float,
+    property_age: int,
+    floor: int,
+    price_per_ping: float,
+    estimated_value: float,
+    ltv_ratio: float,
+    risk_level: str,
+    loan_amount: float,
+    shap_factors: list[dict] | None = None,
+) -> str:
+    """
+    以模板產生估價白話說明（不呼叫 LLM）
+
+    Args:
+        shap_factors: 估價回應的前三大影響因子（依 |contribution| 排序後取前三；None / 空 → 省略因子段落）
+    """
+    paragraphs = [
+        f"此物件位於{district}，為{building_type}，面積約 {area_ping:.1f} 坪、屋齡 {property_age} 年、位於 {floor} 樓。"
+        f"模型估計單價約每坪 {price_per_ping / 10000:,.1f} 萬元，市值約 {estimated_value / 10000:,.0f} 萬元。"
+    ]
+
+    factors = sorted(shap_factors or [], key=lambda f: abs(float(f.get("contribution", 0.0))), reverse=True)[:3]
+    if factors:
+        paragraphs.append("影響估價的主要因素依序為：" + "、".join(_factor_phrase(f) for f in factors) + "。")
+
+    paragraphs.append(
+        f"申請貸款 {loan_amount / 10000:,.0f} 萬元，LTV 為 {ltv_ratio * 100:.1f}%，{_ltv_phrase(ltv_ratio)}；"
+        f"綜合評估為{risk_level}，{RISK_ADVICE.get(risk_level, '請依內部規範審核。')}"
+    )
+    return "\n\n".join(paragraphs)
@@ -6,6 +6,7 @@ POS:    服務層 — 三層模型協調器
         Layer 2: demo_lstm          → lstm_adjusted_value
         Layer 3: demo_rf_sde        → rf_adjusted_value
         Layer 4: monte_carlo        → confidence_interval + risk_level
+        valuate_batch：四層皆以 NumPy 陣列運算批次執行（POST /valuate/batch）
 """
 
 import sys
@@ -16,14 +17,29 @@ _project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.
 if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
-from src.main.python.utils.region_price_table import calculate_base_value
-from src.main.python.inference.demo_lstm import run_demo_lstm
-from src.main.python.inference.demo_rf_sde import run_demo_rf_sde
-from src.main.python.inference.monte_carlo import run_monte_carlo
+import numpy as np
+
+from src.main.python.utils.region_price_table import calculate_base_value, calculate_base_values
+from src.main.python.inference.demo_lstm import run_demo_lstm, run_demo_lstm_batch
+from src.main.python.inference.demo_rf_sde import run_demo_rf_sde, run_demo_rf_sde_batch
+from src.main.python.inference.monte_carlo import (
+    run_monte_carlo,
+    run_monte_carlo_batch,
+    run_term_structure,
+    run_term_structure_batch,
+    RISK_LEVELS,
+    SERVICE_ENGINE,
+)
+from src.main.python.inference.ltv_breach import (
+    run_ltv_breach,
+    breach_probability_dict,
+    DEFAULT_BREACH_HORIZON_YEARS,
+)
 from src.main.python.models.valuation_schema import (
     ValuationRequest,
     ValuationResult,
     ValuationConfidenceInterval,
+    ValuationTermPoint,
 )
 
 
@@ -35,8 +51,9 @@ def valuate(request: ValuationRequest) -> ValuationResult:
         1. 計算基準估值（縣市單價 × 坪數 × 各係數）
         2. Demo LSTM：市場指數調整
         3. Demo RF+SDE：情緒分數調整
-        4. Monte Carlo GBM：1000 路徑，產出 P5/P50/P95 信心區間
-        5. 計算 LTV & 風險等級
+        4. Monte Carlo GBM：產出 P5/P50/P95 信心區間（預設解析引擎，見 SERVICE_ENGINE）
+           與多期限期限結構（1/3/5/10 年 + term_years 到期）
+        5. 計算 LTV & 風險等級，以及貸款期間 LTV 觸價機率（80% / 90%）
 
     Args:
         request: ValuationRequest（已通過 Pydantic 驗證）
@@ -70,7 +87,12 @@ def valuate(request: ValuationRequest) -> ValuationResult:
     )
 
     # ── Layer 4：Monte Carlo GBM 信心區間 ─────────────────────
-    ci, risk_level = run_monte_carlo(spot_value=rf_adjusted_value)
+    ci, risk_level = run_monte_carlo(spot_value=rf_adjusted_value, engine=SERVICE_ENGINE)
+    term_structure = run_term_structure(
+        spot_value     = rf_adjusted_value,
+        maturity_years = request.term_years,
+        engine         = SERVICE_ENGINE,
+    )
 
     # ── 後處理：LTV 計算 ───────────────────────────────────────
     estimated_value = ci.p50
@@ -80,6 +102,14 @@ def valuate(request: ValuationRequest) -> ValuationResult:
     if ltv_ratio > 0.80 and risk_level == "低風險":
         risk_level = "中風險"
 
+    # 貸款期間任一時點 LTV 超過 80% / 90% 的機率
+    breach_probs = run_ltv_breach(
+        spot_values   = rf_adjusted_value,
+        loan_amounts  = request.loan_amount,
+        horizon_years = request.term_years or DEFAULT_BREACH_HORIZON_YEARS,
+        engine        = SERVICE_ENGINE,
+    )
+
     return ValuationResult(
         estimated_value     = estimated_value,
         confidence_interval = ValuationConfidenceInterval(
@@ -87,7 +117,9 @@ def valuate(request: ValuationRequest) -> ValuationResult:
             p50 = ci.p50,
             p95 = ci.p95,
         ),
+        term_structure  = [ValuationTermPoint(**vars(point)) for point in term_structure],
         ltv_ratio       = ltv_ratio,
+        ltv_breach_probability = breach_probability_dict(breach_probs),
         risk_level      = risk_level,
         lstm_index      = lstm_index,
         sentiment_score = sentiment_score,
@@ -97,3 +129,101 @@ def valuate(request: ValuationRequest) -> ValuationResult:
         region          = request.region,
         building_type   = request.building_type,
     )
+
+
+def valuate_batch(requests: list[ValuationRequest]) -> list[dict]:
+    """
+    批次鑑價：四層模型皆以陣列運算一次處理所有請求
+
+    與逐筆呼叫 valuate 結果一致：
+        Layer 1-3 以向量化版本計算（類別欄位去重查表）
+        Layer 4 信心區間以 run_monte_carlo_batch 計算；期限結構與 LTV 觸價機率依 term_years 分組批次計算
+    回傳 dict（欄位同 ValuationResult.model_dump()），避免逐筆建立 Pydantic 物件的驗證成本。
+
+    Args:
+        requests: 已通過 Pydantic 驗證的 ValuationRequest 清單
+
+    Returns:
+        list[dict]（順序同輸入）
+    """
+    n = len(requests)
+    if n == 0:
+        return []
+
+    regions        = np.array([r.region for r in requests], dtype=object)
+    building_types = np.array([r.building_type for r in requests], dtype=object)
+    property_ages  = np.array([r.property_age for r in requests], dtype=np.int64)
+    loan_amounts   = np.array([r.loan_amount for r in requests], dtype=np.float64)
+    term_years     = [r.term_years for r in requests]
+
+    # ── Layer 1：基準估值 ──────────────────────────────────────
+    base_values, breakdown = calculate_base_values(
+        regions        = regions,
+        building_types = building_types,
+        property_ages  = property_ages,
+        floors         = [r.floor for r in requests],
+        layouts        = [r.layout for r in requests],
+        has_parking    = [r.has_parking for r in requests],
+        area_pings     = [r.area_ping for r in requests],
+    )
+
+    # ── Layer 2 / 3：市場指數與情緒分數調整 ─────────────────────
+    lstm_values, lstm_indices = run_demo_lstm_batch(regions, base_values)
+    rf_values, sentiments     = run_demo_rf_sde_batch(regions, building_types, property_ages, lstm_values)
+
+    # ── Layer 4：Monte Carlo GBM 信心區間 ─────────────────────
+    ci, risk_codes = run_monte_carlo_batch(rf_values, engine=SERVICE_ENGINE)
+
+    # 期限結構與 LTV 觸價機率：同 term_years 者共用檢查點，分組批次計算
+    term_points: list[list[dict]] = [None] * n
+    breach_probs = np.empty((n, 2))
+    for term in set(term_years):
+        idx = np.array([i for i, t in enumerate(term_years) if t == term])
+        horizons, term_ci, term_codes = run_term_structure_batch(
+            rf_values[idx], maturity_years=term, engine=SERVICE_ENGINE,
+        )
+        columns = zip(term_ci.p5.tolist(), term_ci.p50.tolist(), term_ci.p95.tolist(), term_codes.tolist())
+        for i, (p5s, p50s, p95s, codes) in zip(idx.tolist(), columns):
+            term_points[i] = [
+                {"years": years, "p5": p5, "p50": p50, "p95": p95, "risk_level": RISK_LEVELS[code]}
+                for years, p5, p50, p95, code in zip(horizons, p5s, p50s, p95s, codes)
+            ]
+        breach_probs[idx] = run_ltv_breach(
+            spot_values   = rf_values[idx],
+            loan_amounts  = loan_amounts[idx],
+            horizon_years = term or DEFAULT_BREACH_HORIZON_YEARS,
+            engine        = SERVICE_ENGINE,
+        )
+
+    # ── 後處理：LTV 計算與高 LTV 升級 ──────────────────────────
+    estimated = ci.p50
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ltv_ratios = np.where(estimated > 0, np.round(loan_amounts / estimated, 4), 1.0)
+    risk_codes = np.where((ltv_ratios > 0.80) & (risk_codes == 0), 1, risk_codes)
+
+    breach_keys  = list(breach_probability_dict(breach_probs[0]))
+    breach_cols  = np.round(breach_probs, 4).tolist()
+    breakdown_rows = [dict(zip(breakdown, row)) for row in zip(*(col.tolist() for col in breakdown.values()))]
+
+    return [
+        {
+            "estimated_value":     est,
+            "confidence_interval": {"p5": p5, "p50": est, "p95": p95},
+            "term_structure":      term,
+            "ltv_ratio":           ltv,
+            "ltv_breach_probability": dict(zip(breach_keys, breach)),
+            "risk_level":          RISK_LEVELS[code],
+            "lstm_index":          lstm,
+            "sentiment_score":     sentiment,
+            "base_value":          base,
+            "breakdown":           bd,
+            "mode":                "production",
+            "region":              req.region,
+            "building_type":       req.building_type,
+        }
+        for req, est, p5, p95, term, ltv, breach, code, lstm, sentiment, base, bd in zip(
+            requests, estimated.tolist(), ci.p5.tolist(), ci.p95.tolist(), term_points,
+            ltv_ratios.tolist(), breach_cols, risk_codes.tolist(), lstm_indices.tolist(),
+            sentiments.tolist(), base_values.tolist(), breakdown_rows,
+        )
+    ]
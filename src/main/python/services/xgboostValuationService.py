@@ -3,16 +3,85 @@ INPUT:  ValuationRequest（district, building_type, area_ping, property_age, flo
 OUTPUT: 估價結果（estimated_value, confidence_interval, ltv_ratio, risk_level）
 POS:    Day 1 推論服務 - 載入 XGBoost 模型，提供個別物件估價
 
-依賴：models/xgboost_valuation.json、models/xgboost_encoders.pkl
+依賴：models/xgboost_valuation.json、models/xgboost_encoders.json（類別編碼表，不存在時由 .pkl 編譯產生）
 模型不存在時自動降級為 Demo 模式（基於行政區查表 + Monte Carlo）
+
+推論快速路徑：
+    特徵直接寫入預先配置的 float32 單列陣列（每執行緒一份），以 Booster.inplace_predict 推論，
+    不建構 pandas DataFrame / DMatrix；類別編碼以預先編譯的 CategoryTables 查表（含未知類別計數）。
+    請求路徑不再需要 pandas（見 scripts/bench_xgboost_inference.py）。
+
+推論後端：
+    log(單價) 推論經可抽換後端（XGBOOST_BACKEND=native / onnx / treelite，見 inference/tree_backends.py），
+    無法載入時自動退回 native；實際後端與退回原因見 backend_info()（/metrics）。
+    解釋因子一律使用原生 Booster 計算。各後端延遲比較見 scripts/bench_inference_backends.py。
+
+微批次：
+    API 層以 build_feature_row 於 event loop 內編碼特徵，並行請求經 MicroBatcher 合併後
+    以 predict_live 一次推論 + 解釋，再將 LivePrediction 傳回 valuate_xgboost 完成後續計算。
+
+解釋因子：
+    以 XGBoost 原生 pred_contribs（TreeSHAP，見 inference/tree_contributions.py）整批計算前三大因子，
+    請求路徑不需要 shap 套件（shap 僅供離線分析選用）。
+
+結果快取：
+    估價分為與貸款無關的 property_valuation（推論、解釋因子、信心區間、期限結構）
+    與 apply_loan（LTV、高 LTV 風險升級、LTV 觸價機率）。前者以 valuation_cache（TTL + LRU，
+    XGBOOST_CACHE_SIZE / XGBOOST_CACHE_TTL_S）快取，鍵為正規化後的物件特徵 + 貸款年限 + 模型版本 + 估價季度，
+    同一物件只改貸款金額時直接重算 LTV；同鍵並行未命中只計算一次。
+
+價格曲面（model="surface"，預設模式由 XGBOOST_MODEL 環境變數決定）：
+    以 training/build_price_surface.py 離線建置的曲面查表 + 內插取得單價（見 inference/price_surface.py），
+    只讀取 JSON 編碼表與 memmap，不載入 xgboost 模型；不提供解釋因子（shap_factors 為空）。
+    曲面不存在、或與目前模型版本 / 估價季度 / 類別編碼表不符時改走即時推論（原因見 surface_info()）。
+
+白話解釋：
+    explain_valuation_zh 經模組共用的 ollama_client（async keep-alive 連線池，逐次逾時，見 services/ollamaClient.py）
+    呼叫 Ollama，不佔用執行緒；stream_explanation_zh 逐 token 產出，供 /valuate/xgboost/explain/stream 以 SSE 轉送。
+    解釋以內容定址鍵（提示詞版本 + 模型 + 渲染後的提示詞）快取於記憶體 LRU 與選用的磁碟層（EXPLAIN_CACHE_DIR），
+    同一案件重複開啟不再重新生成；並行的相同請求只生成一次。
+    explain_with_fallback 另以模板解釋（services/templateExplanation.py，依影響因子 / LTV / 風險評級組句，微秒級）
+    作為備援：LLM 未於 EXPLAIN_LLM_BUDGET_MS 內完成或失敗時回傳模板（source="template"），LLM 於背景繼續生成並寫入快取。
 """
 
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
 import numpy as np
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
-# pandas / xgboost / joblib 在 _load() 中延遲載入，Demo 模式不需要這些套件
-
-from src.main.python.inference.monte_carlo import run_monte_carlo
+from typing import AsyncIterator
+# xgboost（及舊版 .pkl 編碼表所需的 joblib）在 _load() 中延遲載入，Demo 模式不需要這些套件
+
+from src.main.python.core.disk_store import DiskStore
+from src.main.python.core.micro_batcher import Histogram
+from src.main.python.core.result_cache import ResultCache
+from src.main.python.inference.monte_carlo import (
+    ConfidenceInterval,
+    TermStructurePoint,
+    run_monte_carlo,
+    run_term_structure,
+    SERVICE_ENGINE,
+)
+from src.main.python.inference.ltv_breach import (
+    run_ltv_breach,
+    breach_probability_dict,
+    DEFAULT_BREACH_HORIZON_YEARS,
+)
+from src.main.python.inference.price_surface import PriceSurface
+from src.main.python.inference.tree_backends import BackendSelection, select_backend
+from src.main.python.inference.tree_contributions import (
+    tree_contributions,
+    top_k_contributions,
+    APPROXIMATE_CONTRIBS,
+)
+from src.main.python.services.ollamaClient import LATENCY_MS_BUCKETS, OllamaClient, OllamaError
+from src.main.python.services.templateExplanation import template_explanation_zh
+from src.main.python.utils.category_tables import CategoryTables
 from src.main.python.utils.region_price_table import (
     DISTRICT_TO_REGION,
     DISTRICT_PRICE_MULTIPLIER,
@@ -24,6 +93,13 @@ from src.main.python.utils.region_price_table import (
 
 MODEL_PATH    = Path("models/xgboost_valuation.json")
 ENCODERS_PATH = Path("models/xgboost_encoders.pkl")
+CATEGORY_TABLES_PATH = Path("models/xgboost_encoders.json")
+SURFACE_DIR   = Path("models/price_surface")
+
+MODEL_XGBOOST = "xgboost"
+MODEL_SURFACE = "surface"
+# 未指定 model 時的估價模式
+DEFAULT_MODEL = os.environ.get("XGBOOST_MODEL", MODEL_XGBOOST)
 
 FEATURE_COLS = ["district", "building_type", "area_ping", "property_age",
                 "floor", "total_floors", "has_parking", "rooms", "year", "quarter"]
@@ -41,64 +117,257 @@ FEATURE_LABELS = {
     "quarter":       "季節",
 }
 
-_model     = None
-_encoders  = None
-_explainer = None
+_model      = None
+_booster    = None
+_backend: BackendSelection | None = None
+_model_version: str | None = None
+_surface: PriceSurface | None = None
+_surface_error: str | None = None
+_categories: CategoryTables | None = None
+
+# 每執行緒一份的預先配置特徵列（執行器以多執行緒並行推論）
+_row_local = threading.local()
+
+# 模型 / 編碼表 / 曲面的延遲載入鎖（預熱與請求可能同時在不同執行緒首次載入；
+# 可重入：_load / _load_surface 內會呼叫 _ensure_categories）
+_load_lock = threading.RLock()
+
+
+def _load_category_tables() -> CategoryTables:
+    """優先讀 JSON 編碼表；僅有舊版 .pkl 時編譯並寫出 JSON（寫入失敗不影響服務）"""
+    if CATEGORY_TABLES_PATH.exists():
+        return CategoryTables.load(CATEGORY_TABLES_PATH)
+    import joblib
+    tables = CategoryTables.from_label_encoders(joblib.load(ENCODERS_PATH))
+    try:
+        tables.save(CATEGORY_TABLES_PATH)
+    except OSError:
+        pass
+    return tables
+
+
+def _ensure_categories() -> CategoryTables:
+    """僅載入類別編碼表（JSON，毫秒級），供不需模型的特徵編碼使用"""
+    global _categories
+    if _categories is None:
+        with _load_lock:
+            if _categories is None:
+                _categories = _load_category_tables()
+    return _categories
 
 
 def _load():
-    global _model, _encoders, _explainer
-    if _model is None:
-        import joblib
+    """
+    載入模型、推論後端與編碼表（執行緒安全）
+
+    先建構於區域變數，_model 最後才賦值：其他執行緒看到 _model 非 None 時，
+    _booster / _backend / _model_version / _categories 皆已就緒。
+    """
+    global _model, _booster, _backend, _model_version
+    if _model is not None:
+        return
+    with _load_lock:
+        if _model is not None:
+            return
         import xgboost as xgb
         if not MODEL_PATH.exists():
             raise FileNotFoundError(
                 f"找不到模型 {MODEL_PATH}，請先執行 train_xgboost.py"
             )
-        _model = xgb.XGBRegressor()
-        _model.load_model(str(MODEL_PATH))
-        _encoders = joblib.load(ENCODERS_PATH)
-        try:
-            import shap
-            _explainer = shap.TreeExplainer(_model)
-        except ImportError:
-            _explainer = None
+        model = xgb.XGBRegressor()
+        model.load_model(str(MODEL_PATH))
+        booster = model.get_booster()
+        backend = select_backend(booster, MODEL_PATH)
+        version = _file_version(MODEL_PATH)
+        _ensure_categories()
+        _booster, _backend, _model_version = booster, backend, version
+        _model = model
+
+
+def _file_version(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def model_version() -> str:
+    """已載入模型的版本（檔案 mtime + 大小）；未載入時讀取模型檔，無模型檔（Demo 模式）為 demo"""
+    if not MODEL_PATH.exists():
+        return "demo"
+    return _model_version if _model_version is not None else _file_version(MODEL_PATH)
+
+
+def _load_surface() -> PriceSurface | None:
+    """開啟價格曲面（JSON + memmap，不載入模型）；不存在或與目前模型 / 估價季度不符時回傳 None"""
+    global _surface, _surface_error
+    if _surface is None and _surface_error is None:
+        with _load_lock:
+            if _surface is None and _surface_error is None:
+                try:
+                    surface = PriceSurface.load(SURFACE_DIR)
+                    if surface.meta.get("categories") != _ensure_categories().classes:
+                        raise ValueError("類別編碼表與曲面建置時不符，請重新建置")
+                    if MODEL_PATH.exists() and surface.meta.get("model_version") != model_version():
+                        raise ValueError("模型版本與曲面建置時不符，請重新建置")
+                    _surface = surface
+                except (OSError, ValueError, KeyError) as e:
+                    _surface_error = str(e)
+    if _surface is None or _surface_quarter_mismatch() is not None:
+        return None
+    return _surface
+
+
+def _surface_quarter_mismatch() -> str | None:
+    built = (_surface.meta["year"], _surface.meta["quarter"])
+    if built != _year_quarter():
+        return "曲面估價季度 {}Q{} 與目前 {}Q{} 不符，請重新建置".format(*built, *_year_quarter())
+    return None
+
+
+def resolve_model(model: str | None = None) -> str:
+    """實際使用的估價模式：要求 surface 且曲面可用 → surface，否則 xgboost（無模型檔時為 Demo）"""
+    if (model or DEFAULT_MODEL) == MODEL_SURFACE and _load_surface() is not None:
+        return MODEL_SURFACE
+    return MODEL_XGBOOST
+
+
+def surface_info() -> dict:
+    """價格曲面狀態（/metrics 顯示：是否可用、建置季度、大小、建置時誤差或不可用原因）"""
+    if _surface is None:
+        return {"available": False, "error": _surface_error}
+    stale = _surface_quarter_mismatch()
+    return {
+        "available":     stale is None,
+        "error":         stale,
+        "year":          _surface.meta["year"],
+        "quarter":       _surface.meta["quarter"],
+        "model_version": _surface.meta.get("model_version"),
+        "shape":         _surface.meta["shape"],
+        "size_mb":       round(_surface.nbytes / 2**20, 1),
+        "build_error":   _surface.meta.get("error", {}),
+    }
 
 
 def _encode(col: str, value: str) -> int:
-    """對類別欄位做 Label Encoding，遇未知值回傳 0"""
-    le = _encoders.get(col)
-    if le is None:
-        return 0
-    try:
-        return int(le.transform([str(value)])[0])
-    except ValueError:
-        # 未見過的類別：回傳最常見類別的 index（0）
-        return 0
+    """對類別欄位做 Label Encoding（編碼表查表，與 LabelEncoder.transform 相同），遇未知值回傳 0"""
+    # 未見過的類別：回傳最常見類別的 index（0），並計入未知類別統計
+    return _categories.encode(col, value)
+
+
+def backend_info() -> dict:
+    """目前推論後端與退回原因（模型未載入時為空）"""
+    return _backend.info() if _backend is not None else {}
 
 
-def _shap_factors_live(row) -> list[dict]:
-    """XGBoost 模式：用 SHAP TreeExplainer 計算前三大貢獻因子。"""
-    if _explainer is None:
-        return []
+def category_stats() -> dict:
+    """類別編碼查詢 / 未知類別統計（模型未載入時為空）"""
+    return _categories.stats() if _categories is not None else {}
+
+
+def _feature_row() -> np.ndarray:
+    """取得本執行緒的預先配置特徵列 shape=(1, len(FEATURE_COLS))"""
+    row = getattr(_row_local, "row", None)
+    if row is None:
+        row = _row_local.row = np.empty((1, len(FEATURE_COLS)), dtype=np.float32)
+    return row
+
+
+def _fill_row(
+    row: np.ndarray,
+    district: str,
+    building_type: str,
+    area_ping: float,
+    property_age: int,
+    floor: int,
+    total_floors: int,
+    has_parking: bool,
+    rooms: int,
+    year: int,
+    quarter: int,
+) -> np.ndarray:
+    """依 FEATURE_COLS 順序寫入特徵（不配置新陣列）"""
+    r = row[0]
+    r[0] = _encode("district",      district)
+    r[1] = _encode("building_type", building_type)
+    r[2] = area_ping
+    r[3] = property_age
+    r[4] = floor
+    r[5] = total_floors
+    r[6] = int(has_parking)
+    r[7] = rooms
+    r[8] = year
+    r[9] = quarter
+    return row
+
+
+def _predict_log_price(row: np.ndarray) -> float:
+    """單列推論（略過 DataFrame 轉換與 DMatrix 建構）"""
+    return float(_backend.backend.predict(row)[0])
+
+
+def _year_quarter() -> tuple[int, int]:
+    now = datetime.now()
+    return now.year, (now.month - 1) // 3 + 1
+
+
+def build_feature_row(
+    district: str,
+    building_type: str,
+    area_ping: float,
+    property_age: int,
+    floor: int,
+    total_floors: int,
+    has_parking: bool,
+    rooms: int,
+) -> np.ndarray:
+    """編碼單筆物件為新配置的一維特徵列（float32，shape=(len(FEATURE_COLS),)；供微批次送出）"""
+    _ensure_categories()
+    row = np.empty((1, len(FEATURE_COLS)), dtype=np.float32)
+    _fill_row(row, district, building_type, area_ping, property_age,
+              floor, total_floors, has_parking, rooms, *_year_quarter())
+    return row[0]
+
+
+def predict_log_prices(rows: np.ndarray) -> np.ndarray:
+    """批次推論 log(單價)，rows shape=(n, len(FEATURE_COLS))"""
+    _load()
+    return _backend.backend.predict(np.asarray(rows, dtype=np.float32))
+
+
+@dataclass
+class LivePrediction:
+    """單筆正式模式推論結果（微批次分發單位）"""
+    log_price: float
+    factors:   list[dict]
+
+
+def predict_live(rows: np.ndarray) -> list[LivePrediction]:
+    """批次推論 log(單價) + 前三大貢獻因子（MicroBatcher 的 predict_fn）"""
+    rows = np.asarray(rows, dtype=np.float32)
+    log_prices = predict_log_prices(rows)
+    factors = _live_factors(rows)
+    return [LivePrediction(float(p), f) for p, f in zip(log_prices, factors)]
+
+
+def _live_factors(rows: np.ndarray) -> list[list[dict]]:
+    """XGBoost 模式：原生樹貢獻整批計算前三大因子（contribution = 貢獻 / Σ|貢獻|）"""
     try:
-        import shap
-        shap_vals = _explainer.shap_values(row)
-        vals = shap_vals[0] if isinstance(shap_vals, list) else shap_vals[0]
-        total = float(np.sum(np.abs(vals))) or 1.0
-        ranked = sorted(enumerate(vals), key=lambda x: abs(x[1]), reverse=True)[:3]
-        result = []
-        for idx, val in ranked:
-            feat  = FEATURE_COLS[idx]
-            ratio = round(float(val) / total, 4)
-            result.append({
-                "label":        FEATURE_LABELS.get(feat, feat),
-                "contribution": ratio,
-                "direction":    "拉高" if val > 0 else "拉低",
-            })
-        return result
+        contribs = tree_contributions(_booster, rows, approximate=APPROXIMATE_CONTRIBS)
     except Exception:
-        return []
+        return [[] for _ in range(len(rows))]
+    totals = np.abs(contribs).sum(axis=1)
+    order, values = top_k_contributions(contribs)
+    result = []
+    for idx_row, val_row, total in zip(order.tolist(), values.tolist(), totals.tolist()):
+        total = total or 1.0
+        result.append([
+            {
+                "label":        FEATURE_LABELS.get(FEATURE_COLS[idx], FEATURE_COLS[idx]),
+                "contribution": round(val / total, 4),
+                "direction":    "拉高" if val > 0 else "拉低",
+            }
+            for idx, val in zip(idx_row, val_row)
+        ])
+    return result
 
 
 def _shap_factors_demo(property_age: int, floor: int, district: str) -> list[dict]:
@@ -150,7 +419,25 @@ def _demo_price_per_ping(
     return float(price_per_ping)
 
 
-def valuate_xgboost(
+# 坪數量化單位（快取鍵；0.01 坪以下的差異視為同一物件）
+AREA_PING_QUANTUM = 0.01
+
+valuation_cache = ResultCache.from_env("xgboost-valuation", "XGBOOST")
+
+
+@dataclass(frozen=True)
+class PropertyValuation:
+    """與貸款金額無關的物件估價結果（valuation_cache 的快取單位）"""
+    estimated_value: float                          # 點估計（元，Monte Carlo 前）
+    ci:              ConfidenceInterval
+    term_structure:  tuple[TermStructurePoint, ...]
+    risk_level:      str                            # Monte Carlo 風險等級（未含 LTV 升級）
+    price_per_ping:  float
+    model:           str
+    shap_factors:    tuple[dict, ...]
+
+
+def valuation_cache_key(
     district: str,
     building_type: str,
     area_ping: float,
@@ -159,52 +446,74 @@ def valuate_xgboost(
     total_floors: int,
     has_parking: bool,
     rooms: int,
-    loan_amount: float,
-) -> dict:
+    term_years: int | None = None,
+    model: str = MODEL_XGBOOST,
+) -> tuple:
+    """正規化物件特徵 + 貸款年限（影響期限結構）+ 估價模式 + 模型版本 + 估價季度"""
+    return (
+        str(district).strip(),
+        str(building_type).strip(),
+        round(round(float(area_ping) / AREA_PING_QUANTUM) * AREA_PING_QUANTUM, 6),
+        int(property_age),
+        int(floor),
+        int(total_floors),
+        bool(has_parking),
+        int(rooms),
+        None if term_years is None else int(term_years),
+        model,
+        model_version(),
+        _year_quarter(),
+    )
+
+
+def property_valuation(
+    district: str,
+    building_type: str,
+    area_ping: float,
+    property_age: int,
+    floor: int,
+    total_floors: int,
+    has_parking: bool,
+    rooms: int,
+    term_years: int | None = None,
+    live_prediction: LivePrediction | None = None,
+    model: str | None = None,
+) -> PropertyValuation:
     """
-    XGBoost 個別物件估價
+    物件估價（不含貸款）：價格曲面 / XGBoost 推論 / Demo 查表 → Monte Carlo 信心區間與期限結構
 
+    model="surface" 且曲面可用 → 曲面查表（不載入模型）
     若模型已訓練（models/xgboost_valuation.json 存在）→ XGBoost 推論
     否則 → Demo 模式（行政區查表），確保 Hackathon Demo 可正常運作
 
-    Returns:
-        {
-            estimated_value: float,          # P50 估值（元）
-            confidence_interval: {p5, p50, p95},
-            ltv_ratio: float,
-            risk_level: str,
-            price_per_ping: float,           # 估計單價（元/坪）
-            model: "xgboost" | "demo"
-        }
+    live_prediction：微批次已完成的推論與解釋因子（提供時略過編碼與單列推論）
     """
-    model_tag = "xgboost"
+    model_tag = MODEL_XGBOOST
 
-    if MODEL_PATH.exists():
-        # ── 正式模式：XGBoost 推論 ──────────────────────────────
-        import pandas as pd
+    if live_prediction is None and resolve_model(model) == MODEL_SURFACE:
+        # ── 價格曲面：查表 + 面積 / 屋齡內插 ──────────────────────
+        log_pred = _surface.log_price(
+            _encode("district", district), _encode("building_type", building_type),
+            area_ping, property_age, floor, total_floors, has_parking, rooms,
+        )
+        price_per_ping = float(np.expm1(log_pred))
+        model_tag      = MODEL_SURFACE
+        shap_factors   = []
+    elif MODEL_PATH.exists():
+        # ── 正式模式：XGBoost 推論（單列快速路徑）───────────────
         _load()
-        now     = datetime.now()
-        year    = now.year
-        quarter = (now.month - 1) // 3 + 1
-
-        row = pd.DataFrame([{
-            "district":      _encode("district",      district),
-            "building_type": _encode("building_type", building_type),
-            "area_ping":     area_ping,
-            "property_age":  property_age,
-            "floor":         floor,
-            "total_floors":  total_floors,
-            "has_parking":   int(has_parking),
-            "rooms":         rooms,
-            "year":          year,
-            "quarter":       quarter,
-        }])[FEATURE_COLS]
-
-        log_pred       = float(_model.predict(row)[0])
+        if live_prediction is not None:
+            log_pred     = live_prediction.log_price
+            shap_factors = live_prediction.factors
+        else:
+            row = _fill_row(
+                _feature_row(), district, building_type, area_ping, property_age,
+                floor, total_floors, has_parking, rooms, *_year_quarter(),
+            )
+            log_pred = _predict_log_price(row)
+            # ── 原生樹貢獻解釋 ────────────────────────────────────
+            shap_factors = _live_factors(row)[0]
         price_per_ping = float(np.expm1(log_pred))
-
-        # ── SHAP 解釋（若可用）──────────────────────────────────
-        shap_factors = _shap_factors_live(row)
     else:
         # ── Demo 模式：行政區查表 ────────────────────────────────
         price_per_ping = _demo_price_per_ping(district, building_type, property_age, floor)
@@ -214,7 +523,32 @@ def valuate_xgboost(
     estimated_value = price_per_ping * area_ping
 
     # Monte Carlo GBM 信心區間（Layer 4）
-    ci, risk_level = run_monte_carlo(spot_value=estimated_value)
+    ci, risk_level = run_monte_carlo(spot_value=estimated_value, engine=SERVICE_ENGINE)
+    term_structure = run_term_structure(
+        spot_value     = estimated_value,
+        maturity_years = term_years,
+        engine         = SERVICE_ENGINE,
+    )
+
+    return PropertyValuation(
+        estimated_value = estimated_value,
+        ci              = ci,
+        term_structure  = tuple(term_structure),
+        risk_level      = risk_level,
+        price_per_ping  = price_per_ping,
+        model           = model_tag,
+        shap_factors    = tuple(shap_factors),
+    )
+
+
+def apply_loan(
+    valuation: PropertyValuation,
+    loan_amount: float,
+    term_years: int | None = None,
+) -> dict:
+    """在物件估價上計算 LTV、高 LTV 風險升級與貸款期間 LTV 觸價機率，組成 valuate_xgboost 回應"""
+    ci = valuation.ci
+    risk_level = valuation.risk_level
 
     # LTV 計算
     ltv_ratio = loan_amount / ci.p50 if ci.p50 > 0 else 0.0
@@ -223,6 +557,14 @@ def valuate_xgboost(
     if ltv_ratio > 0.80 and risk_level == "低風險":
         risk_level = "中風險"
 
+    # 貸款期間 LTV 觸價機率
+    breach_probs = run_ltv_breach(
+        spot_values   = valuation.estimated_value,
+        loan_amounts  = loan_amount,
+        horizon_years = term_years or DEFAULT_BREACH_HORIZON_YEARS,
+        engine        = SERVICE_ENGINE,
+    )
+
     return {
         "estimated_value": round(ci.p50),
         "confidence_interval": {
@@ -230,37 +572,122 @@ def valuate_xgboost(
             "p50": round(ci.p50),
             "p95": round(ci.p95),
         },
+        "term_structure": [
+            {
+                "years":      point.years,
+                "p5":         round(point.p5),
+                "p50":        round(point.p50),
+                "p95":        round(point.p95),
+                "risk_level": point.risk_level,
+            }
+            for point in valuation.term_structure
+        ],
         "ltv_ratio":      round(ltv_ratio, 4),
+        "ltv_breach_probability": breach_probability_dict(breach_probs),
         "risk_level":     risk_level,
-        "price_per_ping": round(price_per_ping),
-        "model":          model_tag,
-        "shap_factors":   shap_factors,
+        "price_per_ping": round(valuation.price_per_ping),
+        "model":          valuation.model,
+        "shap_factors":   [dict(f) for f in valuation.shap_factors],
     }
 
 
-def explain_valuation_zh(
+def valuate_xgboost(
     district: str,
     building_type: str,
     area_ping: float,
     property_age: int,
     floor: int,
-    price_per_ping: float,
-    estimated_value: float,
-    ltv_ratio: float,
-    risk_level: str,
+    total_floors: int,
+    has_parking: bool,
+    rooms: int,
     loan_amount: float,
-    ollama_url: str = "http://127.0.0.1:11434",
-    model: str = "qwen2.5:14b",
-) -> str:
+    term_years: int | None = None,
+    live_prediction: LivePrediction | None = None,
+    model: str | None = None,
+) -> dict:
     """
-    呼叫本地 Ollama Qwen2.5 模型，以白話中文解釋 XGBoost 估價結果。
+    XGBoost 個別物件估價
+
+    物件估價（property_valuation）經 valuation_cache 快取，LTV 相關欄位每次依 loan_amount 重算；
+    live_prediction：微批次已完成的推論與解釋因子（提供時直接計算，不查快取）
+    model："xgboost" | "surface"（None → DEFAULT_MODEL；曲面不可用時改走即時推論）
 
     Returns:
-        str — 2-3 段白話說明（失敗時回傳空字串，不中斷主流程）
+        {
+            estimated_value: float,          # P50 估值（元）
+            confidence_interval: {p5, p50, p95},
+            term_structure: [{years, p5, p50, p95, risk_level}, ...],  # 1/3/5/10 年 + 到期
+            ltv_ratio: float,
+            ltv_breach_probability: {"80%": p, "90%": p},  # 貸款期間 LTV 觸價機率
+            risk_level: str,
+            price_per_ping: float,           # 估計單價（元/坪）
+            model: "xgboost" | "surface" | "demo"
+        }
     """
-    import json as _json
-    import urllib.request as _req
+    features = dict(
+        district      = district,
+        building_type = building_type,
+        area_ping     = area_ping,
+        property_age  = property_age,
+        floor         = floor,
+        total_floors  = total_floors,
+        has_parking   = has_parking,
+        rooms         = rooms,
+        term_years    = term_years,
+    )
+    if live_prediction is not None:
+        valuation = property_valuation(**features, live_prediction=live_prediction)
+    else:
+        resolved = resolve_model(model)
+        valuation = valuation_cache.get_or_compute(
+            valuation_cache_key(**features, model=resolved),
+            lambda: property_valuation(**features, model=resolved),
+        )
+    return apply_loan(valuation, loan_amount, term_years)
+
+
+# ─── Qwen2.5 白話解釋 ─────────────────────────────────────────────
+
+EXPLAIN_OPTIONS = {"temperature": 0.3, "num_predict": 350}
+
+# 提示詞版本（解釋快取鍵的一部分；修改 explanation_messages 的提示詞時遞增）
+EXPLAIN_PROMPT_VERSION = 1
+
+# 解釋請求共用的 Ollama 連線池（OLLAMA_* 環境變數，見 services/ollamaClient.py）
+ollama_client = OllamaClient.from_env()
+
+# 解釋快取：記憶體 LRU（EXPLAIN_CACHE_SIZE / EXPLAIN_CACHE_TTL_S，預設 1 天）
+# + 選用磁碟層（EXPLAIN_CACHE_DIR，服務重啟後保留）
+explanation_cache = ResultCache.from_env("xgboost-explanation", "EXPLAIN", maxsize=1024, ttl_seconds=86_400)
+explanation_store = DiskStore.from_env("xgboost-explanation", "EXPLAIN")
+explanation_generation_ms = Histogram(LATENCY_MS_BUCKETS)
+
+# 分層解釋（explain_with_fallback）：模式與 hedged 模式的 LLM 延遲預算
+EXPLAIN_MODE_HEDGED   = "hedged"
+EXPLAIN_MODE_LLM      = "llm"
+EXPLAIN_MODE_TEMPLATE = "template"
+EXPLAIN_SOURCE_LLM      = "llm"
+EXPLAIN_SOURCE_TEMPLATE = "template"
+EXPLAIN_MODE          = os.environ.get("EXPLAIN_MODE", EXPLAIN_MODE_HEDGED)
+EXPLAIN_LLM_BUDGET_MS = float(os.environ.get("EXPLAIN_LLM_BUDGET_MS", "1500"))
+
+# 超過延遲預算仍在背景生成的解釋（保留強參照）
+_background_explanations: set = set()
+
 
+def explanation_messages(
+    district: str,
+    building_type: str,
+    area_ping: float,
+    property_age: int,
+    floor: int,
+    price_per_ping: float,
+    estimated_value: float,
+    ltv_ratio: float,
+    risk_level: str,
+    loan_amount: float,
+) -> list[dict]:
+    """估價結果 → Ollama /api/chat 對話訊息"""
     prompt = f"""你是一位專業的不動產估價師，請用白話中文（2-3 段，共約 150 字）向銀行行員解釋以下估價結果，說明影響價格的主要因素，並評估貸款風險。
 
 物件資訊：
@@ -272,22 +699,170 @@ def explain_valuation_zh(
 - 風險評級：{risk_level}
 
 請直接輸出說明文字，不需標題或條列格式。"""
+    return [{"role": "user", "content": prompt}]
 
-    payload = _json.dumps({
-        "model": model,
-        "messages": [{"role": "user", "content": prompt}],
-        "stream": False,
-        "options": {"temperature": 0.3, "num_predict": 350},
-    }).encode()
 
+def explanation_cache_key(messages: list[dict], model: str) -> str:
+    """
+    內容定址的解釋快取鍵（SHA-256 十六進位）
+
+    鍵由提示詞版本、模型名稱、生成參數與渲染後的對話訊息組成；提示詞已將數值四捨五入至顯示精度，
+    顯示結果相同的輸入（例：30.04 與 30.0 坪）共用同一份解釋。修改提示詞時請遞增 EXPLAIN_PROMPT_VERSION。
+    """
+    payload = json.dumps(
+        {"version": EXPLAIN_PROMPT_VERSION, "model": model, "options": EXPLAIN_OPTIONS, "messages": messages},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def explanation_cache_stats() -> dict:
+    """解釋快取指標：記憶體層（命中 / 未命中 / 合併等待）、磁碟層、實際生成耗時（ms）"""
+    return {
+        "memory":        explanation_cache.stats(),
+        "disk":          explanation_store.stats(),
+        "generation_ms": explanation_generation_ms.snapshot(),
+    }
+
+
+def _cached_explanation(key: str) -> str | None:
+    """記憶體層 → 磁碟層（磁碟命中時回填記憶體層）"""
+    content = explanation_cache.get(key)
+    if content is None:
+        content = explanation_store.get(key)
+        if content is not None:
+            explanation_cache.put(key, content)
+    return content
+
+
+def _store_explanation(key: str, content: str) -> None:
+    explanation_cache.put(key, content)
+    explanation_store.put(key, content)
+
+
+async def _llm_explanation(client: OllamaClient | None, model: str | None, **result) -> str:
+    """快取 / single-flight 包裝的 LLM 生成（失敗時拋出 OllamaError，不寫入快取）"""
+    client   = client or ollama_client
+    model    = model or client.model
+    messages = explanation_messages(**result)
+    key      = explanation_cache_key(messages, model)
+
+    async def generate() -> str:
+        stored = await asyncio.to_thread(explanation_store.get, key)
+        if stored is not None:
+            return stored
+        start = time.perf_counter()
+        content = (await client.chat(messages, EXPLAIN_OPTIONS, model=model)).strip()
+        explanation_generation_ms.observe((time.perf_counter() - start) * 1000)
+        if not content:
+            raise OllamaError("Ollama 回覆為空白")
+        await asyncio.to_thread(explanation_store.put, key, content)
+        return content
+
+    return await explanation_cache.aget_or_compute(key, generate)
+
+
+async def explain_valuation_zh(
+    client: OllamaClient | None = None,
+    model: str | None = None,
+    **result,
+) -> str:
+    """
+    呼叫本地 Ollama Qwen2.5 模型，以白話中文解釋 XGBoost 估價結果。
+
+    同一內容的解釋經 explanation_cache（記憶體 LRU）/ explanation_store（選用磁碟層）快取，
+    並行的相同請求共用同一次生成；生成失敗不寫入快取。
+
+    Args:
+        client: Ollama 客戶端（None → 模組共用的 ollama_client 連線池）
+        model:  模型名稱（None → OLLAMA_MODEL）
+        result: explanation_messages 的估價欄位
+
+    Returns:
+        str — 2-3 段白話說明（失敗時回傳空字串，不中斷主流程）
+    """
     try:
-        req = _req.Request(
-            f"{ollama_url}/api/chat",
-            data=payload,
-            headers={"Content-Type": "application/json"},
-        )
-        with _req.urlopen(req, timeout=45) as resp:
-            result = _json.loads(resp.read())
-            return result.get("message", {}).get("content", "").strip()
-    except Exception:
+        return await _llm_explanation(client, model, **result)
+    except OllamaError:
         return ""
+
+
+def template_explanation(shap_factors: list[dict] | None = None, **result) -> str:
+    """模板解釋（未提供影響因子時以 Demo 規則近似因子補上）"""
+    if not shap_factors:
+        shap_factors = _shap_factors_demo(result["property_age"], result["floor"], result["district"])
+    return template_explanation_zh(**result, shap_factors=shap_factors)
+
+
+async def explain_with_fallback(
+    mode: str | None = None,
+    budget_ms: float | None = None,
+    shap_factors: list[dict] | None = None,
+    client: OllamaClient | None = None,
+    model: str | None = None,
+    **result,
+) -> dict:
+    """
+    分層解釋：LLM 於延遲預算內完成則回傳 LLM 說明，否則回傳模板說明
+
+    Args:
+        mode:         hedged / llm / template（None → EXPLAIN_MODE）
+                      hedged   等待 LLM 至多 budget_ms，逾時回傳模板，LLM 於背景繼續生成並寫入快取
+                      llm      等待 LLM 至 Ollama 逾時，失敗才回傳模板
+                      template 直接回傳模板（不呼叫 LLM）
+        budget_ms:    hedged 模式的 LLM 延遲預算（None → EXPLAIN_LLM_BUDGET_MS；0 = 立即回傳模板並於背景預先生成）
+        shap_factors: 估價回應的前三大影響因子（模板使用）
+
+    Returns:
+        {"explanation": str, "source": "llm" | "template"}
+    """
+    mode = mode or EXPLAIN_MODE
+    if mode != EXPLAIN_MODE_TEMPLATE:
+        task = asyncio.ensure_future(_llm_explanation(client, model, **result))
+        timeout = None if mode == EXPLAIN_MODE_LLM else (EXPLAIN_LLM_BUDGET_MS if budget_ms is None else budget_ms) / 1000
+        await asyncio.wait({task}, timeout=timeout)
+        if task.done():
+            if task.exception() is None:
+                return {"explanation": task.result(), "source": EXPLAIN_SOURCE_LLM}
+        else:
+            # 預算內未完成：生成繼續進行並寫入快取（同一案件下次開啟即為 LLM 說明）
+            _background_explanations.add(task)
+            task.add_done_callback(_discard_background_explanation)
+    return {"explanation": template_explanation(shap_factors, **result), "source": EXPLAIN_SOURCE_TEMPLATE}
+
+
+def _discard_background_explanation(task: asyncio.Task) -> None:
+    _background_explanations.discard(task)
+    if not task.cancelled():
+        task.exception()   # 失敗已計入 ollama_client 指標，此處僅避免未取用例外的警告
+
+
+async def stream_explanation_zh(
+    client: OllamaClient | None = None,
+    model: str | None = None,
+    **result,
+) -> AsyncIterator[str]:
+    """
+    explain_valuation_zh 的串流版：逐一產出 token 文字片段（失敗時拋出 OllamaError，由呼叫端決定如何呈現）
+
+    快取命中時一次產出完整說明；未命中時串流生成，完整結束後寫入快取（串流之間不合併）。
+    """
+    client   = client or ollama_client
+    model    = model or client.model
+    messages = explanation_messages(**result)
+    key      = explanation_cache_key(messages, model)
+
+    cached = await asyncio.to_thread(_cached_explanation, key)
+    if cached is not None:
+        yield cached
+        return
+
+    tokens = []
+    start = time.perf_counter()
+    async for token in client.stream_chat(messages, EXPLAIN_OPTIONS, model=model):
+        tokens.append(token)
+        yield token
+    explanation_generation_ms.observe((time.perf_counter() - start) * 1000)
+    content = "".join(tokens).strip()
+    if content:
+        await asyncio.to_thread(_store_explanation, key, content)
@@ -1,6 +1,7 @@
 """
 測試 core/app.py — FastAPI 路由端點
-涵蓋：GET /health 健康檢查、POST /valuate 鑑價 API
+涵蓋：GET /health 健康檢查、GET /ready 啟動預熱就緒、GET /metrics 指標（含執行器佇列）、滿載 429、POST /valuate 鑑價 API、POST /valuate/batch 批次鑑價、
+      POST /valuate/stress 壓力網格、POST /valuate/xgboost/explain(/stream) 白話解釋（Ollama 替身伺服器、模板備援）
 """
 
 import pytest
@@ -43,6 +44,297 @@ class TestHealthEndpoint:
         assert data["port"] == 8001
 
 
+# ─────────────────────────────────────────────────────────────────
+class TestReadyEndpoint:
+    def test_not_ready_before_startup(self):
+        from src.main.python.core.app import readiness
+        readiness.reset()
+        assert client.get("/ready").status_code == 503
+
+    def test_ready_after_lifespan_warmup(self):
+        import time
+        from src.main.python.core.app import _EXECUTORS
+        try:
+            with TestClient(app) as live:
+                deadline = time.monotonic() + 60
+                res = live.get("/ready")
+                while res.status_code != 200 and time.monotonic() < deadline:
+                    assert res.json()["error"] is None
+                    time.sleep(0.05)
+                    res = live.get("/ready")
+                data = res.json()
+                assert res.status_code == 200
+                assert data["ready"] is True
+                for phase in ("preload_models", "warmup_valuate", "warmup_batch",
+                              "warmup_stress", "warmup_xgboost"):
+                    assert phase in data["phases_ms"]
+                assert live.get("/health").status_code == 200
+        finally:
+            # lifespan 結束會關閉執行器；讓模組層級 client 的後續測試可繼續使用
+            for executor in _EXECUTORS:
+                executor.reopen()
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestMetricsEndpoint:
+    def test_metrics_returns_200(self):
+        res = client.get("/metrics")
+        assert res.status_code == 200
+
+    def test_metrics_has_monte_carlo_cache_counters(self):
+        data = client.get("/metrics").json()
+        for key in ("hits", "misses", "size", "maxsize"):
+            assert key in data["monte_carlo_cache"]
+
+    def test_metrics_has_executor_queue_stats(self):
+        client.post("/valuate", json=VALID_PAYLOAD)
+        data = client.get("/metrics").json()
+        for name in ("cpu", "io"):
+            stats = data["executors"][name]
+            for key in ("in_flight", "queue_depth", "capacity", "rejected", "wait_seconds"):
+                assert key in stats
+        assert data["executors"]["cpu"]["completed"] >= 1
+
+
+# ─────────────────────────────────────────────────────────────────
+class _LiveXGBoostRequests:
+    """/valuate/xgboost 正式模式共用設定（需模型檔；每個測試前清空估價快取）"""
+
+    PAYLOAD = {
+        "district": "大安區", "building_type": "大樓", "area_ping": 30.0, "property_age": 10,
+        "floor": 8, "total_floors": 12, "has_parking": False, "loan_amount": 8_000_000.0,
+    }
+
+    @pytest.fixture(autouse=True)
+    def live_model(self):
+        from src.main.python.services import xgboostValuationService as xgb_service
+        if not xgb_service.MODEL_PATH.exists():
+            pytest.skip("模型檔不存在，/valuate/xgboost 走 Demo 模式")
+        xgb_service.valuation_cache.clear()
+        return xgb_service
+
+    @staticmethod
+    def _post_concurrently(payloads):
+        import asyncio
+        import httpx
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+                return await asyncio.gather(*(ac.post("/valuate/xgboost", json=p) for p in payloads))
+
+        return asyncio.run(scenario())
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestXGBoostMicroBatching(_LiveXGBoostRequests):
+    def test_concurrent_requests_share_batches(self, live_model):
+        from src.main.python.core.app import xgboost_batcher
+        payloads = [{**self.PAYLOAD, "area_ping": 30.0 + i} for i in range(8)]
+        before = xgboost_batcher.stats()
+
+        responses = self._post_concurrently(payloads)
+        assert all(r.status_code == 200 for r in responses)
+        for payload, res in zip(payloads, responses):
+            features = {k: v for k, v in payload.items() if k != "loan_amount"}
+            expected = live_model.apply_loan(
+                live_model.property_valuation(**features, rooms=3), payload["loan_amount"],
+            )
+            assert res.json()["estimated_value"] == expected["estimated_value"]
+        after = xgboost_batcher.stats()
+        assert after["items"] - before["items"] == 8
+        assert after["batches"] - before["batches"] < 8
+        assert "micro_batchers" in client.get("/metrics").json()
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestXGBoostValuationCache(_LiveXGBoostRequests):
+    def test_loan_change_reuses_property_valuation(self, live_model):
+        first  = client.post("/valuate/xgboost", json=self.PAYLOAD).json()
+        second = client.post("/valuate/xgboost", json={**self.PAYLOAD, "loan_amount": 16_000_000.0}).json()
+        stats = live_model.valuation_cache.stats()
+        assert (stats["misses"], stats["hits"]) == (1, 1)
+        assert second["estimated_value"] == first["estimated_value"]
+        assert second["shap_factors"] == first["shap_factors"]
+        assert second["ltv_ratio"] == pytest.approx(2 * first["ltv_ratio"], abs=2e-4)
+
+    def test_concurrent_identical_misses_are_coalesced(self, live_model):
+        from src.main.python.core.app import xgboost_batcher
+        before = xgboost_batcher.stats()
+        responses = self._post_concurrently([self.PAYLOAD] * 8)
+        assert len({r.json()["estimated_value"] for r in responses}) == 1
+        stats = live_model.valuation_cache.stats()
+        assert (stats["misses"], stats["coalesced"]) == (1, 7)
+        assert xgboost_batcher.stats()["items"] - before["items"] == 1
+        assert client.get("/metrics").json()["xgboost_valuation_cache"]["size"] == 1
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestXGBoostSurfaceMode(_LiveXGBoostRequests):
+    def test_surface_request_reports_mode_used(self, live_model):
+        from src.main.python.core.app import xgboost_batcher
+        before = xgboost_batcher.stats()["items"]
+        res = client.post("/valuate/xgboost", json={**self.PAYLOAD, "model": "surface"})
+        assert res.status_code == 200
+        surface = client.get("/metrics").json()["xgboost_surface"]
+        # 曲面可用 → 查表且不經微批次；否則退回即時推論
+        assert res.json()["model"] == ("surface" if surface["available"] else "xgboost")
+        assert xgboost_batcher.stats()["items"] - before == (0 if surface["available"] else 1)
+
+    def test_unknown_model_is_rejected(self):
+        res = client.post("/valuate/xgboost", json={**self.PAYLOAD, "model": "lstm"})
+        assert res.status_code == 422
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestXGBoostExplain:
+    PAYLOAD = {
+        "district": "大安區", "building_type": "大樓", "area_ping": 30.0, "property_age": 10, "floor": 8,
+        "price_per_ping": 950_000.0, "estimated_value": 28_500_000.0, "ltv_ratio": 0.28,
+        "risk_level": "低風險", "loan_amount": 8_000_000.0,
+    }
+
+    @pytest.fixture
+    def ollama(self, monkeypatch):
+        """以替身伺服器取代 Ollama（scripts/ollama_stub.py）"""
+        from contextlib import ExitStack
+        from src.main.python.scripts.ollama_stub import serve_in_thread
+        from src.main.python.services import xgboostValuationService as xgb_service
+        from src.main.python.services.ollamaClient import OllamaClient
+
+        xgb_service.explanation_cache.clear()
+        with ExitStack() as servers:
+            def use(**stub_kwargs):
+                base_url, _ = servers.enter_context(serve_in_thread(**stub_kwargs))
+                monkeypatch.setattr(xgb_service, "ollama_client", OllamaClient(base_url=base_url, timeout_s=2.0))
+
+            yield use
+
+    @staticmethod
+    def _events(body: str) -> list[tuple[str, dict]]:
+        import json
+        events = []
+        for block in body.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.split("\n"))
+            events.append((lines["event"], json.loads(lines["data"])))
+        return events
+
+    FACTORS = [
+        {"label": "行政區", "contribution": 0.52, "direction": "拉高"},
+        {"label": "屋齡", "contribution": -0.31, "direction": "拉低"},
+    ]
+
+    def test_explain_returns_reply(self, ollama):
+        from src.main.python.scripts.ollama_stub import REPLY
+        ollama()
+        res = client.post("/valuate/xgboost/explain", json=self.PAYLOAD)
+        assert res.status_code == 200
+        assert res.json() == {"explanation": REPLY, "source": "llm"}
+
+    def test_explain_without_ollama_returns_template(self, ollama):
+        ollama(fail_status=503)
+        res = client.post("/valuate/xgboost/explain", json={**self.PAYLOAD, "shap_factors": self.FACTORS})
+        assert res.status_code == 200
+        data = res.json()
+        assert data["source"] == "template"
+        assert "所在行政區行情較高" in data["explanation"] and "低風險" in data["explanation"]
+
+    def test_slow_llm_returns_template_within_budget(self, ollama, monkeypatch):
+        import time
+        from src.main.python.services import xgboostValuationService as xgb_service
+        ollama(first_token_ms=2000)
+        monkeypatch.setattr(xgb_service, "EXPLAIN_LLM_BUDGET_MS", 100.0)
+        start = time.perf_counter()
+        data = client.post("/valuate/xgboost/explain", json=self.PAYLOAD).json()
+        assert data["source"] == "template"
+        assert time.perf_counter() - start < 1.0
+
+    def test_template_mode_skips_llm(self, ollama):
+        from src.main.python.services import xgboostValuationService as xgb_service
+        ollama()
+        data = client.post("/valuate/xgboost/explain", json={**self.PAYLOAD, "mode": "template"}).json()
+        assert data["source"] == "template" and data["explanation"]
+        assert xgb_service.ollama_client.stats()["requests"] == 0
+
+    def test_stream_forwards_tokens_as_sse(self, ollama):
+        from src.main.python.scripts.ollama_stub import REPLY
+        ollama()
+        res = client.post("/valuate/xgboost/explain/stream", json=self.PAYLOAD)
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/event-stream")
+        events = self._events(res.text)
+        tokens = [data["text"] for event, data in events if event == "token"]
+        assert len(tokens) == len(REPLY)
+        assert "".join(tokens) == REPLY
+        assert events[-1] == ("done", {"explanation": REPLY, "source": "llm"})
+
+    def test_stream_timeout_emits_error_then_template_done(self, ollama):
+        from src.main.python.services import xgboostValuationService as xgb_service
+        ollama(token_ms=50)
+        xgb_service.ollama_client.timeout_s = 0.3
+        events = self._events(client.post("/valuate/xgboost/explain/stream", json=self.PAYLOAD).text)
+        kinds = [event for event, _ in events]
+        assert "token" in kinds
+        assert kinds[-2:] == ["error", "done"]
+        assert "逾時" in events[-2][1]["error"]
+        assert events[-1][1]["source"] == "template"
+        assert events[-1][1]["explanation"].startswith("此物件位於大安區")
+
+    def test_stream_template_mode(self, ollama):
+        ollama()
+        events = self._events(
+            client.post("/valuate/xgboost/explain/stream", json={**self.PAYLOAD, "mode": "template"}).text
+        )
+        assert [event for event, _ in events] == ["token", "done"]
+        assert events[0][1]["text"] == events[1][1]["explanation"]
+        assert events[1][1]["source"] == "template"
+
+    def test_metrics_include_ollama_client(self, ollama):
+        ollama()
+        client.post("/valuate/xgboost/explain/stream", json=self.PAYLOAD)
+        stats = client.get("/metrics").json()["ollama"]
+        assert stats["streams"] == 1
+        assert stats["first_token_ms"]["count"] == 1
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestBackpressure:
+    def test_saturated_executor_returns_429(self, monkeypatch):
+        from src.main.python.core import app as app_module
+        from src.main.python.core.executor import ExecutorSaturated
+
+        async def saturated(*args, **kwargs):
+            raise ExecutorSaturated("valuation-cpu", 2)
+
+        monkeypatch.setattr(app_module.cpu_executor, "run", saturated)
+        res = client.post("/valuate", json=VALID_PAYLOAD)
+        assert res.status_code == 429
+        assert res.headers["Retry-After"] == "2"
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestStressEndpoint:
+    def test_grid_shape_and_legend(self):
+        res = client.post("/valuate/stress", json={
+            "spot_values": [10_000_000, 20_000_000],
+            "mus": [-0.05, 0.0, 0.045],
+            "sigmas": [0.08, 0.16],
+        })
+        assert res.status_code == 200
+        data = res.json()
+        assert len(data["p50"]) == 2
+        assert len(data["p50"][0]) == 3
+        assert len(data["p50"][0][0]) == 2
+        assert data["risk_levels"] == ["低風險", "中風險", "高風險"]
+        assert data["p5"][0][0][0] <= data["p50"][0][0][0] <= data["p95"][0][0][0]
+
+    def test_non_positive_sigma_returns_422(self):
+        res = client.post("/valuate/stress", json={
+            "spot_values": [10_000_000], "mus": [0.0], "sigmas": [0.0],
+        })
+        assert res.status_code == 422
+
+
 # ─────────────────────────────────────────────────────────────────
 class TestValuateEndpoint:
     def test_valid_request_returns_200(self):
@@ -87,3 +379,34 @@ class TestValuateEndpoint:
         res_no = client.post("/valuate", json={**VALID_PAYLOAD, "has_parking": False})
         res_yes = client.post("/valuate", json={**VALID_PAYLOAD, "has_parking": True})
         assert res_yes.json()["estimated_value"] > res_no.json()["estimated_value"]
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestValuateBatchEndpoint:
+    def test_results_match_single_endpoint(self):
+        payloads = [VALID_PAYLOAD, {**VALID_PAYLOAD, "region": "高雄市", "term_years": 20}]
+        data = client.post("/valuate/batch", json=payloads).json()
+        assert data["succeeded"] == 2 and data["failed"] == 0
+        for payload, item in zip(payloads, data["results"]):
+            assert item["ok"] is True
+            assert item["result"] == client.post("/valuate", json=payload).json()
+
+    def test_invalid_item_does_not_fail_batch(self):
+        payloads = [VALID_PAYLOAD, {**VALID_PAYLOAD, "area_ping": -5}, {**VALID_PAYLOAD, "building_type": "城堡"}]
+        res = client.post("/valuate/batch", json=payloads)
+        assert res.status_code == 200
+        data = res.json()
+        assert data["succeeded"] == 1 and data["failed"] == 2
+        assert [item["index"] for item in data["results"]] == [0, 1, 2]
+        assert data["results"][0]["ok"] is True
+        assert "area_ping" in data["results"][1]["error"]
+        assert data["results"][2]["ok"] is False
+
+    def test_oversized_batch_returns_413(self):
+        from src.main.python.core.app import MAX_BATCH_SIZE
+        res = client.post("/valuate/batch", json=[VALID_PAYLOAD] * (MAX_BATCH_SIZE + 1))
+        assert res.status_code == 413
+
+    def test_empty_batch(self):
+        data = client.post("/valuate/batch", json=[]).json()
+        assert data == {"results": [], "succeeded": 0, "failed": 0}
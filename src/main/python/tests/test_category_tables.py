@@ -0,0 +1,74 @@
+"""
+測試 utils/category_tables.py
+涵蓋：編碼與 LabelEncoder.transform 一致、未知類別編碼與計數、整欄向量化與逐筆一致、
+      JSON 序列化往返、版本檢查、未知值追蹤上限
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.main.python.utils import category_tables
+from src.main.python.utils.category_tables import CategoryTables, UNKNOWN_CODE
+
+
+def make_tables() -> CategoryTables:
+    return CategoryTables({"district": ["中山區", "信義區", "大安區"], "building_type": ["公寓", "大樓"]})
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestEncode:
+    def test_matches_label_encoder(self):
+        preprocessing = pytest.importorskip("sklearn.preprocessing")
+        le = preprocessing.LabelEncoder().fit(["大安區", "信義區", "中山區", "信義區"])
+        tables = CategoryTables.from_label_encoders({"district": le})
+        for name in le.classes_:
+            assert tables.encode("district", name) == int(le.transform([name])[0])
+
+    def test_unknown_value_and_column(self):
+        tables = make_tables()
+        assert tables.encode("district", "火星區") == UNKNOWN_CODE
+        assert tables.encode("no_such_column", "x") == UNKNOWN_CODE
+        stats = tables.stats()["district"]
+        assert stats == {"classes": 3, "lookups": 1, "unknown": 1, "unknown_rate": 1.0, "top_unknown": {"火星區": 1}}
+
+    def test_column_matches_scalar(self):
+        rng = np.random.default_rng(0)
+        values = np.array(["中山區", "信義區", "大安區", "火星區", "月球區"], dtype=object)[rng.integers(0, 5, 500)]
+        scalar = make_tables()
+        vector = make_tables()
+        expected = [scalar.encode("district", v) for v in values]
+        np.testing.assert_array_equal(vector.encode_column("district", values), expected)
+        assert vector.stats() == scalar.stats()
+
+    def test_reset_stats(self):
+        tables = make_tables()
+        tables.encode_column("district", ["火星區"] * 3)
+        tables.reset_stats()
+        assert tables.stats()["district"]["lookups"] == 0
+        assert tables.stats()["district"]["top_unknown"] == {}
+
+    def test_tracked_unknown_values_are_bounded(self, monkeypatch):
+        monkeypatch.setattr(category_tables, "MAX_TRACKED_UNKNOWN", 2)
+        tables = make_tables()
+        tables.encode_column("district", ["a", "b", "c", "a"])
+        stats = tables.stats()["district"]
+        assert stats["unknown"] == 4
+        assert stats["top_unknown"] == {"a": 2, "b": 1}
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestSerialization:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "tables.json"
+        make_tables().save(path)
+        loaded = CategoryTables.load(path)
+        assert loaded.classes == make_tables().classes
+        assert loaded.encode("district", "大安區") == 2
+
+    def test_rejects_unknown_version(self, tmp_path):
+        path = tmp_path / "tables.json"
+        path.write_text(json.dumps({"version": 99, "columns": {}}), encoding="utf-8")
+        with pytest.raises(ValueError):
+            CategoryTables.load(path)
@@ -0,0 +1,71 @@
+"""
+測試 inference/chunked_monte_carlo.py
+涵蓋：與對數常態封閉解一致、誤差界、確定性、分塊數、峰值記憶體與路徑數無關
+"""
+
+import tracemalloc
+
+import pytest
+
+from src.main.python.inference.chunked_monte_carlo import (
+    run_monte_carlo_chunked,
+    ChunkedMonteCarloResult,
+)
+from src.main.python.inference.monte_carlo import _analytic_multipliers
+
+
+def _peak_mb(**kwargs) -> float:
+    tracemalloc.start()
+    run_monte_carlo_chunked(10_000_000, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRunMonteCarloChunked:
+    def test_returns_result_dataclass(self):
+        res = run_monte_carlo_chunked(10_000_000, n_paths=20_000, horizon_years=5)
+        assert isinstance(res, ChunkedMonteCarloResult)
+        ci = res.confidence_interval
+        assert ci.p5 < ci.p50 < ci.p95
+
+    def test_agrees_with_closed_form_at_30_years(self):
+        res = run_monte_carlo_chunked(10_000_000, n_paths=200_000, horizon_years=30)
+        m5, m50, m95 = _analytic_multipliers(0.045, 0.08, 30.0)
+        ci = res.confidence_interval
+        for est, exact in [(ci.p5, m5), (ci.p50, m50), (ci.p95, m95)]:
+            assert abs(est / (10_000_000 * exact) - 1) < 0.02
+
+    def test_error_bounds_bracket_estimates(self):
+        res = run_monte_carlo_chunked(10_000_000, n_paths=50_000, horizon_years=10)
+        ci = res.confidence_interval
+        for key, est in [("p5", ci.p5), ("p50", ci.p50), ("p95", ci.p95)]:
+            lo, hi = res.error_bounds[key]
+            assert lo <= est <= hi
+            assert 0 < res.rank_errors[key] < 0.05
+
+    def test_deterministic_with_same_seed(self):
+        a = run_monte_carlo_chunked(10_000_000, n_paths=30_000, horizon_years=5, seed=7)
+        b = run_monte_carlo_chunked(10_000_000, n_paths=30_000, horizon_years=5, seed=7)
+        assert a.confidence_interval == b.confidence_interval
+
+    def test_chunk_and_step_counts(self):
+        res = run_monte_carlo_chunked(
+            10_000_000, n_paths=10_001, chunk_paths=2_500, horizon_years=2, steps_per_year=12,
+        )
+        assert res.n_chunks == 5
+        assert res.n_steps == 24
+
+    def test_long_horizon_is_high_risk(self):
+        res = run_monte_carlo_chunked(10_000_000, n_paths=20_000, horizon_years=30)
+        assert res.risk_level == "高風險"
+
+    def test_peak_memory_flat_in_path_count(self):
+        small = _peak_mb(n_paths=50_000, horizon_years=10)
+        large = _peak_mb(n_paths=400_000, horizon_years=10)
+        assert large < small * 1.5 + 1.0
+
+    def test_invalid_chunk_size_raises(self):
+        with pytest.raises(ValueError):
+            run_monte_carlo_chunked(10_000_000, chunk_paths=0)
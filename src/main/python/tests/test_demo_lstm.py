@@ -1,11 +1,12 @@
 """
 測試 inference/demo_lstm.py
-涵蓋：地區成長率字典、LSTM 市場指數計算、估值調整比例
+涵蓋：地區成長率字典、LSTM 市場指數計算、估值調整比例、批次版本與逐筆一致
 """
 
 import pytest
 from src.main.python.inference.demo_lstm import (
     run_demo_lstm,
+    run_demo_lstm_batch,
     REGION_ANNUAL_GROWTH,
     BASE_INDEX,
     YEARS_ELAPSED,
@@ -92,3 +93,17 @@ class TestRunDemoLstm:
     def test_scale_factor_reasonable(self):
         # 縮放因子應在合理範圍（避免過度偏移）
         assert 0.0 < SCALE_FACTOR <= 1.0
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRunDemoLstmBatch:
+    def test_matches_scalar_for_every_region(self):
+        regions = list(REGION_ANNUAL_GROWTH) + ["未知縣市"]
+        base_values = [10_000_000.0 + 123_457.0 * i for i in range(len(regions))]
+        values, indices = run_demo_lstm_batch(regions, base_values)
+        for region, base, v, idx in zip(regions, base_values, values, indices):
+            assert (v, idx) == run_demo_lstm(region, base)
+
+    def test_empty_input(self):
+        values, indices = run_demo_lstm_batch([], [])
+        assert values.size == 0 and indices.size == 0
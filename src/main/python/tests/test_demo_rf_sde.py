@@ -1,12 +1,15 @@
 """
 測試 inference/demo_rf_sde.py
-涵蓋：屋齡情緒修正邊界、建物需求係數、RF+SDE 情緒分數、估值調整邏輯
+涵蓋：屋齡情緒修正邊界、建物需求係數、RF+SDE 情緒分數、估值調整邏輯、批次版本與逐筆一致（共用門檻常數）
 """
 
 import pytest
+from src.main.python.inference import demo_rf_sde
 from src.main.python.inference.demo_rf_sde import (
     age_sentiment_factor,
     run_demo_rf_sde,
+    run_demo_rf_sde_batch,
+    sentiment_adjustment,
     BUILDING_DEMAND_FACTOR,
 )
 
@@ -117,3 +120,42 @@ class TestRunDemoRfSde:
         # 即使累計因子小於 -1.0，情緒分數應被 clip
         _, score = run_demo_rf_sde("連江縣", "透天", 80, 10_000_000)
         assert score >= -1.0
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRunDemoRfSdeBatch:
+    def test_matches_scalar_across_grid(self):
+        from src.main.python.inference.demo_lstm import REGION_ANNUAL_GROWTH
+        regions, types, ages = [], [], []
+        for region in list(REGION_ANNUAL_GROWTH) + ["未知縣市"]:
+            for btype in list(BUILDING_DEMAND_FACTOR) + ["未知"]:
+                for age in (0, 5, 6, 15, 16, 30, 31, 80):
+                    regions.append(region)
+                    types.append(btype)
+                    ages.append(age)
+        lstm_values = [9_876_543.0] * len(regions)
+        values, scores = run_demo_rf_sde_batch(regions, types, ages, lstm_values)
+        for i in range(len(regions)):
+            assert (values[i], scores[i]) == run_demo_rf_sde(regions[i], types[i], ages[i], lstm_values[i])
+
+    def test_shared_constants_drive_both_paths(self, monkeypatch):
+        # 修改門檻 / 係數常數後，逐筆與批次版本同步改變
+        monkeypatch.setattr(demo_rf_sde, "AGE_SENTIMENT_BREAKS", (2, 50))
+        monkeypatch.setattr(demo_rf_sde, "AGE_SENTIMENT_FACTORS", (0.5, 0.0, -0.5))
+        monkeypatch.setattr(demo_rf_sde, "SENTIMENT_BULLISH", 0.3)
+        monkeypatch.setattr(demo_rf_sde, "BULLISH_ADJUSTMENT", 1.10)
+        ages = [0, 2, 3, 50, 51]
+        values, scores = run_demo_rf_sde_batch(["台北市"] * 5, ["大樓"] * 5, ages, [1_000_000.0] * 5)
+        assert [age_sentiment_factor(a) for a in ages] == [0.5, 0.5, 0.0, 0.0, -0.5]
+        assert values[0] == 1_100_000.0
+        for i, age in enumerate(ages):
+            assert (values[i], scores[i]) == run_demo_rf_sde("台北市", "大樓", age, 1_000_000.0)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestSentimentAdjustment:
+    @pytest.mark.parametrize("score,expected", [
+        (0.16, 1.03), (0.15, 1.00), (0.0, 1.00), (-0.15, 1.00), (-0.16, 0.95),
+    ])
+    def test_thresholds(self, score, expected):
+        assert sentiment_adjustment(score) == expected
@@ -0,0 +1,57 @@
+"""
+測試 core/disk_store.py — 內容定址 JSON 檔案快取
+"""
+
+import json
+
+from src.main.python.core.disk_store import DiskStore
+
+KEY = "ab" + "0" * 62
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestDiskStore:
+    def test_roundtrip(self, tmp_path):
+        store = DiskStore("t", tmp_path)
+        store.put(KEY, "白話說明")
+        assert (tmp_path / "ab" / f"{KEY}.json").exists()
+        assert store.get(KEY) == "白話說明"
+        assert store.stats()["writes"] == 1 and store.stats()["hits"] == 1
+
+    def test_survives_new_instance(self, tmp_path):
+        DiskStore("t", tmp_path).put(KEY, {"a": 1})
+        assert DiskStore("t", tmp_path).get(KEY) == {"a": 1}
+
+    def test_missing_key(self, tmp_path):
+        store = DiskStore("t", tmp_path)
+        assert store.get(KEY) is None
+        assert store.stats()["misses"] == 1
+
+    def test_expired_entry(self, tmp_path):
+        store = DiskStore("t", tmp_path, ttl_seconds=60)
+        store.put(KEY, "x")
+        path = tmp_path / "ab" / f"{KEY}.json"
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        entry["created_at"] -= 120
+        path.write_text(json.dumps(entry), encoding="utf-8")
+        assert store.get(KEY) is None
+        assert store.stats()["expired"] == 1
+
+    def test_corrupt_file_is_a_miss(self, tmp_path):
+        store = DiskStore("t", tmp_path)
+        (tmp_path / "ab").mkdir()
+        (tmp_path / "ab" / f"{KEY}.json").write_text("{not json", encoding="utf-8")
+        assert store.get(KEY) is None
+        assert store.stats()["errors"] == 1
+
+    def test_disabled_without_directory(self):
+        store = DiskStore("t")
+        store.put(KEY, "x")
+        assert store.get(KEY) is None
+        assert store.stats()["enabled"] is False and store.stats()["writes"] == 0
+
+    def test_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("DEMO_CACHE_DIR", str(tmp_path))
+        monkeypatch.setenv("DEMO_CACHE_DISK_TTL_S", "10")
+        store = DiskStore.from_env("demo", "DEMO")
+        assert store.enabled and store.directory == tmp_path and store.ttl_seconds == 10.0
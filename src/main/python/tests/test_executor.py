@@ -0,0 +1,130 @@
+"""
+測試 core/executor.py
+涵蓋：thread / process 執行、例外重拋、在途上限拒絕與 Retry-After、關閉 / 重新開啟、
+      佇列深度與等待時間指標、環境變數設定、HTTP 429 / 503 對應
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.main.python.core.executor import (
+    OffloadExecutor,
+    ExecutorSaturated,
+    ExecutorUnavailable,
+    BACKEND_PROCESS,
+    install_backpressure_handlers,
+)
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+def fail(message: str):
+    raise KeyError(message)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRun:
+    def test_thread_backend_returns_result(self):
+        ex = OffloadExecutor("t", max_workers=2)
+        assert asyncio.run(ex.run(square, 7)) == 49
+        ex.shutdown()
+
+    def test_process_backend_returns_result(self):
+        ex = OffloadExecutor("p", backend=BACKEND_PROCESS, max_workers=1)
+        assert asyncio.run(ex.run(square, 9)) == 81
+        ex.shutdown()
+
+    def test_exception_is_reraised_and_counted(self):
+        ex = OffloadExecutor("t", max_workers=1)
+        with pytest.raises(KeyError):
+            asyncio.run(ex.run(fail, "boom"))
+        stats = ex.stats()
+        assert stats["failed"] == 1
+        assert stats["in_flight"] == 0
+        ex.shutdown()
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError):
+            OffloadExecutor("x", backend="gpu")
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestBackpressure:
+    def test_rejects_when_capacity_reached(self):
+        ex = OffloadExecutor("t", max_workers=1, max_queue=1)
+        gate = threading.Event()
+
+        async def scenario():
+            first  = asyncio.ensure_future(ex.run(gate.wait, 5))
+            second = asyncio.ensure_future(ex.run(gate.wait, 5))
+            await asyncio.sleep(0.05)
+            assert ex.stats()["queue_depth"] == 1
+            with pytest.raises(ExecutorSaturated) as info:
+                await ex.run(square, 1)
+            assert info.value.retry_after >= 1
+            gate.set()
+            await asyncio.gather(first, second)
+
+        asyncio.run(scenario())
+        stats = ex.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+        assert stats["in_flight"] == 0
+        assert stats["wait_seconds"]["samples"] == 2
+        assert stats["wait_seconds"]["max"] > 0
+        ex.shutdown()
+
+    def test_shutdown_then_reopen(self):
+        ex = OffloadExecutor("t", max_workers=1)
+        ex.shutdown()
+        with pytest.raises(ExecutorUnavailable):
+            asyncio.run(ex.run(square, 2))
+        ex.reopen()
+        assert asyncio.run(ex.run(square, 2)) == 4
+        ex.shutdown()
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestFromEnv:
+    def test_reads_prefixed_variables(self, monkeypatch):
+        monkeypatch.setenv("DEMO_EXECUTOR", "process")
+        monkeypatch.setenv("DEMO_WORKERS", "3")
+        monkeypatch.setenv("DEMO_MAX_QUEUE", "5")
+        ex = OffloadExecutor.from_env("demo", "DEMO")
+        assert (ex.backend, ex.max_workers, ex.capacity) == ("process", 3, 8)
+
+    def test_defaults_when_unset(self, monkeypatch):
+        monkeypatch.delenv("DEMO_EXECUTOR", raising=False)
+        monkeypatch.delenv("DEMO_WORKERS", raising=False)
+        monkeypatch.delenv("DEMO_MAX_QUEUE", raising=False)
+        ex = OffloadExecutor.from_env("demo", "DEMO", max_workers=2, max_queue=4)
+        assert (ex.backend, ex.capacity) == ("thread", 6)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestHttpMapping:
+    def make_client(self, exc: Exception) -> TestClient:
+        app = FastAPI()
+        install_backpressure_handlers(app)
+
+        @app.get("/work")
+        async def work():
+            raise exc
+
+        return TestClient(app)
+
+    def test_saturated_is_429_with_retry_after(self):
+        res = self.make_client(ExecutorSaturated("cpu", 3)).get("/work")
+        assert res.status_code == 429
+        assert res.headers["Retry-After"] == "3"
+
+    def test_unavailable_is_503_with_retry_after(self):
+        res = self.make_client(ExecutorUnavailable("cpu")).get("/work")
+        assert res.status_code == 503
+        assert "Retry-After" in res.headers
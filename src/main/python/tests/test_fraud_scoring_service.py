@@ -0,0 +1,174 @@
+"""
+測試 services/fraudScoringService.py
+涵蓋：Demo 模式評分、/health 不觸發模型載入、/metrics 執行器與微批次指標、
+      live 模式並行請求經微批次合併且分數與逐筆 predict_proba 一致、樹貢獻風險因子、
+      POST /score/batch（demo 欄運算與單筆一致、live 一次 predict_proba、單筆驗證失敗不影響整批）、
+      Demo 規則設定檔（改檔後自動套用新權重、/metrics 規則命中統計）
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main.python.services import fraudScoringService as svc
+
+client = TestClient(svc.app)
+
+FEATURES = dict(
+    age=30, occupation_code=2, monthly_income=5.0, credit_inquiry_count=1,
+    existing_bank_loans=0, has_real_estate=True, document_match=True,
+    lives_in_branch_county=True, has_salary_transfer=True,
+)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestDemoMode:
+    def test_score_demo(self):
+        res = client.post("/score", json=FEATURES)
+        assert res.status_code == 200
+        data = res.json()
+        assert data["mode"] == "demo"
+        assert data["risk_level"] == "low"
+
+    def test_health_does_not_load_model(self, monkeypatch):
+        monkeypatch.setattr(svc, "_try_load", lambda: pytest.fail("/health 不應載入模型"))
+        assert client.get("/health").status_code == 200
+
+    def test_metrics_has_executor_and_batcher(self):
+        data = client.get("/metrics").json()
+        assert "score" in data["executors"]
+        assert "batch_size" in data["micro_batchers"]["fraud"]
+
+
+@pytest.fixture
+def live_model(monkeypatch, tmp_path):
+    """以合成資料訓練的小型 XGBoost 模型取代 models/fraud_xgboost.json"""
+    xgb = pytest.importorskip("xgboost")
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, size=(200, len(svc.FEATURE_NAMES)))
+    y = (X[:, 3] > 5).astype(int)
+    model = xgb.XGBClassifier(n_estimators=10, max_depth=3).fit(X, y)
+    model_path = tmp_path / "fraud_xgboost.json"
+    model.save_model(str(model_path))
+    monkeypatch.setattr(svc, "MODEL_PATH", model_path)
+    monkeypatch.setattr(svc, "_model", model)
+    return model
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestLiveMicroBatching:
+    def test_concurrent_scores_are_batched_and_exact(self, live_model):
+        applicants = [svc.BorrowerFeatures(**{**FEATURES, "credit_inquiry_count": i}) for i in range(8)]
+        batcher = svc.fraud_batcher
+        before = batcher.stats()
+
+        async def scenario():
+            return await asyncio.gather(*(svc._score_async(a) for a in applicants))
+
+        results = asyncio.run(scenario())
+        expected = [round(float(live_model.predict_proba(svc._feature_vector(a)[None, :])[0, 1]), 4)
+                    for a in applicants]
+        assert [r.fraud_score for r in results] == expected
+        assert all(r.mode == "live" for r in results)
+        assert all(len(r.top_risk_factors) == 3 for r in results)
+        assert results[0].top_risk_factors[0]["feature"] == "credit_inquiry_count"
+        after = batcher.stats()
+        assert after["items"] - before["items"] == 8
+        assert after["batches"] - before["batches"] < 8
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestBatchEndpoint:
+    APPLICANTS = [
+        {**FEATURES, "credit_inquiry_count": i % 6, "occupation_code": i % 5, "document_match": i % 3 != 0,
+         "monthly_income": 2.0 + i * 0.5, "age": 20 + i * 3, "has_salary_transfer": i % 2 == 0}
+        for i in range(20)
+    ]
+
+    def test_demo_batch_matches_single_endpoint(self):
+        data = client.post("/score/batch", json=self.APPLICANTS).json()
+        assert data["succeeded"] == len(self.APPLICANTS) and data["failed"] == 0
+        for applicant, item in zip(self.APPLICANTS, data["results"]):
+            assert item["ok"] is True
+            assert item["result"] == client.post("/score", json=applicant).json()
+        assert {item["result"]["risk_level"] for item in data["results"]} >= {"low", "medium"}
+
+    def test_demo_factors_sorted_top3(self):
+        rows = svc._feature_matrix([svc.BorrowerFeatures(**{
+            **FEATURES, "document_match": False, "credit_inquiry_count": 5, "occupation_code": 0,
+            "has_salary_transfer": False,
+        })])
+        [result] = svc._demo_score_rows(rows)
+        assert [f["feature"] for f in result["top_risk_factors"]] == [
+            "document_match", "credit_inquiry_count", "occupation_code",
+        ]
+        assert result["fraud_score"] == round(0.35 + 0.25 + 0.15 + 0.08, 4)
+        assert result["risk_level"] == "high"
+
+    def test_invalid_item_does_not_fail_batch(self):
+        payloads = [FEATURES, {**FEATURES, "age": 10}, {**FEATURES, "monthly_income": "abc"}]
+        data = client.post("/score/batch", json=payloads).json()
+        assert data["succeeded"] == 1 and data["failed"] == 2
+        assert [item["index"] for item in data["results"]] == [0, 1, 2]
+        assert "age" in data["results"][1]["error"]
+
+    def test_oversized_batch_returns_413(self):
+        res = client.post("/score/batch", json=[FEATURES] * (svc.MAX_BATCH_SIZE + 1))
+        assert res.status_code == 413
+
+    def test_empty_batch(self):
+        assert client.post("/score/batch", json=[]).json() == {"results": [], "succeeded": 0, "failed": 0}
+
+    def test_live_batch_is_one_predict_proba(self, live_model, monkeypatch):
+        calls = []
+        original = live_model.predict_proba
+        monkeypatch.setattr(live_model, "predict_proba", lambda X: calls.append(len(X)) or original(X))
+        data = client.post("/score/batch", json=self.APPLICANTS).json()
+        assert calls == [len(self.APPLICANTS)]
+        applicants = [svc.BorrowerFeatures(**a) for a in self.APPLICANTS]
+        expected = original(svc._feature_matrix(applicants))[:, 1]
+        for item, p in zip(data["results"], expected):
+            assert item["result"]["mode"] == "live"
+            assert item["result"]["fraud_score"] == round(float(p), 4)
+            assert len(item["result"]["top_risk_factors"]) == 3
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRuleConfig:
+    @pytest.fixture
+    def rules_file(self, monkeypatch, tmp_path):
+        """以暫存複本取代內建規則檔（每次評分都檢查變更）"""
+        path = tmp_path / "fraud_rules.json"
+        path.write_text(svc.RULES_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+        monkeypatch.setattr(svc, "rule_engine", svc.RuleEngine(path, svc.FEATURE_NAMES, reload_interval_s=0))
+        return path
+
+    def test_bundled_rules_cover_features(self):
+        assert set(svc.rule_engine.current().keys) == set(svc.FEATURE_NAMES)
+
+    def test_weight_change_applies_without_restart(self, rules_file):
+        applicant = {**FEATURES, "document_match": False}
+        before = client.post("/score", json=applicant).json()
+
+        config = json.loads(rules_file.read_text(encoding="utf-8"))
+        config["version"] = "tuned"
+        config["rules"][0]["weight"] = 0.55
+        rules_file.write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+        svc.rule_engine.reload()
+
+        after = client.post("/score", json=applicant).json()
+        assert after["fraud_score"] == round(before["fraud_score"] + 0.20, 4)
+        assert after["top_risk_factors"][0] == {
+            "feature": "document_match", "label": "證件比對不一致", "contribution": 0.55,
+        }
+        assert client.get("/metrics").json()["rules"]["version"] == "tuned"
+
+    def test_metrics_report_rule_hits(self, rules_file):
+        client.post("/score/batch", json=[FEATURES, {**FEATURES, "document_match": False}])
+        rules = client.get("/metrics").json()["rules"]
+        assert rules["rows"] == 2
+        assert rules["rules"]["document_match"]["hits"] == 1
+        assert rules["reload_errors"] == 0
@@ -0,0 +1,91 @@
+"""
+測試 inference/ltv_breach.py
+涵蓋：解析引擎與模擬引擎一致、Brownian bridge 修正優於僅離散觀察、
+      初始 LTV 已超標即觸價、跨物件向量化與逐筆一致、門檻單調性、可重現性、API 格式
+"""
+
+import numpy as np
+import pytest
+
+from src.main.python.inference.ltv_breach import (
+    run_ltv_breach,
+    breach_probability_dict,
+    DEFAULT_LTV_THRESHOLDS,
+)
+from src.main.python.inference.monte_carlo import ENGINE_ANALYTIC
+
+SPOT = 10_000_000
+
+# (loan, mu, sigma) — 涵蓋低 / 中 / 高觸價機率
+CASES = [
+    (7_000_000, 0.045, 0.08),
+    (7_000_000, 0.000, 0.15),
+    (5_000_000, -0.02, 0.20),
+]
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestAnalyticEngine:
+    def test_shape_and_range(self):
+        probs = run_ltv_breach(SPOT, 7_000_000, engine=ENGINE_ANALYTIC)
+        assert probs.shape == (1, len(DEFAULT_LTV_THRESHOLDS))
+        assert np.all((probs >= 0.0) & (probs <= 1.0))
+
+    def test_higher_threshold_less_likely(self):
+        p80, p90 = run_ltv_breach(SPOT, 7_000_000, sigmas=0.15, engine=ENGINE_ANALYTIC)[0]
+        assert p90 <= p80
+
+    def test_initial_ltv_above_threshold_is_certain(self):
+        p80, p90 = run_ltv_breach(SPOT, 8_500_000, engine=ENGINE_ANALYTIC)[0]
+        assert p80 == 1.0
+        assert p90 < 1.0
+
+    def test_negligible_volatility_never_breaches(self):
+        probs = run_ltv_breach(SPOT, 1_000_000, sigmas=0.001, engine=ENGINE_ANALYTIC)
+        assert np.all(probs == 0.0)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestSimulatedEngine:
+    @pytest.mark.parametrize("loan,mu,sigma", CASES)
+    def test_bridge_matches_closed_form(self, loan, mu, sigma):
+        exact = run_ltv_breach(SPOT, loan, mu, sigma, engine=ENGINE_ANALYTIC)
+        sim   = run_ltv_breach(SPOT, loan, mu, sigma, n_paths=4000)
+        np.testing.assert_allclose(sim, exact, atol=0.02)
+
+    def test_bridge_correction_beats_discrete_monitoring(self):
+        exact     = run_ltv_breach(SPOT, 7_000_000, 0.0, 0.15, engine=ENGINE_ANALYTIC)
+        bridged   = run_ltv_breach(SPOT, 7_000_000, 0.0, 0.15, n_paths=4000)
+        discrete  = run_ltv_breach(SPOT, 7_000_000, 0.0, 0.15, n_paths=4000, bridge_correction=False)
+        # 僅觀察季末時點會漏掉期間內的穿越 → 系統性低估
+        assert np.all(discrete < exact)
+        assert np.abs(bridged - exact).max() < np.abs(discrete - exact).max()
+
+    def test_initial_ltv_above_threshold_is_certain(self):
+        p80, _ = run_ltv_breach(SPOT, 8_500_000)[0]
+        assert p80 == 1.0
+
+    def test_vectorized_matches_per_property(self):
+        spots = np.array([8e6, 10e6, 12e6, 15e6])
+        loans = np.array([6e6, 7e6, 9e6, 10e6])
+        sigmas = np.array([0.06, 0.08, 0.12, 0.20])
+        batch = run_ltv_breach(spots, loans, sigmas=sigmas, max_block_elements=50_000)
+        for i in range(spots.size):
+            single = run_ltv_breach(spots[i], loans[i], sigmas=sigmas[i])
+            np.testing.assert_allclose(batch[i], single[0], rtol=1e-12)
+
+    def test_deterministic_with_seed(self):
+        a = run_ltv_breach(SPOT, 7_000_000, sigmas=0.15, seed=7)
+        b = run_ltv_breach(SPOT, 7_000_000, sigmas=0.15, seed=7)
+        np.testing.assert_array_equal(a, b)
+
+    def test_higher_threshold_less_likely(self):
+        p80, p90 = run_ltv_breach(SPOT, 7_000_000, sigmas=0.15)[0]
+        assert p90 <= p80
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestBreachProbabilityDict:
+    def test_keys_and_rounding(self):
+        out = breach_probability_dict(np.array([[0.123456, 0.0123456]]))
+        assert out == {"80%": 0.1235, "90%": 0.0123}
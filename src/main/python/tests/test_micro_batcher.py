@@ -0,0 +1,136 @@
+"""
+測試 core/micro_batcher.py
+涵蓋：直方圖累積計數與分位數、並行請求合併為單一批次且結果依序分發、批次大小上限、
+      等待窗口為 0 時不等待、批次例外分發給同批所有請求、predict_fn 回傳筆數不符時整批失敗、
+      執行器滿載時回傳 ExecutorSaturated、指標
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.main.python.core.executor import OffloadExecutor, ExecutorSaturated
+from src.main.python.core.micro_batcher import Histogram, MicroBatcher
+
+
+class RecordingModel:
+    """predict_fn：記錄每批列數，回傳各列總和"""
+    def __init__(self):
+        self.batch_sizes: list[int] = []
+
+    def __call__(self, rows: np.ndarray) -> np.ndarray:
+        self.batch_sizes.append(rows.shape[0])
+        return rows.sum(axis=1)
+
+
+async def submit_all(batcher: MicroBatcher, n: int) -> list:
+    rows = [np.array([float(i), 1.0]) for i in range(n)]
+    return await asyncio.gather(*(batcher.submit(r) for r in rows))
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestHistogram:
+    def test_cumulative_buckets_and_quantiles(self):
+        h = Histogram((1, 2, 4))
+        for v in (0.5, 1, 1.5, 3, 10):
+            h.observe(v)
+        snap = h.snapshot()
+        assert snap["le"] == {"1": 2, "2": 3, "4": 4, "+Inf": 5}
+        assert snap["count"] == 5
+        assert snap["sum"] == pytest.approx(16.0)
+        assert h.quantile(0.5) == 2.0
+        assert h.quantile(0.99) == 4.0
+
+    def test_empty(self):
+        assert Histogram((1, 2)).snapshot()["p99"] == 0.0
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestMicroBatcher:
+    def test_concurrent_requests_share_one_batch(self):
+        model = RecordingModel()
+        batcher = MicroBatcher("t", model, OffloadExecutor("t", max_workers=1), max_batch_size=64, max_wait_ms=50)
+        results = asyncio.run(submit_all(batcher, 10))
+        assert model.batch_sizes == [10]
+        assert [float(r) for r in results] == [i + 1.0 for i in range(10)]
+        stats = batcher.stats()
+        assert (stats["batches"], stats["items"], stats["mean_batch_size"]) == (1, 10, 10.0)
+        assert stats["batch_size"]["le"]["16"] == 1
+        assert stats["queue_delay_ms"]["count"] == 10
+
+    def test_respects_max_batch_size(self):
+        model = RecordingModel()
+        batcher = MicroBatcher("t", model, OffloadExecutor("t", max_workers=1), max_batch_size=4, max_wait_ms=50)
+        results = asyncio.run(submit_all(batcher, 10))
+        assert sorted(model.batch_sizes) == [2, 4, 4]
+        assert [float(r) for r in results] == [i + 1.0 for i in range(10)]
+
+    def test_zero_wait_still_drains_queued_requests(self):
+        model = RecordingModel()
+        batcher = MicroBatcher("t", model, OffloadExecutor("t", max_workers=1), max_wait_ms=0)
+        asyncio.run(submit_all(batcher, 5))
+        assert sum(model.batch_sizes) == 5
+        assert max(model.batch_sizes) == 5   # gather 同一輪排入，第一批即全數取出
+
+    def test_exception_reaches_every_waiter(self):
+        def broken(rows):
+            raise ValueError("壞掉的模型")
+
+        batcher = MicroBatcher("t", broken, OffloadExecutor("t", max_workers=1), max_wait_ms=20)
+
+        async def scenario():
+            return await asyncio.gather(
+                *(batcher.submit(np.zeros(2)) for _ in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert batcher.stats()["failed_batches"] == 1
+
+    def test_short_prediction_fails_every_waiter(self):
+        # predict_fn 少回傳一筆：所有請求收到例外，不會有請求懸而未決
+        batcher = MicroBatcher(
+            "t", lambda rows: rows.sum(axis=1)[:-1], OffloadExecutor("t", max_workers=1), max_wait_ms=20,
+        )
+
+        async def scenario():
+            return await asyncio.wait_for(asyncio.gather(
+                *(batcher.submit(np.ones(2)) for _ in range(3)), return_exceptions=True
+            ), timeout=5)
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, ValueError) and "2 筆" in str(r) for r in results)
+        assert batcher.stats()["failed_batches"] == 1
+
+    def test_saturated_executor_propagates(self):
+        import threading
+        executor = OffloadExecutor("t", max_workers=1, max_queue=0)
+        batcher = MicroBatcher("t", RecordingModel(), executor, max_wait_ms=0)
+        gate = threading.Event()
+
+        async def scenario():
+            blocker = asyncio.ensure_future(executor.run(gate.wait, 5))
+            await asyncio.sleep(0.02)
+            try:
+                with pytest.raises(ExecutorSaturated):
+                    await batcher.submit(np.zeros(2))
+            finally:
+                gate.set()
+                await blocker
+
+        asyncio.run(scenario())
+        executor.shutdown()
+
+    def test_rebinds_to_new_event_loop(self):
+        model = RecordingModel()
+        batcher = MicroBatcher("t", model, OffloadExecutor("t", max_workers=1), max_wait_ms=5)
+        asyncio.run(submit_all(batcher, 2))
+        asyncio.run(submit_all(batcher, 3))
+        assert sum(model.batch_sizes) == 5
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("DEMO_BATCH_MAX_SIZE", "16")
+        monkeypatch.setenv("DEMO_BATCH_WAIT_MS", "0.5")
+        batcher = MicroBatcher.from_env("d", "DEMO", RecordingModel(), OffloadExecutor("d"))
+        assert (batcher.max_batch_size, batcher.max_wait_ms) == (16, 0.5)
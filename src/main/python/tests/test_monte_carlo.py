@@ -1,9 +1,15 @@
 """
 測試 inference/monte_carlo.py
-涵蓋：GBM 確定性（seed=42）、P5<P50<P95 順序、風險等級判斷、比例縮放
+涵蓋：GBM 確定性（seed=42）、P5<P50<P95 順序、風險等級判斷、比例縮放、
+      解析引擎（engine="analytic"）與抽樣引擎一致性、正規化乘數 LRU 快取、
+      批次介面與單筆結果完全一致、多期限期限結構、VALUATION_MC_ENGINE 啟動時驗證、
+      公開乘數介面（percentile_multipliers / analytic_percentile_multipliers）
 """
 
 import math
+from statistics import NormalDist
+
+import numpy as np
 import pytest
 from src.main.python.inference.monte_carlo import (
     run_monte_carlo,
@@ -12,6 +18,20 @@ from src.main.python.inference.monte_carlo import (
     DEFAULT_SIGMA,
     RISK_THRESHOLD_LOW,
     RISK_THRESHOLD_HIGH,
+    ENGINE_ANALYTIC,
+    ENGINE_SAMPLED,
+    classify_risk,
+    multiplier_cache_info,
+    clear_multiplier_cache,
+    run_monte_carlo_batch,
+    classify_risk_codes,
+    risk_labels,
+    RISK_LEVELS,
+    run_term_structure,
+    run_term_structure_batch,
+    TermStructurePoint,
+    DEFAULT_TERM_CHECKPOINTS,
+    _analytic_multipliers,
 )
 
 
@@ -105,3 +125,274 @@ class TestRunMonteCarlo:
         # sigma=0.20 應產生中高波動，確認 risk 不為低風險
         _, risk = run_monte_carlo(10_000_000, sigma=0.20)
         assert risk in ("中風險", "高風險")
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestAnalyticEngine:
+    def test_p5_less_than_p50_less_than_p95(self):
+        ci, _ = run_monte_carlo(10_000_000, engine=ENGINE_ANALYTIC)
+        assert ci.p5 < ci.p50 < ci.p95
+
+    def test_p50_matches_closed_form_median(self):
+        spot = 10_000_000
+        ci, _ = run_monte_carlo(spot, mu=0.045, sigma=0.080, engine=ENGINE_ANALYTIC)
+        expected = spot * math.exp(0.045 - 0.5 * 0.080 ** 2)
+        assert ci.p50 == round(expected, 0)
+
+    def test_ignores_seed(self):
+        ci1, _ = run_monte_carlo(10_000_000, seed=42, engine=ENGINE_ANALYTIC)
+        ci2, _ = run_monte_carlo(10_000_000, seed=99, engine=ENGINE_ANALYTIC)
+        assert ci1 == ci2
+
+    @pytest.mark.parametrize("sigma", [0.001, 0.08, 0.20, 0.80])
+    def test_agrees_with_sampled_within_mc_error(self, sigma):
+        """各百分位數落在抽樣引擎 4 倍標準誤內（分位數漸近標準誤，對數空間）"""
+        spot, mu, n_paths = 10_000_000, DEFAULT_MU, 20_000
+        ci_a, risk_a = run_monte_carlo(spot, mu=mu, sigma=sigma, engine=ENGINE_ANALYTIC)
+        ci_s, risk_s = run_monte_carlo(
+            spot, mu=mu, sigma=sigma, n_paths=n_paths, engine=ENGINE_SAMPLED,
+        )
+        for q, a, s in [(0.05, ci_a.p5, ci_s.p5), (0.50, ci_a.p50, ci_s.p50), (0.95, ci_a.p95, ci_s.p95)]:
+            z = NormalDist().inv_cdf(q)
+            se_log = sigma * math.sqrt(q * (1 - q) / n_paths) / NormalDist().pdf(z)
+            assert abs(math.log(s / a)) < 4 * se_log + 1e-6, f"P{int(q * 100)} 超出 MC 誤差"
+        assert risk_a == risk_s
+
+    def test_risk_levels_match_sampled_defaults(self):
+        for sigma in (0.001, 0.20, 0.80):
+            _, risk_a = run_monte_carlo(10_000_000, sigma=sigma, engine=ENGINE_ANALYTIC)
+            _, risk_s = run_monte_carlo(10_000_000, sigma=sigma, engine=ENGINE_SAMPLED)
+            assert risk_a == risk_s
+
+    def test_unknown_engine_raises(self):
+        with pytest.raises(ValueError):
+            run_monte_carlo(10_000_000, engine="quantum")
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestClassifyRisk:
+    def test_low(self):
+        assert classify_risk(95.0, 100.0, 105.0) == "低風險"
+
+    def test_medium(self):
+        assert classify_risk(90.0, 100.0, 110.0) == "中風險"
+
+    def test_high(self):
+        assert classify_risk(80.0, 100.0, 120.0) == "高風險"
+
+    def test_zero_p50_is_low(self):
+        assert classify_risk(0.0, 0.0, 0.0) == "低風險"
+
+
+# ─────────────────────────────────────────────────────────────────
+def _uncached_reference(spot_value, mu=DEFAULT_MU, sigma=DEFAULT_SIGMA, n_paths=1000, n_steps=252, seed=42):
+    """快取導入前的逐次模擬實作（比對基準）"""
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / n_steps
+    Z = rng.standard_normal(size=(n_paths, n_steps))
+    cum = np.sum((mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * Z, axis=1)
+    final_values = spot_value * np.exp(cum)
+    return tuple(round(float(np.percentile(final_values, q)), 0) for q in (5, 50, 95))
+
+
+class TestMultiplierCache:
+    def setup_method(self):
+        clear_multiplier_cache()
+
+    def test_matches_uncached_simulation_after_rounding(self):
+        rng = np.random.default_rng(7)
+        for spot in rng.uniform(1e6, 1e8, 300).round():
+            ci, _ = run_monte_carlo(float(spot))
+            assert (ci.p5, ci.p50, ci.p95) == _uncached_reference(float(spot))
+
+    def test_matches_uncached_for_custom_params(self):
+        ci, _ = run_monte_carlo(12_345_678, mu=0.02, sigma=0.15, n_paths=500, n_steps=52, seed=7)
+        assert (ci.p5, ci.p50, ci.p95) == _uncached_reference(
+            12_345_678, mu=0.02, sigma=0.15, n_paths=500, n_steps=52, seed=7,
+        )
+
+    def test_hit_and_miss_counters(self):
+        run_monte_carlo(10_000_000)
+        run_monte_carlo(20_000_000)
+        run_monte_carlo(30_000_000, seed=99)
+        info = multiplier_cache_info()
+        assert info["misses"] == 2
+        assert info["hits"] == 1
+        assert info["size"] == 2
+
+    def test_analytic_engine_bypasses_cache(self):
+        run_monte_carlo(10_000_000, engine=ENGINE_ANALYTIC)
+        info = multiplier_cache_info()
+        assert info["hits"] == 0 and info["misses"] == 0
+
+    def test_cache_is_bounded(self):
+        info = multiplier_cache_info()
+        assert info["maxsize"] is not None and info["maxsize"] > 0
+
+    def test_clear_resets_counters(self):
+        run_monte_carlo(10_000_000)
+        clear_multiplier_cache()
+        info = multiplier_cache_info()
+        assert info == {**info, "hits": 0, "misses": 0, "size": 0}
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRunMonteCarloBatch:
+    @pytest.mark.parametrize("engine", [ENGINE_SAMPLED, ENGINE_ANALYTIC])
+    def test_matches_scalar_exactly(self, engine):
+        rng = np.random.default_rng(3)
+        spots  = rng.uniform(1e6, 1e8, 200).round()
+        mus    = rng.choice([-0.05, 0.0, 0.045], size=200)
+        sigmas = rng.choice([0.001, 0.08, 0.16, 0.80], size=200)
+        ci, codes = run_monte_carlo_batch(spots, mus, sigmas, engine=engine)
+        labels = risk_labels(codes)
+        for i in range(len(spots)):
+            ci_s, risk_s = run_monte_carlo(float(spots[i]), mu=float(mus[i]), sigma=float(sigmas[i]), engine=engine)
+            assert (ci.p5[i], ci.p50[i], ci.p95[i]) == (ci_s.p5, ci_s.p50, ci_s.p95)
+            assert labels[i] == risk_s
+
+    def test_per_item_seed_policy(self):
+        spots = np.array([10_000_000.0, 10_000_000.0])
+        ci, _ = run_monte_carlo_batch(spots, seed=np.array([42, 99]))
+        ci42, _ = run_monte_carlo(10_000_000, seed=42)
+        ci99, _ = run_monte_carlo(10_000_000, seed=99)
+        assert ci.p50[0] == ci42.p50
+        assert ci.p50[1] == ci99.p50
+
+    def test_scalar_params_broadcast(self):
+        ci, codes = run_monte_carlo_batch([5_000_000, 10_000_000, 20_000_000])
+        assert ci.p50.shape == (3,)
+        assert codes.shape == (3,)
+        assert np.all(ci.p5 < ci.p50) and np.all(ci.p50 < ci.p95)
+
+    def test_preserves_input_shape(self):
+        spots = np.full((4, 5), 10_000_000.0)
+        ci, codes = run_monte_carlo_batch(spots, engine=ENGINE_ANALYTIC)
+        assert ci.p95.shape == (4, 5)
+        assert codes.shape == (4, 5)
+
+    def test_risk_codes_index_risk_levels(self):
+        _, codes = run_monte_carlo_batch([1e7, 1e7, 1e7], sigmas=[0.001, 0.06, 0.80])
+        assert risk_labels(codes) == [RISK_LEVELS[0], RISK_LEVELS[1], RISK_LEVELS[2]]
+
+    def test_unknown_engine_raises(self):
+        with pytest.raises(ValueError):
+            run_monte_carlo_batch([1e7], engine="quantum")
+
+
+class TestClassifyRiskCodes:
+    def test_matches_scalar_classifier(self):
+        p5  = np.array([95.0, 90.0, 80.0, 0.0])
+        p50 = np.array([100.0, 100.0, 100.0, 0.0])
+        p95 = np.array([105.0, 110.0, 120.0, 0.0])
+        codes = classify_risk_codes(p5, p50, p95)
+        assert risk_labels(codes) == [classify_risk(a, b, c) for a, b, c in zip(p5, p50, p95)]
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRunTermStructure:
+    def test_default_checkpoints(self):
+        points = run_term_structure(10_000_000)
+        assert [p.years for p in points] == [float(c) for c in DEFAULT_TERM_CHECKPOINTS]
+        assert all(isinstance(p, TermStructurePoint) for p in points)
+
+    def test_maturity_appended_and_truncates(self):
+        points = run_term_structure(10_000_000, maturity_years=7)
+        assert [p.years for p in points] == [1.0, 3.0, 5.0, 7.0]
+
+    def test_maturity_beyond_checkpoints(self):
+        points = run_term_structure(10_000_000, maturity_years=30)
+        assert points[-1].years == 30.0
+        assert len(points) == 5
+
+    @pytest.mark.parametrize("engine", [ENGINE_SAMPLED, ENGINE_ANALYTIC])
+    def test_spread_widens_with_horizon(self, engine):
+        points = run_term_structure(10_000_000, maturity_years=30, engine=engine)
+        spreads = [(p.p95 - p.p5) / p.p50 for p in points]
+        assert spreads == sorted(spreads)
+        assert all(p.p5 < p.p50 < p.p95 for p in points)
+
+    def test_analytic_matches_closed_form_at_each_horizon(self):
+        spot = 10_000_000
+        for p in run_term_structure(spot, maturity_years=20, engine=ENGINE_ANALYTIC):
+            m5, m50, m95 = _analytic_multipliers(DEFAULT_MU, DEFAULT_SIGMA, p.years)
+            assert (p.p5, p.p50, p.p95) == (round(spot * m5), round(spot * m50), round(spot * m95))
+
+    def test_sampled_agrees_with_analytic(self):
+        sampled  = run_term_structure(10_000_000, maturity_years=30, n_paths=20_000)
+        analytic = run_term_structure(10_000_000, maturity_years=30, engine=ENGINE_ANALYTIC)
+        for s, a in zip(sampled, analytic):
+            assert abs(s.p50 / a.p50 - 1) < 0.02
+            assert abs(s.p5 / a.p5 - 1) < 0.03
+
+    def test_one_year_point_close_to_run_monte_carlo(self):
+        ci, risk = run_monte_carlo(10_000_000, engine=ENGINE_ANALYTIC)
+        point = run_term_structure(10_000_000, engine=ENGINE_ANALYTIC)[0]
+        assert (point.p5, point.p50, point.p95) == (ci.p5, ci.p50, ci.p95)
+        assert point.risk_level == risk
+
+    def test_deterministic_with_same_seed(self):
+        assert run_term_structure(10_000_000, seed=7) == run_term_structure(10_000_000, seed=7)
+
+    def test_no_positive_checkpoint_raises(self):
+        with pytest.raises(ValueError):
+            run_term_structure(10_000_000, checkpoints=(0,))
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRunTermStructureBatch:
+    @pytest.mark.parametrize("engine", [ENGINE_ANALYTIC, ENGINE_SAMPLED])
+    @pytest.mark.parametrize("maturity", [None, 7, 30])
+    def test_rows_match_scalar(self, engine, maturity):
+        spots = np.array([3_210_987.0, 10_000_000.0, 48_765_432.0])
+        horizons, ci, codes = run_term_structure_batch(spots, maturity_years=maturity, engine=engine)
+        assert ci.p50.shape == (3, len(horizons))
+        for row, spot in enumerate(spots):
+            points = run_term_structure(spot, maturity_years=maturity, engine=engine)
+            assert [p.years for p in points] == list(horizons)
+            for k, p in enumerate(points):
+                assert (ci.p5[row, k], ci.p50[row, k], ci.p95[row, k]) == (p.p5, p.p50, p.p95)
+                assert RISK_LEVELS[codes[row, k]] == p.risk_level
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestServiceEngineEnv:
+    def test_default_is_analytic(self, monkeypatch):
+        from src.main.python.inference.monte_carlo import _service_engine_from_env
+        monkeypatch.delenv("VALUATION_MC_ENGINE", raising=False)
+        assert _service_engine_from_env() == "analytic"
+
+    @pytest.mark.parametrize("engine", ["sampled", "analytic", "antithetic", "sobol"])
+    def test_known_engines_accepted(self, monkeypatch, engine):
+        from src.main.python.inference.monte_carlo import _service_engine_from_env
+        monkeypatch.setenv("VALUATION_MC_ENGINE", engine)
+        assert _service_engine_from_env() == engine
+
+    def test_typo_raises_with_env_name(self, monkeypatch):
+        # SERVICE_ENGINE 於 import 時由此函式取得，拼錯即在服務啟動時失敗
+        from src.main.python.inference.monte_carlo import _service_engine_from_env
+        monkeypatch.setenv("VALUATION_MC_ENGINE", "analytc")
+        with pytest.raises(ValueError, match="VALUATION_MC_ENGINE='analytc'"):
+            _service_engine_from_env()
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestPublicMultipliers:
+    def test_vectorized_analytic_matches_scalar(self):
+        from src.main.python.inference.monte_carlo import analytic_percentile_multipliers
+        mus    = np.array([[0.0, 0.045], [-0.05, 0.10]])
+        sigmas = np.array([[0.05, 0.08], [0.20, 0.30]])
+        grid = analytic_percentile_multipliers(mus, sigmas, horizon=5.0)
+        assert grid.shape == (2, 2, 3)
+        for i in range(2):
+            for j in range(2):
+                np.testing.assert_allclose(
+                    grid[i, j], _analytic_multipliers(mus[i, j], sigmas[i, j], 5.0), rtol=1e-14,
+                )
+
+    @pytest.mark.parametrize("engine", ["sampled", "analytic", "antithetic", "sobol"])
+    def test_percentile_multipliers_scale_run_monte_carlo(self, engine):
+        from src.main.python.inference.monte_carlo import percentile_multipliers
+        m5, m50, m95 = percentile_multipliers(engine, 0.045, 0.08, 1000, 252, 42)
+        ci, _ = run_monte_carlo(10_000_000, engine=engine)
+        assert (ci.p5, ci.p50, ci.p95) == (round(10_000_000 * m5), round(10_000_000 * m50), round(10_000_000 * m95))
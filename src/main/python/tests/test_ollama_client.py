@@ -0,0 +1,177 @@
+"""
+Ollama 非同步客戶端測試（以 scripts/ollama_stub.py 替身伺服器取代 Ollama）
+"""
+
+import asyncio
+
+import pytest
+
+from src.main.python.scripts.ollama_stub import REPLY, serve_in_thread
+from src.main.python.services.ollamaClient import OllamaClient, OllamaError, OllamaTimeout
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture(scope="module")
+def stub():
+    with serve_in_thread(token_ms=1) as server:
+        yield server
+
+
+@pytest.fixture
+def client(stub):
+    base_url, _ = stub
+    return OllamaClient(base_url=base_url, model="stub")
+
+
+async def _collect(client: OllamaClient, **kwargs) -> list[str]:
+    try:
+        return [token async for token in client.stream_chat(MESSAGES, **kwargs)]
+    finally:
+        await client.aclose()
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestChat:
+    def test_returns_full_reply(self, client):
+        async def scenario():
+            try:
+                return await client.chat(MESSAGES, {"temperature": 0.3})
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(scenario()) == REPLY
+        assert client.stats()["requests"] == 1
+        assert client.stats()["total_ms"]["count"] == 1
+
+    def test_reuses_pooled_connection(self, stub, client):
+        _, stub_app = stub
+
+        async def scenario():
+            try:
+                for _ in range(5):
+                    await client.chat(MESSAGES)
+            finally:
+                await client.aclose()
+
+        before_requests, before_peers = stub_app.state.requests, set(stub_app.state.peers)
+        asyncio.run(scenario())
+        assert stub_app.state.requests - before_requests == 5
+        assert len(stub_app.state.peers - before_peers) == 1
+
+    def test_unreachable_server_raises_ollama_error(self):
+        client = OllamaClient(base_url="http://127.0.0.1:9", connect_timeout_s=0.5)
+
+        async def scenario():
+            try:
+                await client.chat(MESSAGES)
+            finally:
+                await client.aclose()
+
+        with pytest.raises(OllamaError):
+            asyncio.run(scenario())
+        assert client.stats()["errors"] + client.stats()["timeouts"] == 1
+        assert client.stats()["in_flight"] == 0
+
+    def test_http_error_raises_ollama_error(self):
+        with serve_in_thread(fail_status=500) as (base_url, _):
+            client = OllamaClient(base_url=base_url)
+
+            async def scenario():
+                try:
+                    await client.chat(MESSAGES)
+                finally:
+                    await client.aclose()
+
+            with pytest.raises(OllamaError, match="500"):
+                asyncio.run(scenario())
+        assert client.stats()["errors"] == 1
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestStreamChat:
+    def test_tokens_arrive_in_order(self, client):
+        tokens = asyncio.run(_collect(client))
+        assert len(tokens) == len(REPLY)
+        assert "".join(tokens) == REPLY
+        stats = client.stats()
+        assert stats["streams"] == 1
+        assert stats["first_token_ms"]["count"] == 1
+        assert stats["in_flight"] == 0
+
+    def test_stream_returns_connection_to_pool(self, stub, client):
+        _, stub_app = stub
+
+        async def scenario():
+            try:
+                for _ in range(3):
+                    [token async for token in client.stream_chat(MESSAGES)]
+                await client.chat(MESSAGES)
+            finally:
+                await client.aclose()
+
+        before = set(stub_app.state.peers)
+        asyncio.run(scenario())
+        assert len(stub_app.state.peers - before) == 1
+
+    def test_first_token_before_full_reply(self):
+        # 首 token 延遲遠小於完整回覆時間（每個 token 20 ms）
+        with serve_in_thread(first_token_ms=10, token_ms=20) as (base_url, _):
+            client = OllamaClient(base_url=base_url)
+
+            async def scenario():
+                loop = asyncio.get_running_loop()
+                start = loop.time()
+                first = None
+                try:
+                    async for _ in client.stream_chat(MESSAGES):
+                        if first is None:
+                            first = loop.time() - start
+                finally:
+                    await client.aclose()
+                return first, loop.time() - start
+
+            first, total = asyncio.run(scenario())
+        assert first < 0.5
+        assert total > first + 0.02 * (len(REPLY) - 1) * 0.8
+
+    def test_total_deadline_raises_timeout(self):
+        with serve_in_thread(first_token_ms=0, token_ms=50) as (base_url, _):
+            client = OllamaClient(base_url=base_url)
+            with pytest.raises(OllamaTimeout):
+                asyncio.run(_collect(client, timeout_s=0.2))
+        assert client.stats()["timeouts"] == 1
+        assert client.stats()["in_flight"] == 0
+
+    def test_read_timeout_between_chunks(self):
+        with serve_in_thread(first_token_ms=1000) as (base_url, _):
+            client = OllamaClient(base_url=base_url, read_timeout_s=0.1)
+            with pytest.raises(OllamaTimeout):
+                asyncio.run(_collect(client))
+
+    def test_abandoned_stream_releases_slot(self, client):
+        async def scenario():
+            stream = client.stream_chat(MESSAGES)
+            try:
+                async for _ in stream:
+                    break
+                await stream.aclose()
+            finally:
+                await client.aclose()
+
+        asyncio.run(scenario())
+        assert client.stats()["in_flight"] == 0
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestFromEnv:
+    def test_env_overrides(self, monkeypatch):
+        monkeypatch.setenv("OLLAMA_URL", "http://ollama:11434/")
+        monkeypatch.setenv("OLLAMA_MODEL", "qwen2.5:7b")
+        monkeypatch.setenv("OLLAMA_MAX_CONNECTIONS", "4")
+        monkeypatch.setenv("OLLAMA_TIMEOUT_S", "10")
+        client = OllamaClient.from_env()
+        assert client.base_url == "http://ollama:11434"
+        assert client.model == "qwen2.5:7b"
+        assert client.max_connections == 4
+        assert client.timeout_s == 10.0
@@ -0,0 +1,149 @@
+"""
+測試 inference/portfolio_monte_carlo.py
+涵蓋：預設相關係數矩陣、Cholesky 快取與驗證、申請案載入、
+      排序累加損失與逐筆暴力計算一致、VaR / ES 性質、行程池結果與單行程一致、集中度
+"""
+
+import numpy as np
+import pytest
+
+from src.main.python.inference.portfolio_monte_carlo import (
+    PortfolioBook,
+    REGIONS,
+    default_region_correlation,
+    region_cholesky,
+    _cholesky_cached,
+    _district_tables,
+    _shard_losses,
+    portfolio_from_applications,
+    load_portfolio_cases,
+    run_portfolio_simulation,
+)
+
+
+def make_book(n: int = 400, seed: int = 0) -> PortfolioBook:
+    rng = np.random.default_rng(seed)
+    regions = np.array(["台北市", "新北市", "高雄市", "花蓮縣"], dtype=object)[rng.integers(0, 4, n)]
+    districts = np.array([f"{r}-{i}" for r, i in zip(regions, rng.integers(0, 3, n))], dtype=object)
+    values = rng.uniform(5e6, 3e7, n)
+    loans  = values * rng.uniform(0.6, 0.98, n)
+    return PortfolioBook(regions, districts, values, loans)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestCorrelation:
+    def test_default_matrix_is_valid_correlation(self):
+        corr = default_region_correlation()
+        assert corr.shape == (len(REGIONS), len(REGIONS))
+        np.testing.assert_array_equal(np.diag(corr), 1.0)
+        np.testing.assert_array_equal(corr, corr.T)
+        assert np.all(np.linalg.eigvalsh(corr) > 0)
+
+    def test_cholesky_reconstructs_and_is_cached(self):
+        _cholesky_cached.cache_clear()
+        corr = default_region_correlation()
+        factor = region_cholesky(corr)
+        np.testing.assert_allclose(factor @ factor.T, corr, atol=1e-12)
+        region_cholesky(corr.copy())
+        assert _cholesky_cached.cache_info().hits == 1
+
+    def test_rejects_non_positive_definite(self):
+        bad = np.array([[1.0, 0.99, -0.99], [0.99, 1.0, 0.99], [-0.99, 0.99, 1.0]])
+        with pytest.raises(ValueError):
+            region_cholesky(bad)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestLoadCases:
+    def test_only_mortgages_with_property(self):
+        records = [
+            {"loanType": "mortgage", "basicInfo": {"amount": 8_000_000},
+             "propertyInfo": {"areaPing": 30, "buildingType": "大樓", "propertyAge": 5,
+                              "floor": 8, "layout": "3房2廳", "hasParking": True, "district": "板橋區"}},
+            {"loanType": "personal", "basicInfo": {"amount": 500_000}, "propertyInfo": None},
+            {"loanType": "mortgage", "basicInfo": {"amount": 5_000_000},
+             "propertyInfo": {"areaPing": None}},
+        ]
+        book = portfolio_from_applications(records)
+        assert len(book) == 1
+        assert book.regions[0] == "新北市"
+        assert book.districts[0] == "板橋區"
+        assert book.collateral_values[0] > 0
+
+    def test_repo_applications_file(self):
+        book = load_portfolio_cases("data/applications.json")
+        assert len(book) > 0
+        assert set(book.regions) <= set(REGIONS)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestShardLosses:
+    def test_matches_brute_force_per_loan(self):
+        book   = make_book()
+        tables = _district_tables(book)
+        region_idx = {r: i for i, r in enumerate(REGIONS)}
+        params = dict(
+            factor = region_cholesky(default_region_correlation()),
+            drift  = np.full(len(REGIONS), -0.05), vol = np.full(len(REGIONS), 0.15),
+            idio_vol = 0.05, keep = 0.9,
+            district_region = tables["district_region"], keys = tables["keys"],
+            cum_loan = tables["cum_loan"], cum_value = tables["cum_value"], ends = tables["ends"],
+        )
+        ss = np.random.SeedSequence(3)
+        got = _shard_losses(params, 64, ss)
+
+        # 以相同亂數流重建各行政區乘數，逐筆計算 max(貸款 - 處分價值, 0)
+        rng = np.random.default_rng(ss)
+        z = rng.standard_normal(size=(64, len(REGIONS))) @ params["factor"].T
+        x = (params["drift"] + params["vol"] * z)[:, tables["district_region"]]
+        x = x + params["idio_vol"] * rng.standard_normal(size=x.shape)
+        m = params["keep"] * np.exp(x)
+        per_loan = np.maximum(book.loan_amounts - m[:, tables["codes"]] * book.collateral_values, 0.0)
+        expected = np.stack([per_loan[:, tables["codes"] == d].sum(axis=1) for d in range(tables["names"].size)], axis=1)
+        np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-3)
+        assert all(region_idx[n.split("|")[0]] == r for n, r in zip(tables["names"], tables["district_region"]))
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRunPortfolioSimulation:
+    def test_var_es_ordering(self):
+        res = run_portfolio_simulation(make_book(), n_paths=5_000, n_workers=1)
+        assert 0 <= res.var["95%"] <= res.var["99%"]
+        assert res.expected_shortfall["95%"] >= res.var["95%"]
+        assert res.expected_shortfall["99%"] >= res.expected_shortfall["95%"]
+        assert res.expected_loss <= res.expected_shortfall["95%"]
+
+    def test_concentration_sums_to_portfolio(self):
+        book = make_book()
+        res = run_portfolio_simulation(book, n_paths=2_000, n_workers=1)
+        assert sum(c.n_loans for c in res.concentration) == len(book)
+        assert sum(c.exposure_share for c in res.concentration) == pytest.approx(1.0, abs=1e-4)
+        assert sum(c.es_share for c in res.concentration) == pytest.approx(1.0, abs=1e-4)
+        shares = [c.es_contribution for c in res.concentration]
+        assert shares == sorted(shares, reverse=True)
+
+    def test_process_pool_matches_inline(self):
+        book = make_book()
+        inline = run_portfolio_simulation(book, n_paths=3_000, shard_paths=1_000, n_workers=1)
+        pooled = run_portfolio_simulation(book, n_paths=3_000, shard_paths=1_000, n_workers=2)
+        assert pooled.n_workers == 2
+        assert pooled.var == inline.var
+        assert pooled.expected_shortfall == inline.expected_shortfall
+
+    def test_higher_correlation_fattens_tail(self):
+        book = make_book()
+        low  = run_portfolio_simulation(book, default_region_correlation(0.0, 0.0), n_paths=5_000, n_workers=1)
+        high = run_portfolio_simulation(book, default_region_correlation(0.9, 0.9), n_paths=5_000, n_workers=1)
+        assert high.expected_shortfall["99%"] > low.expected_shortfall["99%"]
+
+    def test_low_ltv_book_has_no_loss(self):
+        book = make_book()
+        book.loan_amounts = book.collateral_values * 0.1
+        res = run_portfolio_simulation(book, n_paths=1_000, n_workers=1)
+        assert res.var["99%"] == 0.0
+
+    def test_unknown_region_raises(self):
+        book = make_book(10)
+        book.regions[0] = "火星"
+        with pytest.raises(ValueError):
+            run_portfolio_simulation(book, n_paths=100, n_workers=1)
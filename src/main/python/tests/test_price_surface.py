@@ -0,0 +1,112 @@
+"""
+測試 inference/price_surface.py
+涵蓋：建置後以 memmap 載入、格點值與推論一致、面積 / 屋齡雙線性內插（對雙線性函數精確）、
+      樓層 / 房數取最近格點、範圍外取邊界、未知類別 = 編碼 0、整批與單筆查表一致、版本檢查、誤差統計
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.main.python.inference.price_surface import (
+    META_FILE,
+    PriceSurface,
+    build_price_surface,
+    surface_error,
+)
+
+KNOTS = {
+    "floor":        (1, 5, 10),
+    "total_floors": (5, 20),
+    "rooms":        (1, 3),
+    "property_age": (0, 10, 30),
+    "area_ping":    (20, 40, 80),
+}
+
+
+def fake_model(rows: np.ndarray) -> np.ndarray:
+    """對面積 / 屋齡為雙線性、其餘維度為加法偏移的 log(單價)"""
+    district, btype, area, age, floor, total, parking, rooms = (rows[:, i] for i in range(8))
+    return (13.0 + 0.1 * district + 0.05 * btype + 0.002 * area - 0.01 * age + 1e-4 * area * age
+            + 0.003 * floor + 0.001 * total + 0.02 * parking + 0.004 * rooms)
+
+
+def row(district=1, btype=0, area=30.0, age=5.0, floor=5, total=20, parking=1, rooms=3):
+    return np.array([[district, btype, area, age, floor, total, parking, rooms, 2025, 2]], dtype=np.float64)
+
+
+@pytest.fixture(scope="module")
+def surface(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("surface")
+    progress = []
+    surf = build_price_surface(
+        directory, fake_model, n_districts=3, n_building_types=2, year=2025, quarter=2,
+        knots=KNOTS, meta={"model_version": "test"}, progress=lambda d, t: progress.append((d, t)),
+    )
+    assert progress[-1] == (6, 6)
+    return surf
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestBuild:
+    def test_shape_and_memmap(self, surface):
+        assert surface.values.shape == (3, 2, 2, 3, 2, 2, 3, 3)
+        assert isinstance(surface.values, np.memmap)
+        assert surface.meta["model_version"] == "test"
+        assert (surface.meta["year"], surface.meta["quarter"]) == (2025, 2)
+
+    def test_grid_points_match_model(self, surface):
+        r = row(district=2, btype=1, area=40, age=10, floor=10, total=5, parking=0, rooms=1)
+        assert surface.log_prices(r)[0] == pytest.approx(fake_model(r)[0], abs=1e-5)
+
+    def test_version_mismatch_raises(self, surface, tmp_path):
+        directory = tmp_path / "copy"
+        directory.mkdir()
+        np.save(directory / "surface.npy", np.asarray(surface.values))
+        (directory / META_FILE).write_text(json.dumps({**surface.meta, "version": 99}), encoding="utf-8")
+        with pytest.raises(ValueError):
+            PriceSurface.load(directory)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestLookup:
+    @pytest.mark.parametrize("area,age", [(25.0, 3.0), (33.3, 17.5), (79.0, 29.0)])
+    def test_bilinear_interpolation_is_exact(self, surface, area, age):
+        r = row(area=area, age=age)
+        assert surface.log_prices(r)[0] == pytest.approx(fake_model(r)[0], abs=1e-5)
+
+    def test_snap_to_nearest_knot(self, surface):
+        assert surface.log_prices(row(floor=7))[0] == pytest.approx(surface.log_prices(row(floor=5))[0])
+        assert surface.log_prices(row(floor=8))[0] == pytest.approx(surface.log_prices(row(floor=10))[0])
+        assert surface.log_prices(row(rooms=2))[0] == pytest.approx(surface.log_prices(row(rooms=1))[0])
+
+    def test_out_of_range_is_clamped(self, surface):
+        assert surface.log_prices(row(area=500))[0] == pytest.approx(surface.log_prices(row(area=80))[0])
+        assert surface.log_prices(row(floor=60))[0] == pytest.approx(surface.log_prices(row(floor=10))[0])
+        assert surface.log_prices(row(age=-3))[0] == pytest.approx(surface.log_prices(row(age=0))[0])
+
+    def test_unknown_category_uses_code_zero(self, surface):
+        assert surface.log_prices(row(district=7))[0] == pytest.approx(surface.log_prices(row(district=0))[0])
+        assert surface.log_price(7, 0, 30.0, 5, 5, 20, True, 3) == pytest.approx(surface.log_price(0, 0, 30.0, 5, 5, 20, True, 3))
+
+    def test_scalar_matches_batch(self, surface):
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            d, b, parking = rng.integers(0, 3), rng.integers(0, 2), rng.integers(0, 2)
+            area, age = rng.uniform(10, 100), rng.uniform(0, 40)
+            floor, total, rooms = rng.integers(1, 15), rng.integers(1, 25), rng.integers(0, 5)
+            scalar = surface.log_price(d, b, area, age, floor, total, parking, rooms)
+            batch = surface.log_prices(row(d, b, area, age, floor, total, parking, rooms))[0]
+            assert scalar == pytest.approx(batch, abs=1e-9)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestSurfaceError:
+    def test_relative_price_error(self):
+        live = np.log1p(np.array([100.0, 200.0]))
+        approx = np.log1p(np.array([101.0, 196.0]))
+        err = surface_error(approx, live)
+        assert err["n"] == 2
+        assert err["max_pct"] == pytest.approx(2.0, abs=1e-3)
+        assert err["mape_pct"] == pytest.approx(1.5, abs=1e-3)
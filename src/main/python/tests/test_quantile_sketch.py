@@ -0,0 +1,67 @@
+"""
+測試 utils/quantile_sketch.py
+涵蓋：t-digest 分位數精度、誤差界涵蓋真值、分批 / 合併結果、記憶體（centroid 數）有界
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from src.main.python.utils.quantile_sketch import TDigest
+
+
+@pytest.fixture(scope="module")
+def samples():
+    return np.random.default_rng(0).standard_normal(500_000)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestTDigest:
+    @pytest.mark.parametrize("q", [0.05, 0.50, 0.95])
+    def test_quantile_close_to_exact(self, samples, q):
+        d = TDigest()
+        d.update(samples)
+        assert abs(d.quantile(q) - np.quantile(samples, q)) < 0.01
+
+    @pytest.mark.parametrize("q", [0.01, 0.05, 0.50, 0.95, 0.99])
+    def test_bounds_cover_exact_quantile(self, samples, q):
+        d = TDigest()
+        for i in range(0, samples.size, 10_000):
+            d.update(samples[i:i + 10_000])
+        lo, hi = d.quantile_bounds(q)
+        assert lo <= np.quantile(samples, q) <= hi
+
+    def test_tail_rank_error_smaller_than_median(self, samples):
+        d = TDigest()
+        d.update(samples)
+        assert d.rank_error(0.05) < d.rank_error(0.50)
+
+    def test_centroid_count_bounded(self, samples):
+        d = TDigest(compression=100)
+        for i in range(0, samples.size, 5_000):
+            d.update(samples[i:i + 5_000])
+        assert d.centroid_count <= 100
+        assert d.count == samples.size
+
+    def test_merge_matches_single_sketch(self, samples):
+        a, b = TDigest(), TDigest()
+        a.update(samples[:250_000])
+        b.update(samples[250_000:])
+        a.merge(b)
+        assert a.count == samples.size
+        assert abs(a.quantile(0.05) - np.quantile(samples, 0.05)) < 0.01
+
+    def test_min_max_tracked(self, samples):
+        d = TDigest()
+        d.update(samples)
+        assert d.quantile(0.0) == samples.min()
+        assert d.quantile(1.0) == samples.max()
+
+    def test_empty_sketch_returns_nan(self):
+        assert math.isnan(TDigest().quantile(0.5))
+
+    def test_single_value(self):
+        d = TDigest()
+        d.update([42.0])
+        assert d.quantile(0.5) == 42.0
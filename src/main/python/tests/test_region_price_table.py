@@ -1,14 +1,25 @@
 """
 測試 utils/region_price_table.py
-涵蓋：屋齡折舊、樓層係數、格局效率、基準估值計算
+涵蓋：屋齡折舊、樓層係數、格局效率、基準估值計算、
+      批次向量化版本（整數編碼、分段係數、隨機輸入性質測試）與逐筆一致
 """
 
+import numpy as np
 import pytest
 from src.main.python.utils.region_price_table import (
     age_depreciation_factor,
     floor_adjustment_factor,
     layout_efficiency_factor,
     calculate_base_value,
+    calculate_base_values,
+    encode_regions,
+    encode_building_types,
+    age_depreciation_factors,
+    floor_adjustment_factors,
+    layout_efficiency_factors,
+    REGION_CODES,
+    BUILDING_TYPE_CODES,
+    UNKNOWN_REGION_CODE,
     REGION_BASE_PRICE,
     BUILDING_TYPE_MULTIPLIER,
 )
@@ -192,3 +203,96 @@ class TestCalculateBaseValue:
         for region in REGION_BASE_PRICE:
             val, _ = self._calc(region=region)
             assert val > 0, f"{region} 回傳非正值：{val}"
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestCalculateBaseValues:
+    def test_matches_scalar_across_grid(self):
+        rows = [
+            (region, btype, age, floor, layout, parking, 31.7)
+            for region in ("台北市", "新北市", "連江縣", "未知縣市")
+            for btype in list(BUILDING_TYPE_MULTIPLIER) + ["未知"]
+            for age in (0, 3, 5, 6, 20, 21, 40, 41)
+            for floor in (1, 2, 3, 4, 7, 8, 15, 16, 25, 26)
+            for layout in ("4房2廳", "3房2廳", "2房1廳", "套房", "開放式")
+            for parking in (False, True)
+        ]
+        values, breakdown = calculate_base_values(*zip(*rows))
+        for i, row in enumerate(rows):
+            base, expected = calculate_base_value(*row)
+            assert values[i] == base
+            assert {k: col[i] for k, col in breakdown.items()} == expected
+
+    def test_accepts_precoded_categories(self):
+        rows = [("台北市", "大樓", 10, 8, "3房2廳", True, 30.0), ("火星", "城堡", 50, 1, "套房", False, 12.5)]
+        cols = list(zip(*rows))
+        by_name, _ = calculate_base_values(*cols)
+        cols[0] = encode_regions(cols[0])
+        cols[1] = encode_building_types(cols[1])
+        by_code, _ = calculate_base_values(*cols)
+        np.testing.assert_array_equal(by_name, by_code)
+
+    def test_empty_input(self):
+        values, breakdown = calculate_base_values([], [], [], [], [], [], [])
+        assert values.size == 0
+        assert all(col.size == 0 for col in breakdown.values())
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestVectorizedFactors:
+    def test_encode_unknown_region(self):
+        codes = encode_regions(["台北市", "火星", "連江縣"])
+        assert codes.tolist() == [REGION_CODES.index("台北市"), UNKNOWN_REGION_CODE, REGION_CODES.index("連江縣")]
+
+    def test_age_factors_match_scalar_at_every_age(self):
+        ages = np.arange(-3, 101)
+        assert age_depreciation_factors(ages).tolist() == [age_depreciation_factor(int(a)) for a in ages]
+
+    def test_floor_factors_match_scalar_at_every_floor(self):
+        floors = np.arange(-2, 101)
+        for btype in BUILDING_TYPE_CODES:
+            codes = encode_building_types([btype] * floors.size)
+            got = floor_adjustment_factors(floors, codes).tolist()
+            assert got == [floor_adjustment_factor(int(f), btype) for f in floors]
+
+    def test_layout_factors_match_scalar(self):
+        layouts = ["4房2廳", " 3房2廳 ", "3房", "2房1廳", "1房", "套房", "開放式", "", "4房3房2房"]
+        assert layout_efficiency_factors(layouts).tolist() == [layout_efficiency_factor(l) for l in layouts]
+
+
+# ─────────────────────────────────────────────────────────────────
+_LAYOUT_TOKENS = ["1房", "2房", "3房", "4房", "5房", "套房", "1廳", "2廳", "2衛", "開放式", " ", "樓中樓"]
+
+
+def _random_rows(seed: int, n: int = 400) -> list[tuple]:
+    """隨機輸入列：含未知類別、邊界屋齡 / 樓層、任意格局字串與任意坪數"""
+    rng = np.random.default_rng(seed)
+    regions = list(REGION_BASE_PRICE) + ["火星", ""]
+    btypes  = list(BUILDING_TYPE_CODES) + ["城堡"]
+    rows = []
+    for _ in range(n):
+        layout = "".join(rng.choice(_LAYOUT_TOKENS, size=int(rng.integers(0, 4))))
+        rows.append((
+            str(rng.choice(regions)),
+            str(rng.choice(btypes)),
+            int(rng.integers(-2, 90)),
+            int(rng.integers(-1, 110)),
+            layout,
+            bool(rng.integers(0, 2)),
+            float(rng.choice([rng.uniform(0.01, 2000.0), round(rng.uniform(1, 200), 2)])),
+        ))
+    return rows
+
+
+class TestBaseValuesProperty:
+    """性質：任意輸入下，批次結果與逐筆 calculate_base_value 逐位元相同"""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_vector_equals_scalar(self, seed):
+        rows = _random_rows(seed)
+        values, breakdown = calculate_base_values(*zip(*rows))
+        for i, row in enumerate(rows):
+            base, expected = calculate_base_value(*row)
+            assert values[i] == base, row
+            assert {k: col[i] for k, col in breakdown.items()} == expected, row
+
@@ -0,0 +1,169 @@
+"""
+測試 core/result_cache.py
+涵蓋：TTL 到期、LRU 淘汰、maxsize=0 不快取、執行緒版與 event loop 版 single-flight
+      （並行未命中只計算一次、例外傳給所有等待者且不寫入快取、發起者取消不影響其他等待者）、命中率統計
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.main.python.core.result_cache import ResultCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestStorage:
+    def test_hit_after_put(self):
+        cache = ResultCache("t")
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("b", "missing") == "missing"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = ResultCache("t", ttl_seconds=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10.0
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+        assert cache.stats()["size"] == 0
+
+    def test_lru_eviction(self):
+        cache = ResultCache("t", maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")            # a 變為最近使用
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_maxsize_zero_disables_storage(self):
+        cache = ResultCache("t", maxsize=0)
+        assert cache.get_or_compute("a", lambda: 1) == 1
+        assert cache.stats()["size"] == 0
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("DEMO_CACHE_SIZE", "7")
+        monkeypatch.setenv("DEMO_CACHE_TTL_S", "1.5")
+        cache = ResultCache.from_env("demo", "DEMO")
+        assert (cache.maxsize, cache.ttl_seconds) == (7, 1.5)
+
+    def test_from_env_defaults(self, monkeypatch):
+        monkeypatch.delenv("DEMO_CACHE_SIZE", raising=False)
+        monkeypatch.delenv("DEMO_CACHE_TTL_S", raising=False)
+        cache = ResultCache.from_env("demo", "DEMO", maxsize=16, ttl_seconds=60)
+        assert (cache.maxsize, cache.ttl_seconds) == (16, 60.0)
+
+    def test_clear_resets_stats(self):
+        cache = ResultCache("t")
+        cache.get_or_compute("a", lambda: 1)
+        cache.clear()
+        stats = cache.stats()
+        assert (stats["size"], stats["misses"]) == (0, 0)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestThreadSingleFlight:
+    def test_concurrent_misses_compute_once(self):
+        cache = ResultCache("t")
+        gate, calls = threading.Event(), []
+
+        def compute():
+            calls.append(1)
+            gate.wait(5)
+            return "v"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+                   for _ in range(6)]
+        for t in threads:
+            t.start()
+        while cache.stats()["coalesced"] < 5:
+            threading.Event().wait(0.001)
+        gate.set()
+        for t in threads:
+            t.join()
+        assert results == ["v"] * 6
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert (stats["misses"], stats["coalesced"], stats["in_flight"]) == (1, 5, 0)
+        assert cache.get_or_compute("k", lambda: pytest.fail("應命中快取")) == "v"
+
+    def test_error_is_not_cached(self):
+        cache = ResultCache("t")
+
+        def boom():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute("k", boom)
+        assert cache.get_or_compute("k", lambda: 2) == 2
+        assert cache.stats()["errors"] == 1
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestAsyncSingleFlight:
+    def test_concurrent_misses_compute_once(self):
+        cache = ResultCache("t")
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "v"
+
+        async def scenario():
+            return await asyncio.gather(*(cache.aget_or_compute("k", compute) for _ in range(8)))
+
+        assert asyncio.run(scenario()) == ["v"] * 8
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert (stats["misses"], stats["coalesced"], stats["size"]) == (1, 7, 1)
+        assert stats["hit_rate"] == pytest.approx(7 / 8)
+
+    def test_error_reaches_all_waiters(self):
+        cache = ResultCache("t")
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def scenario():
+            return await asyncio.gather(*(cache.aget_or_compute("k", boom) for _ in range(3)),
+                                        return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert cache.stats()["size"] == 0
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        cache = ResultCache("t")
+
+        async def compute():
+            await asyncio.sleep(0.02)
+            return "v"
+
+        async def scenario():
+            leader = asyncio.ensure_future(cache.aget_or_compute("k", compute))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(cache.aget_or_compute("k", compute))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        assert asyncio.run(scenario()) == "v"
+        assert cache.get("k") == "v"
@@ -0,0 +1,187 @@
+"""
+宣告式規則引擎測試：規則編譯（flag / linear / tiers / in / 條件陣列）、設定錯誤、
+檔案變更熱重新載入（無效設定沿用舊規則）、命中 / 耗時統計
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from src.main.python.inference.rule_engine import RuleConfigError, RuleEngine, RuleSet
+
+FEATURES = ["age", "income", "flag"]
+
+CONFIG = {
+    "version": "v1",
+    "rules": [
+        {"feature": "flag", "label": "旗標", "type": "flag", "when": {"op": "eq", "value": 0}, "weight": 0.3},
+        {"feature": "income", "label": "收入", "type": "tiers", "tiers": [
+            {"when": {"op": "lt", "value": 3.0}, "weight": 0.08},
+            {"when": {"op": "lt", "value": 5.0}, "weight": 0.04},
+        ]},
+        {"feature": "age", "label": "年齡", "type": "flag",
+         "when": [{"op": "ge", "value": 65}, {"op": "in", "value": [18, 19]}], "weight": 0.07},
+    ],
+}
+
+ROWS = np.array([
+    [30, 2.0, 0],
+    [70, 4.0, 1],
+    [18, 6.0, 1],
+    [40, 5.0, 0],
+], dtype=np.float64)
+
+
+def _write(path, config) -> None:
+    path.write_text(json.dumps(config), encoding="utf-8")
+
+
+def _bump_mtime(path, seconds: int) -> None:
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 1_000_000_000))
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestCompile:
+    def test_evaluate_matches_rules(self):
+        rules = RuleSet(CONFIG, FEATURES)
+        np.testing.assert_array_equal(rules.evaluate(ROWS), [
+            [0.3, 0.08, 0.0],
+            [0.0, 0.04, 0.07],
+            [0.0, 0.0,  0.07],
+            [0.3, 0.0,  0.0],
+        ])
+        assert rules.keys == ("flag", "income", "age")
+        assert rules.cols == (2, 1, 0)
+
+    def test_linear_is_capped(self):
+        rules = RuleSet({"rules": [
+            {"feature": "income", "type": "linear", "per_unit": 0.06, "max": 0.25},
+        ]}, FEATURES)
+        np.testing.assert_allclose(rules.evaluate(ROWS)[:, 0], [0.12, 0.24, 0.25, 0.25])
+
+    @pytest.mark.parametrize("rule, message", [
+        ({"feature": "height", "type": "flag", "when": {"op": "eq", "value": 0}, "weight": 1}, "未知特徵"),
+        ({"feature": "age", "type": "score", "weight": 1}, "未知的規則類型"),
+        ({"feature": "age", "type": "flag", "when": {"op": "between", "value": 1}, "weight": 1}, "未知的 op"),
+        ({"feature": "age", "type": "flag", "when": {"op": "eq", "value": 0}}, "weight"),
+        ({"feature": "age", "type": "linear", "per_unit": "0.1", "max": 1}, "per_unit"),
+        ({"feature": "age", "type": "tiers", "tiers": []}, "tiers"),
+    ])
+    def test_invalid_rule_rejected(self, rule, message):
+        with pytest.raises(RuleConfigError, match=message):
+            RuleSet({"rules": [rule]}, FEATURES)
+
+    def test_duplicate_feature_rejected(self):
+        rule = CONFIG["rules"][0]
+        with pytest.raises(RuleConfigError, match="重複"):
+            RuleSet({"rules": [rule, rule]}, FEATURES)
+
+    def test_empty_rules_rejected(self):
+        with pytest.raises(RuleConfigError):
+            RuleSet({"rules": []}, FEATURES)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestStats:
+    def test_hits_and_timing_per_rule(self):
+        rules = RuleSet(CONFIG, FEATURES)
+        rules.evaluate(ROWS)
+        rules.evaluate(ROWS[:1])
+        stats = rules.stats()
+        assert stats["calls"] == 2 and stats["rows"] == 5
+        assert stats["rules"]["flag"]["hits"] == 3
+        assert stats["rules"]["income"]["hit_rate"] == round(3 / 5, 4)
+        assert stats["rules"]["age"]["total_ms"] >= 0
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestHotReload:
+    @pytest.fixture
+    def rules_file(self, tmp_path):
+        path = tmp_path / "rules.json"
+        _write(path, CONFIG)
+        return path
+
+    def test_file_change_reloads(self, rules_file):
+        engine = RuleEngine(rules_file, FEATURES, reload_interval_s=0)
+        before = engine.current()
+        _write(rules_file, {**CONFIG, "version": "v2", "rules": CONFIG["rules"][:1]})
+        _bump_mtime(rules_file, 1)
+        after = engine.current()
+        assert after is not before
+        assert after.version == "v2" and after.keys == ("flag",)
+        assert engine.stats()["reloads"] == 1
+
+    def test_unchanged_file_keeps_rule_set(self, rules_file):
+        engine = RuleEngine(rules_file, FEATURES, reload_interval_s=0)
+        assert engine.current() is engine.current()
+        assert engine.stats()["reloads"] == 0
+
+    def test_check_interval_throttles_reload(self, rules_file):
+        engine = RuleEngine(rules_file, FEATURES, reload_interval_s=3600)
+        before = engine.current()
+        _write(rules_file, {**CONFIG, "version": "v2"})
+        _bump_mtime(rules_file, 1)
+        assert engine.current() is before
+        assert engine.reload() is True
+        assert engine.current().version == "v2"
+
+    def test_invalid_update_keeps_previous_rules(self, rules_file):
+        engine = RuleEngine(rules_file, FEATURES, reload_interval_s=0)
+        before = engine.current()
+        rules_file.write_text("{not json", encoding="utf-8")
+        _bump_mtime(rules_file, 1)
+        assert engine.current() is before
+        stats = engine.stats()
+        assert stats["reload_errors"] == 1 and "JSON" in stats["last_error"]
+
+        _write(rules_file, {**CONFIG, "version": "v3"})
+        _bump_mtime(rules_file, 2)
+        assert engine.current().version == "v3"
+        assert engine.stats()["last_error"] is None
+
+    def test_missing_file_at_startup_raises(self, tmp_path):
+        with pytest.raises(RuleConfigError, match="無法讀取"):
+            RuleEngine(tmp_path / "missing.json", FEATURES)
+
+    def test_concurrent_evaluation_during_reloads(self, rules_file):
+        # 評分執行緒持續取用 current()，主執行緒反覆切換兩版規則；每批結果須完全符合其中一版
+        engine = RuleEngine(rules_file, FEATURES, reload_interval_s=3600)
+        expected = {
+            "v1": RuleSet(CONFIG, FEATURES).evaluate(ROWS),
+            "v2": RuleSet({**CONFIG, "rules": CONFIG["rules"][::-1]}, FEATURES).evaluate(ROWS),
+        }
+        errors = []
+        stop = threading.Event()
+
+        def score():
+            while not stop.is_set():
+                rules = engine.current()
+                version = "v1" if rules.keys[0] == "flag" else "v2"
+                if not np.array_equal(rules.evaluate(ROWS), expected[version]):
+                    errors.append(version)
+
+        workers = [threading.Thread(target=score) for _ in range(4)]
+        for w in workers:
+            w.start()
+        for i in range(20):
+            rules = CONFIG["rules"] if i % 2 else CONFIG["rules"][::-1]
+            _write(rules_file, {**CONFIG, "rules": rules})
+            _bump_mtime(rules_file, i + 1)
+            engine.reload()
+        stop.set()
+        for w in workers:
+            w.join()
+        assert errors == []
+        assert engine.stats()["reloads"] == 20
+
+    def test_from_env(self, rules_file, monkeypatch, tmp_path):
+        monkeypatch.setenv("TEST_RULES_PATH", str(rules_file))
+        monkeypatch.setenv("TEST_RULES_RELOAD_S", "0.5")
+        engine = RuleEngine.from_env("TEST", tmp_path / "default.json", FEATURES)
+        assert engine.path == rules_file
+        assert engine.reload_interval_s == 0.5
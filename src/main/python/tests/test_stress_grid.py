@@ -0,0 +1,62 @@
+"""
+測試 inference/stress_grid.py
+涵蓋：網格 shape、sampled 引擎與逐格 run_monte_carlo 完全一致、analytic 封閉解、
+      變異數縮減引擎、壓力情境單調性、輸入驗證
+"""
+
+import numpy as np
+import pytest
+
+from src.main.python.inference.stress_grid import run_stress_grid, StressGridResult
+from src.main.python.inference.monte_carlo import (
+    run_monte_carlo,
+    RISK_LEVELS,
+    ENGINE_ANALYTIC,
+    ENGINE_SAMPLED,
+    ENGINE_ANTITHETIC,
+)
+
+SPOTS  = [10_000_000, 23_456_789]
+MUS    = [-0.05, 0.0, 0.045]
+SIGMAS = [0.04, 0.08, 0.16]
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRunStressGrid:
+    def test_returns_grid_shape(self):
+        res = run_stress_grid(SPOTS, MUS, SIGMAS)
+        assert isinstance(res, StressGridResult)
+        for arr in (res.p5, res.p50, res.p95, res.risk_codes):
+            assert arr.shape == (2, 3, 3)
+
+    @pytest.mark.parametrize("engine", [ENGINE_SAMPLED, ENGINE_ANALYTIC, ENGINE_ANTITHETIC])
+    def test_matches_per_cell_run_monte_carlo(self, engine):
+        res = run_stress_grid(SPOTS, MUS, SIGMAS, engine=engine)
+        for k, spot in enumerate(SPOTS):
+            for i, mu in enumerate(MUS):
+                for j, sigma in enumerate(SIGMAS):
+                    ci, risk = run_monte_carlo(spot, mu, sigma, engine=engine)
+                    assert (res.p5[k, i, j], res.p50[k, i, j], res.p95[k, i, j]) == (ci.p5, ci.p50, ci.p95)
+                    assert RISK_LEVELS[res.risk_codes[k, i, j]] == risk
+
+    def test_scalar_spot_accepted(self):
+        res = run_stress_grid(10_000_000, MUS, SIGMAS)
+        assert res.p50.shape == (1, 3, 3)
+
+    def test_lower_drift_lowers_median(self):
+        res = run_stress_grid(SPOTS, MUS, SIGMAS, engine=ENGINE_SAMPLED)
+        assert np.all(np.diff(res.p50, axis=1) > 0)
+
+    def test_higher_volatility_widens_interval(self):
+        res = run_stress_grid(SPOTS, MUS, SIGMAS, engine=ENGINE_SAMPLED)
+        spread = res.p95 - res.p5
+        assert np.all(np.diff(spread, axis=2) > 0)
+        assert np.all(np.diff(res.risk_codes, axis=2) >= 0)
+
+    def test_rejects_non_positive_sigma(self):
+        with pytest.raises(ValueError):
+            run_stress_grid(SPOTS, MUS, [0.0, 0.08])
+
+    def test_rejects_unknown_engine(self):
+        with pytest.raises(ValueError):
+            run_stress_grid(SPOTS, MUS, SIGMAS, engine="quantum")
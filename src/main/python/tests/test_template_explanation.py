@@ -0,0 +1,45 @@
+"""
+測試 services/templateExplanation.py — 模板白話解釋
+"""
+
+from src.main.python.services.templateExplanation import template_explanation_zh
+
+RESULT = dict(
+    district="大安區", building_type="大樓", area_ping=30.0, property_age=10, floor=8,
+    price_per_ping=950_000.0, estimated_value=28_500_000.0, ltv_ratio=0.28,
+    risk_level="低風險", loan_amount=8_000_000.0,
+)
+FACTORS = [
+    {"label": "屋齡", "contribution": -0.31, "direction": "拉低"},
+    {"label": "行政區", "contribution": 0.52, "direction": "拉高"},
+    {"label": "成交年份", "contribution": 0.10, "direction": "拉高"},
+    {"label": "樓層", "contribution": 0.07, "direction": "拉高"},
+]
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestTemplateExplanation:
+    def test_three_paragraphs(self):
+        text = template_explanation_zh(**RESULT, shap_factors=FACTORS)
+        paragraphs = text.split("\n\n")
+        assert len(paragraphs) == 3
+        assert "大安區" in paragraphs[0] and "95.0 萬元" in paragraphs[0] and "2,850 萬元" in paragraphs[0]
+        assert "LTV 為 28.0%" in paragraphs[2] and "低風險" in paragraphs[2]
+
+    def test_factors_ordered_by_contribution_top3(self):
+        factors = template_explanation_zh(**RESULT, shap_factors=FACTORS).split("\n\n")[1]
+        assert factors.index("所在行政區行情較高") < factors.index("屋齡折舊") < factors.index("成交年份拉高估價")
+        assert "樓層" not in factors
+        assert "約占 52%" in factors
+
+    def test_without_factors_omits_paragraph(self):
+        assert len(template_explanation_zh(**RESULT).split("\n\n")) == 2
+
+    def test_ltv_bands(self):
+        high = template_explanation_zh(**{**RESULT, "ltv_ratio": 0.85, "risk_level": "中風險"})
+        assert "貸款成數偏高" in high and "還款能力" in high
+        assert "貸款成數在一般範圍內" in template_explanation_zh(**{**RESULT, "ltv_ratio": 0.7})
+        assert "貸款成數保守" in template_explanation_zh(**RESULT)
+
+    def test_deterministic(self):
+        assert template_explanation_zh(**RESULT, shap_factors=FACTORS) == template_explanation_zh(**RESULT, shap_factors=FACTORS)
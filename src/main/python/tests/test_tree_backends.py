@@ -0,0 +1,96 @@
+"""
+測試 inference/tree_backends.py
+涵蓋：偏好順序解析、native 與 inplace_predict 一致、未知 / 缺套件後端退回 native 並記錄原因、
+      onnx / treelite 後端與 native 一致且產物快取（套件已安裝時）
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from src.main.python.inference.tree_backends import (
+    BACKEND_NATIVE,
+    BackendSelection,
+    parse_backends,
+    select_backend,
+)
+
+xgb = pytest.importorskip("xgboost")
+
+
+@pytest.fixture(scope="module")
+def model(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, size=(300, 4)).astype(np.float32)
+    y = X[:, 0] - 0.5 * X[:, 2] + rng.normal(0, 0.1, 300)
+    reg = xgb.XGBRegressor(n_estimators=10, max_depth=3).fit(X, y)
+    path = tmp_path_factory.mktemp("model") / "tiny.json"
+    reg.save_model(str(path))
+    return reg.get_booster(), path, X[:32]
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestSelection:
+    def test_parse_backends(self):
+        assert parse_backends(None) == [BACKEND_NATIVE]
+        assert parse_backends(" Treelite, onnx ,") == ["treelite", "onnx"]
+
+    def test_native_matches_inplace_predict(self, model):
+        booster, path, rows = model
+        selection = select_backend(booster, path, ["native"])
+        expected = booster.inplace_predict(rows, validate_features=False)
+        np.testing.assert_array_equal(selection.backend.predict(rows), expected)
+        assert selection.info() == {"backend": "native", "requested": ["native"], "fallback": False, "errors": {}}
+
+    def test_unknown_backend_falls_back_to_native(self, model):
+        booster, path, _ = model
+        selection = select_backend(booster, path, ["tensorrt"])
+        assert isinstance(selection, BackendSelection)
+        assert selection.backend.name == "native"
+        info = selection.info()
+        assert info["fallback"] is True
+        assert "tensorrt" in info["errors"]
+
+    def test_failing_backend_records_error(self, model, monkeypatch):
+        import src.main.python.inference.tree_backends as tb
+
+        def broken(*args, **kwargs):
+            raise ImportError("No module named 'onnxruntime'")
+        monkeypatch.setitem(tb._BACKEND_CLASSES, "onnx", broken)
+        booster, path, _ = model
+        selection = select_backend(booster, path, ["onnx", "native"])
+        assert selection.backend.name == "native"
+        assert "onnxruntime" in selection.errors["onnx"]
+
+    def test_env_selects_backend(self, model, monkeypatch):
+        booster, path, _ = model
+        monkeypatch.setenv("XGBOOST_BACKEND", "native")
+        assert select_backend(booster, path).requested == ["native"]
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestCompiledBackends:
+    def _check(self, model, name):
+        booster, path, rows = model
+        selection = select_backend(booster, path, [name])
+        assert selection.backend.name == name, selection.errors
+        expected = booster.inplace_predict(rows, validate_features=False)
+        np.testing.assert_allclose(selection.backend.predict(rows), expected, rtol=1e-5, atol=1e-5)
+        return selection.backend.artifact
+
+    def test_onnx_matches_native_and_caches(self, model):
+        pytest.importorskip("onnxruntime")
+        pytest.importorskip("onnxmltools")
+        artifact = self._check(model, "onnx")
+        mtime = os.path.getmtime(artifact)
+        self._check(model, "onnx")
+        assert os.path.getmtime(artifact) == mtime
+
+    def test_treelite_matches_native(self, model):
+        pytest.importorskip("treelite")
+        pytest.importorskip("tl2cgen")
+        if shutil.which("gcc") is None:
+            pytest.skip("需要 gcc 編譯 Treelite 函式庫")
+        assert self._check(model, "treelite").exists()
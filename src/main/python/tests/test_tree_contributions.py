@@ -0,0 +1,58 @@
+"""
+測試 inference/tree_contributions.py
+涵蓋：貢獻值 + bias = 模型 margin、與 shap.TreeExplainer 數值一致（已安裝時）、
+      Saabas 近似同樣可加總、前 k 大排序（同值保留欄位順序）
+"""
+
+import numpy as np
+import pytest
+
+from src.main.python.inference.tree_contributions import tree_contributions, top_k_contributions
+
+xgb = pytest.importorskip("xgboost")
+
+
+@pytest.fixture(scope="module")
+def booster_and_rows():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, size=(300, 5)).astype(np.float32)
+    y = 2 * X[:, 0] - X[:, 3] + rng.normal(0, 0.1, 300)
+    model = xgb.XGBRegressor(n_estimators=20, max_depth=3).fit(X, y)
+    return model.get_booster(), X[:16]
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestTreeContributions:
+    def test_shape_drops_bias_column(self, booster_and_rows):
+        booster, rows = booster_and_rows
+        assert tree_contributions(booster, rows).shape == rows.shape
+
+    @pytest.mark.parametrize("approximate", [False, True])
+    def test_contributions_sum_to_margin(self, booster_and_rows, approximate):
+        booster, rows = booster_and_rows
+        full = booster.predict(xgb.DMatrix(rows), pred_contribs=True, approx_contribs=approximate)
+        contribs = tree_contributions(booster, rows, approximate=approximate)
+        margin = booster.predict(xgb.DMatrix(rows), output_margin=True)
+        np.testing.assert_allclose(contribs.sum(axis=1) + full[:, -1], margin, rtol=1e-4, atol=1e-4)
+
+    def test_matches_shap_tree_explainer(self, booster_and_rows):
+        shap = pytest.importorskip("shap")
+        booster, rows = booster_and_rows
+        expected = shap.TreeExplainer(booster).shap_values(rows)
+        np.testing.assert_allclose(tree_contributions(booster, rows), expected, rtol=1e-5, atol=1e-5)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestTopK:
+    def test_orders_by_absolute_value(self):
+        order, values = top_k_contributions(np.array([[0.1, -0.5, 0.3, 0.0]]), k=3)
+        assert order.tolist() == [[1, 2, 0]]
+        assert values.tolist() == [[-0.5, 0.3, 0.1]]
+
+    def test_ties_keep_column_order(self):
+        order, _ = top_k_contributions(np.array([[0.2, -0.2, 0.2]]), k=2)
+        assert order.tolist() == [[0, 1]]
+
+    def test_accepts_single_row(self):
+        order, values = top_k_contributions(np.array([1.0, -2.0]), k=1)
+        assert order.shape == values.shape == (1, 1)
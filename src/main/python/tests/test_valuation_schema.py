@@ -89,6 +89,13 @@ class TestValuationRequest:
             req = ValuationRequest(**{**VALID_REQUEST, "building_type": bt})
             assert req.building_type == bt
 
+    def test_term_years_optional(self):
+        assert ValuationRequest(**VALID_REQUEST).term_years is None
+
+    def test_term_years_exceeds_40_raises(self):
+        with pytest.raises(ValidationError):
+            ValuationRequest(**{**VALID_REQUEST, "term_years": 41})
+
     def test_parking_true_accepted(self):
         req = ValuationRequest(**{**VALID_REQUEST, "has_parking": True})
         assert req.has_parking is True
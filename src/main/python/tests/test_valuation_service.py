@@ -1,11 +1,11 @@
 """
 測試 services/valuationService.py
-涵蓋：端對端鑑價流程、LTV 計算、風險等級升級邏輯、breakdown 鍵完整性
+涵蓋：端對端鑑價流程、LTV 計算、風險等級升級邏輯、breakdown 鍵完整性、批次鑑價與逐筆一致
 """
 
 import pytest
-from src.main.python.models.valuation_schema import ValuationRequest
-from src.main.python.services.valuationService import valuate
+from src.main.python.models.valuation_schema import ValuationRequest, ValuationResult
+from src.main.python.services.valuationService import valuate, valuate_batch
 
 
 def make_request(**kwargs):
@@ -107,3 +107,52 @@ class TestValuate:
         for region in REGION_BASE_PRICE:
             result = valuate(make_request(region=region))
             assert result.estimated_value > 0, f"{region} 鑑價應為正值"
+
+    def test_term_structure_default_checkpoints(self):
+        result = valuate(make_request())
+        assert [p.years for p in result.term_structure] == [1.0, 3.0, 5.0, 10.0]
+
+    def test_term_structure_extends_to_loan_maturity(self):
+        result = valuate(make_request(term_years=30))
+        assert result.term_structure[-1].years == 30.0
+        first = result.term_structure[0]
+        assert first.p50 == result.confidence_interval.p50
+
+    def test_ltv_breach_probability_thresholds(self):
+        result = valuate(make_request(term_years=30))
+        probs = result.ltv_breach_probability
+        assert set(probs) == {"80%", "90%"}
+        assert 0.0 <= probs["90%"] <= probs["80%"] <= 1.0
+
+    def test_longer_term_raises_breach_probability(self):
+        short = valuate(make_request(term_years=5)).ltv_breach_probability
+        long  = valuate(make_request(term_years=30)).ltv_breach_probability
+        assert long["80%"] >= short["80%"]
+
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestValuateBatch:
+    def test_matches_per_item_valuate(self):
+        requests = [
+            make_request(region=region, building_type=btype, property_age=age, floor=floor,
+                         has_parking=parking, term_years=term, loan_amount=loan)
+            for region, btype, age, floor, parking, term, loan in [
+                ("台北市", "大樓",  3,  12, True,  None, 12_000_000.0),
+                ("新北市", "公寓",  35, 1,  False, 20,   9_000_000.0),
+                ("高雄市", "透天",  18, 3,  True,  30,   4_000_000.0),
+                ("連江縣", "別墅",  50, 2,  False, 30,   1_000_000.0),
+                ("台中市", "華廈",  8,  26, False, None, 30_000_000.0),
+            ]
+        ]
+        batch = valuate_batch(requests)
+        assert len(batch) == len(requests)
+        for req, out in zip(requests, batch):
+            assert out == valuate(req).model_dump()
+
+    def test_output_validates_as_valuation_result(self):
+        out = valuate_batch([make_request(term_years=25)])[0]
+        assert ValuationResult.model_validate(out).term_structure[-1].years == 25.0
+
+    def test_empty_batch(self):
+        assert valuate_batch([]) == []
@@ -0,0 +1,144 @@
+"""
+測試 inference/variance_reduction.py
+涵蓋：三種抽樣器與封閉解一致、標準誤回報、目標精度自動調整路徑數、
+      Sobol 同路徑數下標準誤較小、路徑數不超過 max_paths、
+      run_monte_carlo 引擎整合（風險等級穩定、信心區間附標準誤）
+"""
+
+import pytest
+
+from src.main.python.inference.variance_reduction import (
+    run_variance_reduced,
+    PrecisionResult,
+    SAMPLERS,
+    SAMPLER_PLAIN,
+    SAMPLER_ANTITHETIC,
+    SAMPLER_SOBOL,
+)
+from src.main.python.inference.monte_carlo import (
+    run_monte_carlo,
+    run_monte_carlo_batch,
+    _analytic_multipliers,
+    ENGINE_ANALYTIC,
+    ENGINE_SAMPLED,
+    ENGINE_SOBOL,
+    ENGINE_ANTITHETIC,
+)
+
+SPOT = 10_000_000
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRunVarianceReduced:
+    @pytest.mark.parametrize("sampler", SAMPLERS)
+    def test_within_five_standard_errors_of_closed_form(self, sampler):
+        res = run_variance_reduced(SPOT, sampler=sampler, n_paths=4096)
+        exact = [SPOT * m for m in _analytic_multipliers(0.045, 0.08)]
+        ci = res.confidence_interval
+        for key, est, ref in zip(("p5", "p50", "p95"), (ci.p5, ci.p50, ci.p95), exact):
+            assert abs(est - ref) <= 5 * res.standard_errors[key] + 1.0
+
+    @pytest.mark.parametrize("sampler", SAMPLERS)
+    def test_reports_standard_error_for_every_percentile(self, sampler):
+        res = run_variance_reduced(SPOT, sampler=sampler)
+        assert isinstance(res, PrecisionResult)
+        assert set(res.standard_errors) == {"p5", "p50", "p95"}
+        assert all(v >= 0 for v in res.standard_errors.values())
+
+    def test_sobol_beats_plain_at_equal_paths(self):
+        plain = run_variance_reduced(SPOT, sampler=SAMPLER_PLAIN, n_paths=2048)
+        sobol = run_variance_reduced(SPOT, sampler=SAMPLER_SOBOL, n_paths=2048)
+        assert sobol.relative_errors["p5"] < plain.relative_errors["p5"] / 2
+
+    def test_antithetic_median_is_nearly_exact(self):
+        res = run_variance_reduced(SPOT, sampler=SAMPLER_ANTITHETIC, n_paths=2048)
+        assert res.relative_errors["p50"] < 1e-4
+
+    @pytest.mark.parametrize("sampler", SAMPLERS)
+    def test_target_precision_is_met(self, sampler):
+        res = run_variance_reduced(SPOT, sampler=sampler, n_paths=256, target_rel_error=0.002)
+        assert res.target_met
+        assert max(res.relative_errors.values()) <= 0.002
+
+    def test_sobol_needs_fewer_paths_than_plain_for_target(self):
+        plain = run_variance_reduced(SPOT, sampler=SAMPLER_PLAIN, n_paths=256, target_rel_error=0.002)
+        sobol = run_variance_reduced(SPOT, sampler=SAMPLER_SOBOL, n_paths=256, target_rel_error=0.002)
+        assert sobol.n_paths * 4 <= plain.n_paths
+
+    def test_max_paths_caps_search(self):
+        res = run_variance_reduced(
+            SPOT, sampler=SAMPLER_PLAIN, n_paths=256, target_rel_error=1e-6, max_paths=4096,
+        )
+        assert not res.target_met
+        assert res.n_paths <= 4096
+
+    @pytest.mark.parametrize("sampler", SAMPLERS)
+    @pytest.mark.parametrize("max_paths", [3000, 5000, 4096])
+    def test_capped_paths_never_exceed_max_paths(self, sampler, max_paths):
+        res = run_variance_reduced(
+            SPOT, sampler=sampler, n_paths=256, target_rel_error=1e-6, max_paths=max_paths,
+        )
+        assert not res.target_met
+        assert res.n_paths <= max_paths
+        if sampler == SAMPLER_SOBOL:
+            per_rep = res.n_paths // res.n_replicates
+            assert per_rep & (per_rep - 1) == 0
+            assert res.n_paths * 2 > max_paths   # 2 的冪次中不超過上限的最大者
+
+    def test_confidence_interval_carries_standard_errors(self):
+        res = run_variance_reduced(SPOT, sampler=SAMPLER_SOBOL)
+        assert res.confidence_interval.standard_errors == res.standard_errors
+
+    def test_sobol_replicates_are_powers_of_two(self):
+        res = run_variance_reduced(SPOT, sampler=SAMPLER_SOBOL, n_paths=1000, n_replicates=16)
+        per_rep = res.n_paths // 16
+        assert per_rep & (per_rep - 1) == 0
+
+    def test_deterministic_with_same_seed(self):
+        a = run_variance_reduced(SPOT, seed=7)
+        b = run_variance_reduced(SPOT, seed=7)
+        assert a.confidence_interval == b.confidence_interval
+
+    def test_unknown_sampler_raises(self):
+        with pytest.raises(ValueError):
+            run_variance_reduced(SPOT, sampler="halton")
+
+    def test_single_replicate_raises(self):
+        with pytest.raises(ValueError):
+            run_variance_reduced(SPOT, n_replicates=1)
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestMonteCarloEngineIntegration:
+    @pytest.mark.parametrize("engine", [ENGINE_SOBOL, ENGINE_ANTITHETIC])
+    @pytest.mark.parametrize("sigma", [0.001, 0.06, 0.08, 0.20, 0.80])
+    def test_risk_level_matches_analytic(self, engine, sigma):
+        _, risk = run_monte_carlo(SPOT, sigma=sigma, engine=engine)
+        _, risk_a = run_monte_carlo(SPOT, sigma=sigma, engine=ENGINE_ANALYTIC)
+        assert risk == risk_a
+
+    def test_sobol_engine_close_to_analytic(self):
+        ci, _ = run_monte_carlo(SPOT, engine=ENGINE_SOBOL)
+        ci_a, _ = run_monte_carlo(SPOT, engine=ENGINE_ANALYTIC)
+        assert abs(ci.p5 / ci_a.p5 - 1) < 0.003
+        assert abs(ci.p95 / ci_a.p95 - 1) < 0.003
+
+    @pytest.mark.parametrize("engine", [ENGINE_SOBOL, ENGINE_ANTITHETIC])
+    def test_engine_reports_standard_errors(self, engine):
+        ci, _ = run_monte_carlo(SPOT, engine=engine)
+        res = run_variance_reduced(SPOT, sampler=engine, n_paths=1000)
+        assert set(ci.standard_errors) == {"p5", "p50", "p95"}
+        for key in ("p5", "p50", "p95"):
+            assert ci.standard_errors[key] == pytest.approx(res.standard_errors[key], abs=0.02)
+
+    @pytest.mark.parametrize("engine", [ENGINE_ANALYTIC, ENGINE_SAMPLED])
+    def test_other_engines_have_no_replicate_standard_errors(self, engine):
+        ci, _ = run_monte_carlo(SPOT, engine=engine)
+        assert ci.standard_errors is None
+
+    def test_batch_standard_errors_match_single(self):
+        spots = [SPOT, 2 * SPOT]
+        ci, _ = run_monte_carlo_batch(spots, sigmas=[0.08, 0.12], engine=ENGINE_SOBOL)
+        for i, (spot, sigma) in enumerate(zip(spots, (0.08, 0.12))):
+            single, _ = run_monte_carlo(spot, sigma=sigma, engine=ENGINE_SOBOL)
+            assert {k: float(v[i]) for k, v in ci.standard_errors.items()} == single.standard_errors
@@ -0,0 +1,53 @@
+"""
+測試 core/warmup.py
+涵蓋：階段依序執行並記錄耗時、失敗即停止且維持未就緒、/ready 狀態碼、reset
+"""
+
+import asyncio
+
+from src.main.python.core.warmup import Readiness, run_warmup
+
+
+def step(log: list, name: str, fail: bool = False):
+    async def _run():
+        log.append(name)
+        if fail:
+            raise RuntimeError(f"{name} 失敗")
+    return _run
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestRunWarmup:
+    def test_all_phases_succeed(self):
+        log: list = []
+        readiness = Readiness("svc")
+        asyncio.run(run_warmup(readiness, [("a", step(log, "a")), ("b", step(log, "b"))]))
+        assert log == ["a", "b"]
+        snap = readiness.snapshot()
+        assert snap["ready"] is True
+        assert list(snap["phases_ms"]) == ["a", "b"]
+        assert snap["warmup_ms"] >= 0
+        assert snap["error"] is None
+
+    def test_failure_stops_and_stays_not_ready(self):
+        log: list = []
+        readiness = Readiness("svc")
+        asyncio.run(run_warmup(readiness, [
+            ("a", step(log, "a", fail=True)),
+            ("b", step(log, "b")),
+        ]))
+        assert log == ["a"]
+        assert readiness.ready is False
+        assert "a" in readiness.error
+        assert "a" in readiness.phases_ms
+
+
+# ─────────────────────────────────────────────────────────────────
+class TestReadinessResponse:
+    def test_status_codes(self):
+        readiness = Readiness("svc")
+        assert readiness.response().status_code == 503
+        readiness.mark_ready()
+        assert readiness.response().status_code == 200
+        readiness.reset()
+        assert readiness.response().status_code == 503
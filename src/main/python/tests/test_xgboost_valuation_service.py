@@ -1,8 +1,18 @@
 """
 測試 services/xgboostValuationService.py
-涵蓋：Demo 模式（模型不存在時）、信心區間排序、LTV 計算、風險升級邏輯
+涵蓋：Demo 模式（模型不存在時）、信心區間排序、LTV 計算、風險升級邏輯、
+      正式模式單列快速推論路徑（與 DataFrame 路徑一致、每執行緒特徵列）、微批次推論與單列一致、
+      原生樹貢獻解釋因子、估價結果快取（只改貸款金額時命中、快取鍵正規化）、
+      價格曲面模式（格點與即時推論一致、內插、季度不符 / 曲面不存在時退回即時推論）、
+      首次載入執行緒安全（並行首次呼叫、慢速後端選擇）、
+      Qwen2.5 解釋快取（重複 / 並行請求只生成一次、磁碟層、失敗不快取）、分層解釋（延遲預算、模板備援）
 """
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pytest
 from unittest.mock import patch
 from pathlib import Path
@@ -127,3 +137,414 @@ class TestDemoMode:
             for district in list(DISTRICT_TO_REGION.keys())[:15]:
                 result = _valuate(district=district)
                 assert result["estimated_value"] > 0, f"{district} 鑑價應為正值"
+
+    def test_term_structure_extends_to_maturity(self):
+        with patch("src.main.python.services.xgboostValuationService.MODEL_PATH") as mp:
+            mp.exists.return_value = False
+            result = _valuate(term_years=20)
+        years = [p["years"] for p in result["term_structure"]]
+        assert years == [1.0, 3.0, 5.0, 10.0, 20.0]
+        assert result["term_structure"][0]["p50"] == result["confidence_interval"]["p50"]
+
+    def test_ltv_breach_probability_present(self):
+        with patch("src.main.python.services.xgboostValuationService.MODEL_PATH") as mp:
+            mp.exists.return_value = False
+            result = _valuate(term_years=30)
+        probs = result["ltv_breach_probability"]
+        assert set(probs) == {"80%", "90%"}
+        assert 0.0 <= probs["90%"] <= probs["80%"] <= 1.0
+
+
+    def test_loan_change_reuses_cached_valuation(self):
+        from src.main.python.services.xgboostValuationService import valuation_cache
+        with patch("src.main.python.services.xgboostValuationService.MODEL_PATH") as mp:
+            mp.exists.return_value = False
+            valuation_cache.clear()
+            low  = _valuate(loan_amount=4_000_000.0)
+            high = _valuate(loan_amount=12_000_000.0)
+        stats = valuation_cache.stats()
+        assert (stats["misses"], stats["hits"]) == (1, 1)
+        assert high["estimated_value"] == low["estimated_value"]
+        assert high["ltv_ratio"] == pytest.approx(3 * low["ltv_ratio"], abs=2e-4)
+        assert high["ltv_breach_probability"]["80%"] >= low["ltv_breach_probability"]["80%"]
+
+    def test_cache_key_quantizes_area_and_includes_term(self):
+        from src.main.python.services.xgboostValuationService import valuation_cache_key
+        base = ("大安區", "大樓", 30.0, 10, 8, 12, False, 3)
+        assert valuation_cache_key(*base) == valuation_cache_key(" 大安區", "大樓", 30.001, 10, 8, 12, False, 3)
+        assert valuation_cache_key(*base) != valuation_cache_key(*base, term_years=20)
+
+
+# ─── 正式模式：單列快速推論路徑 ────────────────────────────────────
+
+class TestLiveFastPath:
+    """預配置列 + inplace_predict 與原 DataFrame + predict 路徑逐位元一致（需模型檔）"""
+
+    @pytest.fixture(autouse=True)
+    def svc(self):
+        pytest.importorskip("xgboost")
+        from src.main.python.services import xgboostValuationService as svc
+        if not svc.MODEL_PATH.exists():
+            pytest.skip("模型檔不存在")
+        svc._load()
+        return svc
+
+    def _dataframe_predict(self, svc, features: dict) -> float:
+        pd = pytest.importorskip("pandas")
+        row = pd.DataFrame([{
+            **features,
+            "district":      svc._encode("district", features["district"]),
+            "building_type": svc._encode("building_type", features["building_type"]),
+            "has_parking":   int(features["has_parking"]),
+        }])[svc.FEATURE_COLS]
+        return float(svc._model.predict(row)[0])
+
+    @pytest.mark.parametrize("district,building_type,age,floor", [
+        ("大安區", "大樓", 10, 8),
+        ("萬華區", "公寓", 45, 3),
+        ("火星區", "城堡", 0, 1),     # 未知類別 → 編碼 0
+    ])
+    def test_matches_dataframe_predict(self, svc, district, building_type, age, floor):
+        features = dict(
+            district=district, building_type=building_type, area_ping=32.5,
+            property_age=age, floor=floor, total_floors=12, has_parking=True,
+            rooms=3, year=2025, quarter=2,
+        )
+        fast = svc._predict_log_price(svc._fill_row(svc._feature_row(), **features))
+        assert fast == self._dataframe_predict(svc, features)
+
+    def test_encode_matches_label_encoder(self, svc):
+        joblib = pytest.importorskip("joblib")
+        le = joblib.load(svc.ENCODERS_PATH)["district"]
+        for name in le.classes_[:10]:
+            assert svc._encode("district", name) == int(le.transform([name])[0])
+        assert svc._encode("district", "火星區") == 0
+
+    def test_json_tables_match_pickled_encoders(self, svc):
+        joblib = pytest.importorskip("joblib")
+        from src.main.python.utils.category_tables import CategoryTables
+        compiled = CategoryTables.from_label_encoders(joblib.load(svc.ENCODERS_PATH))
+        assert CategoryTables.load(svc.CATEGORY_TABLES_PATH).classes == compiled.classes
+
+    def test_unknown_category_is_counted(self, svc):
+        before = svc.category_stats()["district"]["unknown"]
+        svc._encode("district", "火星區")
+        stats = svc.category_stats()["district"]
+        assert stats["unknown"] == before + 1
+        assert "火星區" in stats["top_unknown"]
+
+    def test_row_buffer_is_per_thread(self, svc):
+        import threading
+        main_row = svc._feature_row()
+        assert svc._feature_row() is main_row
+        other: list = []
+        t = threading.Thread(target=lambda: other.append(svc._feature_row()))
+        t.start(); t.join()
+        assert other[0] is not main_row
+
+    def test_valuate_live_mode(self, svc):
+        result = _valuate()
+        assert result["model"] == "xgboost"
+        assert result["estimated_value"] > 0
+
+    def test_batched_prediction_matches_single_row(self, svc):
+        rows = np.stack([
+            svc.build_feature_row(d, "大樓", 30.0 + i, i, 3 + i, 12, i % 2 == 0, 3)
+            for i, d in enumerate(["大安區", "信義區", "萬華區", "火星區"])
+        ])
+        batched = svc.predict_log_prices(rows)
+        for i, row in enumerate(rows):
+            assert batched[i] == svc._predict_log_price(row[None, :])
+
+    def test_precomputed_prediction_is_used(self, svc):
+        row = svc.build_feature_row("大安區", "大樓", 30.0, 10, 8, 12, False, 3)
+        direct  = _valuate()
+        batched = _valuate(live_prediction=svc.predict_live(row[None, :])[0])
+        assert batched == direct
+
+    def test_default_backend_is_native(self, svc):
+        info = svc.backend_info()
+        assert info["backend"] == "native"
+        assert info["fallback"] is False
+
+    def test_live_factors_are_explained(self, svc):
+        factors = _valuate()["shap_factors"]
+        assert len(factors) == 3
+        assert sum(abs(f["contribution"]) for f in factors) <= 1.0
+        assert all(f["direction"] in ("拉高", "拉低") for f in factors)
+
+
+# ─── 價格曲面模式 ──────────────────────────────────────────────────
+
+class TestSurfaceMode:
+    """model="surface"：離線曲面查表（需模型檔建置小型曲面）"""
+
+    KNOTS = {
+        "floor":        (1, 8, 20),
+        "total_floors": (5, 12),
+        "rooms":        (2, 3),
+        "property_age": (0, 10, 30),
+        "area_ping":    (20, 30, 40),
+    }
+
+    @pytest.fixture(autouse=True)
+    def svc(self, monkeypatch, tmp_path):
+        pytest.importorskip("xgboost")
+        from src.main.python.services import xgboostValuationService as svc
+        from src.main.python.inference.price_surface import build_price_surface
+        if not svc.MODEL_PATH.exists():
+            pytest.skip("模型檔不存在")
+        svc._load()
+        year, quarter = svc._year_quarter()
+        build_price_surface(
+            tmp_path, svc.predict_log_prices,
+            n_districts      = len(svc._categories.classes["district"]),
+            n_building_types = len(svc._categories.classes["building_type"]),
+            year=year, quarter=quarter, knots=self.KNOTS,
+            meta={"model_version": svc.model_version(), "categories": svc._categories.classes},
+        )
+        monkeypatch.setattr(svc, "SURFACE_DIR", tmp_path)
+        monkeypatch.setattr(svc, "_surface", None)
+        monkeypatch.setattr(svc, "_surface_error", None)
+        svc.valuation_cache.clear()
+        return svc
+
+    def test_grid_point_matches_live_inference(self, svc):
+        surface = _valuate(model="surface")
+        live    = _valuate(model="xgboost")
+        assert surface["model"] == "surface"
+        assert surface["shap_factors"] == []
+        assert surface["price_per_ping"] == pytest.approx(live["price_per_ping"], rel=1e-5)
+        assert svc.surface_info()["available"] is True
+
+    def test_interpolated_area_within_grid_cell(self, svc):
+        lo, mid, hi = (_valuate(model="surface", area_ping=a)["price_per_ping"] for a in (20.0, 25.0, 30.0))
+        assert min(lo, hi) <= mid <= max(lo, hi)
+
+    def test_stale_quarter_falls_back_to_live(self, svc, monkeypatch):
+        monkeypatch.setattr(svc, "_year_quarter", lambda: (1999, 1))
+        result = _valuate(model="surface")
+        assert result["model"] == "xgboost"
+        info = svc.surface_info()
+        assert info["available"] is False and "1999Q1" in info["error"]
+
+    def test_missing_surface_falls_back(self, svc, monkeypatch, tmp_path):
+        monkeypatch.setattr(svc, "SURFACE_DIR", tmp_path / "missing")
+        assert _valuate(model="surface")["model"] == "xgboost"
+        assert svc.surface_info()["available"] is False
+
+
+# ─── 首次載入的執行緒安全 ────────────────────────────────────────
+
+class TestConcurrentFirstLoad:
+    """預熱與請求於不同執行緒同時首次載入：_model 可見時後端與編碼表必已就緒"""
+
+    @pytest.fixture
+    def svc(self, monkeypatch):
+        pytest.importorskip("xgboost")
+        from src.main.python.core.result_cache import ResultCache
+        from src.main.python.services import xgboostValuationService as svc
+        if not svc.MODEL_PATH.exists():
+            pytest.skip("模型檔不存在")
+        for name in ("_model", "_booster", "_backend", "_model_version", "_categories"):
+            monkeypatch.setattr(svc, name, None)
+        monkeypatch.setattr(svc, "valuation_cache", ResultCache("valuation-test"))
+        return svc
+
+    @pytest.fixture
+    def select_calls(self, svc, monkeypatch):
+        """後端選擇延遲 0.5 秒（放大載入途中的空窗），回傳呼叫紀錄"""
+        calls = []
+        real_select_backend = svc.select_backend
+
+        def slow_select_backend(*args, **kwargs):
+            calls.append(threading.get_ident())
+            time.sleep(0.5)
+            return real_select_backend(*args, **kwargs)
+
+        monkeypatch.setattr(svc, "select_backend", slow_select_backend)
+        return calls
+
+    def test_concurrent_first_calls_wait_for_load(self, svc, select_calls):
+        barrier = threading.Barrier(2)
+
+        def first_call(age):
+            barrier.wait()
+            return _valuate(property_age=age)
+
+        with ThreadPoolExecutor(2) as pool:
+            results = list(pool.map(first_call, (10, 11)))
+
+        assert [r["model"] for r in results] == ["xgboost", "xgboost"]
+        assert len(select_calls) == 1
+        assert svc._backend is not None and svc._categories is not None
+
+    def test_model_visible_only_after_dependencies(self, svc, select_calls):
+        loader = threading.Thread(target=svc._load)
+        loader.start()
+        while not select_calls:
+            time.sleep(0.005)
+        # 後端選擇進行中：_model 尚未公開
+        assert svc._model is None
+        loader.join()
+        assert svc._model is not None and svc._backend is not None
+
+
+# ─── Qwen2.5 解釋快取（Ollama 替身伺服器）──────────────────────────
+
+@pytest.fixture(scope="module")
+def stub():
+    from src.main.python.scripts.ollama_stub import serve_in_thread
+    with serve_in_thread(first_token_ms=50) as server:
+        yield server
+
+
+class TestExplanationCache:
+    RESULT = dict(
+        district="大安區", building_type="大樓", area_ping=30.0, property_age=10, floor=8,
+        price_per_ping=950_000.0, estimated_value=28_500_000.0, ltv_ratio=0.28,
+        risk_level="低風險", loan_amount=8_000_000.0,
+    )
+
+    @pytest.fixture
+    def svc(self, monkeypatch, tmp_path):
+        """全新的記憶體層 + 暫存目錄磁碟層"""
+        from src.main.python.core.disk_store import DiskStore
+        from src.main.python.core.micro_batcher import Histogram
+        from src.main.python.core.result_cache import ResultCache
+        from src.main.python.services import xgboostValuationService as svc
+        monkeypatch.setattr(svc, "explanation_cache", ResultCache("explain-test"))
+        monkeypatch.setattr(svc, "explanation_store", DiskStore("explain-test", tmp_path))
+        monkeypatch.setattr(svc, "explanation_generation_ms", Histogram(svc.LATENCY_MS_BUCKETS))
+        return svc
+
+    @pytest.fixture
+    def explain(self, svc, stub):
+        """以替身伺服器呼叫 explain_valuation_zh，回傳 (說明列表, 替身伺服器收到的請求數)"""
+        import asyncio
+        from src.main.python.services.ollamaClient import OllamaClient
+        base_url, stub_app = stub
+
+        def run(*overrides, base=None):
+            client = OllamaClient(base_url=base or base_url)
+
+            async def scenario():
+                try:
+                    return await asyncio.gather(*(
+                        svc.explain_valuation_zh(client=client, **{**self.RESULT, **o}) for o in overrides
+                    ))
+                finally:
+                    await client.aclose()
+
+            before = stub_app.state.requests
+            texts = asyncio.run(scenario())
+            return texts, stub_app.state.requests - before
+
+        return run
+
+    def test_repeat_request_hits_cache(self, svc, explain):
+        from src.main.python.scripts.ollama_stub import REPLY
+        assert explain({}) == ([REPLY], 1)
+        assert explain({}) == ([REPLY], 0)
+        stats = svc.explanation_cache_stats()
+        assert stats["memory"]["hits"] == 1
+        assert stats["generation_ms"]["count"] == 1
+
+    def test_concurrent_identical_requests_share_generation(self, svc, explain):
+        texts, generated = explain(*([{}] * 8))
+        assert generated == 1
+        assert len(set(texts)) == 1
+        assert svc.explanation_cache_stats()["memory"]["coalesced"] == 7
+
+    def test_key_normalizes_to_displayed_precision(self, svc):
+        key = lambda **o: svc.explanation_cache_key(svc.explanation_messages(**{**self.RESULT, **o}), "qwen2.5:14b")
+        assert key(area_ping=30.04) == key()
+        assert key(area_ping=30.2) != key()
+        assert svc.explanation_cache_key(svc.explanation_messages(**self.RESULT), "qwen2.5:7b") != key()
+
+    def test_disk_store_survives_restart(self, svc, explain, monkeypatch):
+        from src.main.python.core.result_cache import ResultCache
+        explain({})
+        monkeypatch.setattr(svc, "explanation_cache", ResultCache("explain-restarted"))
+        texts, generated = explain({})
+        assert generated == 0 and texts[0]
+        assert svc.explanation_store.stats()["hits"] == 1
+
+    def test_failure_is_not_cached(self, svc, explain):
+        from src.main.python.scripts.ollama_stub import REPLY, serve_in_thread
+        with serve_in_thread(fail_status=503) as (failing_url, _):
+            assert explain({}, base=failing_url)[0] == [""]
+        assert explain({}) == ([REPLY], 1)
+
+    def test_stream_fills_cache_and_replays(self, svc, stub):
+        import asyncio
+        from src.main.python.scripts.ollama_stub import REPLY
+        from src.main.python.services.ollamaClient import OllamaClient
+        client = OllamaClient(base_url=stub[0])
+
+        async def stream():
+            try:
+                return [t async for t in svc.stream_explanation_zh(client=client, **self.RESULT)]
+            finally:
+                await client.aclose()
+
+        assert len(asyncio.run(stream())) == len(REPLY)
+        assert asyncio.run(stream()) == [REPLY]
+
+
+# ─── 分層解釋（LLM 延遲預算 / 模板備援）──────────────────────────────
+
+class TestExplainWithFallback:
+    RESULT = TestExplanationCache.RESULT
+
+    @pytest.fixture
+    def svc(self, monkeypatch):
+        from src.main.python.core.result_cache import ResultCache
+        from src.main.python.services import xgboostValuationService as svc
+        monkeypatch.setattr(svc, "explanation_cache", ResultCache("explain-test"))
+        return svc
+
+    def _run(self, svc, base_url, *calls, pause_s=0.0):
+        """同一 event loop 內依序呼叫 explain_with_fallback（calls 為各次的 mode / budget_ms 參數）"""
+        import asyncio
+        from src.main.python.services.ollamaClient import OllamaClient
+        client = OllamaClient(base_url=base_url)
+
+        async def scenario():
+            out = []
+            try:
+                for kwargs in calls:
+                    out.append(await svc.explain_with_fallback(client=client, **kwargs, **self.RESULT))
+                    await asyncio.sleep(pause_s)
+            finally:
+                await client.aclose()
+            return out
+
+        return asyncio.run(scenario())
+
+    def test_llm_within_budget(self, svc):
+        from src.main.python.scripts.ollama_stub import REPLY, serve_in_thread
+        with serve_in_thread() as (base_url, _):
+            [res] = self._run(svc, base_url, {"budget_ms": 2000})
+        assert res == {"explanation": REPLY, "source": "llm"}
+
+    def test_over_budget_returns_template_and_fills_cache(self, svc):
+        from src.main.python.scripts.ollama_stub import REPLY, serve_in_thread
+        with serve_in_thread(first_token_ms=200) as (base_url, stub_app):
+            first, second = self._run(svc, base_url, {"budget_ms": 20}, {"budget_ms": 20}, pause_s=0.5)
+        assert first["source"] == "template"
+        assert second == {"explanation": REPLY, "source": "llm"}
+        assert stub_app.state.requests == 1
+
+    def test_llm_failure_returns_template(self, svc):
+        from src.main.python.scripts.ollama_stub import serve_in_thread
+        with serve_in_thread(fail_status=500) as (base_url, _):
+            [res] = self._run(svc, base_url, {"mode": "llm"})
+        assert res["source"] == "template"
+
+    def test_template_mode_is_deterministic(self, svc):
+        factors = [{"label": "屋齡", "contribution": -0.4, "direction": "拉低"}]
+        a, b = self._run(svc, "http://127.0.0.1:9", {"mode": "template", "shap_factors": factors},
+                         {"mode": "template", "shap_factors": factors})
+        assert a == b and a["source"] == "template"
+        assert "屋齡折舊" in a["explanation"]
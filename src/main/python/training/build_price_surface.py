@@ -0,0 +1,145 @@
+"""
+INPUT:  models/xgboost_valuation.json、models/xgboost_encoders.json、data/lvpr/cleaned_lvpr.parquet（誤差評估）
+OUTPUT: models/price_surface/surface.npy（float32 價格曲面，查詢端 mmap）
+        models/price_surface/surface.json（格點、模型版本、估價季度、對即時推論的誤差）
+POS:    Day 1 模型建置 - 離線預先計算 XGBoost 價格曲面（供 valuate_xgboost model="surface" 查表）
+
+執行方式：
+    cd <project_root>
+    python -m src.main.python.training.build_price_surface
+    python -m src.main.python.training.build_price_surface --year 2026 --quarter 1
+
+說明：
+    曲面僅對建置時的模型版本與估價季度有效，每季換季或重新訓練模型後需重新建置
+    （服務偵測到不符時 model="surface" 自動改走即時推論）。
+    誤差評估分兩組：實際成交資料抽樣（含格點範圍外的物件）與格點範圍內均勻抽樣；
+    另量測單筆查表延遲（PriceSurface.log_price，µs）。
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.main.python.inference.price_surface import (
+    DEFAULT_KNOTS,
+    build_price_surface,
+    surface_error,
+    write_meta,
+)
+from src.main.python.services import xgboostValuationService as svc
+
+DATA_PATH = "data/lvpr/cleaned_lvpr.parquet"
+
+
+def _lvpr_rows(n: int, year: int, quarter: int, seed: int = 0) -> np.ndarray:
+    """實際成交資料抽樣，估價年度 / 季度改為曲面建置值"""
+    import pandas as pd
+    df = pd.read_parquet(DATA_PATH)
+    df = df.sample(n=min(n, len(df)), random_state=seed)
+    cols = []
+    for col in svc.FEATURE_COLS:
+        if col in svc._categories.classes:
+            cols.append(svc._categories.encode_column(col, df[col].astype(str).to_numpy()))
+        elif col == "year":
+            cols.append(np.full(len(df), year))
+        elif col == "quarter":
+            cols.append(np.full(len(df), quarter))
+        else:
+            cols.append(df[col].to_numpy())
+    return np.column_stack(cols).astype(np.float32)
+
+
+def _in_grid_rows(n: int, year: int, quarter: int, seed: int = 0) -> np.ndarray:
+    """格點範圍內均勻抽樣（面積 / 屋齡為連續值，其餘為整數）"""
+    rng = np.random.default_rng(seed)
+    k = DEFAULT_KNOTS
+    floor = rng.integers(k["floor"][0], k["floor"][-1] + 1, n)
+    rows = np.column_stack([
+        rng.integers(0, len(svc._categories.classes["district"]), n),
+        rng.integers(0, len(svc._categories.classes["building_type"]), n),
+        rng.uniform(k["area_ping"][0], k["area_ping"][-1], n),
+        rng.uniform(k["property_age"][0], k["property_age"][-1], n).round(),
+        floor,
+        np.maximum(floor, rng.integers(k["total_floors"][0], k["total_floors"][-1] + 1, n)),
+        rng.integers(0, 2, n),
+        rng.integers(k["rooms"][0], k["rooms"][-1] + 1, n),
+        np.full(n, year),
+        np.full(n, quarter),
+    ])
+    return rows.astype(np.float32)
+
+
+def _lookup_latency_us(surface, rows: np.ndarray, calls: int = 5_000) -> dict:
+    out = np.empty(calls)
+    args = [(int(r[0]), int(r[1]), float(r[2]), float(r[3]), int(r[4]), int(r[5]), bool(r[6]), int(r[7]))
+            for r in rows[:calls]]
+    for i in range(calls):
+        a = args[i % len(args)]
+        start = time.perf_counter()
+        surface.log_price(*a)
+        out[i] = (time.perf_counter() - start) * 1e6
+    return {"p50": round(float(np.percentile(out, 50)), 2), "p99": round(float(np.percentile(out, 99)), 2)}
+
+
+def main():
+    default_year, default_quarter = svc._year_quarter()
+    parser = argparse.ArgumentParser(description="建置 XGBoost 價格曲面")
+    parser.add_argument("--year", type=int, default=default_year)
+    parser.add_argument("--quarter", type=int, default=default_quarter, choices=[1, 2, 3, 4])
+    parser.add_argument("--samples", type=int, default=20_000, help="誤差評估抽樣筆數（每組）")
+    parser.add_argument("--out", default=str(svc.SURFACE_DIR))
+    args = parser.parse_args()
+
+    print("═" * 50)
+    print("  XGBoost 價格曲面建置")
+    print("═" * 50)
+    svc._load()
+    n_districts = len(svc._categories.classes["district"])
+    n_btypes    = len(svc._categories.classes["building_type"])
+
+    def progress(done: int, total: int) -> None:
+        if done == total or done % 20 == 0:
+            print(f"   區塊 {done}/{total}", flush=True)
+
+    start = time.perf_counter()
+    surface = build_price_surface(
+        args.out,
+        predict_fn       = svc.predict_log_prices,
+        n_districts      = n_districts,
+        n_building_types = n_btypes,
+        year             = args.year,
+        quarter          = args.quarter,
+        meta             = {
+            "model_version": svc.model_version(),
+            "categories":    svc._categories.classes,
+        },
+        progress         = progress,
+    )
+    print(f"✅ 曲面 shape={tuple(surface.values.shape)}（{surface.nbytes / 2**20:.1f} MB），"
+          f"耗時 {time.perf_counter() - start:.0f} 秒")
+
+    # ── 對即時推論的誤差 ──────────────────────────────────────
+    error = {}
+    in_grid = _in_grid_rows(args.samples, args.year, args.quarter)
+    for name, rows in (
+        ("lvpr",    _lvpr_rows(args.samples, args.year, args.quarter)),
+        ("in_grid", in_grid),
+    ):
+        error[name] = surface_error(surface.log_prices(rows), svc.predict_log_prices(rows))
+    surface.meta["error"] = error
+    surface.meta["lookup_us"] = _lookup_latency_us(surface, in_grid)
+    write_meta(args.out, surface.meta)
+
+    print("\n單價誤差（%）：")
+    print(f"{'sample':<10}{'MAPE':>8}{'P50':>8}{'P95':>8}{'P99':>8}{'max':>9}")
+    print("─" * 51)
+    for name, e in error.items():
+        print(f"{name:<10}{e['mape_pct']:>8.2f}{e['p50_pct']:>8.2f}{e['p95_pct']:>8.2f}"
+              f"{e['p99_pct']:>8.2f}{e['max_pct']:>9.2f}")
+    print(f"\n單筆查表延遲：P50 {surface.meta['lookup_us']['p50']} µs、P99 {surface.meta['lookup_us']['p99']} µs")
+    print(f"✅ 價格曲面儲存：{args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 INPUT:  data/lvpr/cleaned_lvpr.parquet（fetch_lvpr.py 產出）
 OUTPUT: models/xgboost_valuation.json（XGBoost 模型）
         models/xgboost_encoders.pkl（Label Encoder 對照表）
+        models/xgboost_encoders.json（推論用類別編碼表，免 unpickle sklearn）
 POS:    Day 1 模型訓練 - 特徵工程、XGBoost 訓練、MAPE 評估、模型儲存
 
 執行方式：
@@ -18,10 +19,13 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import mean_absolute_percentage_error
 
+from src.main.python.utils.category_tables import CategoryTables
+
 # ─── 路徑設定 ──────────────────────────────────────────────
 DATA_PATH     = Path("data/lvpr/cleaned_lvpr.parquet")
 MODEL_PATH    = Path("models/xgboost_valuation.json")
 ENCODERS_PATH = Path("models/xgboost_encoders.pkl")
+CATEGORY_TABLES_PATH = Path("models/xgboost_encoders.json")
 
 # 類別型特徵（需 Label Encoding）
 CAT_COLS = ["district", "building_type"]
@@ -142,8 +146,10 @@ def main():
     MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
     model.save_model(str(MODEL_PATH))
     joblib.dump(encoders, ENCODERS_PATH)
+    CategoryTables.from_label_encoders(encoders).save(CATEGORY_TABLES_PATH)
     print(f"\n✅ 模型儲存：{MODEL_PATH}")
     print(f"✅ Encoder 儲存：{ENCODERS_PATH}")
+    print(f"✅ 類別編碼表儲存：{CATEGORY_TABLES_PATH}")
 
 
 if __name__ == "__main__":
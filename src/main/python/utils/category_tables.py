@@ -0,0 +1,123 @@
+"""
+INPUT:  LabelEncoder 對照表（{欄位: LabelEncoder}）或 JSON 對照表檔（models/xgboost_encoders.json）
+OUTPUT: 類別 → 整數編碼（單值 / 整欄向量化），未知類別統計
+POS:    工具層 — 預先編譯的類別編碼表（取代每次請求呼叫 LabelEncoder.transform）
+
+設計說明：
+    LabelEncoder.transform([v]) 每次都要轉陣列、二分搜尋，未知值還要經過例外處理；
+    模型載入時將 classes_ 編譯成 {類別字串: 編碼} dict（編碼 = classes_ 中的位置，與 transform 相同），
+    單值查表 O(1)，整欄以 np.fromiter 一次編碼。未知類別一律編碼為 UNKNOWN_CODE（0），
+    並依欄位累計查詢次數 / 未知次數 / 最常見的未知值，供 /metrics 監控資料漂移。
+
+JSON 格式（不需 unpickle sklearn 物件即可載入）：
+    {"version": 1, "unknown_code": 0, "columns": {"district": ["中山區", ...], ...}}
+"""
+
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+TABLES_VERSION = 1
+UNKNOWN_CODE   = 0
+# 每欄保留的相異未知值上限（避免惡意輸入撐大記憶體）
+MAX_TRACKED_UNKNOWN = 1000
+
+
+class CategoryTables:
+    """欄位 → 類別編碼表（含未知類別計數，執行緒安全）"""
+
+    def __init__(self, columns: dict[str, list[str]], unknown_code: int = UNKNOWN_CODE):
+        self.classes = {col: [str(c) for c in values] for col, values in columns.items()}
+        self.unknown_code = int(unknown_code)
+        self._index = {col: {c: i for i, c in enumerate(values)} for col, values in self.classes.items()}
+        self._lock = threading.Lock()
+        self._lookups  = {col: 0 for col in self.classes}
+        self._unknowns = {col: 0 for col in self.classes}
+        self._unknown_values = {col: Counter() for col in self.classes}
+
+    # ─── 建立 / 序列化 ───────────────────────────────────────────────
+
+    @classmethod
+    def from_label_encoders(cls, encoders: dict) -> "CategoryTables":
+        """由 {欄位: LabelEncoder} 編譯（僅讀取 classes_）"""
+        return cls({col: list(le.classes_) for col, le in encoders.items()})
+
+    @classmethod
+    def load(cls, path) -> "CategoryTables":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != TABLES_VERSION:
+            raise ValueError(f"不支援的編碼表版本：{data.get('version')}")
+        return cls(data["columns"], data.get("unknown_code", UNKNOWN_CODE))
+
+    def save(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": TABLES_VERSION, "unknown_code": self.unknown_code, "columns": self.classes},
+                f, ensure_ascii=False, indent=2,
+            )
+
+    # ─── 編碼 ────────────────────────────────────────────────────────
+
+    def encode(self, col: str, value) -> int:
+        """單值編碼；欄位或類別未知時回傳 unknown_code 並計數"""
+        index = self._index.get(col)
+        if index is None:
+            return self.unknown_code
+        code = index.get(str(value))
+        with self._lock:
+            self._lookups[col] += 1
+            if code is None:
+                self._record_unknown_locked(col, str(value), 1)
+        return self.unknown_code if code is None else code
+
+    def encode_column(self, col: str, values: Iterable) -> np.ndarray:
+        """整欄向量化編碼（int32），語意同逐筆 encode"""
+        items = [str(v) for v in (values.tolist() if isinstance(values, np.ndarray) else values)]
+        index = self._index.get(col)
+        if index is None:
+            return np.full(len(items), self.unknown_code, dtype=np.int32)
+        codes = np.fromiter((index.get(v, -1) for v in items), dtype=np.int32, count=len(items))
+        missing = codes < 0
+        with self._lock:
+            self._lookups[col] += len(items)
+            if missing.any():
+                for value, count in Counter(v for v, m in zip(items, missing.tolist()) if m).items():
+                    self._record_unknown_locked(col, value, count)
+        codes[missing] = self.unknown_code
+        return codes
+
+    def _record_unknown_locked(self, col: str, value: str, count: int) -> None:
+        self._unknowns[col] += count
+        tracked = self._unknown_values[col]
+        if value in tracked or len(tracked) < MAX_TRACKED_UNKNOWN:
+            tracked[value] += count
+
+    # ─── 指標 ────────────────────────────────────────────────────────
+
+    def stats(self, top: int = 5) -> dict:
+        """各欄查詢次數、未知次數 / 比率與最常見的未知值"""
+        with self._lock:
+            return {
+                col: {
+                    "classes":      len(self.classes[col]),
+                    "lookups":      self._lookups[col],
+                    "unknown":      self._unknowns[col],
+                    "unknown_rate": round(self._unknowns[col] / self._lookups[col], 4) if self._lookups[col] else 0.0,
+                    "top_unknown":  dict(self._unknown_values[col].most_common(top)),
+                }
+                for col in self.classes
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for col in self.classes:
+                self._lookups[col] = 0
+                self._unknowns[col] = 0
+                self._unknown_values[col].clear()
@@ -0,0 +1,125 @@
+"""
+INPUT:  串流數值區塊（np.ndarray，任意長度、可分批送入）
+OUTPUT: 分位數估計值 + 誤差界（rank 誤差與對應數值區間）
+POS:    工具層 — 可合併的 t-digest 分位數草圖（Merging t-digest，NumPy 向量化壓縮）
+
+算法說明：
+    以 (mean, weight) centroid 集合近似分配；新資料先進緩衝區，
+    緩衝滿時與既有 centroid 合併排序，依 k1 尺度函數分組壓縮：
+        k(q) = compression / (2π) × asin(2q - 1)
+    同一組內 k 值跨距 ≤ 1，尾端 centroid 權重小、精度高（P5 / P95 友善）。
+    記憶體上限約 O(compression + buffer_size)，與資料總量無關。
+
+誤差界：
+    q 所在 centroid 權重 w，樣本總數 N → rank 誤差 ≈ w / (2N)；
+    數值區間取 [quantile(q - ε), quantile(q + ε)]。
+"""
+
+import math
+
+import numpy as np
+
+DEFAULT_COMPRESSION = 200
+DEFAULT_BUFFER_SIZE = 50_000
+
+
+class TDigest:
+    """可合併的串流分位數草圖"""
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.compression = float(compression)
+        self.buffer_size = int(buffer_size)
+        self._means   = np.empty(0, dtype=np.float64)
+        self._weights = np.empty(0, dtype=np.float64)
+        self._buffer: list[np.ndarray] = []
+        self._buffered = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    # ── 寫入 ───────────────────────────────────────────────
+    def update(self, values) -> None:
+        """送入一批數值（任意 shape，會攤平）"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return
+        self._buffer.append(values)
+        self._buffered += values.size
+        self.count += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self._buffered >= self.buffer_size:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> None:
+        """合併另一個草圖（平行分片後彙總用）"""
+        other._compress()
+        if other.count == 0:
+            return
+        self._compress()
+        self._means   = np.concatenate([self._means,   other._means])
+        self._weights = np.concatenate([self._weights, other._weights])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(force=True)
+
+    def _compress(self, force: bool = False) -> None:
+        if not self._buffer and not force:
+            return
+        means   = np.concatenate([self._means]   + self._buffer)
+        weights = np.concatenate([self._weights] + [np.ones(b.size) for b in self._buffer])
+        self._buffer.clear()
+        self._buffered = 0
+        if means.size == 0:
+            return
+
+        order   = np.argsort(means, kind="stable")
+        means   = means[order]
+        weights = weights[order]
+
+        # 以每點中心的累積分位數 → k1 尺度 → 分組
+        total  = weights.sum()
+        q_mid  = (np.cumsum(weights) - 0.5 * weights) / total
+        k      = self.compression / (2.0 * math.pi) * np.arcsin(np.clip(2.0 * q_mid - 1.0, -1.0, 1.0))
+        groups = np.floor(k - k[0]).astype(np.int64)
+        _, starts = np.unique(groups, return_index=True)
+
+        group_weights = np.add.reduceat(weights, starts)
+        group_sums    = np.add.reduceat(means * weights, starts)
+        self._means   = group_sums / group_weights
+        self._weights = group_weights
+
+    # ── 查詢 ───────────────────────────────────────────────
+    @property
+    def centroid_count(self) -> int:
+        self._compress()
+        return int(self._means.size)
+
+    def quantile(self, q: float) -> float:
+        """估計第 q 分位數（0 ≤ q ≤ 1）"""
+        self._compress()
+        if self.count == 0:
+            return math.nan
+        if self._means.size == 1:
+            return float(self._means[0])
+
+        # centroid 中心位置的累積權重，兩端補 min / max 後線性內插
+        centers = np.cumsum(self._weights) - 0.5 * self._weights
+        xs = np.concatenate([[0.0], centers, [float(self.count)]])
+        ys = np.concatenate([[self.min], self._means, [self.max]])
+        return float(np.interp(q * self.count, xs, ys))
+
+    def rank_error(self, q: float) -> float:
+        """q 所在 centroid 的半權重 / N（分位數 rank 誤差界）"""
+        self._compress()
+        if self.count == 0:
+            return math.nan
+        cum = np.cumsum(self._weights)
+        idx = min(int(np.searchsorted(cum, q * self.count)), cum.size - 1)
+        return float(0.5 * self._weights[idx] / self.count)
+
+    def quantile_bounds(self, q: float) -> tuple[float, float]:
+        """q 分位數的數值誤差區間 [quantile(q-ε), quantile(q+ε)]"""
+        eps = self.rank_error(q)
+        return self.quantile(max(q - eps, 0.0)), self.quantile(min(q + eps, 1.0))
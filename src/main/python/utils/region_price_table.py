@@ -3,10 +3,13 @@ INPUT:  region（縣市名稱）、building_type（建物類型）、property_ag
         floor（樓層）、layout（格局）、has_parking（是否有車位）、area_ping（坪數）
 OUTPUT: base_value（基準估值，單位：元）
 POS:    鑑價工具層，提供台灣22縣市的基準單價查詢與調整係數計算
+        （calculate_base_values 為批次向量化版本：整數編碼查表 + searchsorted 分段，與逐筆結果一致）
 """
 
 from typing import Tuple
 
+import numpy as np
+
 # ────────────────────────────────────────────────
 # 台灣22縣市基準單價（大樓，萬/坪）
 # ────────────────────────────────────────────────
@@ -254,3 +257,141 @@ def calculate_base_value(
     }
 
     return round(base_value, 0), breakdown
+
+
+# ────────────────────────────────────────────────
+# 向量化查表：類別欄位整數編碼（未知值編為最後一碼，對應逐筆版本的預設值）
+# ────────────────────────────────────────────────
+REGION_CODES: tuple[str, ...]        = tuple(REGION_BASE_PRICE)
+BUILDING_TYPE_CODES: tuple[str, ...] = tuple(BUILDING_TYPE_MULTIPLIER)
+UNKNOWN_REGION_CODE        = len(REGION_CODES)
+UNKNOWN_BUILDING_TYPE_CODE = len(BUILDING_TYPE_CODES)
+
+_REGION_INDEX        = {r: i for i, r in enumerate(REGION_CODES)}
+_BUILDING_TYPE_INDEX = {b: i for i, b in enumerate(BUILDING_TYPE_CODES)}
+
+_UNIT_PRICE_TABLE = np.array([REGION_BASE_PRICE[r] for r in REGION_CODES] + [10.0])
+_PARKING_TABLE    = np.array(
+    [PARKING_PREMIUM.get(r, DEFAULT_PARKING_PREMIUM) for r in REGION_CODES] + [DEFAULT_PARKING_PREMIUM]
+)
+_BUILDING_MULT_TABLE = np.array([BUILDING_TYPE_MULTIPLIER[b] for b in BUILDING_TYPE_CODES] + [1.00])
+_NO_FLOOR_EFFECT     = np.array([b in ("透天", "別墅") for b in BUILDING_TYPE_CODES] + [False])
+
+# 屋齡分段（searchsorted side="left"）：≤0 / 1-5 / 6-20 / 21-40 / >40
+# 係數 = base - (age - offset) × slope，與 age_depreciation_factor 各段公式逐位元相同
+_AGE_BOUNDS = np.array([0, 5, 20, 40])
+_AGE_BASE   = np.array([1.00, 1.00, 0.95, 0.65, 0.55])
+_AGE_OFFSET = np.array([0, 0, 5, 20, 0])
+_AGE_SLOPE  = np.array([0.0, 0.01, 0.02, 0.005, 0.0])
+
+# 樓層分段（searchsorted side="left"）：≤0 / 1 / 2-3 / 4-7 / 8-15 / 16-25 / >25
+_FLOOR_BOUNDS = np.array([0, 1, 3, 7, 15, 25])
+_FLOOR_TABLE  = np.array([0.95, 0.88, 0.95, 1.00, 1.05, 1.08, 1.10])
+
+
+def encode_regions(regions) -> np.ndarray:
+    """縣市名稱 → 整數代碼（REGION_CODES index，未知縣市 = UNKNOWN_REGION_CODE）"""
+    return _encode(regions, _REGION_INDEX, UNKNOWN_REGION_CODE)
+
+
+def encode_building_types(building_types) -> np.ndarray:
+    """建物類型 → 整數代碼（BUILDING_TYPE_CODES index，未知類型 = UNKNOWN_BUILDING_TYPE_CODE）"""
+    return _encode(building_types, _BUILDING_TYPE_INDEX, UNKNOWN_BUILDING_TYPE_CODE)
+
+
+def _encode(values, index: dict[str, int], unknown: int) -> np.ndarray:
+    """已是整數陣列者視為代碼直接回傳；字串以 dict 查表（較 np.unique 排序 object 陣列快數倍）"""
+    arr = np.asarray(values)
+    if np.issubdtype(arr.dtype, np.integer):
+        return arr.astype(np.intp, copy=False)
+    items = arr.ravel().tolist()
+    return np.fromiter((index.get(v, unknown) for v in items), dtype=np.intp, count=len(items))
+
+
+def _factorize(values) -> Tuple[list, np.ndarray]:
+    """任意可雜湊值 → (唯一值清單, 代碼陣列)，依首次出現順序編碼"""
+    items = np.asarray(values, dtype=object).ravel().tolist()
+    index: dict = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in items), dtype=np.intp, count=len(items))
+    return list(index), codes
+
+
+def age_depreciation_factors(property_ages) -> np.ndarray:
+    """屋齡折舊係數（向量化，分段以 np.searchsorted 定位）"""
+    ages = np.asarray(property_ages, dtype=np.int64)
+    seg  = np.searchsorted(_AGE_BOUNDS, ages, side="left")
+    return _AGE_BASE[seg] - (ages - _AGE_OFFSET[seg]) * _AGE_SLOPE[seg]
+
+
+def floor_adjustment_factors(floors, building_type_codes) -> np.ndarray:
+    """樓層調整係數（向量化，分段以 np.searchsorted 定位；透天 / 別墅固定 1.00）"""
+    floors = np.asarray(floors, dtype=np.int64)
+    factor = _FLOOR_TABLE[np.searchsorted(_FLOOR_BOUNDS, floors, side="left")]
+    return np.where(_NO_FLOOR_EFFECT[building_type_codes], 1.00, factor)
+
+
+def layout_efficiency_factors(layouts) -> np.ndarray:
+    """
+    格局效率係數（向量化，判斷順序同 layout_efficiency_factor，以 np.select 取第一個成立條件）
+
+    格局字串種類有限，先編碼去重，只對唯一值做字串比對再以代碼廣播。
+    """
+    uniques, codes = _factorize(layouts)
+    if not uniques:
+        return np.empty(0, dtype=np.float64)
+    text = np.char.strip(np.array(uniques, dtype=str))
+    has  = lambda token: np.char.find(text, token) >= 0
+    table = np.select(
+        [has("4房"), has("3房"), has("2房"), has("1房") | has("套房")],
+        [0.97, 1.02, 1.05, 0.95],
+        default=1.00,
+    ).astype(np.float64)
+    return table[codes]
+
+
+def calculate_base_values(
+    regions,
+    building_types,
+    property_ages,
+    floors,
+    layouts,
+    has_parking,
+    area_pings,
+) -> Tuple[np.ndarray, dict[str, np.ndarray]]:
+    """
+    批次計算基準估值（各參數為等長序列，公式同 calculate_base_value，結果逐位元一致）
+
+    縣市 / 建物類型可傳入名稱或已編碼的整數代碼（encode_regions / encode_building_types），
+    單價、乘數、車位加成皆以代碼索引查表陣列；屋齡與樓層分段以 np.searchsorted 定位，
+    格局去重後以 np.select 判斷。
+
+    Returns:
+        Tuple[base_values（元，ndarray）, breakdown（各係數明細欄，鍵同 calculate_base_value，值為 ndarray）]
+    """
+    region_codes   = encode_regions(regions)
+    building_codes = encode_building_types(building_types)
+    has_parking    = np.asarray(has_parking, dtype=bool)
+    area_pings     = np.asarray(area_pings, dtype=np.float64)
+
+    unit_price = _UNIT_PRICE_TABLE[region_codes]
+    bldg_mult  = _BUILDING_MULT_TABLE[building_codes]
+    age_factor = age_depreciation_factors(property_ages)
+    flr_factor = floor_adjustment_factors(floors, building_codes)
+    layout_eff = layout_efficiency_factors(layouts)
+
+    main_value = unit_price * area_pings * bldg_mult * age_factor * flr_factor * layout_eff * 10_000
+    parking_premium = np.where(has_parking, _PARKING_TABLE[region_codes], 0.0)
+    base_values = main_value + parking_premium
+
+    breakdown = {
+        "unit_price_per_ping":  unit_price,
+        "area_ping":            area_pings,
+        "building_multiplier":  bldg_mult,
+        "age_depreciation":     np.round(age_factor, 4),
+        "floor_factor":         np.round(flr_factor, 4),
+        "layout_efficiency":    np.round(layout_eff, 4),
+        "main_value":           np.round(main_value, 0),
+        "parking_premium":      parking_premium,
+    }
+
+    return np.round(base_values, 0), breakdown